@@ -0,0 +1,102 @@
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ports.upload_storage import (
+    DirectUploadUnsupportedError,
+    PresignedUpload,
+    StoredObject,
+    UploadStoragePort,
+)
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class LocalUploadStorage(UploadStoragePort):
+    """
+    Upload storage on the API host's disk.
+
+    Objects are plain files under root, served by the API's /uploads mount.
+    Files staged in a directory on the same filesystem are published with an
+    atomic rename, so storing them costs no copy.
+    """
+
+    def __init__(self, root: Path, base_url: str = "/uploads"):
+        """Initialize the storage rooted at a directory served under base_url."""
+        self._root = root
+        self._base_url = base_url.rstrip("/")
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _path(self, key: str) -> Path:
+        path = (self._root / key).resolve()
+        if self._root.resolve() not in path.parents:
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return path
+
+    def public_url(self, key: str) -> str:
+        return f"{self._base_url}/{key}"
+
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        target = self._path(key)
+
+        def _move() -> None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, target)
+
+        await asyncio.to_thread(_move)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).is_file)
+
+    async def read_bytes(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def iter_bytes(self, key: str) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while chunk := await asyncio.to_thread(handle.read, _CHUNK_SIZE):
+                yield chunk
+        finally:
+            await asyncio.to_thread(handle.close)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._path(key).unlink, missing_ok=True)
+
+    async def list_objects(self, prefix: str = "") -> list[StoredObject]:
+        def _scan() -> list[StoredObject]:
+            if not self._root.is_dir():
+                return []
+            objects = []
+            for path in self._root.rglob("*"):
+                key = path.relative_to(self._root).as_posix()
+                # Dot-prefixed entries are staging areas and temp files, not objects.
+                if any(part.startswith(".") for part in key.split("/")):
+                    continue
+                if not key.startswith(prefix) or not path.is_file():
+                    continue
+                stat = path.stat()
+                objects.append(StoredObject(
+                    key=key,
+                    size=stat.st_size,
+                    modified_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                ))
+            return objects
+
+        return await asyncio.to_thread(_scan)
+
+    async def presign_upload(
+        self,
+        key: str,
+        content_type_prefix: str,
+        max_bytes: int,
+        expires_in: int,
+    ) -> PresignedUpload:
+        raise DirectUploadUnsupportedError("Direct uploads require S3 upload storage")
@@ -0,0 +1,15 @@
+from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from ports.payment_gateway import PaymentGatewayPort
+
+
+def get_payment_gateway() -> PaymentGatewayPort:
+    """
+    Return the payment gateway adapter shared by the whole process.
+
+    Routers and background workers (e.g. the payment webhook inbox worker)
+    all select the gateway here, so a webhook is verified and applied by the
+    same adapter whether it is handled inline or from the inbox. The Tpay
+    adapter's payment methods are not implemented yet, so every environment
+    uses the shared fake adapter for now.
+    """
+    return get_shared_fake_payment_adapter()
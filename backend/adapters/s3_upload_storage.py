@@ -0,0 +1,290 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import xml.etree.ElementTree as ElementTree
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import httpx
+
+from ports.upload_storage import PresignedUpload, StoredObject, UploadStoragePort
+from services.http_clients import http_clients
+
+_S3_NS = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _uri_encode(value: str, safe: str = "-_.~") -> str:
+    return quote(value, safe=safe)
+
+
+class SigV4Signer:
+    """
+    AWS Signature Version 4 for the S3 API.
+
+    Implements header signing for API requests and policy signing for
+    browser POST uploads, which is all the adapter needs; no SDK required.
+    """
+
+    def __init__(self, access_key_id: str, secret_access_key: str, region: str, service: str = "s3"):
+        self.access_key_id = access_key_id
+        self._secret_access_key = secret_access_key
+        self.region = region
+        self.service = service
+
+    def _scope(self, day: str) -> str:
+        return f"{day}/{self.region}/{self.service}/aws4_request"
+
+    def credential(self, day: str) -> str:
+        return f"{self.access_key_id}/{self._scope(day)}"
+
+    def signing_key(self, day: str) -> bytes:
+        key = _hmac(f"AWS4{self._secret_access_key}".encode("utf-8"), day)
+        for part in (self.region, self.service, "aws4_request"):
+            key = _hmac(key, part)
+        return key
+
+    def sign_string(self, day: str, string_to_sign: str) -> str:
+        return hmac.new(self.signing_key(day), string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def canonical_request(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+    ) -> tuple[str, str]:
+        """Return (canonical request, signed header list) for a request."""
+        canonical_query = "&".join(
+            f"{_uri_encode(k)}={_uri_encode(v)}" for k, v in sorted(query.items())
+        )
+        lowered = {k.lower(): " ".join(v.strip().split()) for k, v in headers.items()}
+        signed_headers = ";".join(sorted(lowered))
+        canonical_headers = "".join(f"{k}:{lowered[k]}\n" for k in sorted(lowered))
+        return (
+            "\n".join([
+                method,
+                _uri_encode(path, safe="-_.~/"),
+                canonical_query,
+                canonical_headers,
+                signed_headers,
+                payload_hash,
+            ]),
+            signed_headers,
+        )
+
+    def authorization(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+        now: datetime,
+    ) -> str:
+        """Return the Authorization header value; headers must include x-amz-date and host."""
+        day = now.strftime("%Y%m%d")
+        canonical, signed_headers = self.canonical_request(method, path, query, headers, payload_hash)
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            now.strftime("%Y%m%dT%H%M%SZ"),
+            self._scope(day),
+            hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+        ])
+        return (
+            f"AWS4-HMAC-SHA256 Credential={self.credential(day)}, "
+            f"SignedHeaders={signed_headers}, Signature={self.sign_string(day, string_to_sign)}"
+        )
+
+
+class S3UploadStorage(UploadStoragePort):
+    """
+    Upload storage in an S3-compatible bucket (AWS S3, MinIO, R2, ...).
+
+    Uses path-style requests (``<endpoint>/<bucket>/<key>``) signed with
+    SigV4 over the app-scoped "s3" client from ``services.http_clients``, so
+    the ``HTTP_CLIENT_*`` pool limits and timeouts apply. Objects are written with an immutable
+    Cache-Control and served from public_base_url (bucket website or CDN),
+    so file traffic never reaches the API. Direct client uploads use a
+    presigned POST policy, which lets the bucket enforce the size limit.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str = "us-east-1",
+        public_base_url: str = "",
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Initialize the adapter for one bucket.
+
+        public_base_url defaults to the path-style bucket URL. transport lets
+        tests route requests to an in-process stand-in through a private
+        client instead of the shared one.
+        """
+        self._endpoint_url = endpoint_url.rstrip("/")
+        self._bucket = bucket
+        self._signer = SigV4Signer(access_key_id, secret_access_key, region)
+        self._public_base_url = (public_base_url or f"{self._endpoint_url}/{bucket}").rstrip("/")
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._transport is None:
+            return http_clients.get("s3")
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=30.0)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close a private test client; the shared client closes with the registry."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _object_path(self, key: str) -> str:
+        return f"/{self._bucket}/{key}"
+
+    def _signed_request(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        content: bytes = b"",
+    ) -> httpx.Request:
+        now = datetime.now(timezone.utc)
+        query = query or {}
+        payload_hash = hashlib.sha256(content).hexdigest()
+        signed = {
+            "host": httpx.URL(self._endpoint_url).netloc.decode("ascii"),
+            "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "x-amz-content-sha256": payload_hash,
+            **(headers or {}),
+        }
+        signed["authorization"] = self._signer.authorization(
+            method, path, query, signed, payload_hash, now,
+        )
+        return self._http().build_request(
+            method,
+            f"{self._endpoint_url}{_uri_encode(path, safe='-_.~/')}",
+            params=query or None,
+            headers=signed,
+            content=content or None,
+        )
+
+    def public_url(self, key: str) -> str:
+        return f"{self._public_base_url}/{key}"
+
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        content = await asyncio.to_thread(path.read_bytes)
+        request = self._signed_request(
+            "PUT",
+            self._object_path(key),
+            headers={"content-type": content_type, "cache-control": _IMMUTABLE_CACHE_CONTROL},
+            content=content,
+        )
+        response = await self._http().send(request)
+        response.raise_for_status()
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        response = await self._http().send(self._signed_request("HEAD", self._object_path(key)))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def read_bytes(self, key: str) -> bytes | None:
+        response = await self._http().send(self._signed_request("GET", self._object_path(key)))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+    async def iter_bytes(self, key: str) -> AsyncIterator[bytes]:
+        request = self._signed_request("GET", self._object_path(key))
+        response = await self._http().send(request, stream=True)
+        try:
+            if response.status_code == 404:
+                raise FileNotFoundError(key)
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def delete(self, key: str) -> None:
+        response = await self._http().send(self._signed_request("DELETE", self._object_path(key)))
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    async def list_objects(self, prefix: str = "") -> list[StoredObject]:
+        objects: list[StoredObject] = []
+        token: str | None = None
+        while True:
+            query = {"list-type": "2", "prefix": prefix}
+            if token:
+                query["continuation-token"] = token
+            response = await self._http().send(self._signed_request("GET", f"/{self._bucket}", query))
+            response.raise_for_status()
+            root = ElementTree.fromstring(response.content)
+            for item in root.iter(f"{_S3_NS}Contents"):
+                objects.append(StoredObject(
+                    key=item.findtext(f"{_S3_NS}Key"),
+                    size=int(item.findtext(f"{_S3_NS}Size") or 0),
+                    modified_at=datetime.fromisoformat(
+                        item.findtext(f"{_S3_NS}LastModified").replace("Z", "+00:00")
+                    ),
+                ))
+            if root.findtext(f"{_S3_NS}IsTruncated") != "true":
+                return objects
+            token = root.findtext(f"{_S3_NS}NextContinuationToken")
+
+    async def presign_upload(
+        self,
+        key: str,
+        content_type_prefix: str,
+        max_bytes: int,
+        expires_in: int,
+    ) -> PresignedUpload:
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=expires_in)
+        day = now.strftime("%Y%m%d")
+        fields = {
+            "key": key,
+            "x-amz-algorithm": "AWS4-HMAC-SHA256",
+            "x-amz-credential": self._signer.credential(day),
+            "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ"),
+        }
+        policy = {
+            "expiration": expires_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "conditions": [
+                {"bucket": self._bucket},
+                ["starts-with", "$Content-Type", content_type_prefix],
+                ["content-length-range", 1, max_bytes],
+                *({name: value} for name, value in fields.items()),
+            ],
+        }
+        encoded = base64.b64encode(json.dumps(policy).encode("utf-8")).decode("ascii")
+        fields["policy"] = encoded
+        fields["x-amz-signature"] = self._signer.sign_string(day, encoded)
+        return PresignedUpload(
+            url=f"{self._endpoint_url}/{self._bucket}",
+            key=key,
+            expires_at=expires_at,
+            fields=fields,
+        )
@@ -1,9 +1,11 @@
-import httpx
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Optional
+import asyncio
 import hashlib
 import json
+import logging
+import time
 
 from ports.payment_gateway import (
     PaymentGatewayPort,
@@ -14,6 +16,13 @@ from ports.payment_gateway import (
     RefundResult,
     PaymentStatus,
 )
+from services.http_clients import http_clients
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# Refresh the access token in the background once it is this close to expiry.
+TOKEN_REFRESH_MARGIN_SECONDS = 60
 
 
 class TpayAdapter(PaymentGatewayPort):
@@ -21,7 +30,8 @@ class TpayAdapter(PaymentGatewayPort):
     Tpay payment gateway adapter.
 
     Placeholder implementation pending production integration with the Tpay API.
-    All methods raise NotImplementedError until the integration is completed.
+    The OAuth token cache and authenticated request helper are in place; the
+    payment methods raise NotImplementedError until the integration is completed.
     """
 
     TPAY_API_URL = "https://api.tpay.com"
@@ -33,13 +43,15 @@ class TpayAdapter(PaymentGatewayPort):
         merchant_id: str,
         security_code: str,
         sandbox: bool = True,
+        api_url: str | None = None,
     ):
         """
         Initialize the Tpay adapter with credentials and environment settings.
 
         When sandbox is True the adapter points at the Tpay sandbox base URL
-        instead of the production endpoint. The access token state is held
-        in instance variables and refreshed on demand.
+        instead of the production endpoint; api_url overrides both (e.g. a
+        local stand-in). The access token state is held in instance
+        variables and refreshed on demand.
         """
         self._client_id = client_id
         self._client_secret = client_secret
@@ -48,30 +60,76 @@ class TpayAdapter(PaymentGatewayPort):
         self._sandbox = sandbox
         self._access_token: str | None = None
         self._token_expires_at: datetime | None = None
+        self._token_refresh: asyncio.Task[str] | None = None
+        self.token_fetches = LatencyStats()
 
         if sandbox:
             self.TPAY_API_URL = "https://openapi.sandbox.tpay.com"
+        if api_url:
+            self.TPAY_API_URL = api_url.rstrip("/")
 
     async def _get_access_token(self) -> str:
         """
-        Retrieve or refresh the OAuth access token for authenticating API requests.
-
-        Not yet implemented; will call the Tpay token endpoint and cache the
-        result until expiry.
-        """
-        raise NotImplementedError("Tpay integration not yet implemented")
+        Return the cached OAuth access token, refreshing it when needed.
+
+        Concurrent callers share one in-flight refresh. Within
+        ``TOKEN_REFRESH_MARGIN_SECONDS`` of expiry the current token is still
+        returned while a refresh runs in the background, so requests only
+        wait for Tpay's token endpoint when no valid token is left.
+        """
+        now = datetime.now(timezone.utc)
+        if self._access_token and self._token_expires_at and now < self._token_expires_at:
+            if now >= self._token_expires_at - timedelta(seconds=TOKEN_REFRESH_MARGIN_SECONDS):
+                self._start_token_refresh()
+            return self._access_token
+        return await asyncio.shield(self._start_token_refresh())
+
+    def _start_token_refresh(self) -> asyncio.Task[str]:
+        if self._token_refresh is None or self._token_refresh.done():
+            self._token_refresh = asyncio.create_task(self._fetch_access_token(), name="tpay-token-refresh")
+            # Background refreshes may have no waiter; keep their failure out of "never retrieved" warnings.
+            self._token_refresh.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._token_refresh
+
+    def _invalidate_access_token(self) -> None:
+        self._access_token = None
+        self._token_expires_at = None
+
+    async def _fetch_access_token(self) -> str:
+        """Request a new token from Tpay's OAuth endpoint and cache it until expiry."""
+        started = time.perf_counter()
+        try:
+            response = await http_clients.get("tpay").post(
+                f"{self.TPAY_API_URL}/oauth/auth",
+                data={"client_id": self._client_id, "client_secret": self._client_secret},
+            )
+            response.raise_for_status()
+            payload = response.json()
+            token = payload["access_token"]
+            expires_in = int(payload.get("expires_in") or 0)
+        except Exception:
+            self.token_fetches.observe(time.perf_counter() - started, ok=False)
+            logger.exception("[tpay] Access token request failed")
+            raise
+        elapsed = time.perf_counter() - started
+        self.token_fetches.observe(elapsed)
+        self._access_token = token
+        self._token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+        logger.info("[tpay] Access token refreshed in %.3fs, valid for %ds", elapsed, expires_in)
+        return token
 
     async def _make_request(self, method: str, endpoint: str, data: dict | None = None) -> dict:
         """
         Execute an authenticated HTTP request against the Tpay API.
 
-        Obtains a fresh access token, sends the request with JSON body, and
-        raises for non-2xx responses before returning the parsed JSON payload.
+        Uses the cached access token, sends the request with JSON body over
+        the pooled "tpay" client, and raises for non-2xx responses before
+        returning the parsed JSON payload. A 401 drops the token and the
+        request is retried once with a fresh one.
         """
-        token = await self._get_access_token()
-
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
+        for attempt in range(2):
+            token = await self._get_access_token()
+            response = await http_clients.get("tpay").request(
                 method=method,
                 url=f"{self.TPAY_API_URL}{endpoint}",
                 headers={
@@ -80,8 +138,13 @@ class TpayAdapter(PaymentGatewayPort):
                 },
                 json=data,
             )
-            response.raise_for_status()
-            return response.json()
+            if response.status_code == 401 and attempt == 0:
+                if self._access_token == token:
+                    self._invalidate_access_token()
+                continue
+            break
+        response.raise_for_status()
+        return response.json()
 
     async def create_payment(self, request: PaymentRequest) -> PaymentResult:
         """
@@ -128,6 +191,12 @@ class TpayAdapter(PaymentGatewayPort):
         """
         raise NotImplementedError("Tpay integration not yet implemented")
 
+    def verify_webhook_signature(self, payload: dict, signature: str | None) -> bool:
+        """Reject unsigned webhooks and check the signature of the rest."""
+        if not signature:
+            return False
+        return self._verify_webhook_signature(payload, signature)
+
     def _verify_webhook_signature(self, payload: dict, signature: str) -> bool:
         """
         Verify the HMAC signature on an incoming Tpay webhook payload.
@@ -0,0 +1,32 @@
+"""add pg_trgm GIN index on accent-folded users.full_name
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-03-10 10:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+# Must stay identical to utils.text_search.folded() for the planner to use the index.
+FOLDED_FULL_NAME = (
+    "translate(lower(full_name), "
+    "'ąćęłńóśźżáàâäãåčçďéèêëěíìîïňñöôõřšťúùûüůýÿž', "
+    "'acelnoszzaaaaaaccdeeeeeiiiinnooorstuuuuuyyz')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_users_full_name_trgm ON users "
+        f"USING gin ({FOLDED_FULL_NAME} gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_full_name_trgm', table_name='users')
@@ -0,0 +1,125 @@
+"""add admin stats summary tables and change-tracking indexes
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-03-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+# Columns the incremental stats refresh filters and joins on.
+SOURCE_INDEXES = [
+    ('payments', 'user_id'),
+    ('payments', 'created_at'),
+    ('payments', 'updated_at'),
+    ('registrations', 'occurrence_date'),
+    ('registrations', 'payment_id'),
+    ('registrations', 'created_at'),
+    ('registrations', 'updated_at'),
+]
+
+
+def upgrade() -> None:
+    for table, column in SOURCE_INDEXES:
+        op.create_index(f'ix_{table}_{column}', table, [column])
+
+    op.create_table(
+        'stats_payment_daily',
+        sa.Column('day', sa.Date(), nullable=False,
+                  comment='UTC date the payments were created.'),
+        sa.Column('payment_type', sa.String(length=20), nullable=False,
+                  comment='Payment type (event/subscription).'),
+        sa.Column('status', sa.String(length=20), nullable=False,
+                  comment='Payment status.'),
+        sa.Column('plan_code', sa.String(length=50), nullable=False,
+                  comment='Subscription plan code from extra_data; empty for event payments.'),
+        sa.Column('count', sa.Integer(), nullable=False,
+                  comment='Number of payments.'),
+        sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False,
+                  comment='Sum of payment amounts.'),
+        sa.PrimaryKeyConstraint('day', 'payment_type', 'status', 'plan_code'),
+    )
+    op.create_table(
+        'stats_event_payment_daily',
+        sa.Column('day', sa.Date(), nullable=False,
+                  comment='UTC date the payments were created.'),
+        sa.Column('event_id', sa.String(length=36), nullable=False,
+                  comment='Event the registration belongs to.'),
+        sa.Column('payment_type', sa.String(length=20), nullable=False,
+                  comment='Payment type (event/subscription).'),
+        sa.Column('status', sa.String(length=20), nullable=False,
+                  comment='Payment status.'),
+        sa.Column('count', sa.Integer(), nullable=False,
+                  comment='Number of payment/registration pairs.'),
+        sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False,
+                  comment='Sum of payment amounts.'),
+        sa.PrimaryKeyConstraint('day', 'event_id', 'payment_type', 'status'),
+    )
+    op.create_index('ix_stats_event_payment_daily_event_id', 'stats_event_payment_daily', ['event_id'])
+    op.create_table(
+        'stats_registration_daily',
+        sa.Column('occurrence_date', sa.Date(), nullable=False,
+                  comment='Event occurrence date.'),
+        sa.Column('event_id', sa.String(length=36), nullable=False,
+                  comment='Registered event.'),
+        sa.Column('status', sa.String(length=64), nullable=False,
+                  comment='Registration status.'),
+        sa.Column('count', sa.Integer(), nullable=False,
+                  comment='Number of registrations.'),
+        sa.PrimaryKeyConstraint('occurrence_date', 'event_id', 'status'),
+    )
+    op.create_index('ix_stats_registration_daily_event_id', 'stats_registration_daily', ['event_id'])
+    op.create_table(
+        'stats_registration_monthly',
+        sa.Column('month', sa.String(length=7), nullable=False,
+                  comment='Occurrence month (YYYY-MM).'),
+        sa.Column('unique_users', sa.Integer(), nullable=False,
+                  comment='Distinct registered users.'),
+        sa.Column('unique_events', sa.Integer(), nullable=False,
+                  comment='Distinct registered events.'),
+        sa.PrimaryKeyConstraint('month'),
+    )
+    op.create_table(
+        'stats_user',
+        sa.Column('user_id', sa.String(length=36), nullable=False,
+                  comment='FK to the user.'),
+        sa.Column('total_paid', sa.Numeric(precision=14, scale=2), nullable=False,
+                  comment='Sum of completed payments.'),
+        sa.Column('last_payment_at', sa.DateTime(timezone=True), nullable=True,
+                  comment='Latest completed payment.'),
+        sa.Column('event_count', sa.Integer(), nullable=False,
+                  comment='Confirmed registrations.'),
+        sa.Column('registration_count', sa.Integer(), nullable=False,
+                  comment='Registrations in any status.'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_table(
+        'stats_refresh_state',
+        sa.Column('name', sa.String(length=50), nullable=False,
+                  comment='Summary set name.'),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False,
+                  comment='Summaries cover changes up to here.'),
+        sa.Column('full_refreshed_at', sa.DateTime(timezone=True), nullable=True,
+                  comment='Last full rebuild.'),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('stats_refresh_state')
+    op.drop_table('stats_user')
+    op.drop_table('stats_registration_monthly')
+    op.drop_index('ix_stats_registration_daily_event_id', table_name='stats_registration_daily')
+    op.drop_table('stats_registration_daily')
+    op.drop_index('ix_stats_event_payment_daily_event_id', table_name='stats_event_payment_daily')
+    op.drop_table('stats_event_payment_daily')
+    op.drop_table('stats_payment_daily')
+    for table, column in reversed(SOURCE_INDEXES):
+        op.drop_index(f'ix_{table}_{column}', table_name=table)
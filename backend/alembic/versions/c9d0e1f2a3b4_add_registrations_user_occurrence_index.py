@@ -0,0 +1,25 @@
+"""add registrations (user_id, occurrence_date, id) index for keyset pagination
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-03-13 10:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_registrations_user_occurrence_id',
+        'registrations',
+        ['user_id', 'occurrence_date', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_registrations_user_occurrence_id', table_name='registrations')
@@ -0,0 +1,32 @@
+"""add event_occurrence_capacity for pessimistic spot allocation
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-03-14 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_occurrence_capacity',
+        sa.Column('event_id', sa.String(length=36), nullable=False,
+                  comment='FK to the event.'),
+        sa.Column('occurrence_date', sa.Date(), nullable=False,
+                  comment='Event occurrence date.'),
+        sa.Column('occupied', sa.Integer(), nullable=False,
+                  comment='Registrations holding a spot.'),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id', 'occurrence_date'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('event_occurrence_capacity')
@@ -0,0 +1,42 @@
+"""add idempotency_keys
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-03-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('user_id', sa.String(length=36), nullable=False,
+                  comment='FK to the user who sent the request.'),
+        sa.Column('key', sa.String(length=255), nullable=False,
+                  comment='Client-supplied Idempotency-Key header.'),
+        sa.Column('request_hash', sa.String(length=64), nullable=False,
+                  comment='SHA-256 of method, path and body; a reused key must match it.'),
+        sa.Column('status_code', sa.Integer(), nullable=True,
+                  comment='Stored response status; NULL while in progress.'),
+        sa.Column('response_body', sa.Text(), nullable=True,
+                  comment='Stored JSON response body.'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='UTC timestamp when the key was claimed.'),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False,
+                  comment='UTC timestamp after which the key is swept.'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'key'),
+    )
+    op.create_index('ix_idempotency_keys_expires_at', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_keys_expires_at', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,46 @@
+"""add job_runs table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-03-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_runs',
+        sa.Column('id', sa.String(length=36), nullable=False,
+                  comment='Primary key UUID for the job run.'),
+        sa.Column('job_id', sa.String(length=100), nullable=False,
+                  comment='Scheduler job identifier (e.g. event_reminders).'),
+        sa.Column('worker_id', sa.String(length=255), nullable=False,
+                  comment='Host and PID of the worker that executed the run.'),
+        sa.Column('status', sa.String(length=16), nullable=False,
+                  comment='Outcome of the run (success/failed).'),
+        sa.Column('started_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('now()'), nullable=False,
+                  comment='UTC timestamp when the job body started.'),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True,
+                  comment='UTC timestamp when the job body finished.'),
+        sa.Column('duration_ms', sa.Integer(), nullable=True,
+                  comment='Wall-clock duration of the job body in milliseconds.'),
+        sa.Column('error', sa.Text(), nullable=True,
+                  comment='Exception summary when the run failed.'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_job_runs_job_id', 'job_runs', ['job_id'])
+    op.create_index('ix_job_runs_started_at', 'job_runs', ['started_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_runs_started_at', table_name='job_runs')
+    op.drop_index('ix_job_runs_job_id', table_name='job_runs')
+    op.drop_table('job_runs')
@@ -0,0 +1,57 @@
+"""add payment_webhook_inbox
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-03-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payment_webhook_inbox',
+        sa.Column('id', sa.String(length=36), nullable=False,
+                  comment='Primary key UUID for the inbox entry.'),
+        sa.Column('external_id', sa.String(length=255), nullable=False,
+                  comment='Payment gateway identifier from the payload.'),
+        sa.Column('status', sa.String(length=20), nullable=False,
+                  comment='Payment status reported by the gateway.'),
+        sa.Column('payload', sa.Text(), nullable=False,
+                  comment='Raw JSON webhook payload.'),
+        sa.Column('signature', sa.String(length=512), nullable=True,
+                  comment='X-Signature header sent with the webhook.'),
+        sa.Column('source_ip', sa.String(length=64), nullable=True,
+                  comment='IP address the webhook came from.'),
+        sa.Column('state', sa.String(length=20), server_default='pending', nullable=False,
+                  comment='pending, processed or failed (gave up after max attempts).'),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False,
+                  comment='Processing attempts so far.'),
+        sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='UTC timestamp when the webhook was received.'),
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='UTC timestamp from which a worker may (re)try the entry.'),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True,
+                  comment='UTC timestamp when processing finished.'),
+        sa.Column('result', sa.Text(), nullable=True,
+                  comment='Outcome message, or the last error while pending/failed.'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('external_id', 'status', name='uq_payment_webhook_inbox_external_status'),
+    )
+    op.create_index(
+        'ix_payment_webhook_inbox_pending',
+        'payment_webhook_inbox',
+        ['available_at'],
+        postgresql_where=sa.text("state = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_webhook_inbox_pending', table_name='payment_webhook_inbox')
+    op.drop_table('payment_webhook_inbox')
@@ -0,0 +1,21 @@
+"""add users (created_at, id) index for keyset pagination
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-03-09 10:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,99 @@
+"""
+Throughput benchmark: per-message SMTP sessions vs. the pooled bulk sender.
+
+Starts a local aiosmtpd stand-in and delivers the same newsletter to N
+recipients twice — once with one ``aiosmtplib.send`` session per recipient
+(the previous ``send_bulk`` behaviour, capped to the same concurrency so the
+server is not flooded) and once through ``SMTPConnectionPool``.
+
+Run from the backend directory::
+
+    python benchmarks/bench_email_bulk.py --recipients 2000 --pool-size 4
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosmtplib  # noqa: E402
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from services import email_service  # noqa: E402
+from services.email_service import EmailTemplate, SMTPConnectionPool, send_bulk  # noqa: E402
+
+
+class _CountingHandler:
+    def __init__(self) -> None:
+        self.messages = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _per_message(port: int, recipients: list[tuple[str, str]], concurrency: int) -> None:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def _one(email: str, name: str) -> None:
+        subject, html_body = email_service._render_template(EmailTemplate.NEWSLETTER, name, {})
+        msg = email_service._build_message(subject, html_body, email, name)
+        async with limit:
+            await aiosmtplib.send(msg, hostname="127.0.0.1", port=port, start_tls=False)
+
+    await asyncio.gather(*[_one(e, n) for e, n in recipients])
+
+
+async def _pooled(port: int, recipients: list[tuple[str, str]], pool_size: int) -> None:
+    async with SMTPConnectionPool(
+        hostname="127.0.0.1", port=port, start_tls=False, size=pool_size,
+    ) as pool:
+        await send_bulk(EmailTemplate.NEWSLETTER, recipients, pool=pool)
+
+
+async def main(recipient_count: int, pool_size: int) -> None:
+    email_service.settings.smtp_from_email = "noreply@kenaz.test"
+    recipients = [(f"member{i}@example.com", f"Member {i}") for i in range(recipient_count)]
+
+    for label, runner in (
+        ("per-message sessions", lambda port: _per_message(port, recipients, pool_size)),
+        (f"pool (size={pool_size})", lambda port: _pooled(port, recipients, pool_size)),
+    ):
+        handler = _CountingHandler()
+        port = _free_port()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        try:
+            started = time.perf_counter()
+            await runner(port)
+            elapsed = time.perf_counter() - started
+        finally:
+            controller.stop()
+        print(
+            f"{label:<24} {handler.messages:>6} msgs  {handler.sessions:>6} sessions  "
+            f"{elapsed:7.2f}s  {handler.messages / elapsed:8.1f} msg/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.recipients, args.pool_size))
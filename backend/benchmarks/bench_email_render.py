@@ -0,0 +1,55 @@
+"""
+Per-recipient render cost for bulk newsletters: full renderer vs. compiled batch.
+
+Renders the newsletter template for N recipients (each with a personal
+unsubscribe link) with ``_render_template`` and with the batch-compiled
+``_CompiledRender`` used by ``send_bulk``, checks that both produce identical
+output and prints the per-recipient cost.
+
+Run from the backend directory::
+
+    python benchmarks/bench_email_render.py --recipients 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.email_service import EmailTemplate, _compile_for_batch, _render_template  # noqa: E402
+
+
+def main(recipient_count: int) -> None:
+    base_ctx = {
+        "subject": "Nowości z Kenaz Centrum",
+        "headline": "Marzec w Kenaz",
+        "content_html": "<p>Nowe wydarzenia w kalendarzu.</p>" * 20,
+        "cta_url": "https://kenaz.pl/calendar",
+    }
+    recipients = [(f"member{i}@example.com", f"Member {i}") for i in range(recipient_count)]
+    per_recipient = {email: {"unsubscribe_url": f"https://kenaz.pl/unsub/{i}"}
+                     for i, (email, _) in enumerate(recipients)}
+
+    started = time.perf_counter()
+    full = [
+        _render_template(EmailTemplate.NEWSLETTER, name, {**base_ctx, **per_recipient[email]})
+        for email, name in recipients
+    ]
+    full_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = _compile_for_batch(EmailTemplate.NEWSLETTER, base_ctx, per_recipient, recipients[0])
+    fast = [compiled.render(name, per_recipient[email]) for email, name in recipients]
+    fast_elapsed = time.perf_counter() - started
+
+    assert fast == full, "compiled output differs from the full renderer"
+    for label, elapsed in (("full render", full_elapsed), ("compiled batch", fast_elapsed)):
+        print(f"{label:<16} {elapsed:7.3f}s total  {elapsed / recipient_count * 1e6:8.2f} µs/recipient")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=10000)
+    main(parser.parse_args().recipients)
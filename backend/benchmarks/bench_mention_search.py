@@ -0,0 +1,92 @@
+"""
+@mention autocomplete latency: in-memory prefix index vs. the SQL search.
+
+Seeds N active users with generated Polish names inside a transaction that is
+rolled back at the end, then replays typed-out prefixes ("k", "ko", "kow",
+...) against ``/users/search``'s SQL path and against ``MentionIndex.search``
+and prints the per-query cost of each.  Point it at a scratch database (the
+tables are created if missing)::
+
+    DATABASE_URL_TEST=postgresql+asyncpg://... python benchmarks/bench_mention_search.py --users 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from config import get_settings  # noqa: E402
+from database import Base  # noqa: E402
+from models.user import AccountStatus, User, UserRole  # noqa: E402
+from routers.users import search_users  # noqa: E402
+from services.mention_index import MentionIndex  # noqa: E402
+
+_FIRST = ["Anna", "Łukasz", "Zofia", "Paweł", "Małgorzata", "Jakub", "Katarzyna", "Michał", "Agnieszka", "Józef"]
+_LAST = ["Nowak", "Kowalski", "Wiśniewska", "Wójcik", "Kamińska", "Lewandowski", "Zieliński", "Szymańska",
+         "Woźniak", "Dąbrowski", "Kozłowska", "Jankowski", "Mazur", "Krawczyk", "Piotrowska", "Grabowski"]
+_TYPED = ["łukasz", "kowal", "wisn", "anna ko", "dąbr", "mazur", "zofia w"]
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(_FIRST)} {rng.choice(_LAST)}{rng.randint(1, 999):03d}"
+
+
+async def main(database_url: str, user_count: int) -> None:
+    rng = random.Random(7)
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    queries = [typed[:length] for typed in _TYPED for length in range(1, len(typed) + 1)]
+    get_settings().mention_index_enabled = False
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add_all(
+            User(
+                google_id=f"bench-{i}",
+                email=f"bench-{i}@example.com",
+                full_name=_name(rng),
+                role=UserRole.MEMBER,
+                account_status=AccountStatus.ACTIVE,
+            )
+            for i in range(user_count)
+        )
+        await db.flush()
+
+        index = MentionIndex()
+        started = time.perf_counter()
+        await index.reload(db)
+        load_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for query in queries:
+            await search_users(q=query, user=None, db=db)
+        sql_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(100):
+            for query in queries:
+                index.search(query)
+        memory_elapsed = (time.perf_counter() - started) / 100
+
+        await db.rollback()
+    await engine.dispose()
+
+    print(f"{len(index)} users indexed in {load_elapsed * 1000:.1f} ms, {len(queries)} queries")
+    for label, elapsed in (("sql", sql_elapsed), ("prefix index", memory_elapsed)):
+        print(f"{label:<13} {elapsed / len(queries) * 1e6:10.1f} µs/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL_TEST", ""))
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL_TEST is required")
+    asyncio.run(main(args.database_url, args.users))
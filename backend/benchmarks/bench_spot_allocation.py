@@ -0,0 +1,148 @@
+"""
+Registration spot allocation under a registration rush: optimistic vs. row_lock vs. counter.
+
+For each ``REGISTRATION_SPOT_ALLOCATION`` strategy, seeds one free event with
+``--spots`` places and ``--registrants`` users, fires every registration at
+once (each on its own session, ``--connections`` pooled connections) and
+prints wall time, throughput, how many registrants got a spot or the
+waitlist, how many failed with ConcurrencyError after the service's retries,
+and whether the occurrence was oversold.  The seeded rows are deleted
+afterwards.  Point it at a scratch database (the tables are created if
+missing)::
+
+    DATABASE_URL_TEST=postgresql+asyncpg://... python benchmarks/bench_spot_allocation.py --registrants 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from adapters.fake_payment_adapter import FakePaymentAdapter  # noqa: E402
+from database import Base  # noqa: E402
+from models.event import Event  # noqa: E402
+from models.registration import Registration  # noqa: E402
+from models.subscription import Subscription  # noqa: E402
+from models.user import AccountStatus, User, UserRole  # noqa: E402
+from services.payment_service import PaymentService  # noqa: E402
+from services.registration_service import (  # noqa: E402
+    SPOT_OCCUPYING_STATUSES,
+    ConcurrencyError,
+    RegistrationService,
+)
+
+STRATEGIES = ("optimistic", "row_lock", "counter")
+
+
+async def _seed(sessions, run: str, registrants: int, spots: int) -> tuple[str, list[str]]:
+    async with sessions() as db:
+        event = Event(
+            title=f"Bench {run}",
+            event_type="bench",
+            start_date=datetime.now() + timedelta(days=3),
+            city="Poznań",
+            price_guest=Decimal("0.00"),
+            price_member=Decimal("0.00"),
+            max_participants=spots,
+            version=1,
+        )
+        users = [
+            User(
+                google_id=f"bench-alloc-{run}-{i}",
+                email=f"bench-alloc-{run}-{i}@example.com",
+                full_name=f"Bench {i}",
+                role=UserRole.GUEST,
+                account_status=AccountStatus.ACTIVE,
+            )
+            for i in range(registrants)
+        ]
+        db.add_all([event, *users])
+        await db.commit()
+        return event.id, [user.id for user in users]
+
+
+async def _cleanup(sessions, event_id: str, user_ids: list[str]) -> None:
+    async with sessions() as db:
+        await db.execute(delete(Registration).where(Registration.event_id == event_id))
+        await db.execute(delete(Subscription).where(Subscription.user_id.in_(user_ids)))
+        await db.execute(delete(Event).where(Event.id == event_id))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def _run(sessions, strategy: str, registrants: int, spots: int) -> dict:
+    event_id, user_ids = await _seed(sessions, f"{strategy}-{uuid.uuid4().hex[:8]}", registrants, spots)
+    gateway = FakePaymentAdapter(auto_complete=True)
+    outcomes: dict[str, int] = {}
+
+    async def register(user_id: str) -> None:
+        async with sessions() as db:
+            service = RegistrationService(db, PaymentService(db, gateway), spot_allocation=strategy)
+            try:
+                result = await service.initiate_registration(
+                    user=await db.get(User, user_id),
+                    event_id=event_id,
+                    return_url="http://localhost/success",
+                    cancel_url="http://localhost/cancel",
+                )
+                outcome = result["status"]
+            except ConcurrencyError:
+                outcome = "concurrency_error"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(register(user_id) for user_id in user_ids))
+        elapsed = time.perf_counter() - started
+
+        async with sessions() as db:
+            occupied = await db.scalar(
+                select(func.count(Registration.id)).where(
+                    Registration.event_id == event_id,
+                    Registration.status.in_(SPOT_OCCUPYING_STATUSES),
+                )
+            )
+    finally:
+        await _cleanup(sessions, event_id, user_ids)
+    return {"elapsed": elapsed, "outcomes": outcomes, "occupied": occupied}
+
+
+async def main(database_url: str, registrants: int, spots: int, connections: int) -> None:
+    engine = create_async_engine(database_url, pool_size=connections, max_overflow=0, pool_timeout=600)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{registrants} registrants, {spots} spots, {connections} connections")
+    print(f"{'strategy':<11} {'wall s':>7} {'reg/s':>7} {'spot':>5} {'wait':>5} {'failed':>6} {'fail %':>6} oversold")
+    for strategy in STRATEGIES:
+        run = await _run(sessions, strategy, registrants, spots)
+        outcomes = run["outcomes"]
+        failed = outcomes.get("concurrency_error", 0)
+        print(
+            f"{strategy:<11} {run['elapsed']:7.2f} {registrants / run['elapsed']:7.1f} "
+            f"{outcomes.get('confirmed', 0):5d} {outcomes.get('waitlist', 0):5d} {failed:6d} "
+            f"{failed / registrants * 100:6.1f} {'yes' if run['occupied'] > spots else 'no'}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registrants", type=int, default=500)
+    parser.add_argument("--spots", type=int, default=50)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL_TEST", ""))
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL_TEST is required")
+    asyncio.run(main(args.database_url, args.registrants, args.spots, args.connections))
@@ -54,6 +54,22 @@ class Settings(BaseSettings):
     smtp_password: str = ""
     smtp_from_email: str = ""
     smtp_from_name: str = "Kenaz Centrum"
+    # Bulk sends: persistent connections, sends/minute cap (0 = unpaced), retries on 4xx
+    smtp_pool_size: int = 4
+    smtp_max_per_minute: int = 120
+    smtp_max_retries: int = 3
+
+    # Outbound HTTP (Google APIs, Tpay, S3 uploads): one pooled client per upstream host,
+    # opened at startup and closed on shutdown. Limits apply per upstream;
+    # retries re-attempt failed connects only, never a request already sent.
+    # HTTP/2 needs the h2 package (httpx[http2]).
+    http_client_max_connections: int = 20
+    http_client_max_keepalive_connections: int = 10
+    http_client_keepalive_expiry_seconds: float = 30.0
+    http_client_connect_timeout_seconds: float = 5.0
+    http_client_timeout_seconds: float = 15.0
+    http_client_retries: int = 2
+    http_client_http2: bool = False
 
     password_reset_token_expire_minutes: int = 60
 
@@ -69,6 +85,66 @@ class Settings(BaseSettings):
     vapid_public_key: str = ""
     vapid_subject: str = "mailto:admin@kenaz.pl"
 
+    # Periodic job coordination across workers: "auto" takes a PostgreSQL
+    # advisory-lock lease when available, "local" only guards within one process.
+    job_lock_backend: Literal["auto", "local"] = "auto"
+
+    # Action logs: pack day folders older than N days into logs/archive/DD-MM-YYYY.zip,
+    # and delete days older than the retention period (0 = keep forever).
+    log_archive_after_days: int = 1
+    log_retention_days: int = 0
+
+    # Uploaded images: responsive variant widths, re-encode formats (formats the
+    # Pillow build cannot encode are skipped) and worker processes for encoding.
+    image_variant_widths: list[int] = [320, 640, 1280]
+    image_variant_formats: list[str] = ["avif", "webp"]
+    image_processing_workers: int = 2
+
+    # Upload storage: "local" keeps files on this host (served by the API under
+    # /uploads); "s3" stores them in an S3-compatible bucket served from
+    # s3_public_base_url and enables presigned direct uploads.
+    upload_storage_backend: Literal["local", "s3"] = "local"
+    s3_endpoint_url: str = ""
+    s3_region: str = "us-east-1"
+    s3_bucket: str = ""
+    s3_access_key_id: str = ""
+    s3_secret_access_key: str = ""
+    s3_public_base_url: str = ""
+    upload_presign_expiry_seconds: int = 900
+
+    # @mention autocomplete: answer /users/search from an in-process prefix
+    # index of active users, rebuilt from the database every N seconds.
+    mention_index_enabled: bool = False
+    mention_index_refresh_seconds: int = 300
+
+    # Admin stats: summary tables refreshed incrementally every N seconds (and
+    # before each stats read when stale), rebuilt in full nightly.
+    stats_refresh_interval_seconds: int = 300
+
+    # Registration spot allocation: "optimistic" bumps Event.version and retries
+    # on conflict; "row_lock" serialises registrants on a per-occurrence row
+    # (SELECT ... FOR UPDATE) and recounts under the lock; "counter" claims a
+    # spot with one conditional UPDATE of that row's occupied counter.
+    registration_spot_allocation: Literal["optimistic", "row_lock", "counter"] = "optimistic"
+
+    # Registration admission queue: at most N registrations per event run at
+    # once in this worker; later registrants get a FIFO token and have
+    # turn_seconds to register once their turn comes.
+    registration_queue_enabled: bool = False
+    registration_queue_max_in_flight: int = 8
+    registration_queue_turn_seconds: int = 30
+
+    # Idempotency-Key: stored responses of registration, checkout and manual
+    # payment confirmation are replayed to retries for this many hours.
+    idempotency_key_ttl_hours: int = 24
+
+    # Payment webhook inbox: the webhook endpoint stores signed notifications
+    # and acknowledges them at once; a worker in each process polls the inbox
+    # every poll_seconds and gives up on an entry after max_attempts.
+    payment_webhook_inbox_enabled: bool = False
+    payment_webhook_poll_seconds: float = 2.0
+    payment_webhook_max_attempts: int = 8
+
     model_config = SettingsConfigDict(
         env_file=str(_DIR / ".env"),
         env_file_encoding="utf-8",
@@ -0,0 +1,40 @@
+"""
+Delete stored uploads that are no longer referenced anywhere.
+
+Usage (from the backend directory)::
+
+    python gc_uploads.py --dry-run
+    python gc_uploads.py --grace-hours 48
+"""
+
+import argparse
+import asyncio
+
+from database import AsyncSessionLocal, engine
+from routers.uploads import close_upload_storage, get_upload_storage
+from services.upload_gc import DEFAULT_GRACE_SECONDS, collect_unreferenced_uploads
+
+
+async def main(grace_hours: float, dry_run: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        report = await collect_unreferenced_uploads(
+            db, get_upload_storage(), grace_seconds=grace_hours * 3600, dry_run=dry_run,
+        )
+    await close_upload_storage()
+    await engine.dispose()
+
+    verb = "Would delete" if dry_run else "Deleted"
+    for name in report.deleted:
+        print(f"{verb} {name}")
+    print(
+        f"{verb} {len(report.deleted)} file(s), {report.bytes_freed / 1024:.1f} KiB; "
+        f"{report.referenced} referenced upload(s), {report.kept_recent} kept within grace period."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grace-hours", type=float, default=DEFAULT_GRACE_SECONDS / 3600)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.grace_hours, args.dry_run))
@@ -1,10 +1,9 @@
+import socket
 from contextlib import asynccontextmanager
-from pathlib import Path
 from datetime import datetime, timedelta
 
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy import select
@@ -14,6 +13,18 @@ from database import ensure_db_schema, AsyncSessionLocal
 from models.event import Event
 from models.registration import Registration, RegistrationStatus
 from services import push_service
+from services.admission_queue import admission_queue
+from services.calendar_sync import calendar_sync_worker
+from services.http_clients import http_clients
+from services.payment_webhooks import payment_webhook_worker
+from services.idempotency import sweep_idempotency_keys
+from services.image_processing import shutdown_image_workers
+from services.job_coordinator import job_coordinator
+from services.log_archive import run_log_maintenance
+from services.log_service import log_writer
+from services.mention_index import mention_index, refresh_mention_index
+from services.registration_service import resync_spot_counters
+from services.stats_service import rebuild_admin_stats_job, refresh_admin_stats_job
 
 logger = logging.getLogger(__name__)
 from routers import (
@@ -33,6 +44,7 @@ from routers import (
     event_types_router,
     push_router,
 )
+from routers.uploads import UPLOAD_DIR, UploadStaticFiles, close_upload_storage
 
 settings = get_settings()
 
@@ -99,19 +111,117 @@ async def lifespan(app: FastAPI):
 
     Verifies database connectivity on startup by running ensure_db_schema.
     Migrations are intentionally not run here — they are applied exclusively
-    by the deployment pipeline before the process starts.
+    by the deployment pipeline before the process starts. The background
+    action-log writer is started here and drained on shutdown so no queued
+    log line is lost; completed log days are archived nightly. The calendar
+    sync worker and the pooled outbound HTTP clients live as long as the app,
+    as does the payment webhook worker when the webhook inbox is enabled.
     """
     await ensure_db_schema()
+    log_writer.start()
+    http_clients.start()
+    calendar_sync_worker.start()
+    if settings.payment_webhook_inbox_enabled:
+        payment_webhook_worker.start()
+    if settings.registration_spot_allocation == "counter":
+        # Counters are not maintained under the optimistic strategy.
+        try:
+            resynced = await resync_spot_counters()
+            if resynced:
+                logger.info("Resynced %d registration spot counter(s)", resynced)
+        except Exception:
+            logger.exception("Registration spot counter resync failed")
 
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(_send_event_reminders, "interval", hours=1, id="event_reminders")
+    scheduler.add_job(
+        job_coordinator.coordinated(
+            "event_reminders",
+            _send_event_reminders,
+            min_interval=timedelta(minutes=55),
+        ),
+        "interval",
+        hours=1,
+        id="event_reminders",
+    )
+    # Log folders live on each host's disk, so every host archives its own.
+    scheduler.add_job(
+        job_coordinator.coordinated(
+            f"log_maintenance:{socket.gethostname()}",
+            run_log_maintenance,
+            min_interval=timedelta(hours=23),
+        ),
+        "cron",
+        hour=0,
+        minute=30,
+        timezone="UTC",
+        id="log_maintenance",
+    )
+    scheduler.add_job(
+        job_coordinator.coordinated(
+            "admin_stats_refresh",
+            refresh_admin_stats_job,
+            min_interval=timedelta(seconds=settings.stats_refresh_interval_seconds * 0.9),
+        ),
+        "interval",
+        seconds=settings.stats_refresh_interval_seconds,
+        id="admin_stats_refresh",
+    )
+    scheduler.add_job(
+        job_coordinator.coordinated(
+            "admin_stats_rebuild",
+            rebuild_admin_stats_job,
+            min_interval=timedelta(hours=23),
+        ),
+        "cron",
+        hour=1,
+        minute=15,
+        timezone="UTC",
+        id="admin_stats_rebuild",
+    )
+    scheduler.add_job(
+        job_coordinator.coordinated(
+            "idempotency_sweep",
+            sweep_idempotency_keys,
+            min_interval=timedelta(minutes=55),
+        ),
+        "interval",
+        hours=1,
+        id="idempotency_sweep",
+    )
+    if settings.mention_index_enabled:
+        # Each worker serves mention search from its own memory, so every worker refreshes.
+        try:
+            count = await mention_index.reload()
+            logger.info("Mention index loaded with %d active user(s)", count)
+        except Exception:
+            logger.exception("Mention index failed to load; /users/search uses the database")
+        scheduler.add_job(
+            refresh_mention_index,
+            "interval",
+            seconds=settings.mention_index_refresh_seconds,
+            id="mention_index_refresh",
+        )
+    if settings.registration_queue_enabled:
+        # Hands unused turns on even when no waiting client polls.
+        scheduler.add_job(
+            admission_queue.sweep,
+            "interval",
+            seconds=max(settings.registration_queue_turn_seconds // 2, 1),
+            id="admission_queue_sweep",
+        )
     scheduler.start()
     logger.info("Application startup complete – reminder scheduler started")
 
     yield
 
     scheduler.shutdown(wait=False)
-    logger.info("Application shutdown – reminder scheduler stopped")
+    shutdown_image_workers()
+    await payment_webhook_worker.stop()
+    await calendar_sync_worker.stop()
+    await http_clients.aclose()
+    await close_upload_storage()
+    await log_writer.stop()
+    logger.info("Application shutdown – reminder scheduler stopped, action logs flushed")
 
 
 app = FastAPI(
@@ -147,9 +257,10 @@ api_router.include_router(event_types_router)
 api_router.include_router(push_router)
 app.include_router(api_router)
 
-uploads_dir = Path(__file__).resolve().parent / "static" / "uploads"
-uploads_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+# With S3 storage, uploads are served by the bucket/CDN instead of this process.
+if settings.upload_storage_backend == "local":
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    app.mount("/uploads", UploadStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
 
 @app.get("/")
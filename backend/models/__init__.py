@@ -1,5 +1,6 @@
 from models.user import User
 from models.event import Event
+from models.event_capacity import EventOccurrenceCapacity
 from models.registration import Registration
 from models.payment import Payment, Currency
 from models.product import Product
@@ -16,10 +17,22 @@ from models.comment import Comment, CommentReaction, ReactionType
 from models.donation import Donation, DonationSetting, DonationStatus
 from models.event_type import EventType
 from models.push_subscription import PushSubscription
+from models.job_run import JobRun, JobRunStatus
+from models.idempotency_key import IdempotencyKey
+from models.payment_webhook_inbox import PaymentWebhookInbox, WebhookInboxState
+from models.stats_summary import (
+	EventPaymentDailyStats,
+	PaymentDailyStats,
+	RegistrationDailyStats,
+	RegistrationMonthlyStats,
+	StatsRefreshState,
+	UserStats,
+)
 
 __all__ = [
 	"User",
 	"Event",
+	"EventOccurrenceCapacity",
 	"Registration",
 	"Payment",
 	"Currency",
@@ -41,4 +54,15 @@ __all__ = [
 	"DonationStatus",
 	"EventType",
 	"PushSubscription",
+	"JobRun",
+	"JobRunStatus",
+	"IdempotencyKey",
+	"PaymentWebhookInbox",
+	"WebhookInboxState",
+	"PaymentDailyStats",
+	"EventPaymentDailyStats",
+	"RegistrationDailyStats",
+	"RegistrationMonthlyStats",
+	"UserStats",
+	"StatsRefreshState",
 ]
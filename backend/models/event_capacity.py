@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+
+from database import Base
+
+
+class EventOccurrenceCapacity(Base):
+    """
+    Spot allocation row for one event occurrence.
+
+    Used by the ``row_lock`` and ``counter`` registration spot allocation
+    strategies (see RegistrationService._acquire_spot): registrants serialise
+    on this row instead of bumping Event.version.  A row is seeded from the
+    occurrence's spot-occupying registrations on first use.
+    """
+    __tablename__ = "event_occurrence_capacity"
+
+    event_id = Column(
+        String(36),
+        ForeignKey("events.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="FK to the event.",
+    )
+    occurrence_date = Column(Date, primary_key=True, comment="Event occurrence date.")
+    occupied = Column(Integer, nullable=False, default=0, comment="Registrations holding a spot.")
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    First response to a request sent with an ``Idempotency-Key`` header.
+
+    A row is claimed (status_code NULL) before the endpoint runs and filled
+    with the response once it succeeded, so retries of the same request are
+    answered from here; see services.idempotency.  Rows are swept after
+    expires_at.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="FK to the user who sent the request.",
+    )
+    key = Column(String(255), primary_key=True, comment="Client-supplied Idempotency-Key header.")
+    request_hash = Column(
+        String(64),
+        nullable=False,
+        comment="SHA-256 of method, path and body; a reused key must match it.",
+    )
+    status_code = Column(Integer, nullable=True, comment="Stored response status; NULL while in progress.")
+    response_body = Column(Text, nullable=True, comment="Stored JSON response body.")
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="UTC timestamp when the key was claimed.",
+    )
+    expires_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        comment="UTC timestamp after which the key is swept.",
+    )
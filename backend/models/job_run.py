@@ -0,0 +1,70 @@
+import enum
+import uuid
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class JobRunStatus(str, enum.Enum):
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+class JobRun(Base):
+    """
+    Record one execution of a coordinated periodic background job.
+
+    A row is written by the worker that won the job lease, so the table is a
+    cluster-wide history of which process ran each job, when, and for how long.
+    Skipped ticks (lease held elsewhere or job already ran this period) are not
+    recorded.
+    """
+    __tablename__ = "job_runs"
+
+    id = Column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        comment="Primary key UUID for the job run.",
+    )
+    job_id = Column(
+        String(100),
+        nullable=False,
+        index=True,
+        comment="Scheduler job identifier (e.g. event_reminders).",
+    )
+    worker_id = Column(
+        String(255),
+        nullable=False,
+        comment="Host and PID of the worker that executed the run.",
+    )
+    status = Column(
+        String(16),
+        nullable=False,
+        default=JobRunStatus.SUCCESS.value,
+        comment="Outcome of the run (success/failed).",
+    )
+    started_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        index=True,
+        comment="UTC timestamp when the job body started.",
+    )
+    finished_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="UTC timestamp when the job body finished.",
+    )
+    duration_ms = Column(
+        Integer,
+        nullable=True,
+        comment="Wall-clock duration of the job body in milliseconds.",
+    )
+    error = Column(
+        Text,
+        nullable=True,
+        comment="Exception summary when the run failed.",
+    )
@@ -45,6 +45,7 @@ class Payment(Base):
         String(36),
         ForeignKey("users.id"),
         nullable=False,
+        index=True,
         comment="FK to the owning user.",
     )
 
@@ -96,11 +97,13 @@ class Payment(Base):
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
+        index=True,
         comment="Timestamp when the payment was created.",
     )
     updated_at = Column(
         DateTime(timezone=True),
         onupdate=func.now(),
+        index=True,
         comment="Timestamp of the last update.",
     )
     completed_at = Column(
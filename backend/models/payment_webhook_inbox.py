@@ -0,0 +1,67 @@
+import enum
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, UniqueConstraint, text
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class WebhookInboxState(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+class PaymentWebhookInbox(Base):
+    """
+    Payment webhook accepted by ``POST /payments/webhook`` for later processing.
+
+    With the webhook inbox enabled the endpoint only stores the raw payload
+    and acknowledges it; services.payment_webhooks applies pending rows. One
+    row per (external_id, status), so gateway retries of the same
+    notification are deduplicated on insert.
+    """
+    __tablename__ = "payment_webhook_inbox"
+    __table_args__ = (
+        UniqueConstraint("external_id", "status", name="uq_payment_webhook_inbox_external_status"),
+        Index(
+            "ix_payment_webhook_inbox_pending",
+            "available_at",
+            postgresql_where=text("state = 'pending'"),
+        ),
+    )
+
+    id = Column(
+        String(36),
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+        comment="Primary key UUID for the inbox entry.",
+    )
+    external_id = Column(String(255), nullable=False, comment="Payment gateway identifier from the payload.")
+    status = Column(String(20), nullable=False, comment="Payment status reported by the gateway.")
+    payload = Column(Text, nullable=False, comment="Raw JSON webhook payload.")
+    signature = Column(String(512), nullable=True, comment="X-Signature header sent with the webhook.")
+    source_ip = Column(String(64), nullable=True, comment="IP address the webhook came from.")
+    state = Column(
+        String(20),
+        nullable=False,
+        default=WebhookInboxState.PENDING.value,
+        server_default=WebhookInboxState.PENDING.value,
+        comment="pending, processed or failed (gave up after max attempts).",
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0", comment="Processing attempts so far.")
+    received_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="UTC timestamp when the webhook was received.",
+    )
+    available_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="UTC timestamp from which a worker may (re)try the entry.",
+    )
+    processed_at = Column(DateTime(timezone=True), nullable=True, comment="UTC timestamp when processing finished.")
+    result = Column(Text, nullable=True, comment="Outcome message, or the last error while pending/failed.")
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Date, ForeignKey, UniqueConstraint, Boolean
+from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Index, UniqueConstraint, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -48,6 +48,7 @@ class Registration(Base):
     occurrence_date = Column(
         Date,
         nullable=False,
+        index=True,
         comment="Date of the event occurrence for this registration.",
     )
 
@@ -59,6 +60,7 @@ class Registration(Base):
     payment_id = Column(
         String(255),
         nullable=True,
+        index=True,
         comment="External payment ID for gateway linkage.",
     )  # External payment ID
     calendar_event_id = Column(
@@ -96,11 +98,13 @@ class Registration(Base):
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
+        index=True,
         comment="Timestamp when the registration was created.",
     )
     updated_at = Column(
         DateTime(timezone=True),
         onupdate=func.now(),
+        index=True,
         comment="Timestamp of the last update.",
     )
 
@@ -111,5 +115,7 @@ class Registration(Base):
     # Unique constraint: one registration per user per event occurrence.
     __table_args__ = (
         UniqueConstraint("user_id", "event_id", "occurrence_date", name="unique_user_event_occurrence_registration"),
+        # Keyset pagination of a user's upcoming/past registrations.
+        Index("ix_registrations_user_occurrence_id", "user_id", "occurrence_date", "id"),
     )
 
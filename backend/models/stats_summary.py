@@ -0,0 +1,106 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, String
+
+from database import Base
+
+
+class PaymentDailyStats(Base):
+    """
+    Payment count and amount per UTC creation day, type, status and plan.
+
+    Maintained by services.stats_service; backs the payment and balance
+    admin stats.  plan_code is only set for subscription payments.
+    """
+    __tablename__ = "stats_payment_daily"
+
+    day = Column(Date, primary_key=True, comment="UTC date the payments were created.")
+    payment_type = Column(String(20), primary_key=True, comment="Payment type (event/subscription).")
+    status = Column(String(20), primary_key=True, comment="Payment status.")
+    plan_code = Column(
+        String(50),
+        primary_key=True,
+        default="",
+        comment="Subscription plan code from extra_data; empty for event payments.",
+    )
+    count = Column(Integer, nullable=False, comment="Number of payments.")
+    amount = Column(Numeric(14, 2), nullable=False, comment="Sum of payment amounts.")
+
+
+class EventPaymentDailyStats(Base):
+    """
+    Payments linked to an event's registrations, per UTC creation day.
+
+    Maintained by services.stats_service; backs per-event revenue in the
+    event and balance admin stats.
+    """
+    __tablename__ = "stats_event_payment_daily"
+
+    day = Column(Date, primary_key=True, comment="UTC date the payments were created.")
+    event_id = Column(String(36), primary_key=True, index=True, comment="Event the registration belongs to.")
+    payment_type = Column(String(20), primary_key=True, comment="Payment type (event/subscription).")
+    status = Column(String(20), primary_key=True, comment="Payment status.")
+    count = Column(Integer, nullable=False, comment="Number of payment/registration pairs.")
+    amount = Column(Numeric(14, 2), nullable=False, comment="Sum of payment amounts.")
+
+
+class RegistrationDailyStats(Base):
+    """
+    Registration count per occurrence date, event and status.
+
+    Maintained by services.stats_service; backs the registration and event
+    admin stats.
+    """
+    __tablename__ = "stats_registration_daily"
+
+    occurrence_date = Column(Date, primary_key=True, comment="Event occurrence date.")
+    event_id = Column(String(36), primary_key=True, index=True, comment="Registered event.")
+    status = Column(String(64), primary_key=True, comment="Registration status.")
+    count = Column(Integer, nullable=False, comment="Number of registrations.")
+
+
+class RegistrationMonthlyStats(Base):
+    """
+    Distinct users and events with registrations per occurrence month.
+
+    Distinct counts cannot be summed from daily rows, so months are kept
+    separately. Maintained by services.stats_service.
+    """
+    __tablename__ = "stats_registration_monthly"
+
+    month = Column(String(7), primary_key=True, comment="Occurrence month (YYYY-MM).")
+    unique_users = Column(Integer, nullable=False, comment="Distinct registered users.")
+    unique_events = Column(Integer, nullable=False, comment="Distinct registered events.")
+
+
+class UserStats(Base):
+    """
+    Per-user payment and attendance totals for the admin user stats.
+
+    Users without payments or registrations have no row. Maintained by
+    services.stats_service.
+    """
+    __tablename__ = "stats_user"
+
+    user_id = Column(
+        String(36),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="FK to the user.",
+    )
+    total_paid = Column(Numeric(14, 2), nullable=False, default=0, comment="Sum of completed payments.")
+    last_payment_at = Column(DateTime(timezone=True), nullable=True, comment="Latest completed payment.")
+    event_count = Column(Integer, nullable=False, default=0, comment="Confirmed registrations.")
+    registration_count = Column(Integer, nullable=False, default=0, comment="Registrations in any status.")
+
+
+class StatsRefreshState(Base):
+    """
+    Watermark of the admin stats summary tables.
+
+    refreshed_at is the source timestamp up to which the summaries are
+    complete; it is returned with every stats response as its freshness.
+    """
+    __tablename__ = "stats_refresh_state"
+
+    name = Column(String(50), primary_key=True, comment="Summary set name.")
+    refreshed_at = Column(DateTime(timezone=True), nullable=False, comment="Summaries cover changes up to here.")
+    full_refreshed_at = Column(DateTime(timezone=True), nullable=True, comment="Last full rebuild.")
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Boolean, Text
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, Boolean, Index, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -28,6 +28,10 @@ class User(Base):
     one-to-one tables to keep authentication concerns isolated.
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of the admin user list (newest first).
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     id = Column(
         String(36),
@@ -110,6 +110,16 @@ class PaymentGatewayPort(ABC):
         """
         pass
 
+    def verify_webhook_signature(self, payload: dict, signature: str | None) -> bool:
+        """
+        Check a webhook's signature without applying it.
+
+        Used when webhooks are queued in the inbox, so unsigned or forged
+        notifications are rejected before they are stored. Gateways that do
+        not sign webhooks accept every payload.
+        """
+        return True
+
     @abstractmethod
     async def refund(self, request: RefundRequest) -> RefundResult:
         """
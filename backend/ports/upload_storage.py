@@ -0,0 +1,111 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+
+class DirectUploadUnsupportedError(Exception):
+    """The storage backend cannot accept uploads directly from clients."""
+    pass
+
+
+@dataclass
+class StoredObject:
+    """An object listed from upload storage."""
+    key: str
+    size: int
+    modified_at: datetime
+
+
+@dataclass
+class PresignedUpload:
+    """
+    Form POST that lets a client upload one object straight to storage.
+
+    The client sends ``multipart/form-data`` to ``url`` with every entry of
+    ``fields`` followed by the ``file`` part; the signed policy pins the key,
+    restricts the content type and enforces the size range at the storage side.
+    """
+    url: str
+    key: str
+    expires_at: datetime
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+class UploadStoragePort(ABC):
+    """
+    Port (interface) for storing and serving uploaded files.
+
+    Keys are flat object names (``<sha256>-640w.webp``) plus the ``incoming/``
+    prefix used for direct client uploads awaiting processing.
+
+    Implementations:
+    - LocalUploadStorage: Files on the API host's disk, served by the API (default)
+    - S3UploadStorage: S3-compatible object storage with presigned direct uploads
+    """
+
+    @abstractmethod
+    def public_url(self, key: str) -> str:
+        """
+        Return the URL clients use to fetch the object stored under key.
+
+        The URL is stable for the object's lifetime so it can be embedded in
+        event descriptions and cached as immutable.
+        """
+        pass
+
+    @abstractmethod
+    async def put_file(self, key: str, path: Path, content_type: str) -> None:
+        """
+        Store a local file under key, consuming it.
+
+        The object becomes visible atomically; the local file is removed (or
+        moved into place) once the call returns.
+        """
+        pass
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Return whether an object is stored under key."""
+        pass
+
+    @abstractmethod
+    async def read_bytes(self, key: str) -> bytes | None:
+        """Return a small object's content, or None when it does not exist."""
+        pass
+
+    @abstractmethod
+    def iter_bytes(self, key: str) -> AsyncIterator[bytes]:
+        """
+        Stream an object's content in chunks.
+
+        Raises FileNotFoundError when the object does not exist.
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete the object stored under key; missing objects are ignored."""
+        pass
+
+    @abstractmethod
+    async def list_objects(self, prefix: str = "") -> list[StoredObject]:
+        """List stored objects whose key starts with prefix."""
+        pass
+
+    @abstractmethod
+    async def presign_upload(
+        self,
+        key: str,
+        content_type_prefix: str,
+        max_bytes: int,
+        expires_in: int,
+    ) -> PresignedUpload:
+        """
+        Authorise one direct client upload to key.
+
+        Raises DirectUploadUnsupportedError when the backend cannot accept
+        uploads without going through the API.
+        """
+        pass
@@ -1,16 +1,18 @@
+import base64
 import calendar
 import enum
 import json
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import func, select
+from sqlalchemy import func, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from config import get_settings
 from database import get_db
 from models.event import Event
 from models.payment import Payment, PaymentStatus as DBPaymentStatus, Currency
@@ -21,13 +23,27 @@ from models.user import AccountStatus, User, UserRole
 from models.subscription import Subscription
 from models.approval_request import ApprovalRequest
 from models.donation import Donation, DonationStatus
+from models.job_run import JobRun, JobRunStatus
+from models.payment_webhook_inbox import PaymentWebhookInbox, WebhookInboxState
+from models.stats_summary import (
+    EventPaymentDailyStats,
+    PaymentDailyStats,
+    RegistrationDailyStats,
+    RegistrationMonthlyStats,
+    UserStats,
+)
 from security.guards import get_admin_user_dependency
-from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from adapters.payment_gateways import get_payment_gateway
 from services.payment_service import PaymentService
-from services.log_service import log_action, _get_request_ip, user_email_from, _sanitise_email_for_filename, _LOGS_ROOT
+from services.log_service import log_action, _get_request_ip, user_email_from, _sanitise_email_for_filename
+from services.log_export import LogExportFilter, gzip_stream, stream_user_log_export
 from services.registration_service import RegistrationService, RegistrationError
 from services import push_service
+from services.mention_index import mention_index
+from services.payment_webhooks import payment_webhook_worker
+from services.stats_service import ensure_stats_fresh
 from utils.legacy_ids import legacy_id_eq, optional_str_id
+from utils.text_search import escape_like
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -160,6 +176,7 @@ class PaymentStatsResponse(BaseModel):
     average_amount: str = Field(description="Average payment amount.")
     by_status: list[PaymentStatusStats] = Field(description="Breakdown by status.")
     by_type: list[PaymentTypeStats] = Field(description="Breakdown by payment type.")
+    refreshed_at: datetime = Field(description="Time the underlying stats summaries are current to.")
 
 
 class RegistrationStatusStats(BaseModel):
@@ -210,6 +227,7 @@ class RegistrationStatsResponse(BaseModel):
     unique_events: int = Field(description="Number of distinct events registered.")
     by_status: list[RegistrationStatusStats] = Field(description="Breakdown by status.")
     top_events: list[RegistrationTopEvent] = Field(description="Top events by confirmed count.")
+    refreshed_at: datetime = Field(description="Time the underlying stats summaries are current to.")
 
 
 class PendingUserResponse(BaseModel):
@@ -393,8 +411,19 @@ def _extract_transfer_reference(payment: Payment | None, event_id: str) -> str:
     return event_id
 
 
+STATS_REFRESHED_AT_HEADER = "X-Stats-Refreshed-At"
+
+
+async def _fresh_stats(db: AsyncSession, response: Response) -> datetime:
+    """Bring the stats summaries up to date and report their freshness in a header."""
+    refreshed_at = await ensure_stats_fresh(db)
+    response.headers[STATS_REFRESHED_AT_HEADER] = refreshed_at.isoformat()
+    return refreshed_at
+
+
 @router.get("/stats/events", response_model=list[EventStatsResponse])
 async def get_event_stats(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
     month: str | None = Query(default=None, description="Month in YYYY-MM format"),
@@ -405,6 +434,7 @@ async def get_event_stats(
     When a month is provided, the input is validated as YYYY-MM and the query is
     constrained to that calendar range. Otherwise, only future events are included,
     with confirmed registrations and completed payment totals summarized for each event.
+    Counts and totals come from the stats summaries (see services.stats_service).
     """
 
     if month:
@@ -417,12 +447,14 @@ async def get_event_stats(
         last_day = calendar.monthrange(parsed.year, parsed.month)[1]
         month_end = datetime(parsed.year, parsed.month, last_day, 23, 59, 59, 999999)
 
+        await _fresh_stats(db, response)
         events_result = await db.execute(
             select(Event)
             .where(Event.start_date >= month_start, Event.start_date <= month_end)
             .order_by(Event.start_date)
         )
     else:
+        await _fresh_stats(db, response)
         now = datetime.utcnow()
         events_result = await db.execute(
             select(Event)
@@ -437,26 +469,25 @@ async def get_event_stats(
     event_ids = [e.id for e in events]
 
     reg_counts_result = await db.execute(
-        select(Registration.event_id, func.count(Registration.id))
+        select(RegistrationDailyStats.event_id, func.sum(RegistrationDailyStats.count))
         .where(
-            Registration.event_id.in_(event_ids),
-            Registration.status == RegistrationStatus.CONFIRMED.value,
+            RegistrationDailyStats.event_id.in_(event_ids),
+            RegistrationDailyStats.status == RegistrationStatus.CONFIRMED.value,
         )
-        .group_by(Registration.event_id)
+        .group_by(RegistrationDailyStats.event_id)
     )
     reg_counts = {row[0]: row[1] for row in reg_counts_result.all()}
 
     payment_sums_result = await db.execute(
         select(
-            Registration.event_id,
-            func.coalesce(func.sum(Payment.amount), 0),
+            EventPaymentDailyStats.event_id,
+            func.coalesce(func.sum(EventPaymentDailyStats.amount), 0),
         )
-        .join(Payment, Payment.external_id == Registration.payment_id)
         .where(
-            Registration.event_id.in_(event_ids),
-            Payment.status == DBPaymentStatus.COMPLETED.value,
+            EventPaymentDailyStats.event_id.in_(event_ids),
+            EventPaymentDailyStats.status == DBPaymentStatus.COMPLETED.value,
         )
-        .group_by(Registration.event_id)
+        .group_by(EventPaymentDailyStats.event_id)
     )
     payment_sums = {row[0]: Decimal(str(row[1])) for row in payment_sums_result.all()}
 
@@ -491,6 +522,7 @@ async def get_event_stats(
 
 @router.get("/stats/users", response_model=list[UserStatsResponse])
 async def get_user_stats(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
 ) -> list[UserStatsResponse]:
@@ -499,56 +531,23 @@ async def get_user_stats(
 
     This endpoint combines completed payment totals, confirmed registration counts,
     and subscription details, then sorts the results for admin reporting dashboards.
+    Totals come from the per-user stats summary (see services.stats_service).
     """
+    await _fresh_stats(db, response)
 
     users_result = await db.execute(
-        select(User, Subscription).outerjoin(Subscription, Subscription.user_id == User.id)
+        select(User, Subscription, UserStats)
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
     )
     rows = users_result.all()
     if not rows:
         return []
 
-    users = [row[0] for row in rows]
-    subscriptions_by_user = {row[0].id: row[1] for row in rows}
-    user_ids = [u.id for u in users]
-
-    payment_totals_result = await db.execute(
-        select(Payment.user_id, func.coalesce(func.sum(Payment.amount), 0))
-        .where(
-            Payment.user_id.in_(user_ids),
-            Payment.status == DBPaymentStatus.COMPLETED.value,
-        )
-        .group_by(Payment.user_id)
-    )
-    payment_totals = {row[0]: Decimal(row[1]) for row in payment_totals_result.all()}
-
-    last_payment_result = await db.execute(
-        select(
-            Payment.user_id,
-            func.max(Payment.completed_at),
-        )
-        .where(
-            Payment.user_id.in_(user_ids),
-            Payment.status == DBPaymentStatus.COMPLETED.value,
-        )
-        .group_by(Payment.user_id)
-    )
-    last_payments = {row[0]: row[1] for row in last_payment_result.all()}
-
-    event_counts_result = await db.execute(
-        select(Registration.user_id, func.count(Registration.id))
-        .where(
-            Registration.user_id.in_(user_ids),
-            Registration.status == RegistrationStatus.CONFIRMED.value,
-        )
-        .group_by(Registration.user_id)
-    )
-    event_counts = {row[0]: row[1] for row in event_counts_result.all()}
-
     stats: list[UserStatsResponse] = []
-    for u in users:
-        total_paid = payment_totals.get(u.id, Decimal("0"))
-        subscription = subscriptions_by_user.get(u.id)
+    for u, subscription, user_stats in rows:
+        total_paid = Decimal(str(user_stats.total_paid)) if user_stats else Decimal("0")
+        last_payment_at = user_stats.last_payment_at if user_stats else None
         points = int(subscription.points or 0) if subscription else 0
         subscription_end_date = subscription.end_date if subscription else None
         stats.append(
@@ -556,7 +555,7 @@ async def get_user_stats(
                 user_id=str(u.id),
                 full_name=u.full_name,
                 email=u.email,
-                event_count=int(event_counts.get(u.id, 0)),
+                event_count=user_stats.event_count if user_stats else 0,
                 total_paid=f"{total_paid:.2f} PLN",
                 points=points,
                 role=str(u.role.value if hasattr(u.role, "value") else u.role),
@@ -564,7 +563,7 @@ async def get_user_stats(
                     u.account_status.value if hasattr(u.account_status, "value") else u.account_status
                 ),
                 subscription_end_date=subscription_end_date.isoformat() if subscription_end_date else None,
-                last_payment_at=last_payments.get(u.id).isoformat() if last_payments.get(u.id) else None,
+                last_payment_at=last_payment_at.isoformat() if last_payment_at else None,
             )
         )
 
@@ -582,6 +581,7 @@ async def get_user_stats(
 
 @router.get("/stats/payments", response_model=PaymentStatsResponse)
 async def get_payment_stats(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
     month: str | None = Query(default=None, description="Month in YYYY-MM format"),
@@ -591,7 +591,7 @@ async def get_payment_stats(
 
     If a month is provided, it is validated as YYYY-MM and used to filter by
     creation date; otherwise the summary covers all payments. Totals are grouped
-    by status and type for admin reporting.
+    by status and type for admin reporting from the daily payment summary.
     """
     if month:
         try:
@@ -599,85 +599,53 @@ async def get_payment_stats(
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="Invalid month format") from exc
 
-        month_start = datetime(parsed.year, parsed.month, 1)
+        month_start = date(parsed.year, parsed.month, 1)
         last_day = calendar.monthrange(parsed.year, parsed.month)[1]
-        month_end = datetime(parsed.year, parsed.month, last_day, 23, 59, 59, 999999)
-        time_filter = (Payment.created_at >= month_start, Payment.created_at <= month_end)
+        month_end = date(parsed.year, parsed.month, last_day)
+        day_filter = (PaymentDailyStats.day >= month_start, PaymentDailyStats.day <= month_end)
     else:
-        time_filter = ()
-
-    totals_result = await db.execute(
-        select(
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        ).where(*time_filter)
-    )
-    total_count, total_amount = totals_result.one()
-    total_count = int(total_count or 0)
-    total_amount = Decimal(total_amount or 0)
+        day_filter = ()
 
-    completed_result = await db.execute(
+    refreshed_at = await _fresh_stats(db, response)
+    buckets_result = await db.execute(
         select(
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(
-            *time_filter,
-            Payment.status == DBPaymentStatus.COMPLETED.value,
+            PaymentDailyStats.payment_type,
+            PaymentDailyStats.status,
+            func.sum(PaymentDailyStats.count),
+            func.sum(PaymentDailyStats.amount),
         )
+        .where(*day_filter)
+        .group_by(PaymentDailyStats.payment_type, PaymentDailyStats.status)
     )
-    completed_count, completed_amount = completed_result.one()
-    completed_count = int(completed_count or 0)
-    completed_amount = Decimal(completed_amount or 0)
 
-    refunded_result = await db.execute(
-        select(
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(
-            *time_filter,
-            Payment.status == DBPaymentStatus.REFUNDED.value,
-        )
-    )
-    refunded_count, refunded_amount = refunded_result.one()
-    refunded_count = int(refunded_count or 0)
-    refunded_amount = Decimal(refunded_amount or 0)
+    by_status_totals: dict[str, list] = {}
+    by_type_totals: dict[str, list] = {}
+    for payment_type, status, count, amount in buckets_result.all():
+        for totals, key in ((by_status_totals, status), (by_type_totals, payment_type)):
+            entry = totals.setdefault(key, [0, Decimal("0")])
+            entry[0] += int(count)
+            entry[1] += Decimal(amount)
+
+    total_count = sum(count for count, _ in by_status_totals.values())
+    total_amount = sum((amount for _, amount in by_status_totals.values()), Decimal("0"))
+    completed_count, completed_amount = by_status_totals.get(DBPaymentStatus.COMPLETED.value, (0, Decimal("0")))
+    refunded_count, refunded_amount = by_status_totals.get(DBPaymentStatus.REFUNDED.value, (0, Decimal("0")))
 
-    by_status_result = await db.execute(
-        select(
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(*time_filter)
-        .group_by(Payment.status)
-    )
     by_status = [
         PaymentStatusStats(
-            status=str(row[0]),
-            count=int(row[1]),
-            total_amount=f"{Decimal(row[2]):.2f} PLN",
+            status=str(status),
+            count=count,
+            total_amount=f"{amount:.2f} PLN",
         )
-        for row in by_status_result.all()
+        for status, (count, amount) in by_status_totals.items()
     ]
-
-    by_type_result = await db.execute(
-        select(
-            Payment.payment_type,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(*time_filter)
-        .group_by(Payment.payment_type)
-    )
     by_type = [
         PaymentTypeStats(
-            payment_type=str(row[0]),
-            count=int(row[1]),
-            total_amount=f"{Decimal(row[2]):.2f} PLN",
+            payment_type=str(payment_type),
+            count=count,
+            total_amount=f"{amount:.2f} PLN",
         )
-        for row in by_type_result.all()
+        for payment_type, (count, amount) in by_type_totals.items()
     ]
 
     average_amount = Decimal("0")
@@ -694,11 +662,13 @@ async def get_payment_stats(
         average_amount=f"{average_amount:.2f} PLN",
         by_status=by_status,
         by_type=by_type,
+        refreshed_at=refreshed_at,
     )
 
 
 @router.get("/stats/registrations", response_model=RegistrationStatsResponse)
 async def get_registration_stats(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
     month: str | None = Query(default=None, description="Month in YYYY-MM format"),
@@ -708,7 +678,7 @@ async def get_registration_stats(
 
     When a month is provided, it is validated as YYYY-MM and used to filter by
     occurrence date. The response aggregates counts by status and highlights the
-    top events by confirmed registrations.
+    top events by confirmed registrations, read from the registration summaries.
     """
     if month:
         try:
@@ -719,28 +689,38 @@ async def get_registration_stats(
         month_start = datetime(parsed.year, parsed.month, 1).date()
         last_day = calendar.monthrange(parsed.year, parsed.month)[1]
         month_end = datetime(parsed.year, parsed.month, last_day).date()
-        date_filter = (Registration.occurrence_date >= month_start, Registration.occurrence_date <= month_end)
+        date_filter = (
+            RegistrationDailyStats.occurrence_date >= month_start,
+            RegistrationDailyStats.occurrence_date <= month_end,
+        )
     else:
         date_filter = ()
 
-    totals_result = await db.execute(
-        select(
-            func.count(Registration.id),
-            func.count(func.distinct(Registration.user_id)),
-            func.count(func.distinct(Registration.event_id)),
-        ).where(*date_filter)
-    )
-    total_count, unique_users, unique_events = totals_result.one()
-    total_count = int(total_count or 0)
-    unique_users = int(unique_users or 0)
-    unique_events = int(unique_events or 0)
-
+    refreshed_at = await _fresh_stats(db, response)
     status_counts_result = await db.execute(
-        select(Registration.status, func.count(Registration.id))
+        select(RegistrationDailyStats.status, func.sum(RegistrationDailyStats.count))
         .where(*date_filter)
-        .group_by(Registration.status)
+        .group_by(RegistrationDailyStats.status)
     )
     status_counts = {row[0]: int(row[1]) for row in status_counts_result.all()}
+    total_count = sum(status_counts.values())
+
+    # Distinct counts cannot be added up from daily rows.
+    if month:
+        unique_result = await db.execute(
+            select(RegistrationMonthlyStats.unique_users, RegistrationMonthlyStats.unique_events)
+            .where(RegistrationMonthlyStats.month == f"{parsed.year}-{parsed.month:02d}")
+        )
+        unique_users, unique_events = unique_result.one_or_none() or (0, 0)
+    else:
+        unique_users = await db.scalar(
+            select(func.count()).select_from(UserStats).where(UserStats.registration_count > 0)
+        )
+        unique_events = await db.scalar(
+            select(func.count(func.distinct(RegistrationDailyStats.event_id)))
+        )
+    unique_users = int(unique_users or 0)
+    unique_events = int(unique_events or 0)
 
     confirmed_count = status_counts.get(RegistrationStatus.CONFIRMED.value, 0)
     pending_count = (
@@ -756,21 +736,22 @@ async def get_registration_stats(
         for status, count in status_counts.items()
     ]
 
+    confirmed_total = func.sum(RegistrationDailyStats.count)
     top_events_result = await db.execute(
         select(
             Event.id,
             Event.title,
             Event.city,
             Event.max_participants,
-            func.count(Registration.id),
+            confirmed_total,
         )
-        .join(Registration, Registration.event_id == Event.id)
+        .join(RegistrationDailyStats, RegistrationDailyStats.event_id == Event.id)
         .where(
             *date_filter,
-            Registration.status == RegistrationStatus.CONFIRMED.value,
+            RegistrationDailyStats.status == RegistrationStatus.CONFIRMED.value,
         )
         .group_by(Event.id, Event.title, Event.city, Event.max_participants)
-        .order_by(func.count(Registration.id).desc())
+        .order_by(confirmed_total.desc())
         .limit(5)
     )
 
@@ -802,6 +783,7 @@ async def get_registration_stats(
         unique_events=unique_events,
         by_status=by_status,
         top_events=top_events,
+        refreshed_at=refreshed_at,
     )
 
 
@@ -898,6 +880,7 @@ async def approve_user(
             .where(User.id == target.id)
         )
         target = result.unique().scalar_one_or_none()
+        mention_index.upsert(target)
 
     import json as _json
     def _tags(raw):
@@ -1111,7 +1094,7 @@ async def approve_pending_manual_payment(
     This delegates to the registration service, maps domain errors to HTTP codes,
     and returns the refreshed manual payment row for the admin queue.
     """
-    payment_service = PaymentService(db, get_shared_fake_payment_adapter())
+    payment_service = PaymentService(db, get_payment_gateway())
     registration_service = RegistrationService(db, payment_service)
     try:
         approved = await registration_service.approve_manual_payment(registration_id)
@@ -1228,7 +1211,7 @@ async def update_refund_task(
             raise HTTPException(status_code=422, detail="Cannot mark refund as paid when should_refund is false")
         task.refund_marked_paid = payload.refund_marked_paid
         if payload.refund_marked_paid and registration.payment_id:
-            payment_service = PaymentService(db, get_shared_fake_payment_adapter())
+            payment_service = PaymentService(db, get_payment_gateway())
             await payment_service.mark_manual_event_payment_refunded(registration.payment_id)
             if registration.status == RegistrationStatus.CANCELLED.value:
                 registration.status = RegistrationStatus.REFUNDED.value
@@ -1457,7 +1440,7 @@ async def approve_subscription_purchase(
     This delegates to the payment service, maps domain errors to HTTP codes,
     and returns the refreshed purchase row for the admin queue.
     """
-    payment_service = PaymentService(db, get_shared_fake_payment_adapter())
+    payment_service = PaymentService(db, get_payment_gateway())
     try:
         purchase = await payment_service.approve_subscription_manual_payment(purchase_id)
     except ValueError as exc:
@@ -1570,6 +1553,7 @@ class BalanceResponse(BaseModel):
     events: list[BalanceEventRow] = Field(description="Per-event breakdown rows.")
     subscriptions: list[BalanceSubscriptionRow] = Field(description="Per-plan breakdown rows.")
     pending: BalancePendingRow = Field(description="Pending payment summary.")
+    refreshed_at: datetime = Field(description="Time the underlying stats summaries are current to.")
 
 
 def _fmt(amount: Decimal) -> str:
@@ -1625,6 +1609,7 @@ def _parse_period(period: str) -> tuple[datetime, datetime, str]:
 
 @router.get("/stats/balance", response_model=BalanceResponse)
 async def get_balance(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
     period: str | None = Query(
@@ -1637,7 +1622,7 @@ async def get_balance(
 
     Aggregates completed payments (income), refunds, and net amounts with
     monthly, per-event, and per-subscription-plan breakdowns for the selected
-    period.
+    period, read from the daily payment summaries.
     """
     import re as _re  # noqa: F811 - local import to avoid top-level clash
 
@@ -1650,17 +1635,27 @@ async def get_balance(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    time_filter = (Payment.created_at >= date_from, Payment.created_at <= date_to)
+    refreshed_at = await _fresh_stats(db, response)
+    day_filter = (PaymentDailyStats.day >= date_from.date(), PaymentDailyStats.day <= date_to.date())
+    month_label = func.to_char(PaymentDailyStats.day, "YYYY-MM").label("month")
 
-    totals_q = await db.execute(
+    buckets_q = await db.execute(
         select(
-            Payment.payment_type,
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
+            month_label,
+            PaymentDailyStats.payment_type,
+            PaymentDailyStats.status,
+            PaymentDailyStats.plan_code,
+            func.sum(PaymentDailyStats.count),
+            func.sum(PaymentDailyStats.amount),
+        )
+        .where(*day_filter)
+        .group_by(
+            "month",
+            PaymentDailyStats.payment_type,
+            PaymentDailyStats.status,
+            PaymentDailyStats.plan_code,
         )
-        .where(*time_filter)
-        .group_by(Payment.payment_type, Payment.status)
+        .order_by("month")
     )
     income_event = Decimal("0")
     income_sub = Decimal("0")
@@ -1668,40 +1663,15 @@ async def get_balance(
     refund_sub = Decimal("0")
     tx_count = 0
     refund_count = 0
-    for ptype, status, cnt, total in totals_q.all():
+    pending_event = Decimal("0")
+    pending_sub = Decimal("0")
+    pending_event_count = 0
+    pending_sub_count = 0
+    month_data: dict[str, dict] = {}
+    sub_data: dict[str, dict] = {}
+    for month_str, ptype, status, plan_code, cnt, total in buckets_q.all():
         cnt = int(cnt)
         total = Decimal(str(total))
-        if status == DBPaymentStatus.COMPLETED.value:
-            if ptype == "event":
-                income_event += total
-            else:
-                income_sub += total
-            tx_count += cnt
-        elif status == DBPaymentStatus.REFUNDED.value:
-            if ptype == "event":
-                refund_event += total
-            else:
-                refund_sub += total
-            refund_count += cnt
-
-    total_income = income_event + income_sub
-    total_refunds = refund_event + refund_sub
-    total_net = total_income - total_refunds
-
-    month_q = await db.execute(
-        select(
-            func.to_char(Payment.created_at, "YYYY-MM").label("month"),
-            Payment.payment_type,
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(*time_filter)
-        .group_by("month", Payment.payment_type, Payment.status)
-        .order_by("month")
-    )
-    month_data: dict[str, dict] = {}
-    for month_str, ptype, status, cnt, total in month_q.all():
         if month_str not in month_data:
             month_data[month_str] = {
                 "income_event": Decimal("0"),
@@ -1711,17 +1681,48 @@ async def get_balance(
                 "refund_count": 0,
             }
         d = month_data[month_str]
-        cnt = int(cnt)
-        total = Decimal(str(total))
+        plan = None
+        if ptype == "subscription":
+            plan = sub_data.setdefault(plan_code, {
+                "income": Decimal("0"),
+                "refunds": Decimal("0"),
+                "tx_count": 0,
+                "refund_count": 0,
+            })
         if status == DBPaymentStatus.COMPLETED.value:
             if ptype == "event":
+                income_event += total
                 d["income_event"] += total
             else:
+                income_sub += total
                 d["income_sub"] += total
+            tx_count += cnt
             d["tx_count"] += cnt
+            if plan is not None:
+                plan["income"] += total
+                plan["tx_count"] += cnt
         elif status == DBPaymentStatus.REFUNDED.value:
+            if ptype == "event":
+                refund_event += total
+            else:
+                refund_sub += total
+            refund_count += cnt
             d["refunds"] += total
             d["refund_count"] += cnt
+            if plan is not None:
+                plan["refunds"] += total
+                plan["refund_count"] += cnt
+        elif status in (DBPaymentStatus.PENDING.value, DBPaymentStatus.PROCESSING.value):
+            if ptype == "event":
+                pending_event += total
+                pending_event_count += cnt
+            else:
+                pending_sub += total
+                pending_sub_count += cnt
+
+    total_income = income_event + income_sub
+    total_refunds = refund_event + refund_sub
+    total_net = total_income - total_refunds
 
     months = []
     for m, d in sorted(month_data.items()):
@@ -1741,26 +1742,26 @@ async def get_balance(
 
     event_q = await db.execute(
         select(
-            Registration.event_id,
+            EventPaymentDailyStats.event_id,
             Event.title,
             Event.start_date,
             Event.city,
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
+            EventPaymentDailyStats.status,
+            func.sum(EventPaymentDailyStats.count),
+            func.sum(EventPaymentDailyStats.amount),
         )
-        .join(Registration, Payment.external_id == Registration.payment_id)
-        .join(Event, Registration.event_id == Event.id)
+        .join(Event, EventPaymentDailyStats.event_id == Event.id)
         .where(
-            *time_filter,
-            Payment.payment_type == "event",
+            EventPaymentDailyStats.day >= date_from.date(),
+            EventPaymentDailyStats.day <= date_to.date(),
+            EventPaymentDailyStats.payment_type == "event",
         )
         .group_by(
-            Registration.event_id,
+            EventPaymentDailyStats.event_id,
             Event.title,
             Event.start_date,
             Event.city,
-            Payment.status,
+            EventPaymentDailyStats.status,
         )
     )
     event_data: dict[str, dict] = {}
@@ -1804,47 +1805,6 @@ async def get_balance(
         reverse=True,
     )
 
-    sub_q = await db.execute(
-        select(
-            Payment.description,
-            Payment.extra_data,
-            Payment.status,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(
-            *time_filter,
-            Payment.payment_type == "subscription",
-        )
-        .group_by(Payment.description, Payment.extra_data, Payment.status)
-    )
-    sub_data: dict[str, dict] = {}
-    for desc, extra, status, cnt, total in sub_q.all():
-        plan_code = "unknown"
-        if extra:
-            try:
-                parsed = json.loads(extra)
-                if isinstance(parsed, dict):
-                    plan_code = str(parsed.get("plan_code", "unknown"))
-            except (TypeError, json.JSONDecodeError):
-                pass
-        if plan_code not in sub_data:
-            sub_data[plan_code] = {
-                "income": Decimal("0"),
-                "refunds": Decimal("0"),
-                "tx_count": 0,
-                "refund_count": 0,
-            }
-        d = sub_data[plan_code]
-        cnt = int(cnt)
-        total = Decimal(str(total))
-        if status == DBPaymentStatus.COMPLETED.value:
-            d["income"] += total
-            d["tx_count"] += cnt
-        elif status == DBPaymentStatus.REFUNDED.value:
-            d["refunds"] += total
-            d["refund_count"] += cnt
-
     subscriptions = [
         BalanceSubscriptionRow(
             plan_code=pc,
@@ -1857,35 +1817,6 @@ async def get_balance(
         for pc, d in sorted(sub_data.items())
     ]
 
-    pending_q = await db.execute(
-        select(
-            Payment.payment_type,
-            func.count(Payment.id),
-            func.coalesce(func.sum(Payment.amount), 0),
-        )
-        .where(
-            *time_filter,
-            Payment.status.in_([
-                DBPaymentStatus.PENDING.value,
-                DBPaymentStatus.PROCESSING.value,
-            ]),
-        )
-        .group_by(Payment.payment_type)
-    )
-    pending_event = Decimal("0")
-    pending_sub = Decimal("0")
-    pending_event_count = 0
-    pending_sub_count = 0
-    for ptype, cnt, total in pending_q.all():
-        cnt = int(cnt)
-        total = Decimal(str(total))
-        if ptype == "event":
-            pending_event += total
-            pending_event_count += cnt
-        else:
-            pending_sub += total
-            pending_sub_count += cnt
-
     pending = BalancePendingRow(
         pending_event=_fmt(pending_event),
         pending_subscription=_fmt(pending_sub),
@@ -1909,6 +1840,7 @@ async def get_balance(
         events=events,
         subscriptions=subscriptions,
         pending=pending,
+        refreshed_at=refreshed_at,
     )
 
 
@@ -2003,31 +1935,151 @@ class UserListItem(BaseModel):
     has_approval_request: bool = False
 
 
+class UserListPage(BaseModel):
+    """One keyset page of the admin user list."""
+
+    items: list[UserListItem]
+    next_cursor: str | None = Field(
+        default=None,
+        description="Opaque cursor for the next page; null on the last page.",
+    )
+
+
+class UserCountResponse(BaseModel):
+    total: int
+
+
+def _user_list_conditions(
+    status: AccountStatus | None,
+    role: UserRole | None,
+    q: str | None,
+) -> list:
+    conditions = []
+    if status is not None:
+        conditions.append(User.account_status == status)
+    if role is not None:
+        conditions.append(User.role == role)
+    if q and q.strip():
+        pattern = f"%{escape_like(q.strip())}%"
+        conditions.append(or_(
+            User.full_name.ilike(pattern, escape="\\"),
+            User.email.ilike(pattern, escape="\\"),
+        ))
+    return conditions
+
+
+def _encode_user_cursor(user: User) -> str:
+    raw = f"{user.created_at.isoformat()}|{user.id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_user_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, user_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), user_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _user_list_item(user: User, has_approval_request: bool) -> UserListItem:
+    return UserListItem(
+        id=str(user.id),
+        full_name=user.full_name,
+        email=user.email,
+        picture_url=user.picture_url,
+        role=user.role.value if user.role else "guest",
+        account_status=user.account_status.value if user.account_status else "pending",
+        created_at=user.created_at.isoformat() if user.created_at else None,
+        has_approval_request=has_approval_request,
+    )
+
+
+_USER_FILTER_STATUS = Query(None, description="Only users with this account status.")
+_USER_FILTER_ROLE = Query(None, description="Only users with this role.")
+_USER_FILTER_Q = Query(None, max_length=100, description="Case-insensitive search in name and email.")
+
+
 @router.get("/users/all", response_model=list[UserListItem])
 async def list_all_users(
+    status: AccountStatus | None = _USER_FILTER_STATUS,
+    role: UserRole | None = _USER_FILTER_ROLE,
+    q: str | None = _USER_FILTER_Q,
     db: AsyncSession = Depends(get_db),
     _admin: User = Depends(get_admin_user_dependency),
 ) -> list[UserListItem]:
-    """Return every user account ordered by creation date (newest first)."""
+    """
+    Return every matching user account ordered by creation date (newest first).
+
+    Unpaginated; kept for small installations and the current admin UI.
+    Large user bases should use /admin/users/page and /admin/users/count.
+    """
     result = await db.execute(
         select(User)
         .options(joinedload(User.approval_request))
-        .order_by(User.created_at.desc())
+        .where(*_user_list_conditions(status, role, q))
+        .order_by(User.created_at.desc(), User.id.desc())
     )
     users = result.unique().scalars().all()
-    return [
-        UserListItem(
-            id=str(u.id),
-            full_name=u.full_name,
-            email=u.email,
-            picture_url=u.picture_url,
-            role=u.role.value if u.role else "guest",
-            account_status=u.account_status.value if u.account_status else "pending",
-            created_at=u.created_at.isoformat() if u.created_at else None,
-            has_approval_request=u.approval_request is not None,
-        )
-        for u in users
-    ]
+    return [_user_list_item(u, u.approval_request is not None) for u in users]
+
+
+@router.get("/users/page", response_model=UserListPage)
+async def list_users_page(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor from the previous page."),
+    status: AccountStatus | None = _USER_FILTER_STATUS,
+    role: UserRole | None = _USER_FILTER_ROLE,
+    q: str | None = _USER_FILTER_Q,
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> UserListPage:
+    """
+    Return one page of users, newest first, with keyset pagination.
+
+    Pages are ordered by (created_at, id) descending and continue strictly
+    after the cursor row, so the cost per page is independent of its depth
+    (served by ix_users_created_at_id) and users created between requests
+    never shift or duplicate rows. Filters must stay the same across pages.
+    """
+    conditions = _user_list_conditions(status, role, q)
+    if cursor:
+        created_at, user_id = _decode_user_cursor(cursor)
+        conditions.append(tuple_(User.created_at, User.id) < tuple_(created_at, user_id))
+    has_approval_request = (
+        select(ApprovalRequest.user_id)
+        .where(ApprovalRequest.user_id == User.id)
+        .exists()
+        .label("has_approval_request")
+    )
+    result = await db.execute(
+        select(User, has_approval_request)
+        .where(*conditions)
+        .order_by(User.created_at.desc(), User.id.desc())
+        .limit(limit + 1)
+    )
+    rows = result.all()
+    page = rows[:limit]
+    next_cursor = _encode_user_cursor(page[-1][0]) if len(rows) > limit else None
+    return UserListPage(
+        items=[_user_list_item(user, has_request) for user, has_request in page],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/users/count", response_model=UserCountResponse)
+async def count_users(
+    status: AccountStatus | None = _USER_FILTER_STATUS,
+    role: UserRole | None = _USER_FILTER_ROLE,
+    q: str | None = _USER_FILTER_Q,
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> UserCountResponse:
+    """Return the number of users matching the /admin/users/page filters."""
+    total = await db.scalar(
+        select(func.count()).select_from(User).where(*_user_list_conditions(status, role, q))
+    )
+    return UserCountResponse(total=total or 0)
 
 
 @router.post("/users/{user_id}/block", response_model=UserListItem)
@@ -2050,6 +2102,7 @@ async def block_user(
     target.account_status = AccountStatus.BANNED
     await db.commit()
     await db.refresh(target)
+    mention_index.upsert(target)
     await log_action(
                 action="ADMIN_USER_BLOCKED",
         user_email=user_email_from(admin),
@@ -2084,6 +2137,7 @@ async def unblock_user(
     target.account_status = AccountStatus.PENDING
     await db.commit()
     await db.refresh(target)
+    mention_index.upsert(target)
     await log_action(
                 action="ADMIN_USER_UNBLOCKED",
         user_email=user_email_from(_admin),
@@ -2114,12 +2168,22 @@ async def download_user_logs(
     user_id: str = Path(..., min_length=1),
     date_from: date = Query(..., description="Start date (YYYY-MM-DD)"),
     date_to: date = Query(..., description="End date, inclusive (YYYY-MM-DD)"),
+    action: list[str] | None = Query(
+        None,
+        max_length=100,
+        description="Action name or glob pattern to include (e.g. PAYMENT_*); repeatable.",
+    ),
+    time_from: time | None = Query(None, description="UTC time of day on date_from to start at (HH:MM[:SS])."),
+    time_to: time | None = Query(None, description="UTC time of day on date_to to stop at (HH:MM[:SS])."),
+    gzip: bool = Query(False, description="Return the export gzip-compressed."),
     db: AsyncSession = Depends(get_db),
     admin: User = Depends(get_admin_user_dependency),
 ) -> StreamingResponse:
     """
-    Download all log entries for a specific user across a date range as a
-    single plain-text file.  The range must not exceed 30 days.
+    Stream all log entries for a specific user across a date range as a
+    single plain-text (optionally gzip-compressed) file.  The range must not
+    exceed 30 days.  Files are read in chunks off the event loop; action
+    filters use the per-day action index instead of scanning whole files.
     """
     if date_to < date_from:
         raise HTTPException(status_code=400, detail="date_to must be >= date_from")
@@ -2135,28 +2199,26 @@ async def download_user_logs(
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
 
+    export_filter = LogExportFilter(
+        actions=tuple(a.strip().upper() for a in action or [] if a.strip()),
+        start=datetime.combine(date_from, time_from) if time_from else None,
+        end=datetime.combine(date_to, time_to) if time_to else None,
+    )
+    chunks = stream_user_log_export(target.email, date_from, date_to, export_filter)
+
     safe_email = _sanitise_email_for_filename(target.email.lower())
-    filename_stem = f"{safe_email}.log"
-
-    lines: list[str] = []
-    current = date_from
-    while current <= date_to:
-        folder_label = current.strftime("%d-%m-%Y")
-        log_path = _LOGS_ROOT / folder_label / filename_stem
-        if log_path.exists():
-            lines.append(f"# ── {folder_label} ─────────────────────────")
-            lines.append(log_path.read_text(encoding="utf-8").rstrip())
-        else:
-            lines.append(f"# ── {folder_label}  (brak wpisów)")
-        current += timedelta(days=1)
-
-    content = "\n".join(lines) + "\n"
     download_name = (
         f"logs_{safe_email}_{date_from.strftime('%Y%m%d')}"
         f"_{date_to.strftime('%Y%m%d')}.txt"
     )
+    if gzip:
+        return StreamingResponse(
+            gzip_stream(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{download_name}.gz"'},
+        )
     return StreamingResponse(
-        iter([content]),
+        chunks,
         media_type="text/plain; charset=utf-8",
         headers={"Content-Disposition": f'attachment; filename="{download_name}"'},
     )
@@ -2394,3 +2456,184 @@ async def get_admin_user_detail(
         total_donations=f"{total_donations:.2f} PLN",
         pending_actions=actions,
     )
+
+
+# ---------------------------------------------------------------------------
+# Background job history
+# ---------------------------------------------------------------------------
+
+
+class JobRunResponse(BaseModel):
+    """A single recorded execution of a coordinated background job."""
+
+    id: str = Field(description="Run identifier.")
+    job_id: str = Field(description="Scheduler job identifier.")
+    worker_id: str = Field(description="Host and PID of the worker that ran the job.")
+    status: str = Field(description="Outcome of the run (success/failed).")
+    started_at: str = Field(description="ISO timestamp when the run started.")
+    finished_at: str | None = Field(default=None, description="ISO timestamp when the run finished.")
+    duration_ms: int | None = Field(default=None, description="Run duration in milliseconds.")
+    error: str | None = Field(default=None, description="Error summary for failed runs.")
+
+
+class JobSummaryResponse(BaseModel):
+    """
+    Aggregate run statistics for one background job.
+
+    Used by the admin dashboard to check that periodic jobs keep running on
+    exactly one worker and to spot slow or failing jobs.
+    """
+
+    job_id: str = Field(description="Scheduler job identifier.")
+    run_count: int = Field(description="Total recorded runs.")
+    failure_count: int = Field(description="Recorded runs that failed.")
+    avg_duration_ms: int | None = Field(default=None, description="Mean run duration in milliseconds.")
+    max_duration_ms: int | None = Field(default=None, description="Longest run duration in milliseconds.")
+    last_run: JobRunResponse | None = Field(default=None, description="Most recent run.")
+
+
+def _job_run_to_response(run: JobRun) -> JobRunResponse:
+    """Convert a JobRun ORM row into its API representation."""
+    return JobRunResponse(
+        id=run.id,
+        job_id=run.job_id,
+        worker_id=run.worker_id,
+        status=run.status,
+        started_at=run.started_at.isoformat(),
+        finished_at=run.finished_at.isoformat() if run.finished_at else None,
+        duration_ms=run.duration_ms,
+        error=run.error,
+    )
+
+
+@router.get("/jobs", response_model=list[JobSummaryResponse])
+async def list_job_summaries(
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> list[JobSummaryResponse]:
+    """Return run counts, durations and the latest run for every recorded job."""
+    stats_result = await db.execute(
+        select(
+            JobRun.job_id,
+            func.count(JobRun.id),
+            func.count(JobRun.id).filter(JobRun.status == JobRunStatus.FAILED.value),
+            func.avg(JobRun.duration_ms),
+            func.max(JobRun.duration_ms),
+            func.max(JobRun.started_at),
+        )
+        .group_by(JobRun.job_id)
+        .order_by(JobRun.job_id)
+    )
+    stats_rows = stats_result.all()
+    if not stats_rows:
+        return []
+
+    last_result = await db.execute(
+        select(JobRun).where(
+            JobRun.started_at.in_([row[5] for row in stats_rows]),
+            JobRun.job_id.in_([row[0] for row in stats_rows]),
+        )
+    )
+    last_by_job: dict[str, JobRun] = {}
+    for run in last_result.scalars().all():
+        current = last_by_job.get(run.job_id)
+        if current is None or run.started_at > current.started_at:
+            last_by_job[run.job_id] = run
+
+    return [
+        JobSummaryResponse(
+            job_id=job_id,
+            run_count=int(run_count),
+            failure_count=int(failure_count or 0),
+            avg_duration_ms=int(avg_duration) if avg_duration is not None else None,
+            max_duration_ms=int(max_duration) if max_duration is not None else None,
+            last_run=_job_run_to_response(last_by_job[job_id]) if job_id in last_by_job else None,
+        )
+        for job_id, run_count, failure_count, avg_duration, max_duration, _last_started in stats_rows
+    ]
+
+
+@router.get("/jobs/{job_id}/runs", response_model=list[JobRunResponse])
+async def list_job_runs(
+    job_id: str = Path(..., min_length=1, max_length=100),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of runs to return."),
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> list[JobRunResponse]:
+    """Return the most recent runs of one background job, newest first."""
+    result = await db.execute(
+        select(JobRun)
+        .where(JobRun.job_id == job_id)
+        .order_by(JobRun.started_at.desc())
+        .limit(limit)
+    )
+    return [_job_run_to_response(run) for run in result.scalars().all()]
+
+
+# ---------------------------------------------------------------------------
+# Payment webhook inbox
+# ---------------------------------------------------------------------------
+
+
+class LatencyStatsResponse(BaseModel):
+    """Duration summary of one kind of operation in this worker process."""
+
+    count: int = Field(description="Operations recorded since the process started.")
+    failures: int = Field(description="Recorded operations that failed.")
+    mean_seconds: float | None = Field(default=None, description="Mean duration in seconds.")
+    max_seconds: float = Field(description="Longest duration in seconds.")
+    last_seconds: float | None = Field(default=None, description="Duration of the latest operation.")
+
+
+class WebhookInboxStatsResponse(BaseModel):
+    """
+    Backlog and processing statistics of the payment webhook inbox.
+
+    Counts come from the database; lag and processing times are those of the
+    worker in the process that served the request.
+    """
+
+    enabled: bool = Field(description="Whether webhooks are queued in the inbox.")
+    worker_running: bool = Field(description="Whether this process runs the inbox worker.")
+    pending_count: int = Field(description="Webhooks waiting to be applied.")
+    failed_count: int = Field(description="Webhooks given up on after the maximum attempts.")
+    oldest_pending_age_seconds: float | None = Field(
+        default=None, description="Age of the oldest pending webhook in seconds."
+    )
+    lag: LatencyStatsResponse = Field(description="Time from receipt to processed.")
+    processing: LatencyStatsResponse = Field(description="Time spent applying each webhook.")
+    gateway_token_fetches: LatencyStatsResponse | None = Field(
+        default=None,
+        description="OAuth token requests of the payment gateway; null when the gateway has no token.",
+    )
+
+
+@router.get("/payments/webhook-inbox", response_model=WebhookInboxStatsResponse)
+async def get_webhook_inbox_stats(
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> WebhookInboxStatsResponse:
+    """Return the webhook inbox backlog, this worker's processing and the gateway's token statistics."""
+    pending = PaymentWebhookInbox.state == WebhookInboxState.PENDING.value
+    result = await db.execute(
+        select(
+            func.count(PaymentWebhookInbox.id).filter(pending),
+            func.count(PaymentWebhookInbox.id).filter(PaymentWebhookInbox.state == WebhookInboxState.FAILED.value),
+            func.min(PaymentWebhookInbox.received_at).filter(pending),
+        )
+    )
+    pending_count, failed_count, oldest_pending = result.one()
+    oldest_age = (
+        (datetime.now(oldest_pending.tzinfo) - oldest_pending).total_seconds() if oldest_pending else None
+    )
+    token_fetches = getattr(get_payment_gateway(), "token_fetches", None)
+    return WebhookInboxStatsResponse(
+        enabled=get_settings().payment_webhook_inbox_enabled,
+        worker_running=payment_webhook_worker.running,
+        pending_count=int(pending_count or 0),
+        failed_count=int(failed_count or 0),
+        oldest_pending_age_seconds=oldest_age,
+        lag=LatencyStatsResponse(**payment_webhook_worker.lag.as_dict()),
+        processing=LatencyStatsResponse(**payment_webhook_worker.processing.as_dict()),
+        gateway_token_fetches=LatencyStatsResponse(**token_fetches.as_dict()) if token_fetches else None,
+    )
@@ -16,7 +16,7 @@ from services.auth_service import (
     AuthService,
     AuthValidationError,
 )
-from services.registration_service import RegistrationService
+from services.calendar_sync import calendar_sync_worker
 from services.email_service import (
     EmailTemplate,
     generate_reset_token,
@@ -322,10 +322,10 @@ async def google_callback(
             tokens = await auth_service.exchange_code_for_tokens(code)
             await auth_service.update_google_tokens(user, tokens)
             # Retroactively sync any confirmed future registrations that were
-            # created before the user granted calendar access.
+            # created before the user granted calendar access; the account
+            # page polls /users/me/calendar-sync for progress.
             try:
-                reg_service = RegistrationService(db)
-                await reg_service.sync_existing_registrations_to_calendar(user)
+                await calendar_sync_worker.enqueue(user.id)
             except Exception:
                 logger.exception("Calendar connect: retroactive sync failed for user %s", user_id)
             await log_action(
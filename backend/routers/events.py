@@ -2,6 +2,7 @@ import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, cast, String
 from sqlalchemy.orm import selectinload
@@ -9,6 +10,7 @@ from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 
+from config import get_settings
 from database import get_db, AsyncSessionLocal
 from models.event import Event
 
@@ -16,6 +18,8 @@ logger = logging.getLogger(__name__)
 from models.user import User
 from models.registration import Registration, RegistrationStatus
 from services import push_service
+from services.admission_queue import QueueTicket, admission_queue
+from services.idempotency import run_idempotent
 from services.log_service import log_action, _get_request_ip, user_email_from
 
 
@@ -54,7 +58,7 @@ from services.registration_service import (
     AccountNotApprovedError,
 )
 from services.payment_service import PaymentService
-from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from adapters.payment_gateways import get_payment_gateway
 from security.guards import get_active_user_dependency, get_admin_user_dependency
 from utils.legacy_ids import legacy_id_eq
 
@@ -212,6 +216,30 @@ class RegistrationResponse(BaseModel):
     was_promoted_from_waitlist: bool = Field(default=False, description="Whether user was promoted from waitlist.")
 
 
+class AdmissionTicketResponse(BaseModel):
+    """
+    Place in the event's registration admission queue.
+
+    Returned with HTTP 202 instead of a registration while the event is at its
+    in-flight limit; repeat the registration request once state is "ready".
+    """
+
+    queued: bool = Field(default=True, description="Always true: the registration has not run yet.")
+    admission_token: str = Field(description="Token for the status endpoint and the admission:<token> WebSocket channel.")
+    state: str = Field(description="waiting or ready.")
+    position: int = Field(description="1-based position among waiting registrants; 0 when ready.")
+    retry_after: int = Field(description="Seconds until the client should poll again.")
+
+
+def _admission_response(ticket: QueueTicket) -> AdmissionTicketResponse:
+    return AdmissionTicketResponse(
+        admission_token=ticket.token,
+        state=ticket.state,
+        position=ticket.position,
+        retry_after=ticket.retry_after,
+    )
+
+
 class EventUpdateRequest(BaseModel):
     """
     Update an existing event with partial fields.
@@ -249,12 +277,6 @@ class EventUpdateRequest(BaseModel):
     registration_open: bool | None = Field(default=None, description="Toggle registrations open. Set to True to push notification to all active users.")
 
 
-def get_payment_gateway():
-    """Get payment gateway instance."""
-    return get_shared_fake_payment_adapter()
-
-
-
 def _manual_payment_link_required(
     *,
     requires_subscription: bool,
@@ -938,21 +960,83 @@ async def get_event_waitlist(
         raise HTTPException(status_code=404, detail="Event not found")
 
 
-@router.post("/{event_id}/register", response_model=RegistrationResponse)
+@router.post(
+    "/{event_id}/register",
+    response_model=RegistrationResponse,
+    responses={202: {"model": AdmissionTicketResponse}},
+)
 async def register_for_event(
     request: RegistrationRequest,
     event_id: str = Path(..., min_length=1),
     user: User = Depends(get_active_user_dependency),
     db: AsyncSession = Depends(get_db),
     http_request: Request = None,
-) -> RegistrationResponse:
+) -> RegistrationResponse | JSONResponse:
     """
     Register the authenticated user for an event.
 
     The registration service handles capacity checks, waitlisting, and payment
     initiation. Errors are mapped to HTTP status codes for full, duplicate, or
-    unapproved accounts.
+    unapproved accounts. With the admission queue enabled, a registrant who
+    is not admitted yet gets HTTP 202 with their place in line. Retries sent
+    with the same ``Idempotency-Key`` get the first registration back.
     """
+    return await run_idempotent(
+        http_request,
+        db,
+        user.id,
+        lambda: _register_with_admission(request, event_id, user, db, http_request),
+    )
+
+
+async def _register_with_admission(
+    request: RegistrationRequest,
+    event_id: str,
+    user: User,
+    db: AsyncSession,
+    http_request: Request,
+) -> RegistrationResponse | JSONResponse:
+    if get_settings().registration_queue_enabled:
+        ticket = await admission_queue.admit(event_id, user.id)
+        if ticket is not None:
+            return JSONResponse(
+                status_code=202,
+                content=_admission_response(ticket).model_dump(),
+                headers={"Retry-After": str(ticket.retry_after)},
+            )
+        try:
+            return await _register_admitted(request, event_id, user, db, http_request)
+        finally:
+            await admission_queue.release(event_id)
+    return await _register_admitted(request, event_id, user, db, http_request)
+
+
+@router.get("/{event_id}/register/queue/{token}", response_model=AdmissionTicketResponse)
+async def get_admission_status(
+    event_id: str = Path(..., min_length=1),
+    token: str = Path(..., min_length=1),
+    user: User = Depends(get_active_user_dependency),
+) -> AdmissionTicketResponse:
+    """
+    Return the caller's place in the event's registration admission queue.
+
+    Answered from memory without touching the database, so waiting clients
+    can poll it every ``retry_after`` seconds. Unknown or expired tokens
+    return 404; the client should then register again.
+    """
+    ticket = await admission_queue.status(event_id, token, user.id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Admission token not found or expired")
+    return _admission_response(ticket)
+
+
+async def _register_admitted(
+    request: RegistrationRequest,
+    event_id: str,
+    user: User,
+    db: AsyncSession,
+    http_request: Request | None,
+) -> RegistrationResponse:
     payment_gateway = get_payment_gateway()
     payment_service = PaymentService(db, payment_gateway)
     registration_service = RegistrationService(db, payment_service)
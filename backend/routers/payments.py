@@ -8,13 +8,15 @@ from typing import Optional, Literal
 
 from database import get_db
 from config import get_settings
+from services.idempotency import run_idempotent
 from services.log_service import log_action, _get_request_ip, user_email_from
 from models.user import User, UserRole
 from models.payment import PaymentType
 from models.subscription_purchase import SubscriptionPurchaseStatus
 from services.payment_service import PaymentService, SubscriptionPlan
 from services.registration_service import RegistrationService
-from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from services.payment_webhooks import apply_payment_webhook, enqueue_payment_webhook, payment_webhook_worker
+from adapters.payment_gateways import get_payment_gateway
 from ports.payment_gateway import PaymentStatus
 from security.guards import get_active_user_dependency
 from security.rate_limit import build_public_rate_limit_dependency
@@ -159,16 +161,6 @@ class SubscriptionPurchaseResponse(BaseModel):
     created_at: str | None = Field(default=None, description="Purchase creation timestamp.")
 
 
-def get_payment_gateway():
-    """
-    Return the configured payment gateway adapter.
-
-    This helper centralizes gateway selection so endpoints and services use the
-    same adapter instance in development and production.
-    """
-    return get_shared_fake_payment_adapter()
-
-
 def ensure_payment_owner_or_admin(payment, user: User) -> None:
     """
     Enforce that a payment belongs to the current user unless the user is admin.
@@ -251,7 +243,9 @@ async def start_subscription_checkout(
     Start checkout for a paid subscription plan.
 
     The handler validates frontend redirect URLs, ensures the plan is purchasable,
-    and returns payment metadata plus the gateway redirect URL.
+    and returns payment metadata plus the gateway redirect URL. Retries sent
+    with the same ``Idempotency-Key`` get the first checkout back instead of
+    a second gateway payment.
     """
     ensure_frontend_redirect_url(str(payload.return_url))
     ensure_frontend_redirect_url(str(payload.cancel_url))
@@ -260,33 +254,36 @@ async def start_subscription_checkout(
     if not plan or not plan.is_purchasable:
         raise HTTPException(status_code=422, detail="Unsupported subscription plan")
 
-    payment_gateway = get_payment_gateway()
-    payment_service = PaymentService(db, payment_gateway)
-    payment, payment_result = await payment_service.create_subscription_payment(
-        user=user,
-        plan=plan,
-        return_url=str(payload.return_url),
-        cancel_url=str(payload.cancel_url),
-    )
+    async def checkout() -> SubscriptionCheckoutResponse:
+        payment_gateway = get_payment_gateway()
+        payment_service = PaymentService(db, payment_gateway)
+        payment, payment_result = await payment_service.create_subscription_payment(
+            user=user,
+            plan=plan,
+            return_url=str(payload.return_url),
+            cancel_url=str(payload.cancel_url),
+        )
 
-    await log_action(
-                action="PAYMENT_CHECKOUT_STARTED",
-        user_email=user_email_from(user),
-        ip=_get_request_ip(request),
-        type="subscription",
-        plan=payload.plan_code,
-        payment_id=payment.external_id,
-        amount=str(payment.amount),
-        currency=payment.currency,
-    )
-    return SubscriptionCheckoutResponse(
-        payment_id=payment.external_id,
-        status=payment.status,
-        redirect_url=payment_result.redirect_url,
-        amount=str(payment.amount),
-        currency=payment.currency,
-        plan_code=plan.code,
-    )
+        await log_action(
+            action="PAYMENT_CHECKOUT_STARTED",
+            user_email=user_email_from(user),
+            ip=_get_request_ip(request),
+            type="subscription",
+            plan=payload.plan_code,
+            payment_id=payment.external_id,
+            amount=str(payment.amount),
+            currency=payment.currency,
+        )
+        return SubscriptionCheckoutResponse(
+            payment_id=payment.external_id,
+            status=payment.status,
+            redirect_url=payment_result.redirect_url,
+            amount=str(payment.amount),
+            currency=payment.currency,
+            plan_code=plan.code,
+        )
+
+    return await run_idempotent(request, db, user.id, checkout)
 
 
 @router.post("/subscription/free", response_model=FreePlanSwitchResponse)
@@ -511,6 +508,8 @@ async def handle_payment_webhook(
 
     The endpoint validates the payload, updates payment status, and triggers
     domain side-effects such as confirming registrations or activating plans.
+    With the webhook inbox enabled it only checks the signature and stores
+    the webhook; a background worker applies it.
     """
     try:
         raw_payload = await request.json()
@@ -522,60 +521,22 @@ async def handle_payment_webhook(
         raise HTTPException(status_code=422, detail="Invalid webhook payload")
 
     signature = request.headers.get("X-Signature")
-
     payment_gateway = get_payment_gateway()
-    payment_service = PaymentService(db, payment_gateway)
-    registration_service = RegistrationService(db, payment_service)
-
-    payment = await payment_service.process_webhook(payload.model_dump(), signature)
-
-    if not payment:
-        await log_action(
-                        action="WEBHOOK_PAYMENT_NOT_FOUND",
-            ip=_get_request_ip(request),
-            payment_id=payload.payment_id,
-            status=payload.status,
-        )
+    ip = _get_request_ip(request)
+
+    if settings.payment_webhook_inbox_enabled:
+        if not payment_gateway.verify_webhook_signature(payload.model_dump(), signature):
+            await log_action(action="WEBHOOK_SIGNATURE_INVALID", ip=ip, payment_id=payload.payment_id)
+            raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        stored = await enqueue_payment_webhook(db, payload.model_dump(), signature, ip=ip)
+        payment_webhook_worker.wake()
         return WebhookResponse(
-            success=False,
-            message="Payment not found",
-        )
-
-    if payment.status == PaymentStatus.COMPLETED.value:
-        if payment.payment_type == PaymentType.EVENT.value:
-            await registration_service.confirm_registration(payment.external_id)
-            await log_action(
-                                action="WEBHOOK_EVENT_PAYMENT_COMPLETED",
-                ip=_get_request_ip(request),
-                payment_id=payment.external_id,
-                type="event",
-                amount=str(payment.amount),
-                user_id=str(payment.user_id),
-            )
-        elif payment.payment_type == PaymentType.SUBSCRIPTION.value:
-            await payment_service.apply_subscription_for_payment(payment)
-            await log_action(
-                                action="WEBHOOK_SUBSCRIPTION_PAYMENT_COMPLETED",
-                ip=_get_request_ip(request),
-                payment_id=payment.external_id,
-                type="subscription",
-                amount=str(payment.amount),
-                user_id=str(payment.user_id),
-            )
-    else:
-        await log_action(
-                        action="WEBHOOK_PAYMENT_STATUS_UPDATED",
-            ip=_get_request_ip(request),
-            payment_id=payment.external_id,
-            status=payment.status,
-            type=payment.payment_type,
-            amount=str(payment.amount),
+            success=True,
+            message="Webhook queued" if stored else "Webhook already received",
         )
 
-    return WebhookResponse(
-        success=True,
-        message=f"Payment {payment.external_id} updated to {payment.status}",
-    )
+    outcome = await apply_payment_webhook(db, payment_gateway, payload.model_dump(), signature, ip=ip)
+    return WebhookResponse(success=outcome.success, message=outcome.message)
 
 
 @router.get(
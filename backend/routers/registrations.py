@@ -4,10 +4,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from models.user import User
+from services.idempotency import run_idempotent
 from services.log_service import log_action, _get_request_ip, user_email_from
 from services.payment_service import PaymentService
 from services.registration_service import RegistrationService, RegistrationError
-from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from adapters.payment_gateways import get_payment_gateway
 from security.guards import get_active_user_dependency
 
 router = APIRouter(prefix="/registrations", tags=["registrations"])
@@ -37,15 +38,6 @@ class ManualPaymentDetailsResponse(BaseModel):
     can_confirm: bool = Field(description="Whether user can confirm manual payment now.")
 
 
-def get_payment_gateway():
-    """
-    Return the configured payment gateway adapter.
-
-    This helper keeps gateway selection consistent across registration actions.
-    """
-    return get_shared_fake_payment_adapter()
-
-
 @router.post("/{registration_id}/cancel")
 async def cancel_registration(
     request: Request,
@@ -125,17 +117,21 @@ async def confirm_manual_payment(
 
     The endpoint updates the registration state through the service layer and
     returns refreshed manual payment details or appropriate error responses.
+    Retries sent with the same ``Idempotency-Key`` get the first response back.
     """
-    payment_gateway = get_payment_gateway()
-    payment_service = PaymentService(db, payment_gateway)
-    registration_service = RegistrationService(db, payment_service)
-    try:
-        details = await registration_service.confirm_manual_payment_for_user(
-            registration_id=registration_id,
-            user_id=user.id,
-        )
-    except RegistrationError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-    if details is None:
-        raise HTTPException(status_code=404, detail="Registration not found")
-    return ManualPaymentDetailsResponse(**details)
+    async def confirm() -> ManualPaymentDetailsResponse:
+        payment_gateway = get_payment_gateway()
+        payment_service = PaymentService(db, payment_gateway)
+        registration_service = RegistrationService(db, payment_service)
+        try:
+            details = await registration_service.confirm_manual_payment_for_user(
+                registration_id=registration_id,
+                user_id=user.id,
+            )
+        except RegistrationError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        if details is None:
+            raise HTTPException(status_code=404, detail="Registration not found")
+        return ManualPaymentDetailsResponse(**details)
+
+    return await run_idempotent(request, db, user.id, confirm)
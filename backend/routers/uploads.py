@@ -1,49 +1,239 @@
 import os
+import re
+from datetime import datetime
 from pathlib import Path
+from typing import Any
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
 
+from adapters.local_upload_storage import LocalUploadStorage
+from adapters.s3_upload_storage import S3UploadStorage
+from config import get_settings
 from models.user import User
+from ports.upload_storage import DirectUploadUnsupportedError, UploadStoragePort
 from security.guards import get_admin_user_dependency
+from services.upload_service import (
+    InvalidUploadError,
+    UploadTooLargeError,
+    publish_image,
+    save_image_upload,
+    stage_stored_object,
+    staging_directory,
+)
 
 UPLOAD_DIR = Path(__file__).resolve().parent.parent / "static" / "uploads"
 MAX_UPLOAD_BYTES = 5 * 1024 * 1024
-ALLOWED_IMAGE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+# Stored names are content-addressed and never rewritten once published.
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DIRECT_UPLOAD_PREFIX = "incoming/"
+_DIRECT_UPLOAD_KEY_RE = re.compile(r"^incoming/[0-9a-f]{32}$")
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
+_s3_storage: S3UploadStorage | None = None
 
-@router.post("/image")
+
+def get_upload_storage() -> UploadStoragePort:
+    """
+    Return the configured upload storage adapter.
+
+    "local" stores files under UPLOAD_DIR, served by this API; "s3" returns a
+    process-wide S3 adapter so its HTTP connection pool is shared.
+    """
+    global _s3_storage
+    settings = get_settings()
+    if settings.upload_storage_backend == "s3":
+        if _s3_storage is None:
+            _s3_storage = S3UploadStorage(
+                endpoint_url=settings.s3_endpoint_url,
+                bucket=settings.s3_bucket,
+                access_key_id=settings.s3_access_key_id,
+                secret_access_key=settings.s3_secret_access_key,
+                region=settings.s3_region,
+                public_base_url=settings.s3_public_base_url,
+            )
+        return _s3_storage
+    return LocalUploadStorage(UPLOAD_DIR)
+
+
+async def close_upload_storage() -> None:
+    """Drop the S3 adapter (called from the application lifespan); its pooled client closes with http_clients."""
+    global _s3_storage
+    if _s3_storage is not None:
+        await _s3_storage.aclose()
+        _s3_storage = None
+
+
+def _staging_root() -> Path:
+    # Under UPLOAD_DIR so local publishing is a same-filesystem rename.
+    return UPLOAD_DIR / ".staging"
+
+
+class DirectUploadResponse(BaseModel):
+    url: str = Field(description="Bucket URL to POST the multipart form to.")
+    fields: dict[str, str] = Field(description="Form fields to send before the file part.")
+    key: str = Field(description="Object key to pass to /uploads/image/complete.")
+    expires_at: datetime = Field(description="When the upload authorisation expires.")
+
+
+class DirectUploadCompleteRequest(BaseModel):
+    key: str = Field(description="Object key returned by /uploads/image/direct.")
+
+
+# The body is parsed by save_image_upload, so describe it for the OpenAPI docs.
+_IMAGE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/image", openapi_extra=_IMAGE_UPLOAD_BODY)
 async def upload_image(
-    file: UploadFile = File(...),
+    request: Request,
+    storage: UploadStoragePort = Depends(get_upload_storage),
     _admin: User = Depends(get_admin_user_dependency),
-) -> dict[str, str]:
+) -> dict[str, Any]:
     """
     Upload an image file for use in the application.
 
-    This endpoint validates MIME type and size, stores the file in the static
-    uploads directory, and returns a relative URL for the saved image.
+    The multipart body is streamed to a staging directory with the size limit
+    enforced while reading, and the image type is detected from the file's
+    magic bytes. The image is then stripped of EXIF, resized into WebP/AVIF
+    variants in the image worker pool and stored in upload storage. Returns
+    the image URL, its dimensions and a srcset-ready variant list;
+    re-uploading identical content returns the stored manifest.
     """
-    if not file.content_type or file.content_type.lower() not in ALLOWED_IMAGE_MIME_TYPES:
-        raise HTTPException(status_code=400, detail="Only image uploads are allowed")
+    async with staging_directory(_staging_root()) as staging_dir:
+        try:
+            name = await save_image_upload(
+                request.stream(),
+                content_type=request.headers.get("content-type"),
+                content_length=request.headers.get("content-length"),
+                staging_dir=staging_dir,
+                max_bytes=MAX_UPLOAD_BYTES,
+            )
+        except UploadTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        except InvalidUploadError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
 
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        manifest = await publish_image(storage, staging_dir, name)
+    if manifest is None:
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    return manifest
 
-    ext = os.path.splitext(file.filename or "")[1].lower()
-    if ext not in {".jpg", ".jpeg", ".png", ".webp", ".gif"}:
-        ext = ".jpg"
 
-    name = f"{uuid4().hex}{ext}"
-    path = UPLOAD_DIR / name
+@router.post("/image/direct", response_model=DirectUploadResponse)
+async def create_direct_upload(
+    storage: UploadStoragePort = Depends(get_upload_storage),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> DirectUploadResponse:
+    """
+    Authorise one image upload straight to object storage.
+
+    The client POSTs the returned form (plus its own Content-Type field and
+    the file) to the bucket, which enforces the size limit, then calls
+    /uploads/image/complete with the key. Only available with S3 storage.
+    """
+    try:
+        presigned = await storage.presign_upload(
+            key=f"{DIRECT_UPLOAD_PREFIX}{uuid4().hex}",
+            content_type_prefix="image/",
+            max_bytes=MAX_UPLOAD_BYTES,
+            expires_in=get_settings().upload_presign_expiry_seconds,
+        )
+    except DirectUploadUnsupportedError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    return DirectUploadResponse(
+        url=presigned.url,
+        fields=presigned.fields,
+        key=presigned.key,
+        expires_at=presigned.expires_at,
+    )
+
+
+@router.post("/image/complete")
+async def complete_direct_upload(
+    payload: DirectUploadCompleteRequest,
+    storage: UploadStoragePort = Depends(get_upload_storage),
+    _admin: User = Depends(get_admin_user_dependency),
+) -> dict[str, Any]:
+    """
+    Process an image uploaded through /uploads/image/direct.
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="Empty upload")
-    if len(content) > MAX_UPLOAD_BYTES:
-        raise HTTPException(status_code=413, detail="File too large")
+    The object is checked like a streamed upload (size, magic bytes), then
+    processed and stored under its content address; the incoming object is
+    deleted either way. Returns the same manifest as /uploads/image.
+    """
+    if not _DIRECT_UPLOAD_KEY_RE.match(payload.key):
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+    try:
+        async with staging_directory(_staging_root()) as staging_dir:
+            try:
+                name = await stage_stored_object(storage, payload.key, staging_dir, MAX_UPLOAD_BYTES)
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="Upload not found")
+            except UploadTooLargeError as exc:
+                raise HTTPException(status_code=413, detail=str(exc))
+            except InvalidUploadError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+
+            manifest = await publish_image(storage, staging_dir, name)
+    finally:
+        await storage.delete(payload.key)
+    if manifest is None:
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    return manifest
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serve stored uploads as immutable, cache-friendly files.
+
+    Published upload names never change content, so responses carry a
+    one-year ``immutable`` Cache-Control and an ETag derived from the file
+    name, which stays identical across hosts (unlike the default mtime-based
+    tag). Staging directories and temp files (dot-prefixed) are never served.
+    """
 
-    with open(path, "wb") as out:
-        out.write(content)
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in Path(path).parts):
+            return Response(status_code=404)
+        return await super().get_response(path, scope)
 
-    return {"url": f"/uploads/{name}"}
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={
+                "cache-control": UPLOAD_CACHE_CONTROL,
+                "etag": f'"{os.path.basename(full_path)}"',
+            },
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,15 +1,17 @@
+import base64
 import json
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import select
+from sqlalchemy import case, func, or_, select
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+from adapters.payment_gateways import get_payment_gateway
+from config import get_settings
 from database import get_db
 from models.user import AccountStatus, User
 from models.user_profile import UserProfile
@@ -17,11 +19,14 @@ from models.approval_request import ApprovalRequest
 from models.registration import RegistrationStatus
 from routers.auth import get_current_user_dependency
 from security.guards import get_active_user_dependency
+from services.calendar_sync import calendar_sync_worker
 from services.payment_service import PaymentService
 from services.log_service import log_action, _get_request_ip, user_email_from
-from services.registration_service import RegistrationService
+from services.mention_index import mention_index
+from services.registration_service import RegistrationService, UserRegistrationContext
 from services import push_service
 from utils.legacy_ids import legacy_id_eq
+from utils.text_search import escape_like, fold_text, folded, trigram_search_available
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -100,6 +105,16 @@ class UserRegistrationResponse(BaseModel):
     )
 
 
+class UserRegistrationPage(BaseModel):
+    """One keyset page of the authenticated user's upcoming or past registrations."""
+
+    items: list[UserRegistrationResponse] = Field(description="Registrations on this page.")
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page; null on the last page.",
+    )
+
+
 class UserProfileResponse(BaseModel):
     """
     Describe a public-facing user profile.
@@ -119,6 +134,17 @@ class UserProfileResponse(BaseModel):
     )
 
 
+class CalendarSyncStatusResponse(BaseModel):
+    """Progress of the background Google Calendar sync started by connecting a calendar."""
+
+    state: Literal["idle", "queued", "running", "done", "failed"] = Field(
+        description="idle when no sync ran recently on this server.",
+    )
+    total: int = Field(default=0, description="Upcoming registrations to add to the calendar.")
+    processed: int = Field(default=0, description="Registrations sent to Google so far.")
+    synced: int = Field(default=0, description="Registrations added to the calendar, once done.")
+
+
 class UserProfileUpdateRequest(BaseModel):
     """
     Update the authenticated user's profile fields.
@@ -174,10 +200,6 @@ class JoinRequestPayload(BaseModel):
     )
 
 
-def get_payment_gateway():
-    return get_shared_fake_payment_adapter()
-
-
 def _parse_interest_tags(raw: str | None) -> list[str]:
     if not raw:
         return []
@@ -223,11 +245,47 @@ async def search_users(
     user: User = Depends(get_active_user_dependency),
     db: AsyncSession = Depends(get_db),
 ):
-    """Search active users by name (for @mention autocomplete)."""
+    """
+    Search active users by name (for @mention autocomplete), best match first.
+
+    With MENTION_INDEX_ENABLED, word-prefix matches are answered from the
+    in-process mention index; the database is queried only when the index
+    is not loaded or has no match.
+
+    Matching is case- and accent-insensitive ("lukasz" finds "Łukasz") on
+    the folded name, which the ix_users_full_name_trgm GIN index serves.
+    Names starting with the query rank first, then names with a word
+    starting with it, then other substring matches; with pg_trgm installed,
+    near misses (typos) are matched too and ties break on word similarity.
+    """
+    term = fold_text(q.strip())
+    if not term:
+        return []
+    if get_settings().mention_index_enabled:
+        hits = mention_index.search(q, limit=10)
+        if hits:
+            return [
+                UserSearchResult(id=c.id, full_name=c.full_name, picture_url=c.picture_url)
+                for c in hits
+            ]
+    name = folded(User.full_name)
+    escaped = escape_like(term)
+    matches = name.like(f"%{escaped}%", escape="\\")
+    ranking = [
+        case(
+            (name.like(f"{escaped}%", escape="\\"), 0),
+            (name.like(f"% {escaped}%", escape="\\"), 1),
+            else_=2,
+        )
+    ]
+    if await trigram_search_available(db):
+        matches = or_(matches, name.op("%>")(term))
+        ranking.append(func.word_similarity(term, name).desc())
+    ranking += [func.strpos(name, term), func.length(User.full_name), User.full_name]
     stmt = (
         select(User)
-        .where(User.full_name.ilike(f"%{q}%"), User.account_status == AccountStatus.ACTIVE)
-        .order_by(User.full_name)
+        .where(matches, User.account_status == AccountStatus.ACTIVE)
+        .order_by(*ranking)
         .limit(10)
     )
     result = await db.execute(stmt)
@@ -259,6 +317,27 @@ async def get_my_profile(
     )
 
 
+@router.get("/me/calendar-sync", response_model=CalendarSyncStatusResponse)
+async def get_my_calendar_sync_status(
+    user: User = Depends(get_active_user_dependency),
+) -> CalendarSyncStatusResponse:
+    """
+    Return the progress of the user's background Google Calendar sync.
+
+    Answered from the sync worker's memory; the account page polls it after
+    the calendar connect redirect.
+    """
+    progress = calendar_sync_worker.progress(user.id)
+    if progress is None:
+        return CalendarSyncStatusResponse(state="idle")
+    return CalendarSyncStatusResponse(
+        state=progress.state,
+        total=progress.total,
+        processed=progress.processed,
+        synced=progress.synced,
+    )
+
+
 @router.post("/me/join-request", response_model=UserProfileResponse)
 async def submit_join_request(
     payload: JoinRequestPayload,
@@ -394,6 +473,76 @@ async def get_user_profile(
     )
 
 
+def _registration_item(
+    registration_service: RegistrationService,
+    context: UserRegistrationContext,
+    reg,
+    now: datetime,
+) -> UserRegistrationResponse:
+    event = reg.event
+    occurrence_start, occurrence_end = registration_service.get_occurrence_datetimes(
+        event,
+        reg.occurrence_date,
+    )
+    event_now = datetime.now(occurrence_start.tzinfo) if occurrence_start.tzinfo else now
+    info = registration_service.cancellation_info(event, event_now, occurrence_start=occurrence_start)
+
+    return UserRegistrationResponse(
+        registration_id=reg.id,
+        status=reg.status,
+        occurrence_date=reg.occurrence_date.isoformat(),
+        event=EventSummary(
+            id=event.id,
+            title=event.title,
+            event_type=event.event_type or "inne",
+            start_date=occurrence_start.isoformat(),
+            end_date=occurrence_end.isoformat() if occurrence_end else None,
+            time_info=event.time_info,
+            city=event.city,
+            location=event.location,
+            price_guest=str(event.price_guest),
+            price_member=str(event.price_member),
+            manual_payment_verification=bool(event.manual_payment_verification),
+            manual_payment_url=event.manual_payment_url,
+            manual_payment_due_hours=int(event.manual_payment_due_hours or 24),
+            requires_subscription=event.requires_subscription,
+            cancel_cutoff_hours=event.cancel_cutoff_hours or 24,
+            points_value=event.points_value or 0,
+        ),
+        can_cancel=info["can_cancel"],
+        cancel_cutoff_hours=info["cancel_cutoff_hours"],
+        manual_payment_transfer_reference=(
+            event.id if event.manual_payment_verification else None
+        ),
+        payment_deadline=(
+            reg.manual_payment_due_at.isoformat()
+            if reg.manual_payment_due_at
+            else None
+        ),
+        promoted_from_waitlist=bool(reg.promoted_from_waitlist_at),
+        can_confirm_manual_payment=(
+            reg.status == RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value
+            and bool(event.manual_payment_verification)
+        ),
+        effective_price=str(context.price_for(event)),
+        added_to_google_calendar=bool(reg.calendar_event_id),
+    )
+
+
+def _encode_registration_cursor(reg) -> str:
+    raw = f"{reg.occurrence_date.isoformat()}|{reg.id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_registration_cursor(cursor: str) -> tuple[date, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        occurrence_date, registration_id = raw.split("|", 1)
+        return date.fromisoformat(occurrence_date), registration_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/me/registrations", response_model=list[UserRegistrationResponse])
 async def get_my_registrations(
     user: User = Depends(get_active_user_dependency),
@@ -403,7 +552,9 @@ async def get_my_registrations(
     Return the authenticated user's registrations with cancellation metadata.
 
     This endpoint uses the registration service to enrich each registration with
-    event summaries, cutoff rules, and manual payment details for the UI.
+    event summaries, cutoff rules, and manual payment details for the UI. The
+    user's subscription status is resolved once for the whole list; long
+    histories should use ``/me/registrations/page`` instead.
     """
     payment_gateway = get_payment_gateway()
     payment_service = PaymentService(db, payment_gateway)
@@ -412,71 +563,58 @@ async def get_my_registrations(
     registrations = await registration_service.get_user_registrations(user.id)
 
     now = datetime.utcnow()
-    response: list[UserRegistrationResponse] = []
-    for reg in registrations:
-        event = reg.event
-        if event is None:
-            continue
-        occurrence_start, occurrence_end = registration_service.get_occurrence_datetimes(
-            event,
-            reg.occurrence_date,
-        )
-        event_now = datetime.now(occurrence_start.tzinfo) if occurrence_start.tzinfo else now
-        info = await registration_service.get_cancellation_info(
-            user,
-            event,
-            event_now,
-            occurrence_start=occurrence_start,
-        )
+    context = await registration_service.get_user_registration_context(user, now)
+    return [
+        _registration_item(registration_service, context, reg, now)
+        for reg in registrations
+        if reg.event is not None
+    ]
 
-        effective_price = await registration_service._resolve_price_for_user(
-            user, event, now,
-        )
 
-        response.append(
-            UserRegistrationResponse(
-                registration_id=reg.id,
-                status=reg.status,
-                occurrence_date=reg.occurrence_date.isoformat(),
-                event=EventSummary(
-                    id=event.id,
-                    title=event.title,
-                    event_type=event.event_type or "inne",
-                    start_date=occurrence_start.isoformat(),
-                    end_date=occurrence_end.isoformat() if occurrence_end else None,
-                    time_info=event.time_info,
-                    city=event.city,
-                    location=event.location,
-                    price_guest=str(event.price_guest),
-                    price_member=str(event.price_member),
-                    manual_payment_verification=bool(event.manual_payment_verification),
-                    manual_payment_url=event.manual_payment_url,
-                    manual_payment_due_hours=int(event.manual_payment_due_hours or 24),
-                    requires_subscription=event.requires_subscription,
-                    cancel_cutoff_hours=event.cancel_cutoff_hours or 24,
-                    points_value=event.points_value or 0,
-                ),
-                can_cancel=info["can_cancel"],
-                cancel_cutoff_hours=info["cancel_cutoff_hours"],
-                manual_payment_transfer_reference=(
-                    event.id if event.manual_payment_verification else None
-                ),
-                payment_deadline=(
-                    reg.manual_payment_due_at.isoformat()
-                    if reg.manual_payment_due_at
-                    else None
-                ),
-                promoted_from_waitlist=bool(reg.promoted_from_waitlist_at),
-                can_confirm_manual_payment=(
-                    reg.status == RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value
-                    and bool(event.manual_payment_verification)
-                ),
-                effective_price=str(effective_price),
-                added_to_google_calendar=bool(reg.calendar_event_id),
-            )
-        )
+@router.get("/me/registrations/page", response_model=UserRegistrationPage)
+async def get_my_registrations_page(
+    scope: Literal["upcoming", "past"] = Query(
+        default="upcoming",
+        description="upcoming: occurring today or later, soonest first; past: most recent first.",
+    ),
+    limit: int = Query(default=20, ge=1, le=100, description="Page size."),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page."),
+    user: User = Depends(get_active_user_dependency),
+    db: AsyncSession = Depends(get_db),
+) -> UserRegistrationPage:
+    """
+    Return one page of the authenticated user's upcoming or past registrations.
 
-    return response
+    Pages are keyed on (occurrence_date, id), so each page costs the same
+    however long the user's history is, and registrations created while
+    paging never shift later pages. Items match ``/me/registrations``.
+    """
+    payment_gateway = get_payment_gateway()
+    payment_service = PaymentService(db, payment_gateway)
+    registration_service = RegistrationService(db, payment_service)
+
+    now = datetime.utcnow()
+    registrations = await registration_service.get_user_registrations_page(
+        user.id,
+        scope=scope,
+        today=now.date(),
+        limit=limit + 1,
+        after=_decode_registration_cursor(cursor) if cursor else None,
+    )
+    next_cursor = None
+    if len(registrations) > limit:
+        registrations = registrations[:limit]
+        next_cursor = _encode_registration_cursor(registrations[-1])
+
+    context = await registration_service.get_user_registration_context(user, now)
+    return UserRegistrationPage(
+        items=[
+            _registration_item(registration_service, context, reg, now)
+            for reg in registrations
+            if reg.event is not None
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 SUPPORTED_LANGUAGES = {"pl", "en", "zh", "nl", "it", "szl"}
@@ -0,0 +1,191 @@
+"""
+Per-event admission queue for registration rushes.
+
+When registrations open, every member posts to ``/events/{id}/register``
+within seconds and each request runs a full registration transaction,
+including checkout creation at the payment gateway.  With
+``REGISTRATION_QUEUE_ENABLED`` this worker lets at most
+``REGISTRATION_QUEUE_MAX_IN_FLIGHT`` registrations per event run at once:
+
+- **Admission** – a request arriving while the event is at the limit, or
+  while others are already waiting, gets an admission token and its FIFO
+  position (HTTP 202) instead of a registration.  Repeating the POST
+  returns the same place in line.
+- **Turns** – when a slot frees up the oldest waiting token becomes
+  *ready*: ``admission_ready`` is pushed on the WebSocket channel
+  ``admission:<token>`` (subscribe through ``/comments/ws``) and
+  ``GET /events/{id}/register/queue/{token}`` reports it.  The client then
+  repeats the POST within ``REGISTRATION_QUEUE_TURN_SECONDS``; unused turns
+  pass to the next in line.
+
+Like the chat WebSocket manager this is in-process state, which is correct
+for the single-worker deployment; each additional worker would admit its own
+``max_in_flight`` registrations.
+"""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Literal
+
+from config import get_settings
+from services.ws_service import manager as ws_manager
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QueueTicket:
+    """A registrant's place in an event's admission queue."""
+
+    token: str
+    state: Literal["waiting", "ready"]
+    position: int  # 1-based among waiting tickets; 0 once ready
+    retry_after: int
+
+
+@dataclass
+class _Ticket:
+    user_id: str
+    ready_until: float | None = None
+
+
+class _EventQueue:
+    __slots__ = ("in_flight", "tickets", "user_tokens")
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        # Waiting and ready tickets in arrival order.
+        self.tickets: OrderedDict[str, _Ticket] = OrderedDict()
+        self.user_tokens: dict[str, str] = {}
+
+    def drop(self, token: str) -> None:
+        ticket = self.tickets.pop(token)
+        self.user_tokens.pop(ticket.user_id, None)
+
+
+async def _notify_ready(event_id: str, token: str) -> None:
+    await ws_manager.broadcast(
+        f"admission:{token}",
+        {"type": "admission_ready", "event_id": event_id, "admission_token": token},
+    )
+
+
+class AdmissionQueue:
+    """
+    Bounded FIFO admission to registration, one queue per event.
+
+    ``admit`` returns None when the caller holds a slot, which it must give
+    back with ``release`` once its registration finished; otherwise it
+    returns the caller's ticket.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int | None = None,
+        turn_seconds: int | None = None,
+        notify: Callable[[str, str], Awaitable[None]] = _notify_ready,
+    ) -> None:
+        settings = get_settings()
+        self.max_in_flight = max(max_in_flight or settings.registration_queue_max_in_flight, 1)
+        self.turn_seconds = turn_seconds or settings.registration_queue_turn_seconds
+        self._notify = notify
+        self._events: dict[str, _EventQueue] = {}
+
+    def __len__(self) -> int:
+        return sum(len(queue.tickets) for queue in self._events.values())
+
+    async def admit(self, event_id: str, user_id: str) -> QueueTicket | None:
+        """Take a registration slot for the user, or return their place in line."""
+        event_id, user_id = str(event_id), str(user_id)
+        queue = self._events.setdefault(event_id, _EventQueue())
+        await self._advance(event_id, queue)
+
+        token = queue.user_tokens.get(user_id)
+        if token is not None:
+            if queue.tickets[token].ready_until is not None:
+                queue.drop(token)
+                queue.in_flight += 1
+                return None
+            return self._ticket(queue, token)
+
+        if not queue.tickets and queue.in_flight < self.max_in_flight:
+            queue.in_flight += 1
+            return None
+
+        token = secrets.token_urlsafe(16)
+        queue.tickets[token] = _Ticket(user_id=user_id)
+        queue.user_tokens[user_id] = token
+        return self._ticket(queue, token)
+
+    async def release(self, event_id: str) -> None:
+        """Give back a slot taken by ``admit`` and pass it to the next in line."""
+        event_id = str(event_id)
+        queue = self._events.get(event_id)
+        if queue is None:
+            return
+        queue.in_flight = max(queue.in_flight - 1, 0)
+        await self._advance(event_id, queue)
+        self._forget_if_idle(event_id, queue)
+
+    async def status(self, event_id: str, token: str, user_id: str) -> QueueTicket | None:
+        """Return the user's ticket for the token, or None if unknown or expired."""
+        event_id = str(event_id)
+        queue = self._events.get(event_id)
+        if queue is None:
+            return None
+        await self._advance(event_id, queue)
+        ticket = queue.tickets.get(token)
+        if ticket is None or ticket.user_id != str(user_id):
+            return None
+        return self._ticket(queue, token)
+
+    async def sweep(self) -> None:
+        """Expire unused turns and hand them on, also for clients that never poll."""
+        for event_id, queue in list(self._events.items()):
+            await self._advance(event_id, queue)
+            self._forget_if_idle(event_id, queue)
+
+    def _ticket(self, queue: _EventQueue, token: str) -> QueueTicket:
+        if queue.tickets[token].ready_until is not None:
+            return QueueTicket(token=token, state="ready", position=0, retry_after=0)
+        position = 1
+        for other_token, other in queue.tickets.items():
+            if other_token == token:
+                break
+            if other.ready_until is None:
+                position += 1
+        # Poll at least twice per turn so a ready turn is not missed.
+        retry_after = max(min(position // self.max_in_flight, self.turn_seconds // 2), 1)
+        return QueueTicket(token=token, state="waiting", position=position, retry_after=retry_after)
+
+    async def _advance(self, event_id: str, queue: _EventQueue) -> None:
+        now = time.monotonic()
+        for token in [t for t, ticket in queue.tickets.items() if ticket.ready_until and ticket.ready_until < now]:
+            queue.drop(token)
+        ready = sum(1 for ticket in queue.tickets.values() if ticket.ready_until is not None)
+        free = self.max_in_flight - queue.in_flight - ready
+        promoted = []
+        for token, ticket in queue.tickets.items():
+            if free <= 0:
+                break
+            if ticket.ready_until is None:
+                ticket.ready_until = now + self.turn_seconds
+                promoted.append(token)
+                free -= 1
+        for token in promoted:
+            try:
+                await self._notify(event_id, token)
+            except Exception:
+                logger.exception("[admission_queue] Failed to notify token for event %s", event_id)
+
+    def _forget_if_idle(self, event_id: str, queue: _EventQueue) -> None:
+        if not queue.tickets and not queue.in_flight:
+            self._events.pop(event_id, None)
+
+
+admission_queue = AdmissionQueue()
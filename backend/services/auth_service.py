@@ -1,4 +1,3 @@
-import httpx
 import logging
 import re
 import secrets
@@ -13,6 +12,8 @@ from sqlalchemy.exc import IntegrityError
 
 from config import get_settings
 from models.user import User, UserRole, AccountStatus
+from services.http_clients import http_clients
+from services.mention_index import mention_index
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -189,26 +190,25 @@ class AuthService:
         if not settings.google_redirect_uri:
             raise ValueError("GOOGLE_REDIRECT_URI is not configured")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.GOOGLE_TOKEN_URL,
-                data={
-                    "client_id": settings.google_client_id,
-                    "client_secret": settings.google_client_secret,
-                    "code": code,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": settings.google_redirect_uri,
-                },
+        response = await http_clients.get("google").post(
+            self.GOOGLE_TOKEN_URL,
+            data={
+                "client_id": settings.google_client_id,
+                "client_secret": settings.google_client_secret,
+                "code": code,
+                "grant_type": "authorization_code",
+                "redirect_uri": settings.google_redirect_uri,
+            },
+        )
+        if not response.is_success:
+            error_body = response.text
+            logger.error(
+                "Google token exchange failed: status=%s body=%s",
+                response.status_code,
+                error_body[:500],
             )
-            if not response.is_success:
-                error_body = response.text
-                logger.error(
-                    "Google token exchange failed: status=%s body=%s",
-                    response.status_code,
-                    error_body[:500],
-                )
-                response.raise_for_status()
-            return response.json()
+            response.raise_for_status()
+        return response.json()
 
     async def get_google_user_info(self, access_token: str) -> dict:
         """
@@ -217,13 +217,12 @@ class AuthService:
         The call is made to the Google userinfo endpoint and returns the JSON
         payload on success.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.GOOGLE_USERINFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_clients.get("google").get(
+            self.GOOGLE_USERINFO_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        response.raise_for_status()
+        return response.json()
 
     async def get_or_create_user(self, google_user_info: dict) -> User:
         """
@@ -264,6 +263,7 @@ class AuthService:
                 await self.db.rollback()
                 raise AuthConflictError("Account conflict detected while linking Google profile") from exc
             await self.db.refresh(user)
+            mention_index.upsert(user)
             return user
 
         user = User(
@@ -281,6 +281,7 @@ class AuthService:
             await self.db.rollback()
             raise AuthConflictError("Account conflict detected while creating Google account") from exc
         await self.db.refresh(user)
+        mention_index.upsert(user)
         return user
 
     async def update_google_tokens(self, user: User, tokens: dict) -> None:
@@ -0,0 +1,153 @@
+"""
+Background Google Calendar sync after a user connects their calendar.
+
+The OAuth callback used to add every upcoming registration to the calendar
+before redirecting, one token refresh and one HTTPS request per event.  It
+now enqueues the user here and redirects at once; the worker task runs
+``RegistrationService.sync_existing_registrations_to_calendar`` in its own
+session, which sends batched inserts over the pooled Google client.
+
+Progress is kept per user and served by ``GET /users/me/calendar-sync``.
+Like the admission queue this is in-process state: the progress is visible
+on the worker that handled the callback.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from adapters.payment_gateways import get_payment_gateway
+from database import AsyncSessionLocal
+from models.user import User
+from services.payment_service import PaymentService
+from services.registration_service import RegistrationService
+
+logger = logging.getLogger(__name__)
+
+# Finished progress entries are dropped after this long.
+_PROGRESS_RETENTION_SECONDS = 3600.0
+
+
+@dataclass
+class CalendarSyncProgress:
+    """Progress of one user's retroactive calendar sync."""
+
+    state: Literal["queued", "running", "done", "failed"] = "queued"
+    total: int = 0
+    processed: int = 0
+    synced: int = 0
+    updated_at: float = field(default_factory=time.monotonic)
+
+
+class CalendarSyncWorker:
+    """
+    Single background task that syncs queued users one after another.
+
+    ``enqueue`` is cheap and safe to call from request handlers; a user
+    already queued or running is not queued twice.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue[str | None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._progress: dict[str, CalendarSyncProgress] = {}
+
+    @property
+    def running(self) -> bool:
+        """Return True while the worker task accepts users."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop (idempotent)."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="calendar-sync")
+
+    async def stop(self) -> None:
+        """Finish the user being synced and stop; users still queued are dropped."""
+        if self._task is None or self._queue is None:
+            return
+        if not self._task.done():
+            while not self._queue.empty():
+                dropped = self._queue.get_nowait()
+                if dropped is not None and dropped in self._progress:
+                    self._progress[dropped].state = "failed"
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+        self._queue = None
+
+    async def enqueue(self, user_id: str) -> CalendarSyncProgress:
+        """
+        Queue a sync for the user and return its progress entry.
+
+        Without a running worker (scripts, tests) the sync runs inline.
+        """
+        user_id = str(user_id)
+        self._forget_finished()
+        current = self._progress.get(user_id)
+        if current is not None and current.state in ("queued", "running"):
+            return current
+        progress = CalendarSyncProgress()
+        self._progress[user_id] = progress
+        if self.running:
+            assert self._queue is not None
+            await self._queue.put(user_id)
+        else:
+            await self._sync(user_id)
+        return progress
+
+    def progress(self, user_id: str) -> CalendarSyncProgress | None:
+        """Return the user's latest sync progress, if any."""
+        return self._progress.get(str(user_id))
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            user_id = await self._queue.get()
+            if user_id is None:
+                return
+            await self._sync(user_id)
+
+    async def _sync(self, user_id: str) -> None:
+        progress = self._progress.setdefault(user_id, CalendarSyncProgress())
+        progress.state = "running"
+        progress.updated_at = time.monotonic()
+
+        async def report(processed: int, total: int) -> None:
+            progress.processed, progress.total = processed, total
+            progress.updated_at = time.monotonic()
+
+        try:
+            async with self._session_factory() as db:
+                user = await db.get(User, user_id)
+                if user is None:
+                    progress.state = "failed"
+                    return
+                service = RegistrationService(db, PaymentService(db, get_payment_gateway()))
+                progress.synced = await service.sync_existing_registrations_to_calendar(user, on_progress=report)
+            progress.state = "done"
+        except Exception:
+            logger.exception("[calendar_sync] Sync failed for user %s", user_id)
+            progress.state = "failed"
+        finally:
+            progress.updated_at = time.monotonic()
+
+    def _forget_finished(self) -> None:
+        cutoff = time.monotonic() - _PROGRESS_RETENTION_SECONDS
+        for user_id in [
+            uid for uid, p in self._progress.items()
+            if p.state in ("done", "failed") and p.updated_at < cutoff
+        ]:
+            del self._progress[user_id]
+
+
+calendar_sync_worker = CalendarSyncWorker()
@@ -6,6 +6,12 @@ Architecture
 * Single entry-point: ``send_email(template, to_email, to_name, context)``
 * HTML templates rendered inline (no Jinja2 dependency).
 * SMTP via aiosmtplib (async, STARTTLS on port 587 by default).
+* The layout shell is pre-split at import time and bulk sends compile the
+  template once per batch (``_CompiledRender``), so per-recipient rendering
+  only joins static chunks with the recipient-specific values.
+* Bulk sends go through ``SMTPConnectionPool``: a few persistent,
+  authenticated connections with bounded concurrency, per-minute pacing and
+  retry on transient (4xx / disconnect) failures.
 * When ``settings.email_enabled`` is ``False`` (the default in development),
   every outgoing email is printed to the logger instead of actually sent.
   This means zero external dependencies in local dev and CI.
@@ -24,9 +30,13 @@ Planned templates
 * EVENT_REMINDER   – day-before event nudge (future)
 """
 
+import asyncio
 import hashlib
 import logging
+import re
 import secrets
+import time
+from collections import deque
 from datetime import datetime, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -74,20 +84,17 @@ _BRAND_RED = "#e53935"
 _BRAND_NAVY = "#0f174a"
 _BRAND_CREAM = "#fffdf5"
 
-def _wrap_layout(title: str, body_html: str) -> str:
-    """
-    Wrap rendered body HTML in the universal Kenaz email shell.
+_TITLE_SLOT = "\x00title\x00"
+_BODY_SLOT = "\x00body\x00"
 
-    Produces a complete HTML document with a branded navy header, a padded
-    content area, and a legal footer. The result is suitable for use as a
-    standalone email message body.
-    """
-    return f"""<!DOCTYPE html>
+# The layout shell is identical for every message; render it once with slot
+# markers and keep the static chunks so per-message wrapping is three joins.
+_LAYOUT_SHELL = f"""<!DOCTYPE html>
 <html lang="pl">
 <head>
   <meta charset="UTF-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <title>{title}</title>
+  <title>{_TITLE_SLOT}</title>
 </head>
 <body style="margin:0;padding:0;background:{_BRAND_CREAM};font-family:'Helvetica Neue',Helvetica,Arial,sans-serif;">
   <table role="presentation" width="100%" cellpadding="0" cellspacing="0" style="background:{_BRAND_CREAM};">
@@ -106,7 +113,7 @@ def _wrap_layout(title: str, body_html: str) -> str:
           <!-- Body -->
           <tr>
             <td style="padding:36px 40px;color:{_BRAND_NAVY};">
-              {body_html}
+              {_BODY_SLOT}
             </td>
           </tr>
 
@@ -127,6 +134,20 @@ def _wrap_layout(title: str, body_html: str) -> str:
   </table>
 </body>
 </html>"""
+_LAYOUT_HEAD, _rest = _LAYOUT_SHELL.split(_TITLE_SLOT)
+_LAYOUT_MIDDLE, _LAYOUT_TAIL = _rest.split(_BODY_SLOT)
+del _rest
+
+
+def _wrap_layout(title: str, body_html: str) -> str:
+    """
+    Wrap rendered body HTML in the universal Kenaz email shell.
+
+    Produces a complete HTML document with a branded navy header, a padded
+    content area, and a legal footer. The static shell is pre-split into
+    chunks at import time, so only the title and body are joined per call.
+    """
+    return "".join((_LAYOUT_HEAD, title, _LAYOUT_MIDDLE, body_html, _LAYOUT_TAIL))
 
 
 def _btn(url: str, label: str) -> str:
@@ -243,6 +264,349 @@ def _render_template(
     raise ValueError(f"Unknown email template: {template}")
 
 
+def _build_message(
+    subject: str,
+    html_body: str,
+    to_email: str,
+    to_name: str,
+) -> MIMEMultipart:
+    """
+    Assemble the multipart MIME message for one rendered email.
+
+    Adds a short plain-text alternative so clients without HTML support still
+    show something meaningful, followed by the rendered HTML part.
+    """
+    from_address = (
+        f"{settings.smtp_from_name} <{settings.smtp_from_email or settings.smtp_user}>"
+    )
+
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = from_address
+    msg["To"] = f"{to_name} <{to_email}>" if to_name else to_email
+
+    plain = f"{subject}\n\nOtwórz ten email w kliencie obsługującym HTML."
+    msg.attach(MIMEText(plain, "plain", "utf-8"))
+    msg.attach(MIMEText(html_body, "html", "utf-8"))
+    return msg
+
+
+def _log_dev_email(to_email: str, to_name: str, subject: str, html_body: str) -> None:
+    """Log an email that would have been sent while email_enabled is False."""
+    logger.info(
+        "[DEV EMAIL] To: %s <%s> | Subject: %s\n"
+        "Set EMAIL_ENABLED=true + SMTP_* env vars to send real mail.\n"
+        "--- body preview (first 500 chars) ---\n%s",
+        to_name,
+        to_email,
+        subject,
+        html_body[:500],
+    )
+
+
+def _smtp_credentials_missing(to_email: str) -> bool:
+    """Warn and return True when real sending is enabled without SMTP credentials."""
+    if settings.smtp_user and settings.smtp_password:
+        return False
+    logger.warning(
+        "email_enabled=True but SMTP_USER / SMTP_PASSWORD are not set. "
+        "Email to %s dropped.", to_email,
+    )
+    return True
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Pooled SMTP delivery (bulk sends)
+# ──────────────────────────────────────────────────────────────────────────────
+
+class _MinutePacer:
+    """
+    Sliding-window pacer that delays callers to stay under N sends per minute.
+
+    Unlike the API rate limiter this never rejects — ``wait()`` sleeps until a
+    slot in the trailing 60-second window frees up. A limit of 0 disables pacing.
+    """
+
+    def __init__(self, per_minute: int, window_seconds: float = 60.0) -> None:
+        self._per_minute = per_minute
+        self._window = window_seconds
+        self._sent: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if self._per_minute <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._sent and self._sent[0] <= now - self._window:
+                    self._sent.popleft()
+                if len(self._sent) < self._per_minute:
+                    self._sent.append(now)
+                    return
+                await asyncio.sleep(self._sent[0] + self._window - now)
+
+
+def _is_transient_smtp_error(exc: Exception) -> bool:
+    """
+    Return True for SMTP failures worth retrying on a (possibly new) connection.
+
+    Covers dropped connections and 4xx reply codes (greylisting, rate limiting,
+    temporary mailbox errors). Permanent 5xx rejections are not retried.
+    """
+    if isinstance(exc, (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError,
+                        aiosmtplib.SMTPTimeoutError)):
+        return True
+    if isinstance(exc, aiosmtplib.SMTPResponseException):
+        return 400 <= exc.code < 500
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return bool(exc.recipients) and all(400 <= r.code < 500 for r in exc.recipients)
+    return False
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of persistent, authenticated SMTP connections.
+
+    Connections are opened lazily (TCP + STARTTLS + AUTH once per connection)
+    and reused for every message, so a bulk send to thousands of recipients
+    costs ``size`` handshakes instead of one per recipient. At most ``size``
+    messages are in flight at once, sends are paced to ``max_per_minute`` and
+    transient failures are retried with exponential backoff.
+
+    Use as an async context manager so connections are always closed::
+
+        async with SMTPConnectionPool.from_settings() as pool:
+            await pool.send(message)
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        start_tls: bool = True,
+        size: int = 4,
+        max_per_minute: int = 0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self._connect_kwargs: dict[str, Any] = {
+            "hostname": hostname,
+            "port": port,
+            "username": username or None,
+            "password": password or None,
+            "start_tls": start_tls,
+            "timeout": timeout,
+        }
+        self.size = max(1, size)
+        self._max_retries = max_retries
+        self._retry_base_delay = retry_base_delay
+        self._pacer = _MinutePacer(max_per_minute)
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: list[aiosmtplib.SMTP] = []
+        self._all: set[aiosmtplib.SMTP] = set()
+        self.connections_opened = 0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnectionPool":
+        """Build a pool configured from the SMTP_* application settings."""
+        return cls(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_user,
+            password=settings.smtp_password,
+            start_tls=True,
+            size=settings.smtp_pool_size,
+            max_per_minute=settings.smtp_max_per_minute,
+            max_retries=settings.smtp_max_retries,
+        )
+
+    async def __aenter__(self) -> "SMTPConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _open(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(**{k: v for k, v in self._connect_kwargs.items() if k != "start_tls"})
+        await client.connect(start_tls=self._connect_kwargs["start_tls"])
+        self.connections_opened += 1
+        self._all.add(client)
+        return client
+
+    async def _discard(self, client: aiosmtplib.SMTP) -> None:
+        self._all.discard(client)
+        try:
+            client.close()
+        except Exception:  # noqa: BLE001 – already broken
+            pass
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client = self._idle.pop()
+            if client.is_connected:
+                return client
+            await self._discard(client)
+        return await self._open()
+
+    async def send(self, message: MIMEMultipart) -> None:
+        """
+        Deliver one message over a pooled connection, retrying transient errors.
+
+        Raises the last SMTP exception once retries are exhausted or when the
+        server rejects the message permanently.
+        """
+        attempt = 0
+        while True:
+            await self._pacer.wait()
+            async with self._slots:
+                client: aiosmtplib.SMTP | None = None
+                try:
+                    client = await self._checkout()
+                    await client.send_message(message)
+                    self._idle.append(client)
+                    return
+                except Exception as exc:
+                    if client is not None:
+                        if isinstance(exc, aiosmtplib.SMTPResponseException) and client.is_connected:
+                            # The session is still usable after a rejected
+                            # transaction once it has been reset.
+                            try:
+                                await client.rset()
+                                self._idle.append(client)
+                            except Exception:  # noqa: BLE001
+                                await self._discard(client)
+                        else:
+                            await self._discard(client)
+                    if not _is_transient_smtp_error(exc) or attempt >= self._max_retries:
+                        raise
+            attempt += 1
+            await asyncio.sleep(self._retry_base_delay * (2 ** (attempt - 1)))
+
+    async def close(self) -> None:
+        """Politely QUIT and close every open connection."""
+        clients, self._idle = list(self._all), []
+        self._all.clear()
+        for client in clients:
+            try:
+                if client.is_connected:
+                    await client.quit()
+            except Exception:  # noqa: BLE001 – best effort on shutdown
+                client.close()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Compiled renders (bulk sends)
+# ──────────────────────────────────────────────────────────────────────────────
+
+class _CompiledRender:
+    """
+    Pre-rendered template for one bulk batch, split around per-recipient slots.
+
+    The template is rendered once with unique marker strings in place of the
+    recipient name and every per-recipient context key, then split into a list
+    of static chunks with placeholder positions. Rendering a recipient copies
+    that list, drops the recipient's values into the placeholders and joins it
+    (a memcpy-level operation) instead of re-running the renderer, its helper
+    f-strings and the layout.
+
+    ``render`` returns None whenever the shortcut might not produce output
+    identical to ``_render_template`` (empty or non-string slot values, since
+    renderers branch on those), and callers fall back to the full renderer.
+    """
+
+    def __init__(
+        self,
+        template: EmailTemplate,
+        base_ctx: dict[str, Any],
+        slot_keys: tuple[str, ...],
+    ) -> None:
+        self._base_ctx = base_ctx
+        self._slot_keys = slot_keys
+        self._slot_key_set = frozenset(slot_keys)
+        markers = [f"\x00slot{i}\x00" for i in range(len(slot_keys) + 1)]
+        compile_ctx = {**base_ctx, **dict(zip(slot_keys, markers[1:]))}
+        subject, html_body = _render_template(template, markers[0], compile_ctx)
+        pattern = re.compile("|".join(re.escape(marker) for marker in markers))
+        slot_of = {marker: index for index, marker in enumerate(markers)}
+        self._subject_parts, self._subject_slots = self._split(subject, pattern, slot_of)
+        self._html_parts, self._html_slots = self._split(html_body, pattern, slot_of)
+
+    @staticmethod
+    def _split(
+        rendered: str,
+        pattern: re.Pattern[str],
+        slot_of: dict[str, int],
+    ) -> tuple[list[str], list[tuple[int, int]]]:
+        """Split output into chunks plus (chunk position, slot index) placeholders."""
+        parts: list[str] = []
+        slots: list[tuple[int, int]] = []
+        position = 0
+        for match in pattern.finditer(rendered):
+            parts.append(rendered[position:match.start()])
+            slots.append((len(parts), slot_of[match.group(0)]))
+            parts.append("")
+            position = match.end()
+        parts.append(rendered[position:])
+        return parts, slots
+
+    def render(
+        self,
+        to_name: str,
+        overrides: dict[str, Any] | None = None,
+    ) -> tuple[str, str] | None:
+        """Return (subject, html) for one recipient, or None to request a full render."""
+        if not isinstance(to_name, str) or not to_name:
+            return None
+        if overrides and not self._slot_key_set.issuperset(overrides):
+            return None
+        values = [to_name]
+        for key in self._slot_keys:
+            value = overrides[key] if overrides and key in overrides else self._base_ctx.get(key)
+            if not isinstance(value, str) or not value:
+                return None
+            values.append(value)
+
+        subject = self._subject_parts.copy()
+        for position, index in self._subject_slots:
+            subject[position] = values[index]
+        html = self._html_parts.copy()
+        for position, index in self._html_slots:
+            html[position] = values[index]
+        return "".join(subject), "".join(html)
+
+
+def _compile_for_batch(
+    template: EmailTemplate,
+    base_ctx: dict[str, Any],
+    per_recipient_ctx: dict[str, dict[str, Any]],
+    probe: tuple[str, str] | None,
+) -> _CompiledRender | None:
+    """
+    Compile a template for a bulk batch and verify it against the full renderer.
+
+    The probe recipient is rendered both ways; if the outputs differ (e.g. a
+    renderer transforms a slotted value) the compiled form is discarded and
+    the batch uses the full renderer for every recipient.
+    """
+    slot_keys = tuple(sorted({key for ctx in per_recipient_ctx.values() for key in ctx}))
+    try:
+        compiled = _CompiledRender(template, base_ctx, slot_keys)
+    except Exception:  # noqa: BLE001 – renderer needs real values for some keys
+        return None
+    if probe is not None:
+        email, name = probe
+        overrides = per_recipient_ctx.get(email, {})
+        fast = compiled.render(name, overrides)
+        if fast is not None and fast != _render_template(template, name, {**base_ctx, **overrides}):
+            logger.warning("Compiled render mismatch for %s; using full renderer", template.value)
+            return None
+    return compiled
+
+
 async def send_email(
     template: EmailTemplate,
     to_email: str,
@@ -261,36 +625,13 @@ async def send_email(
     subject, html_body = _render_template(template, to_name, ctx)
 
     if not settings.email_enabled:
-        logger.info(
-            "[DEV EMAIL] To: %s <%s> | Subject: %s\n"
-            "Set EMAIL_ENABLED=true + SMTP_* env vars to send real mail.\n"
-            "--- body preview (first 500 chars) ---\n%s",
-            to_name,
-            to_email,
-            subject,
-            html_body[:500],
-        )
+        _log_dev_email(to_email, to_name, subject, html_body)
         return True
 
-    if not settings.smtp_user or not settings.smtp_password:
-        logger.warning(
-            "email_enabled=True but SMTP_USER / SMTP_PASSWORD are not set. "
-            "Email to %s dropped.", to_email,
-        )
+    if _smtp_credentials_missing(to_email):
         return False
 
-    from_address = (
-        f"{settings.smtp_from_name} <{settings.smtp_from_email or settings.smtp_user}>"
-    )
-
-    msg = MIMEMultipart("alternative")
-    msg["Subject"] = subject
-    msg["From"] = from_address
-    msg["To"] = f"{to_name} <{to_email}>" if to_name else to_email
-
-    plain = f"{subject}\n\nOtwórz ten email w kliencie obsługującym HTML."
-    msg.attach(MIMEText(plain, "plain", "utf-8"))
-    msg.attach(MIMEText(html_body, "html", "utf-8"))
+    msg = _build_message(subject, html_body, to_email, to_name)
 
     try:
         await aiosmtplib.send(
@@ -313,27 +654,63 @@ async def send_bulk(
     recipients: list[tuple[str, str]],
     ctx: dict[str, Any] | None = None,
     per_recipient_ctx: dict[str, dict[str, Any]] | None = None,
+    pool: SMTPConnectionPool | None = None,
 ) -> dict[str, bool]:
     """
-    Send the same template to multiple recipients in parallel.
-
-    Each delivery is independent; failures accumulate without stopping the
-    batch. Returns a mapping of recipient email address to delivery success
-    flag. Accepts shared and per-recipient context overrides for personalisation.
+    Send the same template to multiple recipients over a shared connection pool.
+
+    Messages are delivered by a fixed number of workers (the pool size), each
+    reusing one authenticated SMTP session, with sends paced to
+    ``smtp_max_per_minute``. Each delivery is independent; failures accumulate
+    without stopping the batch. Returns a mapping of recipient email address to
+    delivery success flag. Pass ``pool`` to reuse an existing pool; otherwise
+    one is created from settings and closed when the batch completes.
     """
-    import asyncio
-
     base_ctx = dict(ctx or {})
+    overrides = per_recipient_ctx or {}
     results: dict[str, bool] = {}
-
-    async def _one(email: str, name: str) -> None:
-        merged = {**base_ctx, **(per_recipient_ctx or {}).get(email, {})}
-        results[email] = await send_email(
-            template=template,
-            to_email=email,
-            to_name=name,
-            ctx=merged,
-        )
-
-    await asyncio.gather(*[_one(email=e, name=n) for e, n in recipients])
+    compiled = _compile_for_batch(template, base_ctx, overrides, recipients[0] if recipients else None)
+
+    def _render_for(email: str, name: str) -> tuple[str, str]:
+        recipient_ctx = overrides.get(email)
+        rendered = compiled.render(name, recipient_ctx) if compiled else None
+        return rendered or _render_template(template, name, {**base_ctx, **(recipient_ctx or {})})
+
+    if not settings.email_enabled and pool is None:
+        for email, name in recipients:
+            subject, html_body = _render_for(email, name)
+            _log_dev_email(email, name, subject, html_body)
+            results[email] = True
+        return results
+
+    if pool is None and _smtp_credentials_missing(f"{len(recipients)} recipients"):
+        return {email: False for email, _ in recipients}
+
+    queue = iter(recipients)
+
+    async def _worker(active_pool: SMTPConnectionPool) -> None:
+        for email, name in queue:
+            subject, html_body = _render_for(email, name)
+            msg = _build_message(subject, html_body, email, name)
+            try:
+                await active_pool.send(msg)
+                results[email] = True
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Failed to send email to %s: %s", email, exc)
+                results[email] = False
+
+    async def _run(active_pool: SMTPConnectionPool) -> None:
+        workers = min(active_pool.size, len(recipients))
+        await asyncio.gather(*[_worker(active_pool) for _ in range(workers)])
+
+    if pool is not None:
+        await _run(pool)
+    else:
+        async with SMTPConnectionPool.from_settings() as own_pool:
+            await _run(own_pool)
+
+    logger.info(
+        "Bulk email [%s]: %d/%d delivered",
+        template.value, sum(results.values()), len(recipients),
+    )
     return results
@@ -1,57 +1,123 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, date, timezone
-from typing import Optional
+from typing import Optional, Sequence
+from uuid import uuid4
+import json
 import logging
+import re
+import time
 
 import httpx
 
 from config import get_settings
 from models.event import Event
 from models.user import User
+from services.http_clients import http_clients
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Google accepts at most 50 calls in one batch request.
+BATCH_LIMIT = 50
+# Refresh cached access tokens this long before Google says they expire.
+_TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+
+@dataclass
+class _CachedToken:
+    refresh_token: str
+    access_token: str
+    expires_at: float
+
+
+# Access tokens per user id, reused until shortly before they expire.
+_access_tokens: dict[str, _CachedToken] = {}
+
 
 class GoogleCalendarService:
     TOKEN_URL = "https://oauth2.googleapis.com/token"
     EVENTS_URL = "https://www.googleapis.com/calendar/v3/calendars/primary/events"
+    BATCH_URL = "https://www.googleapis.com/batch/calendar/v3"
+    _EVENTS_PATH = "/calendar/v3/calendars/primary/events"
 
-    def __init__(self) -> None:
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
         """
         Initialize the Google Calendar service with OAuth configuration checks.
 
         The constructor validates required Google OAuth settings and raises a
-        ValueError when configuration is incomplete.
+        ValueError when configuration is incomplete. Requests go through the
+        pooled "google" client unless one is passed in.
         """
         if not settings.google_client_id or not settings.google_client_secret:
             raise ValueError("Google OAuth not configured")
+        self._client = client or http_clients.get("google")
 
-    async def _refresh_access_token(self, refresh_token: str) -> str | None:
+    async def _refresh_access_token(self, refresh_token: str) -> tuple[str, int] | None:
         """
         Refresh a Google access token using a stored refresh token.
 
         The method calls Google's token endpoint and returns the access token
-        or None when the request fails.
+        with its lifetime in seconds, or None when the request fails.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.TOKEN_URL,
-                data={
-                    "client_id": settings.google_client_id,
-                    "client_secret": settings.google_client_secret,
-                    "grant_type": "refresh_token",
-                    "refresh_token": refresh_token,
-                },
+        response = await self._client.post(
+            self.TOKEN_URL,
+            data={
+                "client_id": settings.google_client_id,
+                "client_secret": settings.google_client_secret,
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+            },
+        )
+        if response.status_code >= 400:
+            logger.warning(
+                "GCal: token refresh failed status=%s body=%s",
+                response.status_code,
+                response.text[:200],
             )
-            if response.status_code >= 400:
-                logger.warning(
-                    "GCal: token refresh failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:200],
-                )
-                return None
-            payload = response.json()
-            return payload.get("access_token")
+            return None
+        payload = response.json()
+        access_token = payload.get("access_token")
+        if not access_token:
+            return None
+        return access_token, int(payload.get("expires_in") or 0)
+
+    async def _access_token_for(self, user: User) -> str | None:
+        """Return a cached access token for the user, refreshing it when expired."""
+        user_id = str(user.id)
+        cached = _access_tokens.get(user_id)
+        now = time.monotonic()
+        if cached and cached.refresh_token == user.google_refresh_token and cached.expires_at > now:
+            return cached.access_token
+        refreshed = await self._refresh_access_token(user.google_refresh_token)
+        if refreshed is None:
+            _access_tokens.pop(user_id, None)
+            return None
+        access_token, expires_in = refreshed
+        _access_tokens[user_id] = _CachedToken(
+            refresh_token=user.google_refresh_token,
+            access_token=access_token,
+            expires_at=now + expires_in - _TOKEN_EXPIRY_MARGIN_SECONDS,
+        )
+        return access_token
+
+    @staticmethod
+    def _forget_access_token(user: User) -> None:
+        _access_tokens.pop(str(user.id), None)
+
+    @staticmethod
+    def _has_calendar_scope(user: User) -> bool:
+        if not user.google_refresh_token:
+            return False
+        # Verify the stored token actually has calendar scope before trying.
+        google_scopes = getattr(user, "google_scopes", "") or ""
+        if "calendar.events" not in google_scopes:
+            logger.warning(
+                "GCal: user %s has google_refresh_token but no calendar.events scope (%s)",
+                user.id,
+                google_scopes[:120],
+            )
+            return False
+        return True
 
     def _apply_time_info(self, start_date: datetime, end_date: datetime | None, time_info: str | None) -> tuple[datetime, datetime]:
         """
@@ -92,30 +158,8 @@ class GoogleCalendarService:
 
         return start, end
 
-    async def create_event(self, user: User, event: Event, occurrence_date: date | None = None) -> str | None:
-        """
-        Create a Google Calendar event for the given user and occurrence.
-
-        The method refreshes the user's access token, builds an event payload
-        with description and reminders, and returns the created calendar event ID.
-        """
-        if not user.google_refresh_token:
-            return None
-
-        # Verify the stored token actually has calendar scope before trying.
-        google_scopes = getattr(user, "google_scopes", "") or ""
-        if "calendar.events" not in google_scopes:
-            logger.warning(
-                "GCal: user %s has google_refresh_token but no calendar.events scope (%s)",
-                user.id,
-                google_scopes[:120],
-            )
-            return None
-
-        access_token = await self._refresh_access_token(user.google_refresh_token)
-        if not access_token:
-            return None
-
+    def _event_payload(self, event: Event, occurrence_date: date | None) -> dict:
+        """Build the Calendar API event resource for one occurrence."""
         start_base = event.start_date
         end_base = event.end_date
         if occurrence_date and occurrence_date != event.start_date.date():
@@ -133,6 +177,12 @@ class GoogleCalendarService:
             end_date=end_base,
             time_info=event.time_info,
         )
+        # Ensure datetimes are timezone-aware (Google requires timezone offset)
+        if start_dt.tzinfo is None:
+            start_dt = start_dt.replace(tzinfo=timezone.utc)
+        if end_dt.tzinfo is None:
+            end_dt = end_dt.replace(tzinfo=timezone.utc)
+
         description_parts = []
         if event.description:
             description_parts.append(event.description)
@@ -142,7 +192,7 @@ class GoogleCalendarService:
             description_parts.append(f"Miasto: {event.city}")
         description = "\n".join(description_parts) if description_parts else None
 
-        payload = {
+        return {
             "summary": event.title,
             "description": description,
             "location": event.location or event.city,
@@ -161,11 +211,19 @@ class GoogleCalendarService:
             },
         }
 
-        # Ensure datetimes are timezone-aware (Google requires timezone offset)
-        if start_dt.tzinfo is None:
-            start_dt = start_dt.replace(tzinfo=timezone.utc)
-        if end_dt.tzinfo is None:
-            end_dt = end_dt.replace(tzinfo=timezone.utc)
+    async def create_event(self, user: User, event: Event, occurrence_date: date | None = None) -> str | None:
+        """
+        Create a Google Calendar event for the given user and occurrence.
+
+        The method uses the user's cached (or refreshed) access token, builds
+        an event payload with description and reminders, and returns the
+        created calendar event ID.
+        """
+        if not self._has_calendar_scope(user):
+            return None
+        access_token = await self._access_token_for(user)
+        if not access_token:
+            return None
 
         logger.debug(
             "GCal: creating event '%s' for user %s (occurrence=%s)",
@@ -173,19 +231,124 @@ class GoogleCalendarService:
             user.id,
             occurrence_date,
         )
+        response = await self._client.post(
+            self.EVENTS_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+            json=self._event_payload(event, occurrence_date),
+        )
+        if response.status_code >= 400:
+            if response.status_code == 401:
+                self._forget_access_token(user)
+            logger.warning(
+                "GCal: create event failed status=%s body=%s",
+                response.status_code,
+                response.text[:500],
+            )
+            return None
+        data = response.json()
+        return data.get("id")
+
+    async def create_events(
+        self,
+        user: User,
+        occurrences: Sequence[tuple[Event, date | None]],
+    ) -> list[str | None]:
+        """
+        Create calendar events for several occurrences of one user.
+
+        Inserts are sent as Google batch requests of up to ``BATCH_LIMIT``
+        calls, so one token lookup and one HTTPS round trip cover a whole
+        batch. Returns the created event IDs in input order, None where an
+        insert failed.
+        """
+        if not occurrences:
+            return []
+        if not self._has_calendar_scope(user):
+            return [None] * len(occurrences)
+        if len(occurrences) == 1:
+            event, occurrence_date = occurrences[0]
+            return [await self.create_event(user, event, occurrence_date)]
+        access_token = await self._access_token_for(user)
+        if not access_token:
+            return [None] * len(occurrences)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.EVENTS_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-                json=payload,
+        ids: list[str | None] = []
+        for offset in range(0, len(occurrences), BATCH_LIMIT):
+            chunk = occurrences[offset:offset + BATCH_LIMIT]
+            ids.extend(await self._insert_batch(user, access_token, chunk))
+        return ids
+
+    async def _insert_batch(
+        self,
+        user: User,
+        access_token: str,
+        occurrences: Sequence[tuple[Event, date | None]],
+    ) -> list[str | None]:
+        boundary = f"batch_{uuid4().hex}"
+        parts = []
+        for index, (event, occurrence_date) in enumerate(occurrences):
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <item-{index}>\r\n\r\n"
+                f"POST {self._EVENTS_PATH}\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{json.dumps(self._event_payload(event, occurrence_date))}\r\n"
+            )
+        body = "".join(parts) + f"--{boundary}--\r\n"
+        response = await self._client.post(
+            self.BATCH_URL,
+            headers={
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": f"multipart/mixed; boundary={boundary}",
+            },
+            content=body.encode(),
+        )
+        if response.status_code >= 400:
+            if response.status_code == 401:
+                self._forget_access_token(user)
+            logger.warning(
+                "GCal: batch insert failed status=%s body=%s",
+                response.status_code,
+                response.text[:500],
             )
-            if response.status_code >= 400:
+            return [None] * len(occurrences)
+
+        ids: list[str | None] = [None] * len(occurrences)
+        for index, status_code, payload in _parse_batch_response(response):
+            if not 0 <= index < len(ids):
+                continue
+            if status_code >= 400:
                 logger.warning(
-                    "GCal: create event failed status=%s body=%s",
-                    response.status_code,
-                    response.text[:500],
+                    "GCal: batch item %d failed status=%s body=%s", index, status_code, str(payload)[:200]
                 )
-                return None
-            data = response.json()
-            return data.get("id")
+                continue
+            ids[index] = payload.get("id") if isinstance(payload, dict) else None
+        return ids
+
+
+_CONTENT_ID_RE = re.compile(r"^content-id:\s*<response-item-(\d+)>\s*$", re.IGNORECASE | re.MULTILINE)
+_STATUS_LINE_RE = re.compile(r"^HTTP/\d(?:\.\d)?\s+(\d{3})", re.MULTILINE)
+
+
+def _parse_batch_response(response: httpx.Response) -> list[tuple[int, int, object]]:
+    """Split a multipart/mixed batch response into (item index, status, JSON body)."""
+    match = re.search(r'boundary="?([^";]+)"?', response.headers.get("content-type", ""))
+    if not match:
+        logger.warning("GCal: batch response without multipart boundary")
+        return []
+    results = []
+    for part in response.text.split(f"--{match.group(1)}"):
+        content_id = _CONTENT_ID_RE.search(part)
+        status_line = _STATUS_LINE_RE.search(part)
+        if not content_id or not status_line:
+            continue
+        inner = part[status_line.end():]
+        separator = re.search(r"\r?\n\r?\n", inner)
+        raw_body = inner[separator.end():].strip() if separator else ""
+        try:
+            payload = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            payload = raw_body
+        results.append((int(content_id.group(1)), int(status_line.group(1)), payload))
+    return results
@@ -0,0 +1,81 @@
+"""
+Application-scoped pooled HTTP clients for outbound API calls.
+
+Google OAuth, Google Calendar, Tpay and S3 upload storage used to open a throwaway
+``httpx.AsyncClient`` per call: no keep-alive, a TLS handshake on every
+request and no HTTP/2.  The registry holds one client per upstream so
+connections are reused across requests:
+
+- **Lifecycle** – ``start`` (in the app lifespan) opens the clients and
+  ``aclose`` closes them on shutdown.  ``get`` also opens a client on first
+  use, so scripts and tests work without the lifespan.
+- **Policy** – pool limits, timeouts, connect retries and HTTP/2 come from
+  the ``HTTP_CLIENT_*`` settings.  Each upstream has its own pool, so the
+  limits are per host.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import httpx
+
+from config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upstreams opened at startup; other names are opened on first use.
+UPSTREAMS = ("google", "tpay")
+
+
+class HttpClientRegistry:
+    """Named, lazily created ``httpx.AsyncClient`` instances sharing one policy."""
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self._settings = settings
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build(self) -> httpx.AsyncClient:
+        settings = self._settings or get_settings()
+        limits = httpx.Limits(
+            max_connections=settings.http_client_max_connections,
+            max_keepalive_connections=settings.http_client_max_keepalive_connections,
+            keepalive_expiry=settings.http_client_keepalive_expiry_seconds,
+        )
+        transport = httpx.AsyncHTTPTransport(
+            limits=limits,
+            http2=settings.http_client_http2,
+            retries=settings.http_client_retries,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.http_client_timeout_seconds,
+                connect=settings.http_client_connect_timeout_seconds,
+            ),
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream, opening it if needed."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._build()
+            self._clients[name] = client
+        return client
+
+    def start(self) -> None:
+        """Open the clients of the known upstreams (idempotent)."""
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        """Close every client and its pooled connections."""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                logger.exception("[http_clients] Failed to close client")
+
+
+http_clients = HttpClientRegistry()
@@ -0,0 +1,168 @@
+"""
+Idempotency-Key support for retried POSTs.
+
+Mobile clients on flaky connections retry registration, subscription
+checkout and manual-payment confirmation, and each retry used to run the
+whole transaction again, sometimes creating a second gateway checkout.
+Endpoints wrap their work in ``run_idempotent``; when the request carries an
+``Idempotency-Key`` header:
+
+- **Claim** – a row keyed by (user, key) is inserted and committed before
+  the endpoint runs, together with a hash of the method, path and body.
+- **Replay** – a later request with the same key and hash gets the stored
+  response back (``Idempotent-Replayed: true``) without reaching the
+  services.  While the first request is still running it gets 409; a
+  different request under the same key gets 422.
+- **Failures** – only successful responses are stored.  An error, or a
+  non-final response such as the admission queue's 202, drops the claim so
+  the client's retry runs normally.
+
+Keys expire after ``IDEMPOTENCY_KEY_TTL_HOURS`` and are deleted by the
+hourly ``idempotency_sweep`` job.  A claim whose request never finished
+(e.g. a crashed worker) stops blocking retries after five minutes.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_settings
+from database import AsyncSessionLocal
+from models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+_MAX_KEY_LENGTH = 255
+_ABANDONED_CLAIM = timedelta(minutes=5)
+
+
+async def _request_hash(request: Request) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+def _key_filter(user_id: str, key: str):
+    return and_(IdempotencyKey.user_id == str(user_id), IdempotencyKey.key == key)
+
+
+async def _claim(db: AsyncSession, user_id: str, key: str, request_hash: str, now: datetime) -> bool:
+    """Insert the key, or take over an expired or abandoned one; False if it is taken."""
+    expires_at = now + timedelta(hours=get_settings().idempotency_key_ttl_hours)
+    stmt = pg_insert(IdempotencyKey).values(
+        user_id=str(user_id),
+        key=key,
+        request_hash=request_hash,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": None,
+            "response_body": None,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            IdempotencyKey.expires_at < now,
+            and_(IdempotencyKey.status_code.is_(None), IdempotencyKey.created_at < now - _ABANDONED_CLAIM),
+        ),
+    ).returning(IdempotencyKey.key)
+    claimed = (await db.execute(stmt)).first() is not None
+    await db.commit()
+    return claimed
+
+
+async def _forget(db: AsyncSession, user_id: str, key: str) -> None:
+    await db.execute(
+        delete(IdempotencyKey).where(_key_filter(user_id, key), IdempotencyKey.status_code.is_(None))
+    )
+    await db.commit()
+
+
+async def run_idempotent(
+    request: Request,
+    db: AsyncSession,
+    user_id: str,
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Run call once per Idempotency-Key and replay its response for retries.
+
+    Requests without the header run call directly.
+    """
+    if IDEMPOTENCY_KEY_HEADER not in request.headers:
+        return await call()
+    key = request.headers[IDEMPOTENCY_KEY_HEADER].strip()
+    if not key or len(key) > _MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key header")
+
+    request_hash = await _request_hash(request)
+    if not await _claim(db, user_id, key, request_hash, datetime.now(timezone.utc)):
+        stored = (await db.execute(
+            select(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body)
+            .where(_key_filter(user_id, key))
+        )).first()
+        if stored is None:
+            # Swept between the claim and this read; treat it as a new request.
+            return await run_idempotent(request, db, user_id, call)
+        if stored.request_hash != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was used for a different request")
+        if stored.status_code is None:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=json.loads(stored.response_body),
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    try:
+        result = await call()
+    except Exception:
+        await db.rollback()
+        await _forget(db, user_id, key)
+        raise
+    if isinstance(result, Response):
+        # Not a final outcome (e.g. a queued registration); let the retry run.
+        await _forget(db, user_id, key)
+        return result
+    await db.execute(
+        update(IdempotencyKey)
+        .where(_key_filter(user_id, key))
+        .values(status_code=200, response_body=json.dumps(jsonable_encoder(result)))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result
+
+
+async def sweep_idempotency_keys(db: AsyncSession | None = None) -> int:
+    """Scheduler job: delete expired idempotency keys; returns the number deleted."""
+    if db is None:
+        async with AsyncSessionLocal() as session:
+            return await sweep_idempotency_keys(session)
+    result = await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+    )
+    await db.commit()
+    if result.rowcount:
+        logger.info("[idempotency] Swept %d expired key(s)", result.rowcount)
+    return result.rowcount
@@ -0,0 +1,235 @@
+"""
+Responsive variants for uploaded images.
+
+After ``upload_service`` has staged an upload, ``process_uploaded_image``
+decodes it in a worker process, not on the event loop or a thread:
+
+* EXIF orientation is applied, and the original is re-encoded without EXIF
+  metadata (GPS, camera serials); the ICC profile is kept,
+* resized variants are generated at each ``IMAGE_VARIANT_WIDTHS`` width
+  narrower than the original (plus the original width when it is below the
+  largest one), in every ``IMAGE_VARIANT_FORMATS`` format the Pillow build
+  supports,
+* width and height are recorded in a ``<stem>.json`` manifest next to the
+  files, which ``upload_service.publish_image`` then hands to upload storage.
+
+The manifest is srcset-ready::
+
+    {
+        "url": "/uploads/ab12.jpg", "type": "image/jpeg", "width": 4032, "height": 3024,
+        "variants": [{"url": "/uploads/ab12-320w.avif", "type": "image/avif",
+                      "width": 320, "height": 240, "bytes": 9311}, ...],
+        "srcset": {"image/avif": "/uploads/ab12-320w.avif 320w, ...", "image/webp": "..."}
+    }
+
+Animated GIF/WebP/APNG uploads are kept as-is (only their dimensions are
+recorded), since variants would drop the animation.  Multi-picture JPEGs
+(MPO, written by many phone cameras) are not animations: their first frame
+is processed as a regular JPEG.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from config import get_settings
+
+# Refuse decompression bombs well before they exhaust worker memory.
+MAX_IMAGE_PIXELS = 40_000_000
+
+_FORMATS = {
+    # name: (Pillow format, MIME type, extension, save options)
+    "avif": ("AVIF", "image/avif", ".avif", {"quality": 60, "speed": 8}),
+    "webp": ("WEBP", "image/webp", ".webp", {"quality": 80, "method": 4}),
+}
+_ORIGINAL_SAVE_OPTIONS = {
+    "JPEG": {"quality": 90, "optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"quality": 90},
+    "GIF": {},
+}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _save_atomically(image: Image.Image, path: Path, image_format: str, **options) -> int:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        image.save(tmp_path, format=image_format, **options)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path.stat().st_size
+
+
+def _variant_widths(original_width: int, widths: tuple[int, ...]) -> list[int]:
+    targets = {width for width in widths if width < original_width}
+    if widths and original_width <= max(widths):
+        targets.add(original_width)
+    return sorted(targets)
+
+
+def render_variants(
+    upload_dir: str,
+    name: str,
+    widths: tuple[int, ...],
+    formats: tuple[str, ...],
+) -> dict | None:
+    """
+    Strip metadata from an upload and write its resized variants.
+
+    Runs in a worker process; returns the file-level manifest (names, not
+    URLs), or None when the file cannot be decoded as an image.
+    """
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    directory = Path(upload_dir)
+    path = directory / name
+    stem = path.stem
+    try:
+        with Image.open(path) as source:
+            source.load()
+            original_format = source.format
+            mimetype = source.get_format_mimetype()
+            if original_format == "MPO":
+                # Extra frames are previews or depth maps; the first is the photo.
+                original_format, mimetype = "JPEG", Image.MIME["JPEG"]
+            elif getattr(source, "is_animated", False):
+                return {
+                    "name": name,
+                    "type": source.get_format_mimetype(),
+                    "width": source.width,
+                    "height": source.height,
+                    "variants": [],
+                }
+            icc_profile = source.info.get("icc_profile")
+            image = ImageOps.exif_transpose(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        return None
+
+    image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+    original_options = dict(_ORIGINAL_SAVE_OPTIONS.get(original_format, {}))
+    if icc_profile:
+        original_options["icc_profile"] = icc_profile
+    if original_format == "JPEG" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    # Re-encoding without exif= drops EXIF/XMP; the orientation is already applied.
+    _save_atomically(image, path, original_format, **original_options)
+
+    variants = []
+    for width in _variant_widths(image.width, widths):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for format_name in formats:
+            image_format, variant_type, ext, options = _FORMATS[format_name]
+            variant_name = f"{stem}-{width}w{ext}"
+            size = _save_atomically(resized, directory / variant_name, image_format, **options)
+            variants.append({
+                "name": variant_name,
+                "type": variant_type,
+                "width": width,
+                "height": height,
+                "bytes": size,
+            })
+    return {
+        "name": name,
+        "type": mimetype,
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+    }
+
+
+def supported_variant_formats(requested: list[str]) -> tuple[str, ...]:
+    """Return the requested formats this Pillow build can encode, in order."""
+    return tuple(
+        name for name in requested
+        if name in _FORMATS and features.check(_FORMATS[name][0].lower())
+    )
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe.
+        _executor = ProcessPoolExecutor(
+            max_workers=get_settings().image_processing_workers,
+            mp_context=get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_image_workers() -> None:
+    """Stop the worker processes (called from the application lifespan)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _local_url(name: str) -> str:
+    return f"/uploads/{name}"
+
+
+def _build_manifest(result: dict, url_for: Callable[[str], str]) -> dict:
+    variants = [
+        {"url": url_for(variant.pop("name")), **variant}
+        for variant in result["variants"]
+    ]
+    srcset: dict[str, list[str]] = {}
+    for variant in variants:
+        srcset.setdefault(variant["type"], []).append(f"{variant['url']} {variant['width']}w")
+    return {
+        "url": url_for(result["name"]),
+        "type": result["type"],
+        "width": result["width"],
+        "height": result["height"],
+        "variants": variants,
+        "srcset": {mime: ", ".join(entries) for mime, entries in srcset.items()},
+    }
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+async def process_uploaded_image(
+    upload_dir: Path,
+    name: str,
+    url_for: Callable[[str], str] = _local_url,
+) -> dict | None:
+    """
+    Generate variants for a stored upload in the process pool.
+
+    Returns the srcset manifest (also written to ``<stem>.json``), or None when
+    the file is not a decodable image.
+    """
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        _get_executor(),
+        render_variants,
+        str(upload_dir),
+        name,
+        tuple(settings.image_variant_widths),
+        supported_variant_formats(settings.image_variant_formats),
+    )
+    if result is None:
+        return None
+    manifest = _build_manifest(result, url_for)
+    await asyncio.to_thread(_write_manifest, upload_dir / f"{Path(name).stem}.json", manifest)
+    return manifest
@@ -0,0 +1,274 @@
+"""
+Multi-worker-safe coordination for periodic APScheduler jobs.
+
+Every uvicorn worker (and every replica) starts its own ``AsyncIOScheduler``
+in ``lifespan``, so without coordination each worker would fire every job.
+``JobCoordinator`` wraps a job body so that exactly one worker executes it per
+tick:
+
+1. **Lease** – a PostgreSQL session-level advisory lock keyed by the job id
+   (``pg_try_advisory_lock``).  The lock lives on a dedicated connection for
+   the duration of the run and is released automatically by the server if the
+   worker dies, so a crashed worker can never wedge a job.  When the database
+   is not PostgreSQL (or the lock query itself fails) the coordinator falls
+   back to a process-local ``asyncio.Lock`` so single-worker setups keep
+   working.
+2. **Period guard** – once the lease is held, the last successful run is read
+   from ``job_runs``.  If another worker already ran the job within
+   ``min_interval`` the tick is skipped.  This covers workers whose schedules
+   are offset by a few seconds and would otherwise run the job back-to-back.
+3. **History** – the winning worker records start time, duration, outcome and
+   error in ``job_runs``; admins read it via ``GET /admin/jobs``.
+
+Usage::
+
+    from services.job_coordinator import job_coordinator
+
+    scheduler.add_job(
+        job_coordinator.coordinated("event_reminders", _send_event_reminders,
+                                    min_interval=timedelta(minutes=55)),
+        "interval", hours=1, id="event_reminders",
+    )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import hashlib
+import logging
+import os
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from config import get_settings
+from database import AsyncSessionLocal, engine as default_engine
+from models.job_run import JobRun, JobRunStatus
+
+logger = logging.getLogger(__name__)
+
+JobBody = Callable[[], Awaitable[None]]
+
+
+class JobOutcome(str, enum.Enum):
+    """Result of a single coordinated tick as seen by the calling worker."""
+
+    RAN = "ran"
+    FAILED = "failed"
+    SKIPPED_LOCKED = "skipped_locked"
+    SKIPPED_RECENT = "skipped_recent"
+
+
+def _advisory_lock_key(job_id: str) -> int:
+    """
+    Map a job id to a stable signed 64-bit advisory lock key.
+
+    Python's built-in ``hash`` is salted per process, so a SHA-256 prefix is
+    used instead to guarantee every worker derives the same key.
+    """
+    digest = hashlib.sha256(f"kenaz-job:{job_id}".encode()).digest()
+    return int.from_bytes(digest[:8], byteorder="big", signed=True)
+
+
+def _default_worker_id() -> str:
+    """Return a human-readable identifier for the current worker process."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobCoordinator:
+    """Run periodic jobs under a cluster-wide lease and record their history."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        engine: AsyncEngine = default_engine,
+        lock_backend: str | None = None,
+        worker_id: str | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._engine = engine
+        self._lock_backend = lock_backend or get_settings().job_lock_backend
+        self.worker_id = worker_id or _default_worker_id()
+        self._local_locks: dict[str, asyncio.Lock] = {}
+
+    def _use_postgres_lock(self) -> bool:
+        """Decide whether the advisory-lock lease should be attempted."""
+        if self._lock_backend == "local":
+            return False
+        return self._engine.dialect.name == "postgresql"
+
+    @asynccontextmanager
+    async def _local_lease(self, job_id: str) -> AsyncIterator[bool]:
+        """
+        Try to take the process-local lease for a job without waiting.
+
+        Yields True when the lease was acquired, False when another coroutine
+        in this process is already running the job.
+        """
+        lock = self._local_locks.setdefault(job_id, asyncio.Lock())
+        if lock.locked():
+            yield False
+            return
+        async with lock:
+            yield True
+
+    @asynccontextmanager
+    async def _postgres_lease(self, job_id: str) -> AsyncIterator[bool]:
+        """
+        Try to take the advisory-lock lease for a job without waiting.
+
+        The lock is held on a dedicated connection and explicitly released
+        before the connection returns to the pool.  Connection or query
+        failures fall back to the process-local lease.
+        """
+        key = _advisory_lock_key(job_id)
+        try:
+            conn = await self._engine.connect()
+        except (OSError, SQLAlchemyError):
+            logger.warning("[jobs] Advisory lock unavailable for %s, using local lease", job_id)
+            async with self._local_lease(job_id) as acquired:
+                yield acquired
+            return
+
+        try:
+            try:
+                result = await conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+                )
+                acquired = bool(result.scalar())
+                await conn.commit()
+            except SQLAlchemyError:
+                logger.warning("[jobs] Advisory lock query failed for %s, using local lease", job_id)
+                await conn.rollback()
+                async with self._local_lease(job_id) as local_acquired:
+                    yield local_acquired
+                return
+
+            if not acquired:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                try:
+                    await conn.execute(
+                        text("SELECT pg_advisory_unlock(:key)"), {"key": key}
+                    )
+                    await conn.commit()
+                except SQLAlchemyError:
+                    # Dropping the connection releases every session-level lock.
+                    await conn.invalidate()
+        finally:
+            await conn.close()
+
+    def lease(self, job_id: str):
+        """Return the lease context manager appropriate for the configured backend."""
+        if self._use_postgres_lock():
+            return self._postgres_lease(job_id)
+        return self._local_lease(job_id)
+
+    async def _ran_recently(self, job_id: str, min_interval: timedelta) -> bool:
+        """Return True when a successful run of the job started within min_interval."""
+        threshold = datetime.now(timezone.utc) - min_interval
+        try:
+            async with self._session_factory() as db:
+                result = await db.execute(
+                    select(JobRun.id)
+                    .where(
+                        JobRun.job_id == job_id,
+                        JobRun.status == JobRunStatus.SUCCESS.value,
+                        JobRun.started_at >= threshold,
+                    )
+                    .limit(1)
+                )
+                return result.scalar_one_or_none() is not None
+        except (OSError, SQLAlchemyError):
+            logger.warning("[jobs] Could not read run history for %s", job_id)
+            return False
+
+    async def _record_run(
+        self,
+        job_id: str,
+        started_at: datetime,
+        duration_ms: int,
+        error: str | None,
+    ) -> None:
+        """Persist one job run; history failures never propagate to the scheduler."""
+        run = JobRun(
+            job_id=job_id,
+            worker_id=self.worker_id,
+            status=JobRunStatus.FAILED.value if error else JobRunStatus.SUCCESS.value,
+            started_at=started_at,
+            finished_at=started_at + timedelta(milliseconds=duration_ms),
+            duration_ms=duration_ms,
+            error=error,
+        )
+        try:
+            async with self._session_factory() as db:
+                db.add(run)
+                await db.commit()
+        except (OSError, SQLAlchemyError):
+            logger.exception("[jobs] Failed to record run of %s", job_id)
+
+    async def run(
+        self,
+        job_id: str,
+        func: JobBody,
+        min_interval: timedelta | None = None,
+    ) -> JobOutcome:
+        """
+        Execute a job body if this worker wins the lease for the current tick.
+
+        Exceptions raised by the job body are logged and stored in the run
+        history instead of propagating, matching APScheduler's own behaviour of
+        keeping the schedule alive after a failed run.
+        """
+        async with self.lease(job_id) as acquired:
+            if not acquired:
+                logger.debug("[jobs] %s skipped – lease held by another worker", job_id)
+                return JobOutcome.SKIPPED_LOCKED
+            if min_interval is not None and await self._ran_recently(job_id, min_interval):
+                logger.debug("[jobs] %s skipped – already ran within %s", job_id, min_interval)
+                return JobOutcome.SKIPPED_RECENT
+
+            started_at = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            error: str | None = None
+            try:
+                await func()
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("[jobs] %s failed", job_id)
+                error = f"{type(exc).__name__}: {exc}"[:2000]
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            await self._record_run(job_id, started_at, duration_ms, error)
+
+        if error:
+            return JobOutcome.FAILED
+        logger.info("[jobs] %s finished in %d ms on %s", job_id, duration_ms, self.worker_id)
+        return JobOutcome.RAN
+
+    def coordinated(
+        self,
+        job_id: str,
+        func: JobBody,
+        min_interval: timedelta | None = None,
+    ) -> Callable[[], Awaitable[JobOutcome]]:
+        """Wrap a job body into a zero-argument coroutine function for APScheduler."""
+
+        async def _runner() -> JobOutcome:
+            return await self.run(job_id, func, min_interval=min_interval)
+
+        _runner.__name__ = f"coordinated_{job_id}"
+        return _runner
+
+
+# Singleton used by the application scheduler
+job_coordinator = JobCoordinator()
@@ -0,0 +1,216 @@
+"""
+Rolling archive and retention for the per-user action logs.
+
+``log_service`` writes one plain-text file per user per day.  Once a day is
+complete, ``run_log_maintenance`` packs its folder into a single archive::
+
+    logs/
+        archive/
+            26-02-2026.zip
+                tomasz.piescikowski@gmail.com.log       <- deflated member
+                tomasz.piescikowski@gmail.com.log.idx   <- its action index
+                _system.log
+                _system.log.idx
+        27-02-2026/                                   <- today, still live
+
+ZIP keeps every member independently compressed, and its central directory
+works as the per-user member index.  Reading one user's day therefore means
+decompressing only that member, and ``log_export`` reads archives and live
+files the same way.  The archive is written to a temporary file and moved
+into place before its folder is deleted.  If a late write recreates a packed
+folder, the next run merges it into the existing archive.
+
+``LOG_ARCHIVE_AFTER_DAYS`` sets how many days a folder stays live, and
+``LOG_RETENTION_DAYS`` sets how long days are kept at all (0 keeps them
+forever).  Log folders are local to each host, so ``main.lifespan`` schedules
+the job under a per-host coordinator id.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from config import get_settings
+from services import log_service
+from services.log_export import INDEX_VERSION, _line_action
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COMPRESSLEVEL = 9
+_COPY_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class LogMaintenanceReport:
+    """Day labels packed into archives and removed by retention in one run."""
+
+    archived: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+def _parse_day(label: str) -> date | None:
+    try:
+        return datetime.strptime(label, log_service._DAY_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def _live_days() -> list[tuple[date, Path]]:
+    """Return (day, folder) for every live DD-MM-YYYY folder, oldest first."""
+    root = log_service._LOGS_ROOT
+    if not root.is_dir():
+        return []
+    days = []
+    for entry in root.iterdir():
+        day = _parse_day(entry.name)
+        if day is not None and entry.is_dir():
+            days.append((day, entry))
+    return sorted(days)
+
+
+def _archived_days() -> list[tuple[date, Path]]:
+    """Return (day, archive path) for every packed day, oldest first."""
+    archive_dir = log_service._LOGS_ROOT / log_service._ARCHIVE_DIRNAME
+    if not archive_dir.is_dir():
+        return []
+    days = []
+    for entry in archive_dir.glob("*.zip"):
+        day = _parse_day(entry.stem)
+        if day is not None:
+            days.append((day, entry))
+    return sorted(days)
+
+
+class _IndexingWriter:
+    """Forward writes to an archive member while indexing its complete lines."""
+
+    def __init__(self, member) -> None:
+        self._member = member
+        self._pending = b""
+        self.size = 0
+        self.actions: dict[str, list[int]] = {}
+
+    def write(self, data: bytes) -> None:
+        self._member.write(data)
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        for line in lines:
+            self._index(line + b"\n")
+
+    def finish(self) -> None:
+        # A day is complete, so a torn last line is terminated rather than dropped.
+        if self._pending:
+            self._member.write(b"\n")
+            self._index(self._pending + b"\n")
+            self._pending = b""
+
+    def _index(self, line: bytes) -> None:
+        self.actions.setdefault(_line_action(line), []).extend((self.size, len(line)))
+        self.size += len(line)
+
+
+def _copy_into(out: zipfile.ZipFile, name: str, sources) -> None:
+    """Write ``name`` and its action index from the concatenated binary sources."""
+    with out.open(name, "w", force_zip64=True) as member:
+        writer = _IndexingWriter(member)
+        for source in sources:
+            with source as handle:
+                while chunk := handle.read(_COPY_CHUNK_SIZE):
+                    writer.write(chunk)
+            # Each source is a complete file; keep them line-aligned.
+            writer.finish()
+    out.writestr(
+        name + ".idx",
+        json.dumps({"v": INDEX_VERSION, "size": writer.size, "actions": writer.actions},
+                   separators=(",", ":")),
+    )
+
+
+def _pack_day(label: str, folder: Path) -> None:
+    """Pack a live day folder into its archive, merging an existing archive."""
+    archive_path = log_service._archive_path_for(label)
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(f".{archive_path.name}.{os.getpid()}.tmp")
+    live_files = {path.name: path for path in folder.glob("*.log") if path.is_file()}
+    existing = zipfile.ZipFile(archive_path) if archive_path.is_file() else None
+    try:
+        with zipfile.ZipFile(
+            tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=ARCHIVE_COMPRESSLEVEL,
+        ) as out:
+            archived_names = (
+                [name for name in existing.namelist() if name.endswith(".log")] if existing else []
+            )
+            for name in sorted(set(archived_names) | set(live_files)):
+                sources = []
+                if name in archived_names:
+                    sources.append(existing.open(name))
+                if name in live_files:
+                    sources.append(open(live_files[name], "rb"))
+                _copy_into(out, name, sources)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if existing is not None:
+            existing.close()
+    shutil.rmtree(folder)
+
+
+def maintain_logs(
+    today: date | None = None,
+    archive_after_days: int = 1,
+    retention_days: int = 0,
+) -> LogMaintenanceReport:
+    """
+    Pack completed day folders and drop days past retention.
+
+    Folders older than ``archive_after_days`` (never today) are packed; live
+    folders and archives older than ``retention_days`` are deleted (``0``
+    disables retention). Synchronous; call through ``asyncio.to_thread``.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    report = LogMaintenanceReport()
+    retention_cutoff = today - timedelta(days=retention_days) if retention_days > 0 else None
+    archive_cutoff = today - timedelta(days=max(archive_after_days, 1))
+
+    for day, folder in _live_days():
+        label = folder.name
+        if retention_cutoff is not None and day < retention_cutoff:
+            shutil.rmtree(folder)
+            report.removed.append(label)
+        elif day <= archive_cutoff:
+            _pack_day(label, folder)
+            report.archived.append(label)
+
+    if retention_cutoff is not None:
+        for day, archive_path in _archived_days():
+            if day < retention_cutoff:
+                archive_path.unlink(missing_ok=True)
+                if archive_path.stem not in report.removed:
+                    report.removed.append(archive_path.stem)
+    return report
+
+
+async def run_log_maintenance() -> None:
+    """Scheduled entry point: archive and prune action logs off the event loop."""
+    settings = get_settings()
+    report = await asyncio.to_thread(
+        maintain_logs,
+        archive_after_days=settings.log_archive_after_days,
+        retention_days=settings.log_retention_days,
+    )
+    if report.archived or report.removed:
+        logger.info(
+            "[logs] Archived %d day(s), removed %d day(s) past retention",
+            len(report.archived),
+            len(report.removed),
+        )
@@ -0,0 +1,354 @@
+"""
+Streaming export of per-user action logs for the admin download endpoint.
+
+``stream_user_log_export`` yields the export as byte chunks: daily files are
+read in fixed-size chunks through ``asyncio.to_thread`` so neither the event
+loop nor memory ever holds a whole file, and the optional gzip encoder
+compresses incrementally.
+
+Action index
+------------
+Filtering by action (e.g. ``PAYMENT_*``) uses a compact sidecar index stored
+next to each daily file as ``<file>.idx``::
+
+    {"v": 1, "size": 18234, "actions": {"PAYMENT_CREATED": [0, 131, 912, 128]}}
+
+``actions`` maps each action name to a flat list of ``offset, length`` pairs
+of its lines.  The index is built on first filtered read and extended
+incrementally when the log file has grown since (``size`` records how many
+bytes were indexed), so repeated exports only read the matching byte ranges
+instead of scanning whole files.
+
+Archived days
+-------------
+Completed days are packed by ``log_archive`` into ``logs/archive/DD-MM-YYYY.zip``
+with one deflated member per user plus that member's ``.idx``.  A day is read
+from its archive member and/or its live file (a late write after packing
+recreates the folder), so the export does not care which one holds the lines.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+import zlib
+import zipfile
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from services import log_service
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+INDEX_VERSION = 1
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+@dataclass(frozen=True)
+class LogExportFilter:
+    """
+    Optional restrictions applied to exported log lines.
+
+    ``actions`` holds upper-case glob patterns matched against the action name
+    (``PAYMENT_*``); ``start``/``end`` bound the line timestamp (UTC, naive)
+    inclusively.
+    """
+
+    actions: tuple[str, ...] = ()
+    start: datetime | None = None
+    end: datetime | None = None
+
+    def matches_action(self, action: str) -> bool:
+        return not self.actions or any(fnmatchcase(action, p) for p in self.actions)
+
+    def matches_time(self, line: bytes) -> bool:
+        """Compare the line's ``[YYYY-MM-DD HH:MM:SS.mmm UTC]`` stamp to the bounds."""
+        if self.start is None and self.end is None:
+            return True
+        # The stamp sorts lexicographically, so comparing strings is enough.
+        stamp = line[1:24].decode("ascii", errors="replace")
+        if self.start is not None and stamp < self.start.strftime(_TIMESTAMP_FORMAT)[:-3]:
+            return False
+        if self.end is not None and stamp > self.end.strftime(_TIMESTAMP_FORMAT)[:-3]:
+            return False
+        return True
+
+
+def _line_action(line: bytes) -> str:
+    """Extract the action name from a raw ``[stamp] | ACTION | ...`` log line."""
+    bracket = line.find(b"]")
+    if bracket < 0:
+        return ""
+    rest = line[bracket + 1:].lstrip(b" |")
+    end = rest.find(b" |")
+    return rest[:end if end >= 0 else len(rest)].strip().decode("utf-8", errors="replace")
+
+
+def _index_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + ".idx")
+
+
+def _scan_lines(log_file, start: int) -> Iterable[tuple[int, bytes]]:
+    """Yield (offset, raw line) for every complete line from ``start`` onwards."""
+    log_file.seek(start)
+    offset = start
+    for line in log_file:
+        if not line.endswith(b"\n"):
+            break
+        yield offset, line
+        offset += len(line)
+
+
+def build_action_index(
+    log_file,
+    start: int = 0,
+    actions: dict[str, list[int]] | None = None,
+) -> tuple[dict[str, list[int]], int]:
+    """Index the complete lines of an open binary file from ``start``; return (actions, indexed size)."""
+    actions = {} if actions is None else actions
+    indexed_size = start
+    for offset, line in _scan_lines(log_file, start):
+        actions.setdefault(_line_action(line), []).extend((offset, len(line)))
+        indexed_size = offset + len(line)
+    return actions, indexed_size
+
+
+def load_action_index(log_path: Path) -> dict[str, list[int]]:
+    """
+    Return the action index for a log file, building or extending it as needed.
+
+    Synchronous; call through ``asyncio.to_thread``.  Only complete lines are
+    indexed, so a line being appended concurrently is picked up next time.
+    """
+    index_path = _index_path(log_path)
+    actions: dict[str, list[int]] = {}
+    indexed_size = 0
+    try:
+        stored = json.loads(index_path.read_text(encoding="utf-8"))
+        if stored.get("v") == INDEX_VERSION:
+            actions = stored["actions"]
+            indexed_size = int(stored["size"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    size = log_path.stat().st_size
+    if indexed_size > size:
+        # File was rewritten (e.g. restored); start over.
+        actions, indexed_size = {}, 0
+    if indexed_size == size:
+        return actions
+
+    with open(log_path, "rb") as log_file:
+        actions, indexed_size = build_action_index(log_file, indexed_size, actions)
+
+    tmp_path = index_path.with_name(f".{index_path.name}.{os.getpid()}.{uuid.uuid4().hex}")
+    try:
+        tmp_path.write_text(
+            json.dumps({"v": INDEX_VERSION, "size": indexed_size, "actions": actions},
+                       separators=(",", ":")),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, index_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+    return actions
+
+
+def _matching_ranges(actions: dict[str, list[int]], export_filter: LogExportFilter) -> list[tuple[int, int]]:
+    """Return (offset, length) ranges of matching actions in file order."""
+    ranges: list[tuple[int, int]] = []
+    for action, flat in actions.items():
+        if export_filter.matches_action(action):
+            ranges.extend(zip(flat[0::2], flat[1::2]))
+    ranges.sort()
+    return ranges
+
+
+class _ArchiveMember:
+    """Binary reader over one archive member that also owns the open zip file."""
+
+    def __init__(self, archive_path: Path, member: str) -> None:
+        self._zip = zipfile.ZipFile(archive_path)
+        try:
+            self._file = self._zip.open(member)
+        except BaseException:
+            self._zip.close()
+            raise
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int) -> int:
+        # Forward seeks decompress through; ranges are read in ascending order.
+        return self._file.seek(offset)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            self._zip.close()
+
+
+@dataclass(frozen=True)
+class _LogSource:
+    """A user's lines for one day: a live file, or ``member`` of the day's archive."""
+
+    path: Path
+    member: str | None = None
+
+    def open(self):
+        if self.member is None:
+            return open(self.path, "rb")
+        return _ArchiveMember(self.path, self.member)
+
+    def load_index(self) -> dict[str, list[int]]:
+        if self.member is None:
+            return load_action_index(self.path)
+        with zipfile.ZipFile(self.path) as archive:
+            try:
+                stored = json.loads(archive.read(self.member + ".idx"))
+                if stored.get("v") == INDEX_VERSION:
+                    return stored["actions"]
+            except (KeyError, ValueError):
+                pass
+        # Archives are immutable, so an index missing from one is rebuilt per read.
+        log_file = self.open()
+        try:
+            return build_action_index(log_file)[0]
+        finally:
+            log_file.close()
+
+
+def _day_sources(day_label: str, filename: str) -> list[_LogSource]:
+    """Return the sources holding a user's lines for a day, archived part first."""
+    sources: list[_LogSource] = []
+    archive_path = log_service._archive_path_for(day_label)
+    if archive_path.is_file():
+        with zipfile.ZipFile(archive_path) as archive:
+            # The zip central directory is the per-user member index.
+            try:
+                archive.getinfo(filename)
+                sources.append(_LogSource(archive_path, filename))
+            except KeyError:
+                pass
+    live_path = log_service._LOGS_ROOT / day_label / filename
+    if live_path.is_file():
+        sources.append(_LogSource(live_path))
+    return sources
+
+
+def _read_ranges(source: _LogSource, ranges: list[tuple[int, int]]) -> list[bytes]:
+    """Read the given byte ranges (one line each) from a log source."""
+    log_file = source.open()
+    try:
+        lines = []
+        for offset, length in ranges:
+            log_file.seek(offset)
+            lines.append(log_file.read(length))
+        return lines
+    finally:
+        log_file.close()
+
+
+async def _stream_file(source: _LogSource, export_filter: LogExportFilter) -> AsyncIterator[bytes]:
+    """Yield a log source's content (optionally time-filtered) in bounded chunks."""
+    log_file = await asyncio.to_thread(source.open)
+    try:
+        pending = b""
+        last_byte = b"\n"
+        while True:
+            chunk = await asyncio.to_thread(log_file.read, EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            last_byte = chunk[-1:]
+            if export_filter.start is None and export_filter.end is None:
+                yield chunk
+                continue
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            kept = [line + b"\n" for line in lines if export_filter.matches_time(line)]
+            if kept:
+                yield b"".join(kept)
+        if pending and export_filter.matches_time(pending):
+            yield pending + b"\n"
+        elif last_byte != b"\n" and export_filter.start is None and export_filter.end is None:
+            yield b"\n"
+    finally:
+        await asyncio.to_thread(log_file.close)
+
+
+async def _stream_indexed(source: _LogSource, export_filter: LogExportFilter) -> AsyncIterator[bytes]:
+    """Yield only the lines whose action matches, using the action index."""
+    actions = await asyncio.to_thread(source.load_index)
+    ranges = _matching_ranges(actions, export_filter)
+    start = 0
+    while start < len(ranges):
+        # Group ranges into roughly chunk-sized reads.
+        end, batch_bytes = start, 0
+        while end < len(ranges) and batch_bytes < EXPORT_CHUNK_SIZE:
+            batch_bytes += ranges[end][1]
+            end += 1
+        lines = await asyncio.to_thread(_read_ranges, source, ranges[start:end])
+        kept = [line for line in lines if export_filter.matches_time(line)]
+        if kept:
+            yield b"".join(kept)
+        start = end
+
+
+def _day_header(label: str, has_entries: bool) -> bytes:
+    if has_entries:
+        return f"# ── {label} ─────────────────────────\n".encode("utf-8")
+    return f"# ── {label}  (brak wpisów)\n".encode("utf-8")
+
+
+async def stream_user_log_export(
+    user_email: str,
+    date_from: date,
+    date_to: date,
+    export_filter: LogExportFilter | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield a user's log lines for a date range as a plain-text byte stream.
+
+    Each day starts with a ``# ── DD-MM-YYYY`` header line, followed by the
+    day's (filtered) lines, or a ``(brak wpisów)`` marker when the user has no
+    log file or archive member for that day.
+    """
+    export_filter = export_filter or LogExportFilter()
+    filename = log_service._sanitise_email_for_filename(user_email.lower()) + ".log"
+    current = date_from
+    while current <= date_to:
+        label = current.strftime(log_service._DAY_FORMAT)
+        day_end = datetime.combine(current, datetime.max.time())
+        day_start = datetime.combine(current, datetime.min.time())
+        sources = await asyncio.to_thread(_day_sources, label, filename)
+        yield _day_header(label, bool(sources))
+        in_window = (
+            (export_filter.start is None or day_end >= export_filter.start)
+            and (export_filter.end is None or day_start <= export_filter.end)
+        )
+        for source in sources if in_window else ():
+            if export_filter.actions:
+                body = _stream_indexed(source, export_filter)
+            else:
+                body = _stream_file(source, export_filter)
+            async for chunk in body:
+                yield chunk
+        current += timedelta(days=1)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream incrementally into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -10,10 +10,24 @@ File layout::
         27-02-2026/
             tomasz.piescikowski@gmail.com.log   <- per-user actions
             _system.log                          <- webhooks / anonymous actions
+        archive/
+            26-02-2026.zip                       <- completed days, see log_archive
 
 Log line format::
 
-    [2026-02-27 14:35:22.451 UTC] ACTION_NAME | user=email | ip=1.2.3.4 | key=value
+    [2026-02-27 14:35:22.451 UTC] | ACTION_NAME | user=email | ip=1.2.3.4 | key=value
+
+Writing
+-------
+While the application is running, ``log_action`` only formats the line and
+hands it to ``log_writer`` — a background task fed by an in-memory queue.
+The writer groups queued lines per file, writes them in batches (when
+``LOG_WRITER_BATCH_SIZE`` lines are queued or ``LOG_WRITER_FLUSH_INTERVAL``
+seconds pass), keeps recently used file handles open (LRU, at most
+``LOG_WRITER_MAX_OPEN_FILES``) and closes the previous day's handles when the
+UTC date rolls over.  ``lifespan`` starts it and drains it on shutdown.
+Outside the application lifecycle (scripts, router tests) ``log_action``
+appends the line directly under a striped per-file lock.
 
 Usage::
 
@@ -31,16 +45,32 @@ Usage::
 from __future__ import annotations
 
 import asyncio
+import logging
 import re
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 _BACKEND_DIR = Path(__file__).resolve().parent.parent
 _LOGS_ROOT = _BACKEND_DIR.parent / "logs"
+_ARCHIVE_DIRNAME = "archive"
+_DAY_FORMAT = "%d-%m-%Y"
+
+LOG_WRITER_BATCH_SIZE = 256
+LOG_WRITER_FLUSH_INTERVAL = 0.5
+LOG_WRITER_MAX_OPEN_FILES = 64
+LOG_WRITER_MAX_QUEUE = 10_000
 
-_file_locks: dict[str, asyncio.Lock] = {}
-_file_locks_registry_lock = asyncio.Lock()
+logger = logging.getLogger(__name__)
+
+# Direct (writer-less) appends are serialised per file through a fixed array
+# of lock stripes: a file always maps to the same stripe, so memory stays
+# constant no matter how many users and days have been logged.
+_FILE_LOCK_STRIPES = 64
+_file_lock_stripes: tuple[asyncio.Lock, ...] = tuple(
+    asyncio.Lock() for _ in range(_FILE_LOCK_STRIPES)
+)
 
 
 def _sanitise_email_for_filename(email: str) -> str:
@@ -53,27 +83,30 @@ def _sanitise_email_for_filename(email: str) -> str:
     return re.sub(pattern=r"[/\\:*?\"<>|]", repl="_", string=email)
 
 
-def _todays_log_folder() -> Path:
+def _log_folder_for(now: datetime) -> Path:
     """
-    Return today's UTC log directory, creating it on the filesystem if absent.
+    Return the UTC log directory for the given moment without touching the disk.
 
     The directory is named in DD-MM-YYYY format so log folders remain
-    human-readable and sort chronologically when listed.
+    human-readable and sort chronologically when listed. Callers create it
+    lazily when a write fails because it does not exist yet.
     """
-    today_label = datetime.now(timezone.utc).strftime("%d-%m-%Y")
-    folder = _LOGS_ROOT / today_label
-    folder.mkdir(parents=True, exist_ok=True)
-    return folder
+    return _LOGS_ROOT / now.strftime(_DAY_FORMAT)
+
 
+def _archive_path_for(day_label: str) -> Path:
+    """Return the path of the compressed archive holding a packed DD-MM-YYYY day."""
+    return _LOGS_ROOT / _ARCHIVE_DIRNAME / f"{day_label}.zip"
 
-def _resolve_log_file_path(user_email: str | None) -> Path:
+
+def _resolve_log_file_path(user_email: str | None, now: datetime | None = None) -> Path:
     """
-    Resolve the log file path for the given user email and today's date.
+    Resolve the log file path for the given user email and UTC date.
 
     Authenticated users receive a dedicated file named after their lowercase
     email. Unauthenticated or system-level actions are written to _system.log.
     """
-    folder = _todays_log_folder()
+    folder = _log_folder_for(now or datetime.now(timezone.utc))
     if user_email:
         filename = _sanitise_email_for_filename(user_email.lower()) + ".log"
     else:
@@ -81,17 +114,29 @@ def _resolve_log_file_path(user_email: str | None) -> Path:
     return folder / filename
 
 
-async def _get_or_create_file_lock(file_path: str) -> asyncio.Lock:
+def _open_for_append(path: Path) -> TextIO:
+    """
+    Open a log file for appending, creating its day folder on first use.
+
+    Trying the open first keeps the common case to a single syscall instead of
+    an unconditional mkdir per line.
+    """
+    try:
+        return open(file=path, mode="a", encoding="utf-8")
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return open(file=path, mode="a", encoding="utf-8")
+
+
+def _file_lock_for(file_path: Path) -> asyncio.Lock:
     """
-    Return the asyncio.Lock associated with a log file path, creating it lazily.
+    Return the lock stripe guarding appends to the given log file.
 
-    A registry-level meta-lock ensures that lock objects are created atomically,
-    so exactly one Lock exists per file path even under high concurrency.
+    Hashing the path onto a fixed stripe array needs no registry and no global
+    meta-lock. Two files may share a stripe, which only serialises their
+    appends; a single file never maps to two locks.
     """
-    async with _file_locks_registry_lock:
-        if file_path not in _file_locks:
-            _file_locks[file_path] = asyncio.Lock()
-        return _file_locks[file_path]
+    return _file_lock_stripes[hash(file_path) % _FILE_LOCK_STRIPES]
 
 
 def _build_log_line(
@@ -99,6 +144,7 @@ def _build_log_line(
     user_email: str | None,
     ip: str | None,
     extra: dict[str, Any],
+    now: datetime | None = None,
 ) -> str:
     """
     Format a structured log line from the given action, identity, and context fields.
@@ -106,7 +152,7 @@ def _build_log_line(
     The timestamp is expressed in UTC. Extra keyword arguments are appended as
     ``key=value`` pairs; entries whose value is None are silently omitted.
     """
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + " UTC"
+    timestamp = (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + " UTC"
     parts: list[str] = [f"[{timestamp}]", action.upper()]
     parts.append(f"user={user_email or 'anonymous'}")
     if ip:
@@ -124,10 +170,174 @@ def _append_line_to_file(path: Path, line: str) -> None:
     This function is intentionally synchronous because it is invoked through
     asyncio.to_thread and must not use async primitives.
     """
-    with open(file=path, mode="a", encoding="utf-8") as log_file:
+    with _open_for_append(path) as log_file:
         log_file.write(line + "\n")
 
 
+class LogWriter:
+    """
+    Background writer that batches queued log lines into per-file appends.
+
+    All file I/O for a batch runs in one ``asyncio.to_thread`` call, and the
+    writer task awaits it before taking the next batch, so file handles are
+    only ever touched by one thread at a time and need no locking.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = LOG_WRITER_BATCH_SIZE,
+        flush_interval: float = LOG_WRITER_FLUSH_INTERVAL,
+        max_open_files: int = LOG_WRITER_MAX_OPEN_FILES,
+        max_queue: int = LOG_WRITER_MAX_QUEUE,
+    ) -> None:
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_open_files = max(1, max_open_files)
+        self._max_queue = max_queue
+        self._queue: asyncio.Queue[tuple[Path, str] | None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._handles: OrderedDict[Path, TextIO] = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        """Return True while the writer task accepts new lines."""
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop (idempotent)."""
+        if self.running:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._task = asyncio.create_task(self._run(), name="log-writer")
+
+    async def submit(self, path: Path, line: str) -> None:
+        """Queue one line; waits only when the queue is full (backpressure)."""
+        assert self._queue is not None
+        await self._queue.put((path, line))
+
+    async def stop(self) -> None:
+        """
+        Drain every queued line to disk, close all handles and stop the task.
+
+        Lines submitted before ``stop`` is called are guaranteed to be written.
+        ``running`` turns False first, so ``log_action`` writes lines logged
+        during shutdown directly instead of queueing them behind the sentinel.
+        """
+        if self._task is None or self._queue is None:
+            return
+        self._stopping = True
+        if not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        # A submit that was blocked on a full queue may land after the sentinel.
+        leftovers = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftovers.append(item)
+        if leftovers:
+            await asyncio.to_thread(self._write_batch, leftovers)
+        self._task = None
+        self._queue = None
+        await asyncio.to_thread(self._close_all)
+
+    async def _next_batch(self) -> tuple[list[tuple[Path, str]], bool]:
+        """
+        Wait for the next batch of lines.
+
+        Returns once ``batch_size`` lines are collected or ``flush_interval``
+        has elapsed since the first line of the batch. The boolean is True
+        when the stop sentinel was reached.
+        """
+        assert self._queue is not None
+        first = await self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._flush_interval
+        while len(batch) < self._batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:  # noqa: BLE001 – never let logging kill the writer
+                logger.exception("[log_writer] Failed to write %d log line(s)", len(batch))
+
+    def _handle_for(self, path: Path) -> TextIO:
+        """Return an open handle for path, evicting the least recently used one."""
+        handle = self._handles.get(path)
+        if handle is not None:
+            self._handles.move_to_end(path)
+            return handle
+        while len(self._handles) >= self._max_open_files:
+            _, evicted = self._handles.popitem(last=False)
+            evicted.close()
+        handle = _open_for_append(path)
+        self._handles[path] = handle
+        return handle
+
+    def _close_stale_days(self, folder: Path) -> None:
+        """Close handles that belong to an earlier day once a new UTC day starts."""
+        for path in [p for p in self._handles if p.parent != folder]:
+            self._handles.pop(path).close()
+
+    def _write_batch(self, batch: list[tuple[Path, str]]) -> None:
+        """
+        Write a batch grouped by file, one write and flush per file.
+
+        A file that cannot be opened or written only loses its own lines; the
+        rest of the batch is still written.
+        """
+        grouped: dict[Path, list[str]] = {}
+        for path, line in batch:
+            grouped.setdefault(path, []).append(line)
+        for path, lines in grouped.items():
+            try:
+                handle = self._handle_for(path)
+                handle.write("\n".join(lines) + "\n")
+                handle.flush()
+            except Exception:  # noqa: BLE001 – never let one file drop the batch
+                logger.exception("[log_writer] Failed to write %d log line(s) to %s", len(lines), path)
+                stale = self._handles.pop(path, None)
+                if stale is not None:
+                    try:
+                        stale.close()
+                    except OSError:
+                        pass
+        self._close_stale_days(batch[-1][0].parent)
+
+    def _close_all(self) -> None:
+        while self._handles:
+            _, handle = self._handles.popitem()
+            handle.close()
+
+
+# Singleton started and stopped by the application lifespan
+log_writer = LogWriter()
+
+
 async def log_action(
     action: str,
     user_email: str | None = None,
@@ -137,19 +347,24 @@ async def log_action(
     """
     Append one structured log line to the correct per-user daily log file.
 
-    Safe to call concurrently from multiple async endpoint handlers — a
-    per-file asyncio lock prevents interleaved writes, and the actual file I/O
-    is offloaded to a thread via asyncio.to_thread to avoid blocking the event loop.
+    When the background ``log_writer`` is running the line is only queued, so
+    the caller pays no thread hop or syscalls. Otherwise the line is written
+    directly — a striped per-file asyncio lock prevents interleaved writes,
+    and the file I/O is offloaded to a thread to avoid blocking the event loop.
     """
+    now = datetime.now(timezone.utc)
     line = _build_log_line(
         action=action,
         user_email=user_email,
         ip=ip,
         extra=extra,
+        now=now,
     )
-    log_path = _resolve_log_file_path(user_email)
-    file_lock = await _get_or_create_file_lock(file_path=str(log_path))
-    async with file_lock:
+    log_path = _resolve_log_file_path(user_email, now)
+    if log_writer.running:
+        await log_writer.submit(log_path, line)
+        return
+    async with _file_lock_for(log_path):
         await asyncio.to_thread(_append_line_to_file, log_path, line)
 
 
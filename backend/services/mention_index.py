@@ -0,0 +1,211 @@
+"""
+In-process prefix index for @mention autocomplete.
+
+``/users/search`` is called on every keystroke of every chat user.  With
+``MENTION_INDEX_ENABLED`` each worker keeps the active users' names in a
+prefix trie and answers those calls from memory instead of the database:
+
+- **Normalisation** – names are folded with ``utils.text_search.fold_text``
+  (lower-case, Polish and common European diacritics stripped) and split into
+  words, so "luk" and "ŁUK" both reach "Anna Łukaszewicz".  Every trie node
+  holds the ids of users with a word starting with that node's prefix and,
+  once queried, its ranked top matches, so a repeated lookup costs one step
+  per query character.
+- **Ranking** – the same as the SQL search: names starting with the query
+  first, then other word-prefix matches, shorter names first.  Mid-word
+  substrings and typos are not indexed; when the trie has no match the
+  endpoint falls back to the SQL search, which handles both.
+- **Freshness** – ``mention_index.reload()`` loads all active users at
+  startup and then every ``MENTION_INDEX_REFRESH_SECONDS``.  Between reloads
+  the code paths that approve, block, unblock or rename a user call
+  ``mention_index.upsert(user)`` after committing, which updates this
+  worker's copy immediately; other workers catch up on their next reload.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.user import AccountStatus, User
+from utils.text_search import fold_text
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+# Ranked results cached per trie node for single-word queries.
+_TOP_CACHE_SIZE = 20
+
+
+@dataclass(frozen=True)
+class MentionCandidate:
+    """A user as stored in the mention index."""
+
+    id: str
+    full_name: str
+    picture_url: str | None
+    folded_name: str
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids", "top")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: set[str] = set()
+        self.top: list[MentionCandidate] | None = None
+
+
+def _words(folded_name: str) -> set[str]:
+    return set(_WORD_RE.findall(folded_name))
+
+
+class MentionIndex:
+    """
+    Prefix trie over active users' folded name words.
+
+    The index is empty and ``search`` returns None until the first
+    ``reload``; ``upsert`` and ``discard`` are no-ops until then, so
+    disabled deployments never hold user data in memory.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._users: dict[str, MentionCandidate] = {}
+        self._loaded_at: float | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _insert(self, root: _TrieNode, candidate: MentionCandidate) -> None:
+        for word in _words(candidate.folded_name):
+            node = root
+            for char in word:
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(candidate.id)
+                node.top = None
+
+    def _remove(self, candidate: MentionCandidate) -> None:
+        for word in _words(candidate.folded_name):
+            path = [self._root]
+            for char in word:
+                node = path[-1].children.get(char)
+                if node is None:
+                    break
+                node.ids.discard(candidate.id)
+                node.top = None
+                path.append(node)
+            # Prune nodes no other user passes through.
+            for parent, char in zip(reversed(path[:-1]), reversed(word[:len(path) - 1])):
+                child = parent.children[char]
+                if child.ids or child.children:
+                    break
+                del parent.children[char]
+
+    def replace_all(self, candidates: list[MentionCandidate]) -> None:
+        """Swap in a freshly built trie holding exactly these candidates."""
+        root = _TrieNode()
+        users = {}
+        for candidate in candidates:
+            users[candidate.id] = candidate
+            self._insert(root, candidate)
+        self._root, self._users = root, users
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, user: User) -> None:
+        """Re-index one user after a commit; inactive or unnamed users are dropped."""
+        if not self.loaded:
+            return
+        self.discard(str(user.id))
+        if user.account_status == AccountStatus.ACTIVE and user.full_name:
+            candidate = MentionCandidate(
+                id=str(user.id),
+                full_name=user.full_name,
+                picture_url=user.picture_url,
+                folded_name=fold_text(user.full_name),
+            )
+            self._users[candidate.id] = candidate
+            self._insert(self._root, candidate)
+
+    def discard(self, user_id: str) -> None:
+        """Remove one user from the index."""
+        candidate = self._users.pop(user_id, None)
+        if candidate is not None:
+            self._remove(candidate)
+
+    async def reload(self, db: AsyncSession | None = None) -> int:
+        """Rebuild the index from the database; returns the number of users indexed."""
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                return await self.reload(session)
+        result = await db.execute(
+            select(User.id, User.full_name, User.picture_url)
+            .where(User.account_status == AccountStatus.ACTIVE, User.full_name.is_not(None))
+        )
+        self.replace_all([
+            MentionCandidate(
+                id=str(user_id),
+                full_name=full_name,
+                picture_url=picture_url,
+                folded_name=fold_text(full_name),
+            )
+            for user_id, full_name, picture_url in result.all()
+        ])
+        return len(self._users)
+
+    def search(self, query: str, limit: int = 10) -> list[MentionCandidate] | None:
+        """
+        Return up to limit users with a name word starting with each query word.
+
+        Returns None while the index is not loaded, so callers can fall back
+        to the database.
+        """
+        if not self.loaded:
+            return None
+        term = fold_text(query.strip())
+        words = _WORD_RE.findall(term)
+        if not words:
+            return []
+        nodes = []
+        for word in words:
+            node = self._root
+            for char in word:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            nodes.append(node)
+        if len(nodes) == 1 and words[0] == term and limit <= _TOP_CACHE_SIZE:
+            # Short prefixes match most users; rank each node's matches once.
+            node = nodes[0]
+            if node.top is None:
+                node.top = self._rank(node.ids, term, _TOP_CACHE_SIZE)
+            return node.top[:limit]
+        id_sets = sorted((node.ids for node in nodes), key=len)
+        return self._rank(id_sets[0].intersection(*id_sets[1:]), term, limit)
+
+    def _rank(self, ids: set[str], term: str, limit: int) -> list[MentionCandidate]:
+        return heapq.nsmallest(
+            limit,
+            (self._users[user_id] for user_id in ids),
+            key=lambda c: (not c.folded_name.startswith(term), len(c.full_name), c.full_name),
+        )
+
+
+async def refresh_mention_index() -> None:
+    """Scheduler job: rebuild this worker's mention index from the database."""
+    count = await mention_index.reload()
+    logger.debug("[mention_index] Reloaded %d active user(s)", count)
+
+
+mention_index = MentionIndex()
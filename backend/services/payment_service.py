@@ -1,7 +1,8 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from typing import Iterator, Optional
 import json
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -59,7 +60,15 @@ SUBSCRIPTION_PLANS: dict[str, SubscriptionPlan] = {
 
 
 class PaymentService:
-    """Service for payment operations."""
+    """
+    Service for payment operations.
+
+    Each mutating method commits its own changes unless it runs inside
+    ``unit_of_work()``. In that block the methods only flush, and the caller
+    commits once for the whole request. Inserts return server-generated
+    columns such as created_at through RETURNING, and the session does not
+    expire on commit, so nothing is refreshed afterwards.
+    """
 
     def __init__(self, db: AsyncSession, payment_gateway: PaymentGatewayPort):
         """
@@ -70,6 +79,27 @@ class PaymentService:
         """
         self.db = db
         self.gateway = payment_gateway
+        self._defer_commit = False
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator["PaymentService"]:
+        """
+        Flush instead of commit inside the block; the caller commits once.
+
+        Blocks nest, and the outermost block decides.
+        """
+        previous, self._defer_commit = self._defer_commit, True
+        try:
+            yield self
+        finally:
+            self._defer_commit = previous
+
+    async def _save(self) -> None:
+        """Commit pending changes, or only flush them inside ``unit_of_work()``."""
+        if self._defer_commit:
+            await self.db.flush()
+        else:
+            await self.db.commit()
 
     @staticmethod
     def _build_manual_external_id() -> str:
@@ -182,8 +212,7 @@ class PaymentService:
             gateway_response=json.dumps(result.raw_response) if result.raw_response else None,
         )
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
 
         return payment, result
 
@@ -220,8 +249,7 @@ class PaymentService:
             extra_data=json.dumps(payload),
         )
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
         return payment
 
     async def mark_manual_event_payment_completed(self, payment_external_id: str) -> Payment | None:
@@ -240,8 +268,7 @@ class PaymentService:
         payment.status = DBPaymentStatus.COMPLETED.value
         payment.completed_at = datetime.utcnow()
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
         return payment
 
     async def mark_manual_event_payment_refunded(self, payment_external_id: str) -> Payment | None:
@@ -257,8 +284,7 @@ class PaymentService:
             return None
         payment.status = DBPaymentStatus.REFUNDED.value
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
         return payment
 
     async def create_subscription_payment(
@@ -310,11 +336,10 @@ class PaymentService:
             completed_at=datetime.utcnow() if result.status == PaymentStatus.COMPLETED else None,
         )
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
-
         if result.status == PaymentStatus.COMPLETED:
-            await self.apply_subscription_for_payment(payment)
+            with self.unit_of_work():
+                await self.apply_subscription_for_payment(payment)
+        await self._save()
 
         return payment, result
 
@@ -340,8 +365,7 @@ class PaymentService:
         if verification.paid_at:
             payment.completed_at = verification.paid_at
 
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
 
         return payment
 
@@ -366,11 +390,10 @@ class PaymentService:
             if verification.paid_at:
                 payment.completed_at = verification.paid_at
 
-            await self.db.commit()
-            await self.db.refresh(payment)
-
             if payment.payment_type == PaymentType.SUBSCRIPTION.value and payment.status == DBPaymentStatus.COMPLETED.value:
-                await self.apply_subscription_for_payment(payment)
+                with self.unit_of_work():
+                    await self.apply_subscription_for_payment(payment)
+            await self._save()
 
         return payment
 
@@ -425,8 +448,7 @@ class PaymentService:
         self.db.add(user)
         self.db.add(subscription)
         self.db.add(payment)
-        await self.db.commit()
-        await self.db.refresh(payment)
+        await self._save()
         return True
 
     async def refund_payment(self, payment_id: str, reason: str | None = None) -> RefundResult:
@@ -460,7 +482,7 @@ class PaymentService:
 
         if refund_result.success:
             payment.status = DBPaymentStatus.REFUNDED.value
-            await self.db.commit()
+            await self._save()
 
         return refund_result
 
@@ -545,8 +567,7 @@ class PaymentService:
             status=SubscriptionPurchaseStatus.MANUAL_PAYMENT_REQUIRED.value,
         )
         self.db.add(purchase)
-        await self.db.commit()
-        await self.db.refresh(purchase)
+        await self._save()
         return purchase
 
     async def get_subscription_purchase_details(
@@ -651,8 +672,7 @@ class PaymentService:
         purchase.status = SubscriptionPurchaseStatus.MANUAL_PAYMENT_VERIFICATION.value
         purchase.manual_payment_confirmed_at = now
         self.db.add(purchase)
-        await self.db.commit()
-        await self.db.refresh(purchase)
+        await self._save()
         return await self.get_subscription_purchase_details(purchase_id, user_id)
 
     async def approve_subscription_manual_payment(
@@ -679,7 +699,8 @@ class PaymentService:
         if not purchase.payment_id:
             raise ValueError("No payment record linked to this purchase")
 
-        await self.mark_manual_event_payment_completed(purchase.payment_id)
+        with self.unit_of_work():
+            await self.mark_manual_event_payment_completed(purchase.payment_id)
 
         pay_result = await self.db.execute(
             select(Payment).where(Payment.external_id == purchase.payment_id)
@@ -728,8 +749,7 @@ class PaymentService:
         self.db.add(subscription)
         self.db.add(payment)
         self.db.add(purchase)
-        await self.db.commit()
-        await self.db.refresh(purchase)
+        await self._save()
         return purchase
 
     async def get_user_pending_subscription_purchase(
@@ -0,0 +1,310 @@
+"""
+Payment webhook processing and the optional webhook inbox.
+
+``apply_payment_webhook`` is what ``POST /payments/webhook`` has always done:
+gateway verification, payment update, then registration confirmation or
+subscription activation.  During database slowness that took longer than the
+gateway waits, and the gateway retried.  With
+``PAYMENT_WEBHOOK_INBOX_ENABLED`` the endpoint instead stores the raw
+payload after checking its signature and answers 200 at once:
+
+- **Inbox** – one ``payment_webhook_inbox`` row per (external_id, status);
+  gateway retries of a notification already stored are acknowledged without
+  a new row.
+- **Worker** – every API process runs a ``PaymentWebhookWorker``.  It
+  leases due pending rows (``FOR UPDATE SKIP LOCKED``, so workers never
+  share a row), applies them oldest first and marks them processed.  Failed
+  attempts are retried with exponential backoff and marked failed after
+  ``PAYMENT_WEBHOOK_MAX_ATTEMPTS``; a lease left by a crashed worker expires.
+  A row is applied again only if a worker died before recording the result,
+  and the payment side effects are idempotent.
+- **Metrics** – the worker tracks the receive-to-processed lag and the
+  processing time of each entry, reported by ``GET /admin/payments/webhook-inbox``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from adapters.payment_gateways import get_payment_gateway
+from config import get_settings
+from database import AsyncSessionLocal
+from models.payment import PaymentStatus, PaymentType
+from models.payment_webhook_inbox import PaymentWebhookInbox, WebhookInboxState
+from ports.payment_gateway import PaymentGatewayPort
+from services.log_service import log_action
+from services.payment_service import PaymentService
+from services.registration_service import RegistrationService
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+# A leased entry is offered to other workers again after this long.
+_LEASE = timedelta(seconds=60)
+_MAX_BACKOFF_SECONDS = 300
+_BATCH_SIZE = 20
+
+
+@dataclass(frozen=True)
+class WebhookOutcome:
+    """Result of applying one webhook, as reported back to the gateway."""
+
+    success: bool
+    message: str
+
+
+async def apply_payment_webhook(
+    db: AsyncSession,
+    gateway: PaymentGatewayPort,
+    payload: dict,
+    signature: str | None,
+    ip: str | None = None,
+) -> WebhookOutcome:
+    """
+    Apply a payment webhook: update the payment and run its side effects.
+
+    Completed event payments confirm their registration and completed
+    subscription payments activate the plan; both steps are idempotent.
+    The payment update and its side effects are committed together.
+    """
+    payment_service = PaymentService(db, gateway)
+    registration_service = RegistrationService(db, payment_service)
+
+    with payment_service.unit_of_work():
+        payment = await payment_service.process_webhook(payload, signature)
+
+    if not payment:
+        await log_action(
+            action="WEBHOOK_PAYMENT_NOT_FOUND",
+            ip=ip,
+            payment_id=payload.get("payment_id"),
+            status=payload.get("status"),
+        )
+        return WebhookOutcome(success=False, message="Payment not found")
+
+    if payment.status == PaymentStatus.COMPLETED.value:
+        if payment.payment_type == PaymentType.EVENT.value:
+            await registration_service.confirm_registration(payment.external_id)
+            await db.commit()
+            await log_action(
+                action="WEBHOOK_EVENT_PAYMENT_COMPLETED",
+                ip=ip,
+                payment_id=payment.external_id,
+                type="event",
+                amount=str(payment.amount),
+                user_id=str(payment.user_id),
+            )
+        elif payment.payment_type == PaymentType.SUBSCRIPTION.value:
+            with payment_service.unit_of_work():
+                await payment_service.apply_subscription_for_payment(payment)
+            await db.commit()
+            await log_action(
+                action="WEBHOOK_SUBSCRIPTION_PAYMENT_COMPLETED",
+                ip=ip,
+                payment_id=payment.external_id,
+                type="subscription",
+                amount=str(payment.amount),
+                user_id=str(payment.user_id),
+            )
+    else:
+        await db.commit()
+        await log_action(
+            action="WEBHOOK_PAYMENT_STATUS_UPDATED",
+            ip=ip,
+            payment_id=payment.external_id,
+            status=payment.status,
+            type=payment.payment_type,
+            amount=str(payment.amount),
+        )
+
+    return WebhookOutcome(
+        success=True,
+        message=f"Payment {payment.external_id} updated to {payment.status}",
+    )
+
+
+async def enqueue_payment_webhook(
+    db: AsyncSession,
+    payload: dict[str, Any],
+    signature: str | None,
+    ip: str | None = None,
+) -> bool:
+    """Store a webhook in the inbox; False when the same notification is already there."""
+    stmt = (
+        pg_insert(PaymentWebhookInbox)
+        .values(
+            id=str(uuid.uuid4()),
+            external_id=str(payload["payment_id"]),
+            status=str(payload["status"]),
+            payload=json.dumps(payload),
+            signature=signature,
+            source_ip=ip,
+        )
+        .on_conflict_do_nothing(constraint="uq_payment_webhook_inbox_external_status")
+        .returning(PaymentWebhookInbox.id)
+    )
+    stored = (await db.execute(stmt)).first() is not None
+    await db.commit()
+    return stored
+
+
+class PaymentWebhookWorker:
+    """
+    Background task that drains the webhook inbox.
+
+    Polls every ``PAYMENT_WEBHOOK_POLL_SECONDS`` and is woken early by
+    ``wake`` when this process stores a webhook.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        gateway_factory: Callable[[], PaymentGatewayPort] = get_payment_gateway,
+    ) -> None:
+        self._session_factory = session_factory
+        self._gateway_factory = gateway_factory
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._stopping = False
+        self.lag = LatencyStats()
+        self.processing = LatencyStats()
+
+    @property
+    def running(self) -> bool:
+        """Return True while the worker task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop (idempotent)."""
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="payment-webhook-worker")
+
+    def wake(self) -> None:
+        """Process the inbox now instead of at the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Finish the entry in progress and stop; pending rows stay in the inbox."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.wake()
+        await self._task
+        self._task = None
+        self._wakeup = None
+
+    async def _run(self) -> None:
+        poll_seconds = get_settings().payment_webhook_poll_seconds
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                while not self._stopping and await self.process_due() > 0:
+                    pass
+            except Exception:
+                logger.exception("[payment_webhooks] Inbox pass failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def process_due(self, limit: int = _BATCH_SIZE) -> int:
+        """Lease and apply up to ``limit`` due entries; returns how many were leased."""
+        entries = await self._lease(limit)
+        for entry_id in entries:
+            if self._stopping:
+                break
+            await self._process(entry_id)
+        return len(entries)
+
+    async def _lease(self, limit: int) -> list[str]:
+        now = datetime.now(timezone.utc)
+        due = (
+            select(PaymentWebhookInbox.id)
+            .where(
+                PaymentWebhookInbox.state == WebhookInboxState.PENDING.value,
+                PaymentWebhookInbox.available_at <= now,
+            )
+            .order_by(PaymentWebhookInbox.received_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._session_factory() as db:
+            result = await db.execute(
+                update(PaymentWebhookInbox)
+                .where(PaymentWebhookInbox.id.in_(due.scalar_subquery()))
+                .values(available_at=now + _LEASE, attempts=PaymentWebhookInbox.attempts + 1)
+                .returning(PaymentWebhookInbox.id, PaymentWebhookInbox.received_at)
+                .execution_options(synchronize_session=False)
+            )
+            leased = sorted(result.all(), key=lambda row: row.received_at)
+            await db.commit()
+        return [row.id for row in leased]
+
+    async def _process(self, entry_id: str) -> None:
+        started = time.perf_counter()
+        async with self._session_factory() as db:
+            entry = await db.get(PaymentWebhookInbox, entry_id)
+            if entry is None or entry.state != WebhookInboxState.PENDING.value:
+                return
+            payload, signature, ip = json.loads(entry.payload), entry.signature, entry.source_ip
+            received_at, attempts = entry.received_at, entry.attempts
+            try:
+                outcome = await apply_payment_webhook(db, self._gateway_factory(), payload, signature, ip=ip)
+            except Exception as exc:
+                await db.rollback()
+                self.processing.observe(time.perf_counter() - started, ok=False)
+                await self._record_failure(db, entry_id, attempts, exc)
+                return
+            now = datetime.now(timezone.utc)
+            await db.execute(
+                update(PaymentWebhookInbox)
+                .where(PaymentWebhookInbox.id == entry_id)
+                .values(state=WebhookInboxState.PROCESSED.value, processed_at=now, result=outcome.message)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        self.processing.observe(time.perf_counter() - started)
+        self.lag.observe((now - received_at).total_seconds())
+
+    async def _record_failure(self, db: AsyncSession, entry_id: str, attempts: int, exc: Exception) -> None:
+        max_attempts = get_settings().payment_webhook_max_attempts
+        now = datetime.now(timezone.utc)
+        if attempts >= max_attempts:
+            values = {"state": WebhookInboxState.FAILED.value, "processed_at": now}
+            logger.error("[payment_webhooks] Giving up on inbox entry %s after %d attempts", entry_id, attempts)
+        else:
+            backoff = min(2 ** attempts, _MAX_BACKOFF_SECONDS)
+            values = {"available_at": now + timedelta(seconds=backoff)}
+            logger.warning(
+                "[payment_webhooks] Inbox entry %s failed (attempt %d), retrying in %ds",
+                entry_id,
+                attempts,
+                backoff,
+                exc_info=exc,
+            )
+        await db.execute(
+            update(PaymentWebhookInbox)
+            .where(PaymentWebhookInbox.id == entry_id)
+            .values(result=f"{type(exc).__name__}: {exc}"[:1000], **values)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+payment_webhook_worker = PaymentWebhookWorker()
@@ -1,25 +1,38 @@
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Optional
+from typing import Awaitable, Callable, Literal, Optional
 from datetime import datetime, timedelta, date
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 import logging
 
+from config import get_settings
+from database import AsyncSessionLocal
 from models.user import User, UserRole, AccountStatus
 from models.subscription import Subscription
 from models.event import Event
+from models.event_capacity import EventOccurrenceCapacity
 from models.registration import Registration, RegistrationStatus
 from models.registration_refund_task import RegistrationRefundTask
 from models.payment import Currency
 from services.payment_service import PaymentService
 from ports.payment_gateway import PaymentStatus as GatewayPaymentStatus
-from services.google_calendar_service import GoogleCalendarService
+from services.google_calendar_service import BATCH_LIMIT, GoogleCalendarService
 from utils.legacy_ids import legacy_id_eq
+from utils.request_memo import RequestMemo
 
 logger = logging.getLogger(__name__)
 
+SPOT_OCCUPYING_STATUSES = (
+    RegistrationStatus.CONFIRMED.value,
+    RegistrationStatus.PENDING.value,
+    RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value,
+    RegistrationStatus.MANUAL_PAYMENT_VERIFICATION.value,
+)
+
 
 class RegistrationError(Exception):
     """Base exception for registration errors."""
@@ -51,23 +64,71 @@ class AccountNotApprovedError(RegistrationError):
     pass
 
 
+def _occupied_count_query(event_id: str, occurrence_date: date):
+    """Count an occurrence's registrations that hold a spot."""
+    return select(func.count(Registration.id)).where(
+        legacy_id_eq(Registration.event_id, event_id),
+        Registration.occurrence_date == occurrence_date,
+        Registration.status.in_(SPOT_OCCUPYING_STATUSES),
+    )
+
+
+def _capacity_key(event_id: str, occurrence_date: date) -> tuple:
+    return (
+        EventOccurrenceCapacity.event_id == str(event_id),
+        EventOccurrenceCapacity.occurrence_date == occurrence_date,
+    )
+
+
+@dataclass(frozen=True)
+class UserRegistrationContext:
+    """
+    Per-request pricing state for listing one user's registrations.
+
+    Built once by ``RegistrationService.get_user_registration_context`` so a
+    listing resolves the user's subscription status a single time instead of
+    once per registration.
+    """
+
+    is_active_subscriber: bool
+
+    def price_for(self, event: Event) -> Decimal:
+        """Return the price this user pays for the event."""
+        return RegistrationService.price_for_subscriber(event, self.is_active_subscriber)
+
+
 class RegistrationService:
     """
     Service for event registration with concurrency-safe operations.
 
     Uses optimistic locking with version field to prevent race conditions
-    when multiple users try to register for limited spots simultaneously.
+    when multiple users try to register for limited spots simultaneously,
+    or one of the pessimistic per-occurrence allocators selected by
+    ``REGISTRATION_SPOT_ALLOCATION`` (see ``_acquire_spot``).
+
+    Instances are request-scoped: ``memo`` remembers subscriptions, events
+    and registration contexts loaded during the request, so flows such as
+    registration, waitlist promotion and payment approval query each of them
+    once.  Write paths invalidate the keys they change.
     """
 
-    def __init__(self, db: AsyncSession, payment_service: PaymentService):
+    def __init__(
+        self,
+        db: AsyncSession,
+        payment_service: PaymentService,
+        spot_allocation: str | None = None,
+    ):
         """
         Initialize the registration service with database and payment helpers.
 
         The service coordinates registration state, payments, and policy checks
         using the provided async database session and payment service.
+        spot_allocation overrides the configured allocation strategy.
         """
         self.db = db
         self.payment_service = payment_service
+        self.spot_allocation = spot_allocation or get_settings().registration_spot_allocation
+        self.memo = RequestMemo()
 
     def _occupies_spot(self, status: str) -> bool:
         """
@@ -76,12 +137,7 @@ class RegistrationService:
         The method returns True for confirmed, pending, and manual-payment
         states that should count toward capacity.
         """
-        return status in {
-            RegistrationStatus.CONFIRMED.value,
-            RegistrationStatus.PENDING.value,
-            RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value,
-            RegistrationStatus.MANUAL_PAYMENT_VERIFICATION.value,
-        }
+        return status in SPOT_OCCUPYING_STATUSES
 
     def _requires_manual_payment_for_registration(self, event: Event, price: Decimal) -> bool:
         """
@@ -115,14 +171,19 @@ class RegistrationService:
         Load a user's subscription record if available.
 
         The method uses a preloaded relationship when present, otherwise it
-        queries the database to avoid async lazy-loading issues.
+        queries the database (once per request) to avoid async lazy-loading
+        issues.
         """
         if hasattr(user, "__dict__") and "subscription" in user.__dict__:
             return user.subscription
-        result = await self.db.execute(
-            select(Subscription).where(legacy_id_eq(Subscription.user_id, user.id))
-        )
-        return result.scalar_one_or_none()
+
+        async def load() -> Subscription | None:
+            result = await self.db.execute(
+                select(Subscription).where(legacy_id_eq(Subscription.user_id, user.id))
+            )
+            return result.scalar_one_or_none()
+
+        return await self.memo.load("subscription", user.id, load)
 
     async def _is_active_subscriber(self, user: User, now: datetime) -> bool:
         """
@@ -194,19 +255,31 @@ class RegistrationService:
         duration = event.end_date - event.start_date
         return start_dt, start_dt + duration
 
-    async def _resolve_price_for_user(self, user: User, event: Event, now: datetime) -> Decimal:
+    @staticmethod
+    def price_for_subscriber(event: Event, is_active_subscriber: bool) -> Decimal:
         """
-        Resolve the registration price for a user and event.
+        Return the event price for a subscriber or non-subscriber.
 
         Active subscribers pay the member price, while others pay the guest price.
         """
-        if await self._is_active_subscriber(user, now):
+        if is_active_subscriber:
             return Decimal(str(event.price_member))
         return Decimal(str(event.price_guest))
 
-    async def get_cancellation_info(
-        self,
-        user: User,
+    async def _resolve_price_for_user(self, user: User, event: Event, now: datetime) -> Decimal:
+        """
+        Resolve the registration price for a user and event.
+
+        Active subscribers pay the member price, while others pay the guest price.
+        """
+        return self.price_for_subscriber(event, await self._is_active_subscriber(user, now))
+
+    async def get_user_registration_context(self, user: User, now: datetime) -> UserRegistrationContext:
+        """Resolve the user's subscription status once for pricing a list of registrations."""
+        return UserRegistrationContext(is_active_subscriber=await self._is_active_subscriber(user, now))
+
+    @staticmethod
+    def cancellation_info(
         event: Event,
         now: datetime,
         occurrence_start: datetime | None = None,
@@ -214,7 +287,8 @@ class RegistrationService:
         """
         Compute cancellation eligibility for a registration.
 
-        The method evaluates cutoff windows to return UI-friendly cancellation metadata.
+        The cutoff only depends on the event and the occurrence start, so this
+        needs no database access.
         """
         cancel_cutoff_hours = event.cancel_cutoff_hours or 24
         event_start = occurrence_start or event.start_date
@@ -226,22 +300,40 @@ class RegistrationService:
             "can_cancel": can_cancel,
         }
 
+    async def get_cancellation_info(
+        self,
+        user: User,
+        event: Event,
+        now: datetime,
+        occurrence_start: datetime | None = None,
+    ) -> dict:
+        """
+        Compute cancellation eligibility for a registration.
+
+        The method evaluates cutoff windows to return UI-friendly cancellation metadata.
+        """
+        return self.cancellation_info(event, now, occurrence_start)
+
     async def get_event_with_registrations(self, event_id: str) -> Event | None:
         """
         Load an event with its registrations and related user data.
 
         The query uses eager loading to avoid async lazy-loading issues and
-        returns None when the event is missing.
-        """
-        stmt = (
-            select(Event)
-            .options(joinedload(Event.registrations).joinedload(Registration.user))
-            .where(legacy_id_eq(Event.id, event_id))
-        )
-        result = await self.db.execute(stmt)
-        if hasattr(result, "unique"):
-            result = result.unique()
-        return result.scalar_one_or_none()
+        returns None when the event is missing.  The event is memoised until a
+        registration write for it invalidates the key.
+        """
+        async def load() -> Event | None:
+            stmt = (
+                select(Event)
+                .options(joinedload(Event.registrations).joinedload(Registration.user))
+                .where(legacy_id_eq(Event.id, event_id))
+            )
+            result = await self.db.execute(stmt)
+            if hasattr(result, "unique"):
+                result = result.unique()
+            return result.scalar_one_or_none()
+
+        return await self.memo.load("event", event_id, load)
 
     async def _get_participants_by_status(
         self,
@@ -487,6 +579,94 @@ class RegistrationService:
         result = await self.db.execute(stmt)
         return result.rowcount > 0
 
+    async def _acquire_spot(self, event: Event, occurrence_date: date) -> bool:
+        """
+        Claim a spot on an occurrence with the configured allocation strategy.
+
+        Returns False when the occurrence turned out to be full.  The
+        optimistic strategy raises ConcurrencyError when another registration
+        changed the event since it was loaded; the row_lock and counter
+        strategies make concurrent registrants wait for each other instead.
+        """
+        if self.spot_allocation == "optimistic":
+            if not await self._acquire_spot_with_optimistic_lock(event.id, event.version):
+                raise ConcurrencyError("Concurrent modification detected")
+            return True
+        return await self._reserve_capacity(event, occurrence_date)
+
+    async def _count_occupied(self, event_id: str, occurrence_date: date) -> int:
+        result = await self.db.execute(_occupied_count_query(event_id, occurrence_date))
+        return int(result.scalar_one() or 0)
+
+    async def _seed_capacity_row(self, event_id: str, occurrence_date: date) -> None:
+        """Create the occurrence's capacity row from its current registrations."""
+        await self.db.execute(
+            pg_insert(EventOccurrenceCapacity)
+            .values(
+                event_id=str(event_id),
+                occurrence_date=occurrence_date,
+                occupied=_occupied_count_query(event_id, occurrence_date).scalar_subquery(),
+            )
+            .on_conflict_do_nothing()
+        )
+
+    async def _reserve_capacity(self, event: Event, occurrence_date: date) -> bool:
+        """
+        Claim a spot on the occurrence's capacity row.
+
+        row_lock locks the row with SELECT ... FOR UPDATE and recounts the
+        occupying registrations; counter increments ``occupied`` with one
+        conditional UPDATE.  Either way the row stays locked until the caller
+        commits, so the next registrant sees this registration.  Events
+        without a participant limit need no claim.
+        """
+        if not event.max_participants:
+            return True
+        key = _capacity_key(event.id, occurrence_date)
+        if self.spot_allocation == "counter":
+            claim = (
+                update(EventOccurrenceCapacity)
+                .where(*key, EventOccurrenceCapacity.occupied < event.max_participants)
+                .values(occupied=EventOccurrenceCapacity.occupied + 1)
+                .returning(EventOccurrenceCapacity.occupied)
+                .execution_options(synchronize_session=False)
+            )
+            if (await self.db.execute(claim)).first() is not None:
+                return True
+            if await self.db.scalar(select(EventOccurrenceCapacity.occupied).where(*key)) is not None:
+                return False
+            # First registrant for the occurrence; a concurrent one may seed the
+            # row too, and the claim then waits for whichever insert won.
+            await self._seed_capacity_row(event.id, occurrence_date)
+            return (await self.db.execute(claim)).first() is not None
+
+        lock = select(EventOccurrenceCapacity.occupied).where(*key).with_for_update()
+        if (await self.db.execute(lock)).first() is None:
+            await self._seed_capacity_row(event.id, occurrence_date)
+            await self.db.execute(lock)
+        # A new statement after the lock sees every committed claim.
+        occupied = await self._count_occupied(event.id, occurrence_date)
+        if occupied >= event.max_participants:
+            return False
+        await self.db.execute(
+            update(EventOccurrenceCapacity)
+            .where(*key)
+            .values(occupied=occupied + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return True
+
+    async def _release_spot(self, event_id: str, occurrence_date: date) -> None:
+        """Return a spot to the occurrence's capacity row after a cancellation."""
+        if self.spot_allocation == "optimistic":
+            return
+        await self.db.execute(
+            update(EventOccurrenceCapacity)
+            .where(*_capacity_key(event_id, occurrence_date))
+            .values(occupied=func.greatest(EventOccurrenceCapacity.occupied - 1, 0))
+            .execution_options(synchronize_session=False)
+        )
+
     async def initiate_registration(
         self,
         user: User,
@@ -518,7 +698,13 @@ class RegistrationService:
                 if attempt == max_retries - 1:
                     raise
                 await self.db.rollback()
+                # The retry must see the registrations and version that won;
+                # the rollback also expired the caller's user.
+                self.memo.clear()
+                await self.db.refresh(user)
                 continue
+            finally:
+                self.memo.invalidate("event", event_id)
 
         raise ConcurrencyError("Failed to register after multiple attempts")
 
@@ -605,53 +791,11 @@ class RegistrationService:
         ])
 
         if event.max_participants and occupied_count >= event.max_participants:
-            if existing and existing.status == RegistrationStatus.WAITLIST.value:
-                await self.db.refresh(existing)
-                return {
-                    "registration_id": str(existing.id),
-                    "status": RegistrationStatus.WAITLIST.value,
-                    "is_waitlisted": True,
-                    "is_free": True,
-                    "redirect_url": None,
-                    "occurrence_date": resolved_occurrence_date.isoformat(),
-                }
-
-            if existing and existing.status in [
-                RegistrationStatus.CANCELLED.value,
-                RegistrationStatus.REFUNDED.value,
-            ]:
-                registration = existing
-                registration.status = RegistrationStatus.WAITLIST.value
-                registration.payment_id = None
-                registration.manual_payment_confirmed_at = None
-                registration.promoted_from_waitlist_at = None
-                registration.manual_payment_due_at = None
-                registration.waitlist_notification_sent = False
-                registration.waitlist_notified_at = None
-            else:
-                registration = Registration(
-                    user=user,
-                    event=event,
-                    occurrence_date=resolved_occurrence_date,
-                    status=RegistrationStatus.WAITLIST.value,
-                )
-                self.db.add(registration)
-
-            await self.db.commit()
-            await self.db.refresh(registration)
-
-            return {
-                "registration_id": str(registration.id),
-                "status": RegistrationStatus.WAITLIST.value,
-                "is_waitlisted": True,
-                "is_free": True,
-                "redirect_url": None,
-                "occurrence_date": resolved_occurrence_date.isoformat(),
-            }
+            return await self._join_waitlist(user, event, existing, resolved_occurrence_date)
 
-        current_version = event.version
-        if not await self._acquire_spot_with_optimistic_lock(event_id, current_version):
-            raise ConcurrencyError("Concurrent modification detected")
+        if not await self._acquire_spot(event, resolved_occurrence_date):
+            # Concurrent registrants took the remaining spots since the event was loaded.
+            return await self._join_waitlist(user, event, existing, resolved_occurrence_date)
 
         pending_status = (
             RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value
@@ -721,14 +865,16 @@ class RegistrationService:
                 "occurrence_date": resolved_occurrence_date.isoformat(),
             }
 
-        payment, payment_result = await self.payment_service.create_event_payment(
-            user=user,
-            event_id=event_id,
-            amount=price,
-            description=f"Rejestracja: {event.title}",
-            return_url=return_url,
-            cancel_url=cancel_url,
-        )
+        # The payment row is committed together with the registration below.
+        with self.payment_service.unit_of_work():
+            payment, payment_result = await self.payment_service.create_event_payment(
+                user=user,
+                event_id=event_id,
+                amount=price,
+                description=f"Rejestracja: {event.title}",
+                return_url=return_url,
+                cancel_url=cancel_url,
+            )
 
         registration.payment_id = payment_result.payment_id
         if payment_result.status == GatewayPaymentStatus.COMPLETED:
@@ -763,6 +909,65 @@ class RegistrationService:
             "occurrence_date": resolved_occurrence_date.isoformat(),
         }
 
+    async def _join_waitlist(
+        self,
+        user: User,
+        event: Event,
+        existing: Registration | None,
+        occurrence_date: date,
+    ) -> dict:
+        """
+        Put the user on the occurrence's waitlist when it is full.
+
+        Reuses a cancelled or refunded registration, and leaves an existing
+        waitlist entry unchanged.
+        """
+        if existing and existing.status == RegistrationStatus.WAITLIST.value:
+            # Ends the transaction so a capacity row lock is not held.
+            await self.db.commit()
+            await self.db.refresh(existing)
+            return {
+                "registration_id": str(existing.id),
+                "status": RegistrationStatus.WAITLIST.value,
+                "is_waitlisted": True,
+                "is_free": True,
+                "redirect_url": None,
+                "occurrence_date": occurrence_date.isoformat(),
+            }
+
+        if existing and existing.status in [
+            RegistrationStatus.CANCELLED.value,
+            RegistrationStatus.REFUNDED.value,
+        ]:
+            registration = existing
+            registration.status = RegistrationStatus.WAITLIST.value
+            registration.payment_id = None
+            registration.manual_payment_confirmed_at = None
+            registration.promoted_from_waitlist_at = None
+            registration.manual_payment_due_at = None
+            registration.waitlist_notification_sent = False
+            registration.waitlist_notified_at = None
+        else:
+            registration = Registration(
+                user=user,
+                event=event,
+                occurrence_date=occurrence_date,
+                status=RegistrationStatus.WAITLIST.value,
+            )
+            self.db.add(registration)
+
+        await self.db.commit()
+        await self.db.refresh(registration)
+
+        return {
+            "registration_id": str(registration.id),
+            "status": RegistrationStatus.WAITLIST.value,
+            "is_waitlisted": True,
+            "is_free": True,
+            "redirect_url": None,
+            "occurrence_date": occurrence_date.isoformat(),
+        }
+
     async def _promote_next_waitlisted_registration(self, event: Event, occurrence_date: date) -> None:
         """
         Promote the oldest waitlisted registration when a spot opens up.
@@ -773,21 +978,7 @@ class RegistrationService:
         if not event.max_participants:
             return
 
-        occupied_count_result = await self.db.execute(
-            select(func.count(Registration.id)).where(
-                legacy_id_eq(Registration.event_id, event.id),
-                Registration.occurrence_date == occurrence_date,
-                Registration.status.in_(
-                    [
-                        RegistrationStatus.CONFIRMED.value,
-                        RegistrationStatus.PENDING.value,
-                        RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value,
-                        RegistrationStatus.MANUAL_PAYMENT_VERIFICATION.value,
-                    ]
-                ),
-            )
-        )
-        occupied_count = int(occupied_count_result.scalar_one() or 0)
+        occupied_count = await self._count_occupied(event.id, occurrence_date)
         if occupied_count >= event.max_participants:
             return
 
@@ -805,12 +996,23 @@ class RegistrationService:
         next_waitlisted = waitlist_result.scalar_one_or_none()
         if not next_waitlisted or not next_waitlisted.user:
             return
+        self.memo.prime("registration", next_waitlisted.id, next_waitlisted)
 
         occurrence_start_dt, _ = self.get_occurrence_datetimes(event, occurrence_date)
         now = datetime.now(occurrence_start_dt.tzinfo) if occurrence_start_dt.tzinfo else datetime.now()
         price = await self._resolve_price_for_user(next_waitlisted.user, event, now)
 
-        if price > 0 and self._requires_manual_payment_for_registration(event, price):
+        manual_payment_mode = self._requires_manual_payment_for_registration(event, price)
+        paid_waitlist_without_gateway = price > 0 and not manual_payment_mode
+        if paid_waitlist_without_gateway:
+            return
+
+        if self.spot_allocation != "optimistic" and not await self._reserve_capacity(event, occurrence_date):
+            # A concurrent registrant took the spot; release the capacity row lock.
+            await self.db.commit()
+            return
+
+        if manual_payment_mode:
             next_waitlisted.status = RegistrationStatus.MANUAL_PAYMENT_REQUIRED.value
             next_waitlisted.payment_id = None
             next_waitlisted.manual_payment_confirmed_at = None
@@ -820,10 +1022,7 @@ class RegistrationService:
             next_waitlisted.waitlist_notified_at = None
             self.db.add(next_waitlisted)
             await self.db.commit()
-            return
-
-        paid_waitlist_without_gateway = price > 0 and not self._requires_manual_payment_for_registration(event, price)
-        if paid_waitlist_without_gateway:
+            self.memo.invalidate("event", event.id)
             return
 
         next_waitlisted.status = RegistrationStatus.CONFIRMED.value
@@ -834,6 +1033,7 @@ class RegistrationService:
         self.db.add(next_waitlisted)
         waitlisted_user = next_waitlisted.user
         await self.db.commit()
+        self.memo.invalidate("event", event.id)
         await self.db.refresh(next_waitlisted)
         await self._apply_points_for_event(waitlisted_user, event)
         await self._maybe_add_to_google_calendar(next_waitlisted)
@@ -960,15 +1160,16 @@ class RegistrationService:
 
         payment_external_id = registration.payment_id
         if not payment_external_id:
-            payment = await self.payment_service.create_manual_event_payment(
-                user=registration.user,
-                event_id=str(registration.event_id),
-                registration_id=str(registration.id),
-                amount=amount,
-                description=f"Manualna płatność: {registration.event.title}",
-                transfer_reference=self._transfer_reference_for_event(registration.event),
-                declared_at=now,
-            )
+            with self.payment_service.unit_of_work():
+                payment = await self.payment_service.create_manual_event_payment(
+                    user=registration.user,
+                    event_id=str(registration.event_id),
+                    registration_id=str(registration.id),
+                    amount=amount,
+                    description=f"Manualna płatność: {registration.event.title}",
+                    transfer_reference=self._transfer_reference_for_event(registration.event),
+                    declared_at=now,
+                )
             payment_external_id = payment.external_id
 
         registration.payment_id = payment_external_id
@@ -976,6 +1177,7 @@ class RegistrationService:
         registration.manual_payment_confirmed_at = now
         self.db.add(registration)
         await self.db.commit()
+        self.memo.invalidate("event", registration.event_id)
         await self.db.refresh(registration)
         return await self._manual_payment_details_from_registration(registration)
 
@@ -998,33 +1200,37 @@ class RegistrationService:
         registration = result.scalar_one_or_none()
         if not registration:
             return None
+        self.memo.prime("registration", registration.id, registration)
         if registration.status != RegistrationStatus.MANUAL_PAYMENT_VERIFICATION.value:
             raise RegistrationError("Registration is not awaiting manual payment verification")
         if not registration.event or not registration.user:
             raise RegistrationError("Registration context is incomplete")
 
-        if not registration.payment_id:
-            occurrence_start_dt, _ = self.get_occurrence_datetimes(registration.event, registration.occurrence_date)
-            now = datetime.now(occurrence_start_dt.tzinfo) if occurrence_start_dt.tzinfo else datetime.now()
-            amount = await self._resolve_price_for_user(registration.user, registration.event, now)
-            payment = await self.payment_service.create_manual_event_payment(
-                user=registration.user,
-                event_id=str(registration.event_id),
-                registration_id=str(registration.id),
-                amount=amount,
-                description=f"Manualna płatność: {registration.event.title}",
-                transfer_reference=self._transfer_reference_for_event(registration.event),
-                declared_at=registration.manual_payment_confirmed_at or now,
-            )
-            registration.payment_id = payment.external_id
+        # Payment changes are committed together with the registration below.
+        with self.payment_service.unit_of_work():
+            if not registration.payment_id:
+                occurrence_start_dt, _ = self.get_occurrence_datetimes(registration.event, registration.occurrence_date)
+                now = datetime.now(occurrence_start_dt.tzinfo) if occurrence_start_dt.tzinfo else datetime.now()
+                amount = await self._resolve_price_for_user(registration.user, registration.event, now)
+                payment = await self.payment_service.create_manual_event_payment(
+                    user=registration.user,
+                    event_id=str(registration.event_id),
+                    registration_id=str(registration.id),
+                    amount=amount,
+                    description=f"Manualna płatność: {registration.event.title}",
+                    transfer_reference=self._transfer_reference_for_event(registration.event),
+                    declared_at=registration.manual_payment_confirmed_at or now,
+                )
+                registration.payment_id = payment.external_id
 
-        await self.payment_service.mark_manual_event_payment_completed(registration.payment_id)
+            await self.payment_service.mark_manual_event_payment_completed(registration.payment_id)
 
         registration.status = RegistrationStatus.CONFIRMED.value
         self.db.add(registration)
         reg_user = registration.user
         reg_event = registration.event
         await self.db.commit()
+        self.memo.invalidate("event", registration.event_id)
         await self.db.refresh(registration)
         await self._apply_points_for_event(reg_user, reg_event)
         await self._maybe_add_to_google_calendar(registration)
@@ -1086,10 +1292,12 @@ class RegistrationService:
         if registration:
             if registration.user and registration.user.account_status != AccountStatus.ACTIVE:
                 return registration
+            self.memo.prime("registration", registration.id, registration)
             reg_user = registration.user
             reg_event = registration.event
             registration.status = RegistrationStatus.CONFIRMED.value
             await self.db.commit()
+            self.memo.invalidate("event", registration.event_id)
             await self.db.refresh(registration)
             await self._apply_points_for_event(reg_user, reg_event)
             await self._maybe_add_to_google_calendar(registration)
@@ -1115,25 +1323,29 @@ class RegistrationService:
         self.db.add(subscription)
         await self.db.commit()
         await self.db.refresh(subscription)
+        self.memo.prime("subscription", user.id, subscription)
 
     async def _maybe_add_to_google_calendar(self, registration: Registration) -> None:
         """
         Add a confirmed registration to Google Calendar when eligible.
 
-        The method eagerly loads user/event relationships, skips when the user
-        lacks a refresh token, creates a calendar event via Google API, and
-        stores the resulting event ID.
+        The method eagerly loads user/event relationships unless the request
+        already has them, skips when the user lacks a refresh token, creates a
+        calendar event via Google API, and stores the resulting event ID.
         """
         if not registration or registration.calendar_event_id:
             return
 
-        stmt = (
-            select(Registration)
-            .options(joinedload(Registration.user), joinedload(Registration.event))
-            .where(Registration.id == registration.id)
-        )
-        result = await self.db.execute(stmt)
-        reg = result.scalar_one_or_none()
+        async def load() -> Registration | None:
+            stmt = (
+                select(Registration)
+                .options(joinedload(Registration.user), joinedload(Registration.event))
+                .where(Registration.id == registration.id)
+            )
+            result = await self.db.execute(stmt)
+            return result.scalar_one_or_none()
+
+        reg = await self.memo.load("registration", registration.id, load)
         if not reg or not reg.user or not reg.event:
             logger.warning("GCal: registration %s missing user or event", registration.id)
             return
@@ -1161,16 +1373,22 @@ class RegistrationService:
         await self.db.commit()
         await self.db.refresh(registration)
 
-    async def sync_existing_registrations_to_calendar(self, user: User) -> int:
+    async def sync_existing_registrations_to_calendar(
+        self,
+        user: User,
+        on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+    ) -> int:
         """
         Retroactively add confirmed future registrations to Google Calendar.
 
-        Called immediately after a user grants Google Calendar access so that
-        registrations made before the grant are synced.  Only confirmed
-        registrations for future occurrences that do not yet have a
-        calendar_event_id are processed.
+        Runs on the calendar sync worker after a user grants Google Calendar
+        access so that registrations made before the grant are synced.  Only
+        confirmed registrations for future occurrences that do not yet have a
+        calendar_event_id are processed.  Inserts go to Google in batches of
+        up to ``BATCH_LIMIT`` and each batch is committed before
+        ``on_progress(done, total)`` is awaited.
 
-        Returns the number of registrations submitted to the calendar API.
+        Returns the number of registrations added to the calendar.
         """
         if not user.google_refresh_token:
             return 0
@@ -1178,29 +1396,45 @@ class RegistrationService:
         today = datetime.utcnow().date()
         stmt = (
             select(Registration)
+            .options(joinedload(Registration.event))
             .where(
                 Registration.user_id == str(user.id),
                 Registration.status == RegistrationStatus.CONFIRMED.value,
                 Registration.calendar_event_id.is_(None),
                 Registration.occurrence_date >= today,
             )
+            .order_by(Registration.occurrence_date)
         )
         result = await self.db.execute(stmt)
-        registrations = result.scalars().all()
+        registrations = [reg for reg in result.scalars().all() if reg.event is not None]
+        total = len(registrations)
+        if on_progress is not None:
+            await on_progress(0, total)
+        if not registrations:
+            return 0
 
+        service = GoogleCalendarService()
         synced = 0
-        for reg in registrations:
+        for offset in range(0, total, BATCH_LIMIT):
+            chunk = registrations[offset:offset + BATCH_LIMIT]
             try:
-                await self._maybe_add_to_google_calendar(reg)
-                synced += 1
-            except Exception:
-                logger.exception(
-                    "GCal retroactive sync: failed for registration %s", reg.id
+                calendar_ids = await service.create_events(
+                    user, [(reg.event, reg.occurrence_date) for reg in chunk]
                 )
+            except Exception:
+                logger.exception("GCal retroactive sync: batch failed for user %s", user.id)
+                calendar_ids = [None] * len(chunk)
+            for reg, calendar_event_id in zip(chunk, calendar_ids):
+                if calendar_event_id:
+                    reg.calendar_event_id = calendar_event_id
+                    synced += 1
+            await self.db.commit()
+            if on_progress is not None:
+                await on_progress(offset + len(chunk), total)
         logger.info(
             "GCal retroactive sync: synced %d/%d registrations for user %s",
             synced,
-            len(registrations),
+            total,
             user.id,
         )
         return synced
@@ -1272,8 +1506,11 @@ class RegistrationService:
                 task.should_refund = True
                 task.refund_marked_paid = True
 
+        if self._occupies_spot(previous_status):
+            await self._release_spot(event.id, registration.occurrence_date)
         self.db.add(task)
         await self.db.commit()
+        self.memo.invalidate("event", event.id)
         if self._occupies_spot(previous_status):
             await self._promote_next_waitlisted_registration(event, registration.occurrence_date)
 
@@ -1303,3 +1540,78 @@ class RegistrationService:
         )
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
+
+    async def get_user_registrations_page(
+        self,
+        user_id: str,
+        *,
+        scope: Literal["upcoming", "past"],
+        today: date,
+        limit: int,
+        after: tuple[date, str] | None = None,
+    ) -> list[Registration]:
+        """
+        Return one keyset page of a user's upcoming or past registrations.
+
+        Upcoming registrations (occurring today or later) are ordered soonest
+        first, past ones most recent first; ``after`` is the
+        ``(occurrence_date, id)`` of the last registration of the previous page.
+        """
+        key = tuple_(Registration.occurrence_date, Registration.id)
+        conditions = [legacy_id_eq(Registration.user_id, user_id)]
+        if scope == "upcoming":
+            conditions.append(Registration.occurrence_date >= today)
+            if after is not None:
+                conditions.append(key > tuple_(*after))
+            order = (Registration.occurrence_date.asc(), Registration.id.asc())
+        else:
+            conditions.append(Registration.occurrence_date < today)
+            if after is not None:
+                conditions.append(key < tuple_(*after))
+            order = (Registration.occurrence_date.desc(), Registration.id.desc())
+        stmt = (
+            select(Registration)
+            .options(joinedload(Registration.event))
+            .where(*conditions)
+            .order_by(*order)
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def resync_spot_counters(db: AsyncSession | None = None) -> int:
+    """
+    Recount ``occupied`` on the capacity rows of upcoming occurrences.
+
+    The optimistic strategy does not maintain the counter, so rows left from
+    an earlier counter or row_lock period can be stale; startup runs this
+    when the counter strategy is configured.  Each row is locked while it is
+    recounted, so claims in flight are not lost.  Returns the rows updated.
+    """
+    if db is None:
+        async with AsyncSessionLocal() as session:
+            return await resync_spot_counters(session)
+    today = datetime.utcnow().date()
+    result = await db.execute(
+        select(EventOccurrenceCapacity.event_id, EventOccurrenceCapacity.occurrence_date)
+        .where(EventOccurrenceCapacity.occurrence_date >= today)
+    )
+    keys = result.all()
+    updated = 0
+    for event_id, occurrence_date in keys:
+        key = _capacity_key(event_id, occurrence_date)
+        locked = await db.execute(select(EventOccurrenceCapacity.occupied).where(*key).with_for_update())
+        current = locked.scalar_one_or_none()
+        if current is not None:
+            occupied = int((await db.execute(_occupied_count_query(event_id, occurrence_date))).scalar_one())
+            if occupied != current:
+                await db.execute(
+                    update(EventOccurrenceCapacity)
+                    .where(*key)
+                    .values(occupied=occupied)
+                    .execution_options(synchronize_session=False)
+                )
+                updated += 1
+        await db.commit()
+    return updated
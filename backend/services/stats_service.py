@@ -0,0 +1,412 @@
+"""
+Precomputed summaries behind the admin stats endpoints.
+
+The ``/admin/stats/*`` endpoints used to aggregate all of ``payments`` and
+``registrations`` on every dashboard load.  They now read the small summary
+tables in ``models.stats_summary`` instead, which this module maintains:
+
+- **Buckets** – payments are summed per UTC creation day (and per event for
+  payments linked to a registration), registrations per occurrence date and
+  event, distinct users/events per occurrence month, and payment and
+  attendance totals per user.  Every bucket is recomputed from the source
+  rows, never adjusted by deltas, so a refresh can be repeated safely.
+- **Incremental refresh** – ``stats_refresh_state`` keeps a watermark.  A
+  refresh finds payments and registrations created or updated since the
+  watermark and recomputes only the buckets they touch: their payment days,
+  their events' registration and revenue rows, the months those events
+  occur in and their users.  The new watermark is the start of the oldest
+  transaction still open (at most ``_MAX_TRANSACTION_LAG`` back), so rows
+  stamped by a transaction that commits after the refresh are picked up by
+  the next one.
+- **Freshness** – ``ensure_stats_fresh`` runs before every stats read.  It
+  costs four index probes when nothing changed and an incremental refresh
+  otherwise, and returns the watermark, which the endpoints report as the
+  time their numbers are current to.  A coordinated job refreshes every
+  ``STATS_REFRESH_INTERVAL_SECONDS`` so reads rarely do the work, and a
+  nightly full rebuild repairs what timestamps cannot reveal (rows deleted
+  or re-dated by hand).
+
+Refreshes serialise on a PostgreSQL transaction-level advisory lock.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Iterable
+
+from sqlalchemy import Date, and_, case, cast, delete, exists, func, insert, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.payment import Payment, PaymentStatus
+from models.registration import Registration, RegistrationStatus
+from models.stats_summary import (
+    EventPaymentDailyStats,
+    PaymentDailyStats,
+    RegistrationDailyStats,
+    RegistrationMonthlyStats,
+    StatsRefreshState,
+    UserStats,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "admin_stats"
+_LOCK_SQL = text("SELECT pg_advisory_xact_lock(hashtext('kenaz-admin-stats'))")
+# Rows stamped by a transaction open longer than this are left to the nightly rebuild.
+_MAX_TRANSACTION_LAG = timedelta(hours=1)
+_WATERMARK_SQL = text(
+    """
+    SELECT greatest(
+        least(clock_timestamp(), coalesce(min(xact_start), clock_timestamp())),
+        clock_timestamp() - CAST(:max_lag AS interval)
+    )
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+    """
+)
+
+_PAYMENT_STATUS = func.coalesce(Payment.status, PaymentStatus.PENDING.value)
+_REGISTRATION_STATUS = func.coalesce(Registration.status, RegistrationStatus.PENDING.value)
+_OCCURRENCE_MONTH = func.to_char(Registration.occurrence_date, "YYYY-MM")
+
+
+def _utc_day(column):
+    return cast(func.timezone("UTC", column), Date)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _on_days(column, days: Iterable[date]):
+    """Range filter matching timestamps on any of the given UTC days."""
+    return or_(*(
+        and_(column >= _day_start(day), column < _day_start(day + timedelta(days=1)))
+        for day in days
+    ))
+
+
+def month_bounds(month: str) -> tuple[date, date]:
+    """Return the first and last day of a YYYY-MM month."""
+    first = datetime.strptime(month, "%Y-%m").date()
+    following = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, following - timedelta(days=1)
+
+
+def plan_code_from_extra(extra_data: str | None) -> str:
+    """Return the subscription plan code stored in a payment's extra_data JSON."""
+    if extra_data:
+        try:
+            parsed = json.loads(extra_data)
+        except (TypeError, json.JSONDecodeError):
+            return "unknown"
+        if isinstance(parsed, dict):
+            return str(parsed.get("plan_code", "unknown"))
+    return "unknown"
+
+
+async def _rebuild_payment_days(db: AsyncSession, days: set[date] | None) -> None:
+    """Recompute stats_payment_daily for the given UTC days (all days when None)."""
+    day = _utc_day(Payment.created_at)
+    # Only subscription payments carry a plan; event payments group without extra_data.
+    extra = case((Payment.payment_type == "subscription", Payment.extra_data))
+    query = (
+        select(
+            day,
+            Payment.payment_type,
+            _PAYMENT_STATUS,
+            extra,
+            func.count(Payment.id),
+            func.coalesce(func.sum(Payment.amount), 0),
+        )
+        .where(Payment.created_at.is_not(None))
+        .group_by(day, Payment.payment_type, _PAYMENT_STATUS, extra)
+    )
+    clear = delete(PaymentDailyStats)
+    if days is not None:
+        query = query.where(_on_days(Payment.created_at, days))
+        clear = clear.where(PaymentDailyStats.day.in_(days))
+
+    buckets: dict[tuple, list] = defaultdict(lambda: [0, Decimal("0")])
+    for bucket_day, payment_type, status, extra_data, count, amount in (await db.execute(query)).all():
+        plan_code = plan_code_from_extra(extra_data) if payment_type == "subscription" else ""
+        bucket = buckets[(bucket_day, payment_type, status, plan_code)]
+        bucket[0] += int(count)
+        bucket[1] += Decimal(str(amount))
+
+    await db.execute(clear)
+    if buckets:
+        await db.execute(insert(PaymentDailyStats), [
+            {
+                "day": bucket_day,
+                "payment_type": payment_type,
+                "status": status,
+                "plan_code": plan_code,
+                "count": count,
+                "amount": amount,
+            }
+            for (bucket_day, payment_type, status, plan_code), (count, amount) in buckets.items()
+        ])
+
+
+async def _rebuild_event_payments(
+    db: AsyncSession, days: set[date] | None, event_ids: set[str] | None
+) -> None:
+    """
+    Recompute stats_event_payment_daily for the given days and events.
+
+    A registration may be relinked to another payment, so the rows of every
+    event with a changed registration are recomputed in full; changed
+    payments are covered by their day.  Both None means all rows.
+    """
+    day = _utc_day(Payment.created_at)
+    query = (
+        select(
+            day,
+            Registration.event_id,
+            Payment.payment_type,
+            _PAYMENT_STATUS,
+            func.count(Payment.id),
+            func.coalesce(func.sum(Payment.amount), 0),
+        )
+        .join(Registration, Payment.external_id == Registration.payment_id)
+        .where(Payment.created_at.is_not(None))
+        .group_by(day, Registration.event_id, Payment.payment_type, _PAYMENT_STATUS)
+    )
+    clear = delete(EventPaymentDailyStats)
+    if days is not None or event_ids is not None:
+        days, event_ids = days or set(), event_ids or set()
+        if not days and not event_ids:
+            return
+        query = query.where(or_(
+            Registration.event_id.in_(event_ids),
+            *([_on_days(Payment.created_at, days)] if days else []),
+        ))
+        clear = clear.where(or_(
+            EventPaymentDailyStats.day.in_(days),
+            EventPaymentDailyStats.event_id.in_(event_ids),
+        ))
+    await db.execute(clear)
+    await db.execute(
+        insert(EventPaymentDailyStats).from_select(
+            ["day", "event_id", "payment_type", "status", "count", "amount"], query
+        )
+    )
+
+
+async def _rebuild_registrations(db: AsyncSession, event_ids: set[str] | None) -> set[str] | None:
+    """
+    Recompute stats_registration_daily for the given events (all when None).
+
+    Returns the occurrence months the events had before or have after the
+    refresh, whose distinct counts need recomputing too.
+    """
+    query = (
+        select(
+            Registration.occurrence_date,
+            Registration.event_id,
+            _REGISTRATION_STATUS,
+            func.count(Registration.id),
+        )
+        .group_by(Registration.occurrence_date, Registration.event_id, _REGISTRATION_STATUS)
+    )
+    clear = delete(RegistrationDailyStats)
+    months = None
+    if event_ids is not None:
+        if not event_ids:
+            return set()
+        query = query.where(Registration.event_id.in_(event_ids))
+        clear = clear.where(RegistrationDailyStats.event_id.in_(event_ids))
+        previous = await db.execute(
+            select(func.to_char(RegistrationDailyStats.occurrence_date, "YYYY-MM"))
+            .where(RegistrationDailyStats.event_id.in_(event_ids))
+            .distinct()
+        )
+        current = await db.execute(
+            select(_OCCURRENCE_MONTH).where(Registration.event_id.in_(event_ids)).distinct()
+        )
+        months = set(previous.scalars()) | set(current.scalars())
+    await db.execute(clear)
+    await db.execute(
+        insert(RegistrationDailyStats).from_select(["occurrence_date", "event_id", "status", "count"], query)
+    )
+    return months
+
+
+async def _rebuild_months(db: AsyncSession, months: set[str] | None) -> None:
+    """Recompute stats_registration_monthly for the given YYYY-MM months (all when None)."""
+    query = (
+        select(
+            _OCCURRENCE_MONTH,
+            func.count(func.distinct(Registration.user_id)),
+            func.count(func.distinct(Registration.event_id)),
+        )
+        .group_by(_OCCURRENCE_MONTH)
+    )
+    clear = delete(RegistrationMonthlyStats)
+    if months is not None:
+        if not months:
+            return
+        query = query.where(or_(*(
+            Registration.occurrence_date.between(*month_bounds(month)) for month in months
+        )))
+        clear = clear.where(RegistrationMonthlyStats.month.in_(months))
+    await db.execute(clear)
+    await db.execute(
+        insert(RegistrationMonthlyStats).from_select(["month", "unique_users", "unique_events"], query)
+    )
+
+
+async def _rebuild_users(db: AsyncSession, user_ids: set[str] | None) -> None:
+    """Recompute stats_user for the given users (all when None)."""
+    completed = Payment.status == PaymentStatus.COMPLETED.value
+    payments = (
+        select(
+            Payment.user_id,
+            func.coalesce(func.sum(Payment.amount).filter(completed), 0),
+            func.max(Payment.completed_at).filter(completed),
+        )
+        .group_by(Payment.user_id)
+    )
+    registrations = (
+        select(
+            Registration.user_id,
+            func.count(Registration.id).filter(Registration.status == RegistrationStatus.CONFIRMED.value),
+            func.count(Registration.id),
+        )
+        .group_by(Registration.user_id)
+    )
+    clear = delete(UserStats)
+    if user_ids is not None:
+        if not user_ids:
+            return
+        payments = payments.where(Payment.user_id.in_(user_ids))
+        registrations = registrations.where(Registration.user_id.in_(user_ids))
+        clear = clear.where(UserStats.user_id.in_(user_ids))
+
+    rows: dict[str, dict] = {}
+    for user_id, total_paid, last_payment_at in (await db.execute(payments)).all():
+        rows[user_id] = {
+            "user_id": user_id,
+            "total_paid": Decimal(str(total_paid)),
+            "last_payment_at": last_payment_at,
+            "event_count": 0,
+            "registration_count": 0,
+        }
+    for user_id, event_count, registration_count in (await db.execute(registrations)).all():
+        row = rows.setdefault(user_id, {
+            "user_id": user_id,
+            "total_paid": Decimal("0"),
+            "last_payment_at": None,
+        })
+        row["event_count"] = int(event_count)
+        row["registration_count"] = int(registration_count)
+
+    await db.execute(clear)
+    if rows:
+        await db.execute(insert(UserStats), list(rows.values()))
+
+
+async def _changed_since(db: AsyncSession, since: datetime) -> tuple[set[date], set[str], set[str]]:
+    """Return the payment days, event ids and user ids touched by rows changed since a watermark."""
+    payment_rows = await db.execute(
+        select(_utc_day(Payment.created_at), Payment.user_id)
+        .where(or_(Payment.created_at >= since, Payment.updated_at >= since))
+        .distinct()
+    )
+    days: set[date] = set()
+    user_ids: set[str] = set()
+    for day, user_id in payment_rows.all():
+        if day is not None:
+            days.add(day)
+        user_ids.add(user_id)
+
+    registration_rows = await db.execute(
+        select(Registration.event_id, Registration.user_id)
+        .where(or_(Registration.created_at >= since, Registration.updated_at >= since))
+        .distinct()
+    )
+    event_ids: set[str] = set()
+    for event_id, user_id in registration_rows.all():
+        event_ids.add(event_id)
+        user_ids.add(user_id)
+    return days, event_ids, user_ids
+
+
+async def refresh_admin_stats(db: AsyncSession, full: bool = False) -> datetime:
+    """
+    Bring the summary tables up to date and commit; returns the new watermark.
+
+    Rebuilds everything when ``full`` is set or the tables were never
+    built, otherwise only the buckets touched since the last refresh.
+    """
+    await db.execute(_LOCK_SQL)
+    state = (await db.execute(
+        select(StatsRefreshState)
+        .where(StatsRefreshState.name == STATE_NAME)
+        .execution_options(populate_existing=True)
+    )).scalar_one_or_none()
+    watermark = (await db.execute(_WATERMARK_SQL, {"max_lag": _MAX_TRANSACTION_LAG})).scalar_one()
+
+    if state is None or full:
+        await _rebuild_payment_days(db, None)
+        await _rebuild_event_payments(db, None, None)
+        await _rebuild_registrations(db, None)
+        await _rebuild_months(db, None)
+        await _rebuild_users(db, None)
+        if state is None:
+            state = StatsRefreshState(name=STATE_NAME)
+            db.add(state)
+        state.full_refreshed_at = watermark
+        logger.info("[stats] Rebuilt admin stats summaries")
+    else:
+        days, event_ids, user_ids = await _changed_since(db, state.refreshed_at)
+        await _rebuild_payment_days(db, days)
+        await _rebuild_event_payments(db, days, event_ids)
+        months = await _rebuild_registrations(db, event_ids)
+        await _rebuild_months(db, months)
+        await _rebuild_users(db, user_ids)
+        logger.debug(
+            "[stats] Refreshed %d day(s), %d event(s), %d user(s)", len(days), len(event_ids), len(user_ids)
+        )
+    state.refreshed_at = watermark
+    await db.commit()
+    return watermark
+
+
+async def ensure_stats_fresh(db: AsyncSession) -> datetime:
+    """
+    Refresh the summaries if anything changed since the watermark.
+
+    Returns the watermark the summaries are current to.
+    """
+    watermark = StatsRefreshState.refreshed_at
+    probes = [
+        exists().where(column >= watermark)
+        for column in (Payment.created_at, Payment.updated_at, Registration.created_at, Registration.updated_at)
+    ]
+    row = (await db.execute(
+        select(watermark, or_(*probes)).where(StatsRefreshState.name == STATE_NAME)
+    )).one_or_none()
+    if row is None or row[1]:
+        return await refresh_admin_stats(db)
+    return row[0]
+
+
+async def refresh_admin_stats_job() -> None:
+    """Scheduler job: incremental refresh of the admin stats summaries."""
+    async with AsyncSessionLocal() as db:
+        await refresh_admin_stats(db)
+
+
+async def rebuild_admin_stats_job() -> None:
+    """Scheduler job: full rebuild of the admin stats summaries."""
+    async with AsyncSessionLocal() as db:
+        await refresh_admin_stats(db, full=True)
@@ -0,0 +1,113 @@
+"""
+Garbage collection for the content-addressed upload store.
+
+An upload is stored as a family of files sharing one stem: the original
+``<stem>.<ext>``, its variants ``<stem>-<width>w.<ext>`` and its
+``<stem>.json`` manifest.  A stem is live while any upload URL of the family
+appears in one of ``REFERENCE_COLUMNS`` (event descriptions, announcement
+bodies, user avatars and product images).  ``collect_unreferenced_uploads``
+deletes every family from upload storage that is neither live nor younger
+than the grace period.  The grace period keeps images that were uploaded but
+whose event or announcement has not been saved yet.  Abandoned direct uploads
+(``incoming/`` objects past the grace period) are deleted too.
+
+Run from the backend directory::
+
+    python gc_uploads.py --dry-run
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.announcement import Announcement
+from models.event import Event
+from models.product import Product
+from models.user import User
+from ports.upload_storage import StoredObject, UploadStoragePort
+
+REFERENCE_COLUMNS = (
+    Event.description,
+    Announcement.content,
+    User.picture_url,
+    Product.image_url,
+)
+DEFAULT_GRACE_SECONDS = 24 * 60 * 60
+INCOMING_PREFIX = "incoming/"
+
+# sha256 stems, plus the uuid4-hex stems of uploads stored before hashing.
+_STEM = r"[0-9a-f]{64}|[0-9a-f]{32}"
+_URL_STEM_RE = re.compile(rf"/({_STEM})(?:-\d+w)?\.[a-z0-9]+\b")
+_KEY_STEM_RE = re.compile(rf"^({_STEM})(?:-\d+w)?\.[a-z0-9]+$")
+
+
+@dataclass
+class UploadGCReport:
+    """Outcome of one collection run."""
+
+    referenced: int = 0
+    kept_recent: int = 0
+    deleted: list[str] = field(default_factory=list)
+    bytes_freed: int = 0
+
+
+async def referenced_upload_stems(db: AsyncSession, url_markers: set[str]) -> set[str]:
+    """Return every upload stem referenced from ``REFERENCE_COLUMNS``."""
+    stems: set[str] = set()
+    for column in REFERENCE_COLUMNS:
+        query = select(column).where(or_(*(column.contains(marker) for marker in url_markers)))
+        result = await db.stream_scalars(query)
+        async for value in result:
+            stems.update(_URL_STEM_RE.findall(value))
+    return stems
+
+
+def _select_garbage(
+    objects: list[StoredObject],
+    referenced: set[str],
+    cutoff: datetime,
+    report: UploadGCReport,
+) -> list[StoredObject]:
+    families: dict[str, list[StoredObject]] = {}
+    garbage: list[StoredObject] = []
+    for obj in objects:
+        if obj.key.startswith(INCOMING_PREFIX):
+            if obj.modified_at < cutoff:
+                garbage.append(obj)
+            continue
+        match = _KEY_STEM_RE.match(obj.key)
+        if match:
+            families.setdefault(match.group(1), []).append(obj)
+    for stem, members in sorted(families.items()):
+        if stem in referenced:
+            continue
+        if max(obj.modified_at for obj in members) >= cutoff:
+            report.kept_recent += 1
+            continue
+        garbage.extend(members)
+    return garbage
+
+
+async def collect_unreferenced_uploads(
+    db: AsyncSession,
+    storage: UploadStoragePort,
+    grace_seconds: float = DEFAULT_GRACE_SECONDS,
+    dry_run: bool = False,
+) -> UploadGCReport:
+    """Delete upload families no longer referenced from the database."""
+    # Local URLs are relative, S3 ones absolute; match both, plus legacy /uploads/ links.
+    markers = {"/uploads/", storage.public_url("")}
+    referenced = await referenced_upload_stems(db, markers)
+    report = UploadGCReport(referenced=len(referenced))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    for obj in _select_garbage(await storage.list_objects(), referenced, cutoff, report):
+        if not dry_run:
+            await storage.delete(obj.key)
+        report.deleted.append(obj.key)
+        report.bytes_freed += obj.size
+    return report
@@ -0,0 +1,327 @@
+"""
+Streaming image uploads.
+
+``save_image_upload`` parses the ``multipart/form-data`` request body itself,
+chunk by chunk, instead of letting the framework spool the whole body first.
+This lets it:
+
+* reject a request whose ``Content-Length`` already exceeds the limit before
+  reading any of the body,
+* stop reading as soon as the file part grows past ``max_bytes``,
+* write chunks to a per-request staging directory through
+  ``asyncio.to_thread``, so disk I/O never blocks the event loop,
+* decide the stored type and extension from the file's magic bytes rather
+  than the client-supplied ``Content-Type`` or filename.
+
+Direct uploads (presigned POST straight to S3 storage) are pulled back into
+staging with ``stage_stored_object`` under the same checks.
+
+``publish_image`` then processes the staged image and hands every produced
+file to the ``UploadStoragePort``.  The manifest goes last, so its presence
+marks a complete upload.  Uploads are content-addressed: files are named
+after the SHA-256 of the uploaded bytes (``<sha256><ext>``), so uploading the
+same image again returns the stored manifest instead of writing a copy.  A
+published name therefore never changes content, which is what lets uploads
+be served as immutable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from uuid import uuid4
+
+from multipart.exceptions import FormParserError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from ports.upload_storage import UploadStoragePort
+from services.image_processing import process_uploaded_image
+
+# Room for the multipart boundaries and part headers around the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+_SNIFF_BYTES = 16
+_CONTENT_TYPES = {
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".json": "application/json",
+}
+
+
+class UploadError(Exception):
+    """Base exception for rejected uploads."""
+    pass
+
+
+class UploadTooLargeError(UploadError):
+    """The uploaded file exceeds the size limit."""
+    pass
+
+
+class InvalidUploadError(UploadError):
+    """The request body or the uploaded file is not acceptable."""
+    pass
+
+
+def sniff_image_type(head: bytes) -> tuple[str, str] | None:
+    """Return (MIME type, extension) for a supported image signature, else None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg", ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png", ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif", ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    return None
+
+
+def _multipart_boundary(content_type: str | None) -> bytes:
+    if not content_type:
+        raise InvalidUploadError("Expected a multipart/form-data upload")
+    media_type, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if media_type != b"multipart/form-data" or not boundary:
+        raise InvalidUploadError("Expected a multipart/form-data upload")
+    return boundary
+
+
+class _FilePartCollector:
+    """
+    Multipart parser callbacks that keep only the data of one named file part.
+
+    The parser calls back synchronously from ``write``; the collected data is
+    drained once per request chunk so it can be written off-loop in one call.
+    """
+
+    def __init__(self, field_name: str) -> None:
+        self._field_name = field_name.encode()
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._in_file = False
+        self.found = False
+        self.pending: list[bytes] = []
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._in_file = (
+            not self.found
+            and options.get(b"name") == self._field_name
+            and b"filename" in options
+        )
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self.found = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.pending)
+        self.pending.clear()
+        return data
+
+
+class _StagedFile:
+    """
+    A staging file that hashes, measures and sniffs content as it is written.
+
+    ``finish`` renames it to its content address inside the staging directory.
+    """
+
+    def __init__(self, staging_dir: Path, max_bytes: int) -> None:
+        self._staging_dir = staging_dir
+        self._max_bytes = max_bytes
+        self._path = staging_dir / f".upload-{uuid4().hex}.part"
+        self._out = None
+        self._digest = hashlib.sha256()
+        self._head = b""
+        self.size = 0
+
+    async def open(self) -> None:
+        self._out = await asyncio.to_thread(open, self._path, "wb")
+
+    def _write(self, data: bytes) -> None:
+        self._out.write(data)
+        self._digest.update(data)
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self._max_bytes:
+            raise UploadTooLargeError("File too large")
+        if len(self._head) < _SNIFF_BYTES:
+            self._head = (self._head + data)[:_SNIFF_BYTES]
+        await asyncio.to_thread(self._write, data)
+
+    async def finish(self) -> str:
+        if self.size == 0:
+            raise InvalidUploadError("Empty upload")
+        detected = sniff_image_type(self._head)
+        if detected is None:
+            raise InvalidUploadError("Only image uploads are allowed")
+        name = f"{self._digest.hexdigest()}{detected[1]}"
+        await asyncio.to_thread(self._out.close)
+        await asyncio.to_thread(os.replace, self._path, self._staging_dir / name)
+        return name
+
+    async def discard(self) -> None:
+        def _discard() -> None:
+            if self._out is not None:
+                self._out.close()
+            self._path.unlink(missing_ok=True)
+
+        await asyncio.to_thread(_discard)
+
+
+@asynccontextmanager
+async def staging_directory(staging_root: Path):
+    """Yield a private directory for one upload and remove it afterwards."""
+    path = staging_root / uuid4().hex
+    await asyncio.to_thread(path.mkdir, parents=True)
+    try:
+        yield path
+    finally:
+        await asyncio.to_thread(shutil.rmtree, path, True)
+
+
+async def save_image_upload(
+    body: AsyncIterator[bytes],
+    content_type: str | None,
+    content_length: str | None,
+    staging_dir: Path,
+    max_bytes: int,
+    field_name: str = "file",
+) -> str:
+    """
+    Stream the ``field_name`` file of a multipart body into ``staging_dir``.
+
+    Returns the staged file name (``<sha256><ext>``, extension taken from the
+    detected image type). Raises ``UploadTooLargeError`` or
+    ``InvalidUploadError``; nothing is left on disk in either case.
+    """
+    boundary = _multipart_boundary(content_type)
+    max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise InvalidUploadError("Invalid Content-Length header")
+        if declared > max_body_bytes:
+            raise UploadTooLargeError("File too large")
+
+    collector = _FilePartCollector(field_name)
+    parser = MultipartParser(boundary, collector.callbacks())
+    staged = _StagedFile(staging_dir, max_bytes)
+    await staged.open()
+    try:
+        received = 0
+        async for chunk in body:
+            received += len(chunk)
+            if received > max_body_bytes:
+                raise UploadTooLargeError("File too large")
+            try:
+                parser.write(chunk)
+            except FormParserError:
+                raise InvalidUploadError("Malformed multipart body")
+            data = collector.drain()
+            if data:
+                await staged.write(data)
+        try:
+            parser.finalize()
+        except FormParserError:
+            raise InvalidUploadError("Malformed multipart body")
+
+        if not collector.found:
+            raise InvalidUploadError("Missing file upload")
+        return await staged.finish()
+    except BaseException:
+        await staged.discard()
+        raise
+
+
+async def stage_stored_object(
+    storage: UploadStoragePort,
+    key: str,
+    staging_dir: Path,
+    max_bytes: int,
+) -> str:
+    """
+    Copy a directly uploaded object into ``staging_dir`` under the same checks.
+
+    Raises ``FileNotFoundError`` when nothing was uploaded under ``key``.
+    """
+    staged = _StagedFile(staging_dir, max_bytes)
+    await staged.open()
+    try:
+        async for chunk in storage.iter_bytes(key):
+            await staged.write(chunk)
+        return await staged.finish()
+    except BaseException:
+        await staged.discard()
+        raise
+
+
+def _manifest_key(name: str) -> str:
+    return f"{Path(name).stem}.json"
+
+
+async def publish_image(storage: UploadStoragePort, staging_dir: Path, name: str) -> dict | None:
+    """
+    Process a staged image and store its files; return the srcset manifest.
+
+    Identical content already in storage returns its stored manifest without
+    reprocessing. Returns None when the staged file is not a decodable image.
+    """
+    stored = await storage.read_bytes(_manifest_key(name))
+    if stored is not None:
+        return json.loads(stored)
+
+    manifest = await process_uploaded_image(staging_dir, name, url_for=storage.public_url)
+    if manifest is None:
+        return None
+
+    produced = await asyncio.to_thread(
+        lambda: sorted(p.name for p in staging_dir.iterdir() if not p.name.startswith("."))
+    )
+    manifest_key = _manifest_key(name)
+    for key in [k for k in produced if k != manifest_key] + [manifest_key]:
+        content_type = _CONTENT_TYPES.get(Path(key).suffix, "application/octet-stream")
+        await storage.put_file(key, staging_dir / key, content_type)
+    return manifest
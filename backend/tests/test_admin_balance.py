@@ -710,9 +710,30 @@ class TestBalanceResponseStructure:
             "period_label", "date_from", "date_to",
             "total_income", "total_income_event", "total_income_subscription",
             "total_refunds", "total_net", "total_tx_count", "total_refund_count",
-            "months", "events", "subscriptions", "pending",
+            "months", "events", "subscriptions", "pending", "refreshed_at",
         }
         assert expected_keys.issubset(set(data.keys()))
+        assert resp.headers["X-Stats-Refreshed-At"] == datetime.fromisoformat(data["refreshed_at"]).isoformat()
+
+    @pytest.mark.asyncio
+    async def test_balance_reflects_payment_updates_after_first_read(self, db_session, admin_client, admin_user):
+        payment = await _make_payment(
+            db_session, admin_user.id, Decimal("40.00"),
+            status=DBPaymentStatus.PENDING.value,
+            created_at=datetime(2026, 1, 20, 12, 0),
+        )
+        resp = await admin_client.get("/api/admin/stats/balance?period=2026-01")
+        assert resp.json()["pending"]["pending_event_count"] == 1
+        first_refreshed_at = resp.json()["refreshed_at"]
+
+        payment.status = DBPaymentStatus.COMPLETED.value
+        await db_session.commit()
+
+        resp = await admin_client.get("/api/admin/stats/balance?period=2026-01")
+        data = resp.json()
+        assert data["pending"]["pending_event_count"] == 0
+        assert data["total_income"] == "40.00 PLN"
+        assert data["refreshed_at"] > first_refreshed_at
 
     @pytest.mark.asyncio
     async def test_pending_has_all_fields(self, admin_client: AsyncClient):
@@ -0,0 +1,192 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, APIRouter
+from httpx import ASGITransport, AsyncClient
+
+import services.log_export as log_export
+import services.log_service as log_service
+from database import get_db
+from models.user import AccountStatus, User, UserRole
+from routers import admin_router
+from routers.auth import get_current_user_dependency
+
+
+@pytest.fixture
+def logs_root(tmp_path, monkeypatch):
+    root = tmp_path / "logs"
+    monkeypatch.setattr(log_service, "_LOGS_ROOT", root)
+    return root
+
+
+@pytest.fixture
+async def target_user(db_session) -> User:
+    user = User(
+        google_id=f"user-{uuid4().hex}",
+        email=f"Member-{uuid4().hex}@Example.com",
+        full_name="Member",
+        role=UserRole.MEMBER,
+        account_status=AccountStatus.ACTIVE,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def admin_client(db_session):
+    admin = User(
+        google_id=f"admin-{uuid4().hex}",
+        email=f"admin-{uuid4().hex}@example.com",
+        full_name="Admin",
+        role=UserRole.ADMIN,
+        account_status=AccountStatus.ACTIVE,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+
+    app = FastAPI()
+    _api = APIRouter(prefix="/api")
+    _api.include_router(admin_router)
+    app.include_router(_api)
+
+    async def override_get_db():
+        yield db_session
+
+    async def override_current_user_dependency():
+        return admin
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_dependency] = override_current_user_dependency
+
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def _line(stamp: str, action: str, email: str, **extra) -> str:
+    now = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+    return log_service._build_log_line(action, email, None, extra, now=now)
+
+
+def _write_day(root, label: str, email: str, lines: list[str]):
+    folder = root / label
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{email.lower()}.log"
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return path
+
+
+def _sample_days(root, email: str):
+    day1 = [
+        _line("2026-03-01 08:00:00.000", "LOGIN", email),
+        _line("2026-03-01 09:15:00.000", "PAYMENT_CREATED", email, amount="30 PLN"),
+        _line("2026-03-01 12:00:00.000", "EVENT_REGISTERED", email),
+        _line("2026-03-01 18:30:00.000", "PAYMENT_COMPLETED", email, amount="30 PLN"),
+    ]
+    day3 = [
+        _line("2026-03-03 07:00:00.000", "LOGIN", email),
+        _line("2026-03-03 10:00:00.000", "PAYMENT_CREATED", email, amount="50 PLN"),
+    ]
+    _write_day(root, "01-03-2026", email, day1)
+    _write_day(root, "03-03-2026", email, day3)
+    return day1, day3
+
+
+def _url(user: User) -> str:
+    return f"/api/admin/users/{user.id}/logs/download"
+
+
+@pytest.mark.asyncio
+async def test_download_streams_all_days_with_headers(admin_client, target_user, logs_root):
+    day1, day3 = _sample_days(logs_root, target_user.email)
+
+    response = await admin_client.get(
+        _url(target_user), params={"date_from": "2026-03-01", "date_to": "2026-03-03"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    expected = "\n".join(
+        ["# ── 01-03-2026 ─────────────────────────", *day1,
+         "# ── 02-03-2026  (brak wpisów)",
+         "# ── 03-03-2026 ─────────────────────────", *day3]
+    ) + "\n"
+    assert response.text == expected
+
+
+@pytest.mark.asyncio
+async def test_download_action_filter_uses_index(admin_client, target_user, logs_root):
+    day1, day3 = _sample_days(logs_root, target_user.email)
+    params = {"date_from": "2026-03-01", "date_to": "2026-03-03", "action": "payment_*"}
+
+    response = await admin_client.get(_url(target_user), params=params)
+
+    assert response.status_code == 200
+    body_lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    assert body_lines == [day1[1], day1[3], day3[1]]
+    index_path = logs_root / "01-03-2026" / f"{target_user.email.lower()}.log.idx"
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    assert set(index["actions"]) == {"LOGIN", "PAYMENT_CREATED", "EVENT_REGISTERED", "PAYMENT_COMPLETED"}
+
+    # Appending extends the index incrementally instead of rebuilding it.
+    log_path = logs_root / "01-03-2026" / f"{target_user.email.lower()}.log"
+    extra = _line("2026-03-01 20:00:00.000", "PAYMENT_REFUNDED", target_user.email)
+    with open(log_path, "a", encoding="utf-8") as handle:
+        handle.write(extra + "\n")
+
+    response = await admin_client.get(
+        _url(target_user),
+        params={"date_from": "2026-03-01", "date_to": "2026-03-01", "action": ["PAYMENT_REFUNDED", "LOGIN"]},
+    )
+    body_lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    assert body_lines == [day1[0], extra]
+
+
+@pytest.mark.asyncio
+async def test_download_time_filter_bounds_first_and_last_day(admin_client, target_user, logs_root, monkeypatch):
+    day1, day3 = _sample_days(logs_root, target_user.email)
+    # Tiny chunks exercise line reassembly across chunk boundaries.
+    monkeypatch.setattr(log_export, "EXPORT_CHUNK_SIZE", 16)
+
+    response = await admin_client.get(
+        _url(target_user),
+        params={
+            "date_from": "2026-03-01",
+            "date_to": "2026-03-03",
+            "time_from": "09:00",
+            "time_to": "08:00",
+        },
+    )
+
+    body_lines = [line for line in response.text.splitlines() if not line.startswith("#")]
+    assert body_lines == [day1[1], day1[2], day1[3], day3[0]]
+
+
+@pytest.mark.asyncio
+async def test_download_gzip_matches_plain_export(admin_client, target_user, logs_root):
+    _sample_days(logs_root, target_user.email)
+    params = {"date_from": "2026-03-01", "date_to": "2026-03-03"}
+
+    plain = await admin_client.get(_url(target_user), params=params)
+    compressed = await admin_client.get(_url(target_user), params={**params, "gzip": "true"})
+
+    assert compressed.status_code == 200
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert compressed.headers["content-disposition"].endswith('.txt.gz"')
+    assert gzip.decompress(compressed.content).decode("utf-8") == plain.text
+
+
+@pytest.mark.asyncio
+async def test_download_rejects_too_long_range(admin_client, target_user, logs_root):
+    response = await admin_client.get(
+        _url(target_user), params={"date_from": "2026-01-01", "date_to": "2026-03-01"}
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+import services.admission_queue as admission_module
+from config import get_settings
+from database import get_db
+from models.event import Event
+from routers import events_router
+from routers.auth import get_current_user_dependency
+from services.admission_queue import AdmissionQueue, admission_queue
+
+
+class _Notifications:
+    def __init__(self) -> None:
+        self.tokens: list[str] = []
+
+    async def __call__(self, event_id: str, token: str) -> None:
+        self.tokens.append(token)
+
+
+@pytest.mark.asyncio
+async def test_queue_admits_in_arrival_order_and_passes_unused_turns_on(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: clock[0])
+    notified = _Notifications()
+    queue = AdmissionQueue(max_in_flight=2, turn_seconds=30, notify=notified)
+
+    assert await queue.admit("e1", "u1") is None
+    assert await queue.admit("e1", "u2") is None
+    first = await queue.admit("e1", "u3")
+    second = await queue.admit("e1", "u4")
+    assert (first.state, first.position, second.position) == ("waiting", 1, 2)
+    # Asking again keeps the place in line; other events are independent.
+    assert await queue.admit("e1", "u3") == first
+    assert await queue.admit("e2", "u5") is None
+
+    await queue.release("e1")
+    assert notified.tokens == [first.token]
+    assert (await queue.status("e1", first.token, "u3")).state == "ready"
+    assert (await queue.status("e1", second.token, "u4")).position == 1
+    assert await queue.status("e1", first.token, "u4") is None
+
+    # u3 never comes back: after the turn expires u4 is next.
+    clock[0] += 31
+    await queue.sweep()
+    assert notified.tokens == [first.token, second.token]
+    assert await queue.status("e1", first.token, "u3") is None
+    assert await queue.admit("e1", "u4") is None
+
+    for _ in range(2):
+        await queue.release("e1")
+    await queue.release("e2")
+    assert len(queue) == 0
+    assert queue._events == {}
+
+
+@pytest.mark.asyncio
+async def test_register_returns_ticket_until_admitted(db_session, test_user, monkeypatch):
+    notified = _Notifications()
+    monkeypatch.setattr(get_settings(), "registration_queue_enabled", True)
+    monkeypatch.setattr(admission_queue, "max_in_flight", 1)
+    monkeypatch.setattr(admission_queue, "_notify", notified)
+    event = Event(
+        title="Rush",
+        event_type="mors",
+        start_date=datetime.now() + timedelta(days=2),
+        city="Poznań",
+        price_guest=Decimal("0.00"),
+        price_member=Decimal("0.00"),
+        max_participants=5,
+        version=1,
+    )
+    db_session.add(event)
+    await db_session.commit()
+
+    app = FastAPI()
+    api = APIRouter(prefix="/api")
+    api.include_router(events_router)
+    app.include_router(api)
+
+    async def override_get_db():
+        yield db_session
+
+    async def override_current_user():
+        return test_user
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_dependency] = override_current_user
+    payload = {"return_url": "http://localhost/ok", "cancel_url": "http://localhost/cancel"}
+
+    # Another registration holds the only slot.
+    assert await admission_queue.admit(event.id, "someone-else") is None
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            queued = await client.post(f"/api/events/{event.id}/register", json=payload)
+            assert queued.status_code == 202
+            ticket = queued.json()
+            assert (ticket["queued"], ticket["state"], ticket["position"]) == (True, "waiting", 1)
+            assert queued.headers["Retry-After"] == "1"
+
+            await admission_queue.release(event.id)
+            assert notified.tokens == [ticket["admission_token"]]
+            status = await client.get(f"/api/events/{event.id}/register/queue/{ticket['admission_token']}")
+            assert status.json()["state"] == "ready"
+
+            registered = await client.post(f"/api/events/{event.id}/register", json=payload)
+            assert registered.status_code == 200
+            assert registered.json()["status"] == "confirmed"
+
+            expired = await client.get(f"/api/events/{event.id}/register/queue/{ticket['admission_token']}")
+            assert expired.status_code == 404
+    finally:
+        admission_queue._events.pop(str(event.id), None)
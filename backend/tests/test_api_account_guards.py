@@ -12,6 +12,7 @@ from models.registration import Registration, RegistrationStatus
 from models.user import AccountStatus, User, UserRole
 from models.approval_request import ApprovalRequest
 from models.user_profile import UserProfile
+from models.subscription import Subscription
 from routers import registrations_router, users_router
 from services.auth_service import AuthService
 
@@ -430,3 +431,109 @@ async def test_pending_user_cannot_access_manual_payment_endpoints(guarded_api_c
     )
     assert response.status_code == 403
     assert response.json()["detail"] == "Account pending admin approval"
+
+
+async def _active_user(db_session, full_name: str, status: AccountStatus = AccountStatus.ACTIVE) -> User:
+    user = User(
+        google_id=f"search-{uuid4().hex}",
+        email=f"search-{uuid4().hex}@example.com",
+        full_name=full_name,
+        role=UserRole.MEMBER,
+        account_status=status,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_user_search_ranks_prefix_matches_and_folds_accents(guarded_api_client: AsyncClient, db_session):
+    searcher = await _active_user(db_session, "Searcher")
+    await _active_user(db_session, "Mikołaj Kluka")
+    await _active_user(db_session, "Anna Łukaszewicz")
+    await _active_user(db_session, "Łukasz Nowak")
+    await _active_user(db_session, "Łucja Banned", status=AccountStatus.BANNED)
+    token = AuthService(db_session).create_access_token(searcher)
+
+    response = await guarded_api_client.get(
+        "/api/users/search",
+        params={"q": "LUK"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+    assert [u["full_name"] for u in response.json()][:3] == [
+        "Łukasz Nowak",
+        "Anna Łukaszewicz",
+        "Mikołaj Kluka",
+    ]
+
+    response = await guarded_api_client.get(
+        "/api/users/search",
+        params={"q": "łucj"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.json() == []
+
+    response = await guarded_api_client.get(
+        "/api/users/search",
+        params={"q": "%"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_my_registrations_page_splits_upcoming_and_past(guarded_api_client: AsyncClient, db_session):
+    member = await _active_user(db_session, "Paging Member")
+    db_session.add(Subscription(user_id=member.id, end_date=datetime.utcnow() + timedelta(days=30)))
+    today = datetime.utcnow().date()
+    for offset in (-10, 3, 7):
+        start = datetime.combine(today + timedelta(days=offset), datetime.min.time()).replace(hour=18)
+        event = Event(
+            title=f"Event {offset:+d}",
+            event_type="mors",
+            start_date=start,
+            city="Poznań",
+            price_guest=Decimal("50.00"),
+            price_member=Decimal("30.00"),
+        )
+        db_session.add(event)
+        await db_session.flush()
+        db_session.add(Registration(
+            user_id=member.id,
+            event_id=event.id,
+            occurrence_date=start.date(),
+            status=RegistrationStatus.CONFIRMED.value,
+        ))
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {AuthService(db_session).create_access_token(member)}"}
+
+    first = await guarded_api_client.get(
+        "/api/users/me/registrations/page", params={"limit": 1}, headers=headers
+    )
+    assert first.status_code == 200
+    assert [r["event"]["title"] for r in first.json()["items"]] == ["Event +3"]
+    assert first.json()["items"][0]["effective_price"] == "30.00"
+    second = await guarded_api_client.get(
+        "/api/users/me/registrations/page",
+        params={"limit": 1, "cursor": first.json()["next_cursor"]},
+        headers=headers,
+    )
+    assert [r["event"]["title"] for r in second.json()["items"]] == ["Event +7"]
+    assert second.json()["next_cursor"] is None
+
+    past = await guarded_api_client.get(
+        "/api/users/me/registrations/page", params={"scope": "past"}, headers=headers
+    )
+    assert [r["event"]["title"] for r in past.json()["items"]] == ["Event -10"]
+    assert past.json()["items"][0]["can_cancel"] is False
+
+    full = await guarded_api_client.get("/api/users/me/registrations", headers=headers)
+    assert sorted(r["event"]["title"] for r in full.json()) == ["Event +3", "Event +7", "Event -10"]
+    assert {r["effective_price"] for r in full.json()} == {"30.00"}
+
+    invalid = await guarded_api_client.get(
+        "/api/users/me/registrations/page", params={"cursor": "???"}, headers=headers
+    )
+    assert invalid.status_code == 400
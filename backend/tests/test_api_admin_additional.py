@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from uuid import uuid4
 
@@ -282,6 +282,83 @@ class TestAdminPendingUsersAndApprove:
         assert response.json()["account_status"] == AccountStatus.ACTIVE.value
 
 
+class TestAdminUserList:
+    async def _seed(self, db_session) -> list[User]:
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        users = []
+        for index in range(5):
+            users.append(User(
+                id=f"00000000-0000-0000-0000-00000000000{index}",
+                google_id=f"list-{uuid4().hex}",
+                email=f"member{index}@example.com",
+                full_name=f"Member {index}",
+                role=UserRole.MEMBER if index % 2 else UserRole.GUEST,
+                account_status=AccountStatus.PENDING if index == 4 else AccountStatus.ACTIVE,
+                # Two users share a timestamp so the id tie-breaker is exercised.
+                created_at=base + timedelta(days=min(index, 3)),
+            ))
+        users.append(User(
+            google_id=f"list-{uuid4().hex}",
+            email="percent@example.com",
+            full_name="100% Real_Name",
+            role=UserRole.GUEST,
+            account_status=AccountStatus.ACTIVE,
+            created_at=base - timedelta(days=1),
+        ))
+        db_session.add_all(users)
+        await db_session.commit()
+        db_session.add(ApprovalRequest(user_id=users[4].id))
+        await db_session.commit()
+        return users
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_cover_all_users_once(self, admin_client: AsyncClient, admin_user: User, db_session):
+        await self._seed(db_session)
+        legacy = (await admin_client.get("/api/admin/users/all")).json()
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await admin_client.get("/api/admin/users/page", params=params)
+            assert response.status_code == 200
+            body = response.json()
+            assert len(body["items"]) <= 2
+            seen.extend(body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert [u["id"] for u in seen] == [u["id"] for u in legacy]
+        assert len(seen) == 7
+        assert seen[1]["id"] == "00000000-0000-0000-0000-000000000004"
+        assert seen[1]["has_approval_request"] is True
+        assert seen[2]["id"] == "00000000-0000-0000-0000-000000000003"
+
+    @pytest.mark.asyncio
+    async def test_filters_and_count(self, admin_client: AsyncClient, admin_user: User, db_session):
+        await self._seed(db_session)
+
+        members = (await admin_client.get(
+            "/api/admin/users/page", params={"role": "member", "status": "active"},
+        )).json()
+        assert [u["email"] for u in members["items"]] == ["member3@example.com", "member1@example.com"]
+        assert (await admin_client.get("/api/admin/users/count", params={"role": "member"})).json() == {"total": 2}
+
+        # LIKE wildcards in the search term are matched literally.
+        found = (await admin_client.get("/api/admin/users/page", params={"q": "0% REAL_"})).json()
+        assert [u["email"] for u in found["items"]] == ["percent@example.com"]
+        assert (await admin_client.get("/api/admin/users/count", params={"q": "_"})).json() == {"total": 1}
+        by_email = (await admin_client.get("/api/admin/users/all", params={"q": "MEMBER2@"})).json()
+        assert [u["full_name"] for u in by_email] == ["Member 2"]
+        assert (await admin_client.get("/api/admin/users/count")).json() == {"total": 7}
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_rejected(self, admin_client: AsyncClient):
+        response = await admin_client.get("/api/admin/users/page", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
 class TestAdminPaymentStats:
     @pytest.mark.asyncio
     async def test_payment_stats_aggregates_by_status_and_type(self, db_session, admin_client: AsyncClient):
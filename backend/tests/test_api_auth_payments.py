@@ -7,6 +7,7 @@ import pytest
 from fastapi import FastAPI, APIRouter
 from httpx import ASGITransport, AsyncClient
 
+from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
 import routers.payments as payments_module
 from database import get_db
 from config import get_settings
@@ -577,7 +578,7 @@ class TestPaymentsRouter:
         auth_user: User,
         monkeypatch,
     ):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -592,7 +593,7 @@ class TestPaymentsRouter:
 
     @pytest.mark.asyncio
     async def test_get_payment_status_returns_payment_data(self, api_client: AsyncClient, db_session, auth_user: User, monkeypatch):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -640,7 +641,7 @@ class TestPaymentsRouter:
         auth_user: User,
         monkeypatch,
     ):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -711,7 +712,7 @@ class TestPaymentsRouter:
 
     @pytest.mark.asyncio
     async def test_webhook_returns_payment_not_found_when_missing_in_db(self, api_client: AsyncClient, monkeypatch):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -725,7 +726,7 @@ class TestPaymentsRouter:
 
     @pytest.mark.asyncio
     async def test_webhook_completed_confirms_registration(self, api_client: AsyncClient, db_session, auth_user: User, monkeypatch):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -773,7 +774,7 @@ class TestPaymentsRouter:
 
     @pytest.mark.asyncio
     async def test_fake_payment_page_rejects_invalid_token(self, api_client: AsyncClient, monkeypatch):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -784,7 +785,7 @@ class TestPaymentsRouter:
 
     @pytest.mark.asyncio
     async def test_fake_complete_and_fail_endpoints(self, api_client: AsyncClient, db_session, auth_user: User, monkeypatch):
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -953,7 +954,7 @@ class TestPaymentsRouter:
         monkeypatch,
     ):
         monkeypatch.setattr(payments_module.settings, "frontend_url", "http://test")
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
@@ -1010,7 +1011,7 @@ class TestPaymentsRouter:
     ):
         monkeypatch.setattr(payments_module.settings, "frontend_url", "http://test")
         monkeypatch.setattr(payments_module.settings, "debug", True)
-        gateway = payments_module.get_shared_fake_payment_adapter(base_url="http://test")
+        gateway = get_shared_fake_payment_adapter(base_url="http://test")
         gateway.clear_payments()
         monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
 
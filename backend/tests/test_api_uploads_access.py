@@ -1,6 +1,9 @@
+import hashlib
+import io
 from uuid import uuid4
 
 import pytest
+from PIL import Image
 from fastapi import FastAPI, APIRouter
 from httpx import ASGITransport, AsyncClient
 
@@ -8,7 +11,9 @@ import routers.uploads as uploads_module
 from database import get_db
 from models.user import AccountStatus, User, UserRole
 from routers import uploads_router
+from routers.uploads import UploadStaticFiles
 from services.auth_service import AuthService
+from services.upload_service import UploadTooLargeError, save_image_upload
 
 
 @pytest.fixture
@@ -32,9 +37,18 @@ async def uploads_api_client(db_session, tmp_path, monkeypatch):
         await client.aclose()
 
 
+def _encode(image_format: str, size=(48, 32), mode="RGB") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, "navy").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _stored_names(upload_dir) -> list[str]:
+    return sorted(p.name for p in upload_dir.iterdir() if not p.name.startswith("."))
+
+
 def _image_file():
-    # Minimal JPEG-like bytes are enough for this endpoint (it validates content-type only).
-    return ("test.jpg", b"\xff\xd8\xff\xe0fakejpg", "image/jpeg")
+    return ("test.jpg", _encode("JPEG"), "image/jpeg")
 
 
 @pytest.mark.asyncio
@@ -161,3 +175,210 @@ async def test_upload_rejects_unsupported_image_mime(uploads_api_client: AsyncCl
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Only image uploads are allowed"
+
+
+async def _admin_headers(db_session) -> dict[str, str]:
+    user = User(
+        google_id=f"admin-stream-{uuid4().hex}",
+        email=f"admin-stream-{uuid4().hex}@example.com",
+        full_name="Active Admin",
+        role=UserRole.ADMIN,
+        account_status=AccountStatus.ACTIVE,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return {"Authorization": f"Bearer {AuthService(db_session).create_access_token(user)}"}
+
+
+@pytest.mark.asyncio
+async def test_upload_detects_type_from_magic_bytes(uploads_api_client: AsyncClient, db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+    png = _encode("PNG", mode="RGBA")
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers=headers,
+        files={"file": ("photo.jpg", png, "application/octet-stream")},
+    )
+
+    assert response.status_code == 200
+    name = response.json()["url"].removeprefix("/uploads/")
+    assert name.endswith(".png")
+    assert Image.open(tmp_path / "uploads" / name).format == "PNG"
+    assert list((tmp_path / "uploads" / ".staging").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_returns_srcset_manifest(uploads_api_client: AsyncClient, db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers=headers,
+        files={"file": ("photo.jpg", _encode("JPEG", size=(700, 20)), "image/jpeg")},
+    )
+
+    assert response.status_code == 200
+    manifest = response.json()
+    assert (manifest["type"], manifest["width"], manifest["height"]) == ("image/jpeg", 700, 20)
+    assert sorted({v["width"] for v in manifest["variants"]}) == [320, 640, 700]
+    assert manifest["srcset"]["image/webp"].endswith("-700w.webp 700w")
+    for variant in manifest["variants"]:
+        assert (tmp_path / "uploads" / variant["url"].removeprefix("/uploads/")).is_file()
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_undecodable_image(uploads_api_client: AsyncClient, db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers=headers,
+        files={"file": ("broken.jpg", b"\xff\xd8\xff\xe0truncated", "image/jpeg")},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid image file"
+    assert _stored_names(tmp_path / "uploads") == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_spoofed_content_type(uploads_api_client: AsyncClient, db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers=headers,
+        files={"file": ("evil.jpg", b"<?php echo 1; ?>", "image/jpeg")},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Only image uploads are allowed"
+    assert _stored_names(tmp_path / "uploads") == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("content_type", "detail"),
+    [
+        ("multipart/form-data; boundary=expected", "Malformed multipart body"),
+        ("multipart/form-data", "Expected a multipart/form-data upload"),
+    ],
+)
+async def test_upload_rejects_malformed_multipart_body(
+    uploads_api_client: AsyncClient, db_session, tmp_path, content_type, detail
+):
+    headers = await _admin_headers(db_session)
+    body = (
+        b"--other\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="photo.jpg"\r\n'
+        b"Content-Type: image/jpeg\r\n\r\n" + _encode("JPEG") + b"\r\n--other--\r\n"
+    )
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers={**headers, "Content-Type": content_type},
+        content=body,
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+    assert _stored_names(tmp_path / "uploads") == []
+
+
+@pytest.mark.asyncio
+async def test_upload_rejects_empty_file(uploads_api_client: AsyncClient, db_session):
+    headers = await _admin_headers(db_session)
+
+    response = await uploads_api_client.post(
+        "/api/uploads/image",
+        headers=headers,
+        files={"file": ("empty.jpg", b"", "image/jpeg")},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Empty upload"
+
+
+@pytest.mark.asyncio
+async def test_save_image_upload_stops_reading_once_limit_is_exceeded(tmp_path):
+    boundary = "kenazboundary"
+    consumed = 0
+
+    async def body():
+        nonlocal consumed
+        yield (
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.jpg\"\r\n"
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode() + b"\xff\xd8\xff"
+        for _ in range(1000):
+            consumed += 1
+            yield b"x" * 512
+
+    with pytest.raises(UploadTooLargeError):
+        await save_image_upload(
+            body(),
+            content_type=f"multipart/form-data; boundary={boundary}",
+            content_length=None,
+            staging_dir=tmp_path,
+            max_bytes=1024,
+        )
+
+    assert consumed <= 3
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_image_upload_rejects_declared_length_without_reading(tmp_path):
+    async def body():
+        raise AssertionError("body must not be read")
+        yield b""
+
+    with pytest.raises(UploadTooLargeError):
+        await save_image_upload(
+            body(),
+            content_type="multipart/form-data; boundary=x",
+            content_length=str(500 * 1024 * 1024),
+            staging_dir=tmp_path,
+            max_bytes=1024,
+        )
+
+
+@pytest.mark.asyncio
+async def test_upload_deduplicates_identical_content(uploads_api_client: AsyncClient, db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+    content = _encode("PNG", size=(40, 20))
+
+    first = await uploads_api_client.post(
+        "/api/uploads/image", headers=headers, files={"file": ("a.png", content, "image/png")},
+    )
+    files_after_first = _stored_names(tmp_path / "uploads")
+    second = await uploads_api_client.post(
+        "/api/uploads/image", headers=headers, files={"file": ("copy.png", content, "image/png")},
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["url"] == f"/uploads/{hashlib.sha256(content).hexdigest()}.png"
+    assert _stored_names(tmp_path / "uploads") == files_after_first
+
+
+@pytest.mark.asyncio
+async def test_upload_static_files_are_immutable_with_etag(tmp_path):
+    (tmp_path / "abc.png").write_bytes(_encode("PNG"))
+    (tmp_path / ".upload-123.part").write_bytes(b"partial")
+    app = FastAPI()
+    app.mount("/uploads", UploadStaticFiles(directory=str(tmp_path)), name="uploads")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/uploads/abc.png")
+        revalidated = await client.get("/uploads/abc.png", headers={"If-None-Match": response.headers["etag"]})
+        hidden = await client.get("/uploads/.upload-123.part")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["etag"] == '"abc.png"'
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert hidden.status_code == 404
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import services.google_calendar_service as gcal_module
+from models.event import Event
+from models.registration import Registration, RegistrationStatus
+from services.calendar_sync import CalendarSyncWorker
+from services.http_clients import http_clients
+
+
+class _FakeGoogle:
+    """Answers the token and batch endpoints like Google does."""
+
+    def __init__(self) -> None:
+        self.token_requests = 0
+        self.batch_sizes: list[int] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url == gcal_module.GoogleCalendarService.TOKEN_URL:
+            self.token_requests += 1
+            return httpx.Response(200, json={"access_token": "access-1", "expires_in": 3599})
+        assert request.headers["Authorization"] == "Bearer access-1"
+        if request.url == gcal_module.GoogleCalendarService.EVENTS_URL:
+            self.batch_sizes.append(1)
+            return httpx.Response(200, json={"id": "gcal-single"})
+        assert request.url == gcal_module.GoogleCalendarService.BATCH_URL
+        boundary = request.headers["Content-Type"].split("boundary=")[1]
+        items = request.content.decode().split(f"--{boundary}")[1:-1]
+        self.batch_sizes.append(len(items))
+        parts = []
+        for index, item in enumerate(items):
+            payload = json.loads(item.strip().split("\r\n\r\n")[-1])
+            assert payload["start"]["dateTime"].endswith("+00:00")
+            # The second insert of each batch fails.
+            status, body = ("403 Forbidden", {"error": "quota"}) if index == 1 else ("200 OK", {"id": f"gcal-{index}"})
+            parts.append(
+                "--batch_resp\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-item-{index}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{json.dumps(body)}\r\n"
+            )
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "multipart/mixed; boundary=batch_resp"},
+            content=("".join(parts) + "--batch_resp--\r\n").encode(),
+        )
+
+
+@pytest.mark.asyncio
+async def test_worker_syncs_registrations_in_batches(db_engine, db_session, test_user, monkeypatch):
+    google = _FakeGoogle()
+    monkeypatch.setattr(gcal_module.settings, "google_client_id", "client")
+    monkeypatch.setattr(gcal_module.settings, "google_client_secret", "secret")
+    monkeypatch.setitem(http_clients._clients, "google", httpx.AsyncClient(transport=httpx.MockTransport(google)))
+    monkeypatch.setattr(gcal_module, "_access_tokens", {})
+    monkeypatch.setattr(gcal_module, "BATCH_LIMIT", 2)
+    monkeypatch.setattr("services.registration_service.BATCH_LIMIT", 2)
+
+    test_user.google_refresh_token = "refresh-1"
+    test_user.google_scopes = "openid https://www.googleapis.com/auth/calendar.events"
+    event = Event(
+        title="Weekly",
+        event_type="mors",
+        start_date=datetime.now() + timedelta(days=1),
+        city="Poznań",
+        price_guest=Decimal("0.00"),
+        price_member=Decimal("0.00"),
+        version=1,
+    )
+    db_session.add(event)
+    await db_session.flush()
+    for week in range(3):
+        db_session.add(Registration(
+            user_id=test_user.id,
+            event_id=event.id,
+            occurrence_date=(event.start_date + timedelta(weeks=week)).date(),
+            status=RegistrationStatus.CONFIRMED.value,
+        ))
+    await db_session.commit()
+
+    worker = CalendarSyncWorker(async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False))
+    worker.start()
+    try:
+        queued = await worker.enqueue(test_user.id)
+        assert await worker.enqueue(test_user.id) is queued
+        while queued.state in ("queued", "running"):
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+
+    progress = worker.progress(test_user.id)
+    assert (progress.state, progress.total, progress.processed, progress.synced) == ("done", 3, 3, 2)
+    # One token refresh serves both calls; the last chunk of one is a plain insert.
+    assert google.token_requests == 1
+    assert google.batch_sizes == [2, 1]
+    result = await db_session.execute(
+        select(Registration.calendar_event_id)
+        .where(Registration.user_id == test_user.id)
+        .order_by(Registration.occurrence_date)
+        .execution_options(populate_existing=True)
+    )
+    assert result.scalars().all() == ["gcal-0", None, "gcal-single"]
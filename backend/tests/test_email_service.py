@@ -0,0 +1,207 @@
+import asyncio
+import socket
+import time
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from services import email_service
+from services.email_service import EmailTemplate, SMTPConnectionPool, _MinutePacer, send_bulk
+
+
+class _RecordingHandler:
+    """aiosmtpd handler that records deliveries and can defer the first N messages."""
+
+    def __init__(self, transient_failures: int = 0) -> None:
+        self.transient_failures = transient_failures
+        self.delivered: list[str] = []
+        self.sessions: set[int] = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions.add(id(session))
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.transient_failures > 0:
+            self.transient_failures -= 1
+            return "451 4.3.0 Try again later"
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handlers: list[tuple[Controller, _RecordingHandler]] = []
+
+    def _start(transient_failures: int = 0) -> tuple[int, _RecordingHandler]:
+        handler = _RecordingHandler(transient_failures=transient_failures)
+        port = _free_port()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        handlers.append((controller, handler))
+        return port, handler
+
+    yield _start
+    for controller, _ in handlers:
+        controller.stop()
+
+
+@pytest.fixture(autouse=True)
+def _sender_address(monkeypatch):
+    monkeypatch.setattr(email_service.settings, "smtp_from_email", "noreply@kenaz.test")
+
+
+def _pool(port: int, **kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        hostname="127.0.0.1",
+        port=port,
+        start_tls=False,
+        retry_base_delay=0.01,
+        **kwargs,
+    )
+
+
+def _recipients(count: int) -> list[tuple[str, str]]:
+    return [(f"member{i}@example.com", f"Member {i}") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_reuses_pooled_connections(smtp_server):
+    port, handler = smtp_server()
+    recipients = _recipients(40)
+
+    async with _pool(port, size=3) as pool:
+        results = await send_bulk(
+            EmailTemplate.NEWSLETTER,
+            recipients,
+            ctx={"subject": "News", "content_html": "<p>Hi</p>"},
+            pool=pool,
+        )
+        opened = pool.connections_opened
+
+    assert all(results.values())
+    assert sorted(handler.delivered) == sorted(email for email, _ in recipients)
+    assert opened <= 3
+    assert len(handler.sessions) <= 3
+
+
+@pytest.mark.asyncio
+async def test_pool_retries_transient_4xx(smtp_server):
+    port, handler = smtp_server(transient_failures=2)
+
+    async with _pool(port, size=1, max_retries=3) as pool:
+        results = await send_bulk(EmailTemplate.WELCOME, _recipients(1), pool=pool)
+
+    assert results == {"member0@example.com": True}
+    assert handler.delivered == ["member0@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_pool_gives_up_after_max_retries(smtp_server):
+    port, handler = smtp_server(transient_failures=10)
+
+    async with _pool(port, size=1, max_retries=1) as pool:
+        results = await send_bulk(EmailTemplate.WELCOME, _recipients(1), pool=pool)
+
+    assert results == {"member0@example.com": False}
+    assert handler.delivered == []
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_concurrency(smtp_server, monkeypatch):
+    port, _handler = smtp_server()
+    in_flight = 0
+    peak = 0
+    original_checkout = SMTPConnectionPool._checkout
+
+    async def tracking_checkout(self):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        client = await original_checkout(self)
+        in_flight -= 1
+        return client
+
+    monkeypatch.setattr(SMTPConnectionPool, "_checkout", tracking_checkout)
+    pool = _pool(port, size=2)
+    try:
+        await asyncio.gather(*[
+            pool.send(email_service._build_message("S", "<p>x</p>", email, name))
+            for email, name in _recipients(10)
+        ])
+    finally:
+        await pool.close()
+
+    assert peak <= 2
+
+
+@pytest.mark.asyncio
+async def test_minute_pacer_delays_once_window_is_full():
+    pacer = _MinutePacer(per_minute=2, window_seconds=0.2)
+
+    started = time.monotonic()
+    for _ in range(3):
+        await pacer.wait()
+    elapsed = time.monotonic() - started
+
+    assert elapsed >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_dev_mode_logs_without_smtp(monkeypatch):
+    monkeypatch.setattr(email_service.settings, "email_enabled", False)
+
+    results = await send_bulk(EmailTemplate.WELCOME, _recipients(3))
+
+    assert results == {f"member{i}@example.com": True for i in range(3)}
+
+
+@pytest.mark.parametrize(
+    "template, base_ctx, per_recipient_ctx",
+    [
+        (
+            EmailTemplate.NEWSLETTER,
+            {"subject": "Marzec w Kenaz", "content_html": "<p>Nowe wydarzenia</p>", "cta_url": "https://kenaz.pl"},
+            {"member0@example.com": {"unsubscribe_url": "https://kenaz.pl/unsub/0"},
+             "member1@example.com": {"unsubscribe_url": "https://kenaz.pl/unsub/1"}},
+        ),
+        (EmailTemplate.WELCOME, {"frontend_url": "https://kenaz.pl"}, {}),
+        (
+            EmailTemplate.PASSWORD_RESET,
+            {"expires_minutes": 120},
+            {"member0@example.com": {"reset_url": "https://kenaz.pl/reset?t=a"},
+             "member1@example.com": {"reset_url": "https://kenaz.pl/reset?t=b"}},
+        ),
+    ],
+)
+def test_compiled_render_matches_full_renderer(template, base_ctx, per_recipient_ctx):
+    recipients = _recipients(2)
+    compiled = email_service._compile_for_batch(template, base_ctx, per_recipient_ctx, recipients[0])
+
+    assert compiled is not None
+    for email, name in recipients:
+        overrides = per_recipient_ctx.get(email, {})
+        expected = email_service._render_template(template, name, {**base_ctx, **overrides})
+        assert compiled.render(name, overrides) == expected
+
+
+def test_compiled_render_defers_to_full_renderer_for_branching_values():
+    compiled = email_service._compile_for_batch(
+        EmailTemplate.NEWSLETTER,
+        {"subject": "S"},
+        {"member0@example.com": {"unsubscribe_url": "https://kenaz.pl/unsub/0"}},
+        None,
+    )
+
+    # Empty names and empty slotted values switch renderer branches.
+    assert compiled.render("", {"unsubscribe_url": "https://kenaz.pl/unsub/0"}) is None
+    assert compiled.render("Ala", {"unsubscribe_url": ""}) is None
+    assert compiled.render("Ala", {"headline": "Other"}) is None
@@ -0,0 +1,63 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from config import Settings
+from services.http_clients import HttpClientRegistry
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802 – http.server naming
+        self.server.client_ports.add(self.client_address[1])
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    server.client_ports = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_registry_reuses_connections_across_calls(stand_in_server):
+    url = f"http://127.0.0.1:{stand_in_server.server_address[1]}/ping"
+    registry = HttpClientRegistry(Settings(http_client_timeout_seconds=5, http_client_retries=1))
+    registry.start()
+    try:
+        client = registry.get("google")
+        for _ in range(5):
+            response = await client.get(url)
+            assert response.json() == {"ok": True}
+        assert registry.get("google") is client
+        assert registry.get("tpay") is not client
+        # All five calls travelled over one kept-alive connection.
+        assert len(stand_in_server.client_ports) == 1
+    finally:
+        await registry.aclose()
+    assert client.is_closed
+
+    # A throwaway client per call, as before, connects every time.
+    stand_in_server.client_ports.clear()
+    for _ in range(3):
+        async with httpx.AsyncClient() as throwaway:
+            await throwaway.get(url)
+    assert len(stand_in_server.client_ports) == 3
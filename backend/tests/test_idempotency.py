@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+from adapters.fake_payment_adapter import get_shared_fake_payment_adapter
+import routers.payments as payments_module
+from database import get_db
+from models.event import Event
+from models.idempotency_key import IdempotencyKey
+from models.payment import Payment
+from models.registration import Registration
+from routers import events_router, payments_router
+from routers.auth import get_current_user_dependency
+from services.idempotency import sweep_idempotency_keys
+
+
+def _client(db_session, user) -> AsyncClient:
+    app = FastAPI()
+    api = APIRouter(prefix="/api")
+    api.include_router(events_router)
+    api.include_router(payments_router)
+    app.include_router(api)
+
+    async def override_get_db():
+        yield db_session
+
+    async def override_current_user():
+        return user
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_dependency] = override_current_user
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def _count(db_session, model, *where) -> int:
+    return (await db_session.execute(select(func.count()).select_from(model).where(*where))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_retried_checkout_replays_first_payment(db_session, test_user, monkeypatch):
+    monkeypatch.setattr(payments_module.settings, "frontend_url", "http://test")
+    gateway = get_shared_fake_payment_adapter(base_url="http://test")
+    gateway.clear_payments()
+    monkeypatch.setattr(payments_module, "get_payment_gateway", lambda: gateway)
+    payload = {
+        "plan_code": "monthly",
+        "return_url": "http://test/plans?payment=success",
+        "cancel_url": "http://test/plans?payment=cancelled",
+    }
+
+    async with _client(db_session, test_user) as client:
+        first = await client.post(
+            "/api/payments/subscription/checkout", json=payload, headers={"Idempotency-Key": "checkout-1"}
+        )
+        retry = await client.post(
+            "/api/payments/subscription/checkout", json=payload, headers={"Idempotency-Key": "checkout-1"}
+        )
+        other_plan = await client.post(
+            "/api/payments/subscription/checkout",
+            json={**payload, "plan_code": "yearly"},
+            headers={"Idempotency-Key": "checkout-1"},
+        )
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert other_plan.status_code == 422
+    assert await _count(db_session, Payment, Payment.user_id == test_user.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_registration_releases_key_and_sweep_drops_expired(db_session, test_user):
+    event = Event(
+        title="Retry",
+        event_type="mors",
+        start_date=datetime.now() + timedelta(days=2),
+        city="Poznań",
+        price_guest=Decimal("0.00"),
+        price_member=Decimal("0.00"),
+        max_participants=5,
+        version=1,
+    )
+    db_session.add(event)
+    await db_session.commit()
+    payload = {"return_url": "http://localhost/ok", "cancel_url": "http://localhost/cancel"}
+    headers = {"Idempotency-Key": "register-1"}
+    user_id, event_id = test_user.id, event.id
+
+    async with _client(db_session, test_user) as client:
+        missing = await client.post("/api/events/no-such-event/register", json=payload, headers=headers)
+        assert missing.status_code == 404
+        assert await _count(db_session, IdempotencyKey, IdempotencyKey.user_id == user_id) == 0
+        # The failed request rolled back the session the user was loaded in.
+        await db_session.refresh(test_user)
+
+        first = await client.post(f"/api/events/{event_id}/register", json=payload, headers=headers)
+        retry = await client.post(f"/api/events/{event_id}/register", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["registration_id"] == first.json()["registration_id"]
+    assert await _count(db_session, Registration, Registration.event_id == event_id) == 1
+
+    stored = await db_session.get(IdempotencyKey, (user_id, "register-1"))
+    assert stored.status_code == 200
+    assert await sweep_idempotency_keys(db_session) == 0
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db_session.commit()
+    assert await sweep_idempotency_keys(db_session) == 1
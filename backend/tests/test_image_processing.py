@@ -0,0 +1,105 @@
+import json
+
+from PIL import Image
+
+from services.image_processing import (
+    _build_manifest,
+    render_variants,
+    supported_variant_formats,
+)
+
+
+def _save(path, size=(1600, 1200), mode="RGB", color="navy", **options):
+    Image.new(mode, size, color).save(path, **options)
+
+
+def test_render_variants_strips_exif_and_applies_orientation(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90° clockwise on display
+    exif[0x010F] = "PhoneMaker"
+    _save(tmp_path / "photo.jpg", size=(1600, 1200), exif=exif.tobytes())
+
+    result = render_variants(str(tmp_path), "photo.jpg", (320, 640, 1280), ("webp",))
+
+    assert (result["width"], result["height"]) == (1200, 1600)
+    with Image.open(tmp_path / "photo.jpg") as original:
+        assert original.size == (1200, 1600)
+        assert not original.getexif()
+    assert [(v["name"], v["width"], v["height"]) for v in result["variants"]] == [
+        ("photo-320w.webp", 320, 427),
+        ("photo-640w.webp", 640, 853),
+        ("photo-1200w.webp", 1200, 1600),
+    ]
+    with Image.open(tmp_path / "photo-640w.webp") as variant:
+        assert variant.size == (640, 853)
+        assert not variant.getexif()
+
+
+def test_render_variants_keeps_small_images_at_native_width(tmp_path):
+    _save(tmp_path / "logo.png", size=(500, 100), mode="RGBA", color=(0, 0, 128, 100))
+
+    result = render_variants(str(tmp_path), "logo.png", (320, 640, 1280), ("webp",))
+
+    assert [v["width"] for v in result["variants"]] == [320, 500]
+    with Image.open(tmp_path / "logo-500w.webp") as variant:
+        assert variant.mode == "RGBA"
+
+
+def test_render_variants_leaves_animated_gif_untouched(tmp_path):
+    frames = [Image.new("RGB", (64, 64), color) for color in ("navy", "gold")]
+    frames[0].save(tmp_path / "anim.gif", save_all=True, append_images=frames[1:])
+    before = (tmp_path / "anim.gif").read_bytes()
+
+    result = render_variants(str(tmp_path), "anim.gif", (32,), ("webp",))
+
+    assert result["variants"] == []
+    assert (result["width"], result["height"]) == (64, 64)
+    assert (tmp_path / "anim.gif").read_bytes() == before
+
+
+def test_render_variants_treats_multi_picture_jpeg_as_still(tmp_path):
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"
+    exif[0x8825] = {2: (52.0, 24.0, 0.0)}  # GPS latitude
+    frames = [Image.new("RGB", (800, 600), color) for color in ("navy", "gold")]
+    frames[0].save(tmp_path / "phone.jpg", format="MPO", save_all=True, append_images=frames[1:], exif=exif)
+    with Image.open(tmp_path / "phone.jpg") as upload:
+        assert upload.format == "MPO" and upload.is_animated
+
+    result = render_variants(str(tmp_path), "phone.jpg", (320,), ("webp",))
+
+    assert result["type"] == "image/jpeg"
+    assert [(v["name"], v["width"]) for v in result["variants"]] == [("phone-320w.webp", 320)]
+    with Image.open(tmp_path / "phone.jpg") as original:
+        assert original.format == "JPEG"
+        assert not original.getexif()
+
+
+def test_render_variants_rejects_undecodable_file(tmp_path):
+    (tmp_path / "bad.jpg").write_bytes(b"\xff\xd8\xff\xe0not really")
+
+    assert render_variants(str(tmp_path), "bad.jpg", (320,), ("webp",)) is None
+
+
+def test_manifest_groups_srcset_by_type():
+    result = {
+        "name": "ab.jpg", "type": "image/jpeg", "width": 700, "height": 350,
+        "variants": [
+            {"name": "ab-320w.avif", "type": "image/avif", "width": 320, "height": 160, "bytes": 10},
+            {"name": "ab-320w.webp", "type": "image/webp", "width": 320, "height": 160, "bytes": 12},
+            {"name": "ab-640w.avif", "type": "image/avif", "width": 640, "height": 320, "bytes": 30},
+        ],
+    }
+
+    manifest = _build_manifest(result, lambda name: f"/uploads/{name}")
+
+    assert manifest["srcset"] == {
+        "image/avif": "/uploads/ab-320w.avif 320w, /uploads/ab-640w.avif 640w",
+        "image/webp": "/uploads/ab-320w.webp 320w",
+    }
+    assert json.loads(json.dumps(manifest)) == manifest
+
+
+def test_supported_variant_formats_skips_unknown_names():
+    assert "bmp" not in supported_variant_formats(["bmp", "webp"])
+    assert "webp" in supported_variant_formats(["bmp", "webp"])
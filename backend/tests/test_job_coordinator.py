@@ -0,0 +1,197 @@
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, APIRouter
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from database import get_db
+from models.job_run import JobRun, JobRunStatus
+from models.user import AccountStatus, User, UserRole
+from routers import admin_router
+from routers.auth import get_current_user_dependency
+from services.job_coordinator import JobCoordinator, JobOutcome, _advisory_lock_key
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _coordinator(db_engine, session_factory, worker: str, lock_backend: str = "auto") -> JobCoordinator:
+    return JobCoordinator(
+        session_factory=session_factory,
+        engine=db_engine,
+        lock_backend=lock_backend,
+        worker_id=worker,
+    )
+
+
+def test_advisory_lock_key_is_stable_and_distinct():
+    assert _advisory_lock_key("event_reminders") == _advisory_lock_key("event_reminders")
+    assert _advisory_lock_key("event_reminders") != _advisory_lock_key("other_job")
+    assert -(2 ** 63) <= _advisory_lock_key("event_reminders") < 2 ** 63
+
+
+@pytest.mark.asyncio
+async def test_run_records_successful_history(db_engine, session_factory):
+    coordinator = _coordinator(db_engine, session_factory, "worker-a")
+    calls: list[int] = []
+
+    async def job() -> None:
+        calls.append(1)
+
+    outcome = await coordinator.run("job-success", job)
+
+    assert outcome == JobOutcome.RAN
+    assert calls == [1]
+    async with session_factory() as db:
+        runs = (await db.execute(select(JobRun).where(JobRun.job_id == "job-success"))).scalars().all()
+    assert len(runs) == 1
+    assert runs[0].status == JobRunStatus.SUCCESS.value
+    assert runs[0].worker_id == "worker-a"
+    assert runs[0].duration_ms is not None and runs[0].duration_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_run_records_failure_without_raising(db_engine, session_factory):
+    coordinator = _coordinator(db_engine, session_factory, "worker-a")
+
+    async def job() -> None:
+        raise RuntimeError("boom")
+
+    outcome = await coordinator.run("job-failure", job)
+
+    assert outcome == JobOutcome.FAILED
+    async with session_factory() as db:
+        run = (await db.execute(select(JobRun).where(JobRun.job_id == "job-failure"))).scalar_one()
+    assert run.status == JobRunStatus.FAILED.value
+    assert "RuntimeError: boom" in run.error
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lock_backend", ["auto", "local"])
+async def test_concurrent_workers_run_job_once(db_engine, session_factory, lock_backend):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls: list[str] = []
+
+    def make_job(worker: str):
+        async def job() -> None:
+            calls.append(worker)
+            started.set()
+            await release.wait()
+        return job
+
+    if lock_backend == "local":
+        # The in-process fallback only guards coroutines sharing one coordinator.
+        shared = _coordinator(db_engine, session_factory, "worker-a", lock_backend)
+        coordinators = [shared, shared]
+    else:
+        coordinators = [
+            _coordinator(db_engine, session_factory, "worker-a", lock_backend),
+            _coordinator(db_engine, session_factory, "worker-b", lock_backend),
+        ]
+
+    first = asyncio.create_task(coordinators[0].run("job-concurrent", make_job("a")))
+    await asyncio.wait_for(started.wait(), timeout=5)
+    second_outcome = await coordinators[1].run("job-concurrent", make_job("b"))
+    release.set()
+    first_outcome = await first
+
+    assert first_outcome == JobOutcome.RAN
+    assert second_outcome == JobOutcome.SKIPPED_LOCKED
+    assert calls == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_lease_is_released_after_run(db_engine, session_factory):
+    worker_a = _coordinator(db_engine, session_factory, "worker-a")
+    worker_b = _coordinator(db_engine, session_factory, "worker-b")
+
+    async def job() -> None:
+        return None
+
+    assert await worker_a.run("job-release", job) == JobOutcome.RAN
+    assert await worker_b.run("job-release", job) == JobOutcome.RAN
+
+
+@pytest.mark.asyncio
+async def test_min_interval_skips_job_already_run_by_other_worker(db_engine, session_factory):
+    worker_a = _coordinator(db_engine, session_factory, "worker-a")
+    worker_b = _coordinator(db_engine, session_factory, "worker-b")
+    calls: list[str] = []
+
+    async def job() -> None:
+        calls.append("run")
+
+    assert await worker_a.run("job-periodic", job, min_interval=timedelta(minutes=55)) == JobOutcome.RAN
+    assert (
+        await worker_b.run("job-periodic", job, min_interval=timedelta(minutes=55))
+        == JobOutcome.SKIPPED_RECENT
+    )
+    assert calls == ["run"]
+
+
+@pytest.fixture
+async def admin_client(db_session):
+    admin = User(
+        google_id=f"admin-{uuid4().hex}",
+        email=f"admin-{uuid4().hex}@example.com",
+        full_name="Admin",
+        role=UserRole.ADMIN,
+        account_status=AccountStatus.ACTIVE,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+
+    app = FastAPI()
+    _api = APIRouter(prefix="/api")
+    _api.include_router(admin_router)
+    app.include_router(_api)
+
+    async def override_get_db():
+        yield db_session
+
+    async def override_current_user_dependency():
+        return admin
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_dependency] = override_current_user_dependency
+
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_admin_job_endpoints_expose_history(db_engine, session_factory, admin_client: AsyncClient):
+    coordinator = _coordinator(db_engine, session_factory, "worker-a")
+
+    async def ok_job() -> None:
+        return None
+
+    async def failing_job() -> None:
+        raise ValueError("bad")
+
+    await coordinator.run("event_reminders", ok_job)
+    await coordinator.run("event_reminders", failing_job)
+
+    summary = await admin_client.get("/api/admin/jobs")
+    assert summary.status_code == 200
+    payload = summary.json()
+    assert len(payload) == 1
+    assert payload[0]["job_id"] == "event_reminders"
+    assert payload[0]["run_count"] == 2
+    assert payload[0]["failure_count"] == 1
+    assert payload[0]["last_run"]["status"] == "failed"
+
+    runs = await admin_client.get("/api/admin/jobs/event_reminders/runs", params={"limit": 1})
+    assert runs.status_code == 200
+    assert len(runs.json()) == 1
+    assert runs.json()[0]["error"] == "ValueError: bad"
@@ -1,9 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from types import SimpleNamespace
 
 import pytest
+from fastapi import Response
 
+import routers.admin
 from routers.admin import get_event_stats, get_registration_stats, get_user_stats
 from services.payment_service import PaymentService
 from services.registration_service import RegistrationService
@@ -46,6 +48,9 @@ class _QueueSession:
             raise AssertionError("Unexpected execute() call in test")
         return self._results.pop(0)
 
+    async def scalar(self, statement):
+        return (await self.execute(statement)).scalar_one_or_none()
+
 
 class _CaptureSession:
     def __init__(self, result: _ExecuteResult | None = None):
@@ -57,6 +62,15 @@ class _CaptureSession:
         return self._result
 
 
+@pytest.fixture
+def fresh_stats(monkeypatch):
+    async def _ensure_stats_fresh(_db):
+        return datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(routers.admin, "ensure_stats_fresh", _ensure_stats_fresh)
+
+
+@pytest.mark.usefixtures("fresh_stats")
 class TestAdminLegacyIdCompat:
     @pytest.mark.asyncio
     async def test_event_stats_coerces_legacy_integer_event_id_to_string(self):
@@ -79,7 +93,7 @@ class TestAdminLegacyIdCompat:
             ]
         )
 
-        payload = await get_event_stats(db=db, _admin=SimpleNamespace(), month=None)
+        payload = await get_event_stats(response=Response(), db=db, _admin=SimpleNamespace(), month=None)
 
         assert payload[0].event_id == "170"
 
@@ -93,16 +107,18 @@ class TestAdminLegacyIdCompat:
             account_status=SimpleNamespace(value="active"),
         )
         legacy_subscription = SimpleNamespace(end_date=None, points=12)
+        legacy_stats = SimpleNamespace(
+            total_paid=Decimal("60.00"),
+            last_payment_at=datetime(2026, 2, 9, 17, 0, 0),
+            event_count=3,
+        )
         db = _QueueSession(
             [
-                _ExecuteResult(rows=[(legacy_user, legacy_subscription)]),
-                _ExecuteResult(rows=[(357, Decimal("60.00"))]),
-                _ExecuteResult(rows=[(357, datetime(2026, 2, 9, 17, 0, 0))]),
-                _ExecuteResult(rows=[(357, 3)]),
+                _ExecuteResult(rows=[(legacy_user, legacy_subscription, legacy_stats)]),
             ]
         )
 
-        payload = await get_user_stats(db=db, _admin=SimpleNamespace())
+        payload = await get_user_stats(response=Response(), db=db, _admin=SimpleNamespace())
 
         assert payload[0].user_id == "357"
 
@@ -110,7 +126,6 @@ class TestAdminLegacyIdCompat:
     async def test_registration_stats_coerces_top_event_id_to_string(self):
         db = _QueueSession(
             [
-                _ExecuteResult(one_value=(4, 2, 2)),
                 _ExecuteResult(
                     rows=[
                         ("confirmed", 2),
@@ -118,11 +133,13 @@ class TestAdminLegacyIdCompat:
                         ("cancelled", 1),
                     ]
                 ),
+                _ExecuteResult(scalar_value=2),
+                _ExecuteResult(scalar_value=2),
                 _ExecuteResult(rows=[(170, "Legacy Event", "Poznań", 5, 2)]),
             ]
         )
 
-        payload = await get_registration_stats(db=db, _admin=SimpleNamespace(), month=None)
+        payload = await get_registration_stats(response=Response(), db=db, _admin=SimpleNamespace(), month=None)
 
         assert payload.top_events[0].event_id == "170"
 
@@ -0,0 +1,96 @@
+import json
+import zipfile
+from datetime import date, datetime, timezone
+
+import pytest
+
+import services.log_archive as log_archive
+import services.log_service as log_service
+from services.log_export import LogExportFilter, stream_user_log_export
+
+
+@pytest.fixture
+def logs_root(tmp_path, monkeypatch):
+    root = tmp_path / "logs"
+    monkeypatch.setattr(log_service, "_LOGS_ROOT", root)
+    return root
+
+
+def _line(stamp: str, action: str, email: str | None) -> str:
+    now = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    return log_service._build_log_line(action, email, None, {}, now=now)
+
+
+def _write(root, label: str, filename: str, lines: list[str], trailing_newline: bool = True) -> None:
+    folder = root / label
+    folder.mkdir(parents=True, exist_ok=True)
+    text = "\n".join(lines) + ("\n" if trailing_newline else "")
+    with open(folder / filename, "a", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+async def _export(email: str, day: date, export_filter: LogExportFilter | None = None) -> list[str]:
+    chunks = [chunk async for chunk in stream_user_log_export(email, day, day, export_filter)]
+    return [line for line in b"".join(chunks).decode("utf-8").splitlines() if not line.startswith("#")]
+
+
+def test_maintain_packs_completed_days_and_keeps_today(logs_root):
+    email = "ala@example.com"
+    old = [_line("2026-03-01 08:00:00", "LOGIN", email), _line("2026-03-01 09:00:00", "PAYMENT_CREATED", email)]
+    _write(logs_root, "01-03-2026", f"{email}.log", old)
+    _write(logs_root, "01-03-2026", "_system.log", [_line("2026-03-01 10:00:00", "WEBHOOK", None)])
+    (logs_root / "01-03-2026" / f"{email}.log.idx").write_text("{}", encoding="utf-8")
+    _write(logs_root, "03-03-2026", f"{email}.log", [_line("2026-03-03 08:00:00", "LOGIN", email)])
+
+    report = log_archive.maintain_logs(today=date(2026, 3, 3))
+
+    assert report.archived == ["01-03-2026"]
+    assert not (logs_root / "01-03-2026").exists()
+    assert (logs_root / "03-03-2026").is_dir()
+    with zipfile.ZipFile(log_service._archive_path_for("01-03-2026")) as archive:
+        assert sorted(archive.namelist()) == sorted(
+            [f"{email}.log", f"{email}.log.idx", "_system.log", "_system.log.idx"]
+        )
+        assert archive.getinfo(f"{email}.log").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read(f"{email}.log").decode("utf-8") == "\n".join(old) + "\n"
+        index = json.loads(archive.read(f"{email}.log.idx"))
+    assert set(index["actions"]) == {"LOGIN", "PAYMENT_CREATED"}
+
+
+@pytest.mark.asyncio
+async def test_export_reads_archive_and_late_live_writes(logs_root):
+    email = "ala@example.com"
+    lines = [
+        _line("2026-03-01 08:00:00", "LOGIN", email),
+        _line("2026-03-01 09:00:00", "PAYMENT_CREATED", email),
+        _line("2026-03-01 12:00:00", "PAYMENT_COMPLETED", email),
+    ]
+    _write(logs_root, "01-03-2026", f"{email}.log", lines[:2], trailing_newline=False)
+    log_archive.maintain_logs(today=date(2026, 3, 2))
+    # A late line recreates the packed folder; it is read until the next run merges it.
+    _write(logs_root, "01-03-2026", f"{email}.log", lines[2:])
+
+    assert await _export(email, date(2026, 3, 1)) == lines
+    assert await _export(email, date(2026, 3, 1), LogExportFilter(actions=("PAYMENT_*",))) == lines[1:]
+
+    log_archive.maintain_logs(today=date(2026, 3, 2))
+
+    assert not (logs_root / "01-03-2026").exists()
+    assert await _export(email, date(2026, 3, 1)) == lines
+    assert await _export(email, date(2026, 3, 1), LogExportFilter(actions=("PAYMENT_*",))) == lines[1:]
+    assert await _export("other@example.com", date(2026, 3, 1)) == []
+
+
+def test_retention_removes_old_archives_and_folders(logs_root):
+    email = "ala@example.com"
+    for label in ("01-01-2026", "20-02-2026", "28-02-2026"):
+        _write(logs_root, label, f"{email}.log", [_line("2026-01-01 08:00:00", "LOGIN", email)])
+    log_archive.maintain_logs(today=date(2026, 3, 1))
+    _write(logs_root, "02-01-2026", f"{email}.log", [_line("2026-01-02 08:00:00", "LOGIN", email)])
+
+    report = log_archive.maintain_logs(today=date(2026, 3, 1), retention_days=30)
+
+    assert sorted(report.removed) == ["01-01-2026", "02-01-2026"]
+    assert not (logs_root / "02-01-2026").exists()
+    remaining = sorted(path.name for path in (logs_root / "archive").iterdir())
+    assert remaining == ["20-02-2026.zip", "28-02-2026.zip"]
@@ -0,0 +1,184 @@
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import services.log_service as log_service
+from services.log_service import LogWriter, log_action
+
+
+@pytest.fixture
+def logs_root(tmp_path, monkeypatch):
+    root = tmp_path / "logs"
+    monkeypatch.setattr(log_service, "_LOGS_ROOT", root)
+    return root
+
+
+@pytest.fixture
+async def running_writer(monkeypatch):
+    writer = LogWriter(batch_size=50, flush_interval=0.05, max_open_files=2)
+    monkeypatch.setattr(log_service, "log_writer", writer)
+    writer.start()
+    yield writer
+    await writer.stop()
+
+
+def _today_folder(root):
+    return root / datetime.now(timezone.utc).strftime("%d-%m-%Y")
+
+
+@pytest.mark.asyncio
+async def test_log_action_writes_directly_without_writer(logs_root):
+    await log_action("PAYMENT_CREATED", user_email="Ala@Example.com", ip="1.2.3.4", amount="10 PLN")
+
+    content = (_today_folder(logs_root) / "ala@example.com.log").read_text(encoding="utf-8")
+    assert "PAYMENT_CREATED | user=Ala@Example.com | ip=1.2.3.4 | amount=10 PLN" in content
+
+
+@pytest.mark.asyncio
+async def test_writer_batches_lines_and_flushes_on_stop(logs_root, running_writer):
+    users = [f"user{i}@example.com" for i in range(5)]
+    for n in range(40):
+        await log_action("ACTION", user_email=users[n % len(users)], seq=n)
+    await log_action("WEBHOOK_RECEIVED")
+
+    await running_writer.stop()
+
+    folder = _today_folder(logs_root)
+    for i, email in enumerate(users):
+        lines = (folder / f"{email}.log").read_text(encoding="utf-8").splitlines()
+        assert [line.rsplit("seq=", 1)[1] for line in lines] == [str(n) for n in range(i, 40, 5)]
+    assert "WEBHOOK_RECEIVED | user=anonymous" in (folder / "_system.log").read_text(encoding="utf-8")
+    assert not running_writer.running
+
+
+@pytest.mark.asyncio
+async def test_lines_logged_during_stop_are_written(logs_root, running_writer):
+    await log_action("BEFORE_STOP")
+    stopping = asyncio.create_task(running_writer.stop())
+    await asyncio.sleep(0)
+    assert not running_writer.running
+
+    await log_action("DURING_STOP")
+    await stopping
+
+    content = (_today_folder(logs_root) / "_system.log").read_text(encoding="utf-8")
+    assert "BEFORE_STOP" in content
+    assert "DURING_STOP" in content
+
+
+def test_unwritable_file_does_not_drop_rest_of_batch(logs_root):
+    writer = LogWriter()
+    folder = _today_folder(logs_root)
+    folder.mkdir(parents=True)
+    (folder / "not-a-dir").write_text("", encoding="utf-8")
+    broken = folder / "not-a-dir" / "x.log"
+    good = folder / "ok.log"
+
+    writer._write_batch([(broken, "lost"), (good, "kept")])
+    writer._close_all()
+
+    assert good.read_text(encoding="utf-8") == "kept\n"
+
+
+@pytest.mark.asyncio
+async def test_writer_keeps_bounded_open_handles(logs_root, running_writer):
+    for n in range(10):
+        await log_action("ACTION", user_email=f"user{n}@example.com")
+    await running_writer.stop()
+
+    assert len(running_writer._handles) == 0
+    assert len(list(_today_folder(logs_root).iterdir())) == 10
+
+
+@pytest.mark.asyncio
+async def test_writer_closes_previous_day_handles_on_rollover(logs_root):
+    writer = LogWriter(max_open_files=8)
+    before = datetime(2026, 3, 1, 23, 59, 59, tzinfo=timezone.utc)
+    after = datetime(2026, 3, 2, 0, 0, 1, tzinfo=timezone.utc)
+    old_path = log_service._resolve_log_file_path("ala@example.com", before)
+    new_path = log_service._resolve_log_file_path("ala@example.com", after)
+
+    writer._write_batch([(old_path, "late line")])
+    assert old_path in writer._handles
+    writer._write_batch([(new_path, "early line")])
+
+    assert old_path not in writer._handles
+    assert new_path in writer._handles
+    writer._close_all()
+    assert old_path.read_text(encoding="utf-8") == "late line\n"
+    assert new_path.parent.name == "02-03-2026"
+    assert new_path.read_text(encoding="utf-8") == "early line\n"
+
+
+class _FakeDatetime(datetime):
+    current = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+async def _log_days(days, users=30):
+    for day in days:
+        _FakeDatetime.current = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc) + timedelta(days=day)
+        for n in range(users):
+            await log_action("ACTION", user_email=f"user{n}@example.com")
+
+
+def _log_service_bytes(snapshot):
+    return sum(stat.size for stat in snapshot.filter_traces(
+        [tracemalloc.Filter(True, log_service.__file__)]
+    ).statistics("filename"))
+
+
+@pytest.mark.asyncio
+async def test_direct_writes_keep_memory_flat_across_day_rollovers(logs_root, monkeypatch):
+    monkeypatch.setattr(log_service, "datetime", _FakeDatetime)
+    await _log_days(range(5))
+
+    tracemalloc.start()
+    try:
+        await _log_days(range(5, 10))
+        after_few = _log_service_bytes(tracemalloc.take_snapshot())
+        await _log_days(range(10, 60))
+        after_many = _log_service_bytes(tracemalloc.take_snapshot())
+    finally:
+        tracemalloc.stop()
+
+    # Fifty more days of thirty files each retain (almost) nothing.
+    assert after_many - after_few < 16 * 1024
+    assert len(list(logs_root.iterdir())) == 60
+
+
+@pytest.mark.asyncio
+async def test_writer_handles_stay_flat_across_day_rollovers(logs_root, monkeypatch):
+    monkeypatch.setattr(log_service, "datetime", _FakeDatetime)
+    writer = LogWriter(batch_size=30, flush_interval=0.05, max_open_files=64)
+    monkeypatch.setattr(log_service, "log_writer", writer)
+    open_after_batch = []
+    write_batch = writer._write_batch
+
+    def recording_write_batch(batch):
+        write_batch(batch)
+        open_after_batch.append(len(writer._handles))
+
+    writer._write_batch = recording_write_batch
+    writer.start()
+    try:
+        await _log_days(range(20))
+    finally:
+        await writer.stop()
+
+    # One day's files at most, even though max_open_files would allow more.
+    assert len(open_after_batch) >= 20
+    assert max(open_after_batch) <= 30
+    assert len(list(logs_root.iterdir())) == 20
+
+
+def test_same_file_always_maps_to_same_lock(logs_root):
+    path = log_service._resolve_log_file_path("ala@example.com")
+    same_path = log_service._resolve_log_file_path("ALA@example.com")
+
+    assert log_service._file_lock_for(path) is log_service._file_lock_for(same_path)
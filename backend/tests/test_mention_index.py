@@ -0,0 +1,110 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from config import get_settings
+from database import get_db
+from models.user import AccountStatus, User, UserRole
+from routers import users_router
+from services.auth_service import AuthService
+from services.mention_index import MentionCandidate, MentionIndex, mention_index
+from utils.text_search import fold_text
+
+
+def _candidate(user_id: str, full_name: str) -> MentionCandidate:
+    return MentionCandidate(id=user_id, full_name=full_name, picture_url=None, folded_name=fold_text(full_name))
+
+
+def _names(hits) -> list[str]:
+    return [c.full_name for c in hits]
+
+
+def test_search_ranks_name_prefix_before_word_prefix_and_folds_accents():
+    index = MentionIndex()
+    assert index.search("an") is None
+
+    index.replace_all([
+        _candidate("1", "Mikołaj Kluka"),
+        _candidate("2", "Anna Łukaszewicz"),
+        _candidate("3", "Łukasz Nowak"),
+        _candidate("4", "Zofia Kowalska-Łukomska"),
+    ])
+
+    assert _names(index.search("ŁUK")) == ["Łukasz Nowak", "Anna Łukaszewicz", "Zofia Kowalska-Łukomska"]
+    assert _names(index.search("anna luk")) == ["Anna Łukaszewicz"]
+    assert _names(index.search("luk", limit=1)) == ["Łukasz Nowak"]
+    # Mid-word matches are left to the SQL search.
+    assert index.search("ukasz") == []
+    assert index.search("  ") == []
+
+
+def test_upsert_follows_renames_and_status_changes():
+    index = MentionIndex()
+    user = User(id="u1", full_name="Jan Kowalski", account_status=AccountStatus.ACTIVE)
+    index.upsert(user)
+    assert len(index) == 0
+
+    index.replace_all([])
+    index.upsert(user)
+    assert _names(index.search("kow")) == ["Jan Kowalski"]
+
+    user.full_name = "Jan Nowak"
+    index.upsert(user)
+    assert index.search("kow") == []
+    assert _names(index.search("now")) == ["Jan Nowak"]
+
+    user.account_status = AccountStatus.BANNED
+    index.upsert(user)
+    assert index.search("jan") == []
+    assert len(index) == 0
+    assert index._root.children == {}
+
+
+@pytest.fixture
+async def search_client(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "mention_index_enabled", True)
+    app = FastAPI()
+    _api = APIRouter(prefix="/api")
+    _api.include_router(users_router)
+    app.include_router(_api)
+
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    try:
+        yield client
+    finally:
+        await client.aclose()
+        mention_index.__init__()
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_answers_from_index_and_falls_back_to_sql(search_client: AsyncClient, db_session):
+    users = []
+    for name, status in (("Searcher", AccountStatus.ACTIVE), ("Łukasz Nowak", AccountStatus.ACTIVE),
+                         ("Łucja Pending", AccountStatus.PENDING)):
+        users.append(User(
+            google_id=f"mention-{uuid4().hex}",
+            email=f"mention-{uuid4().hex}@example.com",
+            full_name=name,
+            role=UserRole.MEMBER,
+            account_status=status,
+        ))
+    db_session.add_all(users)
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {AuthService(db_session).create_access_token(users[0])}"}
+
+    assert await mention_index.reload(db_session) == 2
+    # Renamed in the database only: the index still answers with the loaded name.
+    users[1].full_name = "Łukasz Kowalski"
+    await db_session.commit()
+
+    response = await search_client.get("/api/users/search", params={"q": "luk"}, headers=headers)
+    assert [u["full_name"] for u in response.json()] == ["Łukasz Nowak"]
+
+    response = await search_client.get("/api/users/search", params={"q": "walsk"}, headers=headers)
+    assert [u["full_name"] for u in response.json()] == ["Łukasz Kowalski"]
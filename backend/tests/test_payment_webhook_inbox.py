@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import routers.admin as admin_module
+import routers.payments as payments_module
+import services.payment_webhooks as webhooks_module
+from adapters.fake_payment_adapter import FakePaymentAdapter
+from adapters.tpay_adapter import TpayAdapter
+from config import get_settings
+from models.payment import Payment, PaymentStatus, PaymentType
+from models.payment_webhook_inbox import PaymentWebhookInbox, WebhookInboxState
+from ports.payment_gateway import PaymentRequest
+from services.payment_webhooks import PaymentWebhookWorker, enqueue_payment_webhook
+
+
+async def _inbox_entries(db: AsyncSession) -> list[PaymentWebhookInbox]:
+    result = await db.execute(
+        select(PaymentWebhookInbox)
+        .order_by(PaymentWebhookInbox.received_at)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_worker_applies_deduplicated_webhook(db_engine, db_session, test_user, monkeypatch):
+    gateway = FakePaymentAdapter(auto_complete=False)
+    gateway_payment = await gateway.create_payment(
+        PaymentRequest(
+            amount=Decimal("30.00"),
+            currency="PLN",
+            description="Inbox",
+            user_id=test_user.id,
+            user_email=test_user.email,
+            user_name=test_user.full_name,
+            return_url="http://r",
+            cancel_url="http://c",
+        )
+    )
+    db_session.add(Payment(
+        user_id=test_user.id,
+        external_id=gateway_payment.payment_id,
+        amount=Decimal("30.00"),
+        currency="PLN",
+        payment_type=PaymentType.EVENT.value,
+        status=PaymentStatus.PENDING.value,
+        description="Inbox",
+    ))
+    await db_session.commit()
+
+    confirmed = []
+
+    async def fake_confirm(self, payment_id):
+        confirmed.append(payment_id)
+
+    monkeypatch.setattr("services.registration_service.RegistrationService.confirm_registration", fake_confirm)
+
+    payload = {"payment_id": gateway_payment.payment_id, "status": "completed"}
+    assert await enqueue_payment_webhook(db_session, payload, "sig", ip="10.0.0.1") is True
+    # A gateway retry of the same notification is acknowledged, not stored again.
+    assert await enqueue_payment_webhook(db_session, payload, "sig", ip="10.0.0.1") is False
+
+    worker = PaymentWebhookWorker(
+        async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False),
+        gateway_factory=lambda: gateway,
+    )
+    assert await worker.process_due() == 1
+    assert await worker.process_due() == 0
+
+    (entry,) = await _inbox_entries(db_session)
+    assert entry.state == WebhookInboxState.PROCESSED.value
+    assert entry.attempts == 1
+    assert entry.result == f"Payment {gateway_payment.payment_id} updated to completed"
+    assert confirmed == [gateway_payment.payment_id]
+    payment = await db_session.scalar(
+        select(Payment)
+        .where(Payment.external_id == gateway_payment.payment_id)
+        .execution_options(populate_existing=True)
+    )
+    assert payment.status == PaymentStatus.COMPLETED.value
+    assert worker.lag.count == 1
+    assert worker.processing.count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_webhook_is_retried_with_backoff_then_given_up(db_engine, db_session, monkeypatch):
+    async def failing_apply(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(webhooks_module, "apply_payment_webhook", failing_apply)
+    monkeypatch.setattr(get_settings(), "payment_webhook_max_attempts", 2)
+    await enqueue_payment_webhook(db_session, {"payment_id": "P-1", "status": "completed"}, None)
+
+    worker = PaymentWebhookWorker(async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False))
+    assert await worker.process_due() == 1
+
+    (entry,) = await _inbox_entries(db_session)
+    assert entry.state == WebhookInboxState.PENDING.value
+    assert entry.attempts == 1
+    assert entry.result == "RuntimeError: database unavailable"
+    assert entry.available_at > datetime.now(timezone.utc)
+    # Not due again until the backoff has passed.
+    assert await worker.process_due() == 0
+
+    await db_session.execute(
+        update(PaymentWebhookInbox).values(available_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    await db_session.commit()
+    assert await worker.process_due() == 1
+
+    (entry,) = await _inbox_entries(db_session)
+    assert entry.state == WebhookInboxState.FAILED.value
+    assert entry.attempts == 2
+    assert worker.processing.failures == 2
+    assert worker.lag.count == 0
+
+
+def test_inline_and_inbox_paths_share_the_gateway_selector():
+    assert PaymentWebhookWorker()._gateway_factory is payments_module.get_payment_gateway
+
+
+@pytest.mark.asyncio
+async def test_inbox_stats_report_gateway_token_fetches(db_session, monkeypatch):
+    stats = await admin_module.get_webhook_inbox_stats(db=db_session, _admin=None)
+    assert stats.gateway_token_fetches is None
+
+    tpay = TpayAdapter(client_id="client", client_secret="secret", merchant_id="merchant", security_code="code")
+    tpay.token_fetches.observe(0.25)
+    tpay.token_fetches.observe(1.5, ok=False)
+    monkeypatch.setattr(admin_module, "get_payment_gateway", lambda: tpay)
+
+    stats = await admin_module.get_webhook_inbox_stats(db=db_session, _admin=None)
+    assert stats.gateway_token_fetches.count == 2
+    assert stats.gateway_token_fetches.failures == 1
+    assert stats.gateway_token_fetches.max_seconds == 1.5
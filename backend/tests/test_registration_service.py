@@ -12,12 +12,15 @@ import pytest
 import asyncio
 from decimal import Decimal
 from datetime import datetime, timedelta
-from sqlalchemy import select
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from models.user import User, UserRole, AccountStatus
 from models.event import Event
+from models.event_capacity import EventOccurrenceCapacity
 from models.registration import Registration, RegistrationStatus
 from models.registration_refund_task import RegistrationRefundTask
+from services.payment_service import PaymentService
 from services.registration_service import (
     RegistrationService,
     AlreadyRegisteredError,
@@ -142,6 +145,48 @@ class TestPaidEventRegistration:
         assert result["status"] == "pending_payment"
         assert result["amount"] == "30.00"  # Member price
 
+    @pytest.mark.asyncio
+    async def test_paid_registration_commits_payment_once(
+        self,
+        registration_service: RegistrationService,
+        test_user: User,
+        test_event: Event,
+        db_session,
+    ):
+        """Payment and registration share one commit and the payment is never re-read."""
+        statements = []
+        commits = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        def record_commit(conn):
+            commits.append(conn)
+
+        engine = db_session.bind.sync_engine
+        sa_event.listen(engine, "before_cursor_execute", record)
+        sa_event.listen(engine, "commit", record_commit)
+        try:
+            result = await registration_service.initiate_registration(
+                user=test_user,
+                event_id=test_event.id,
+                return_url="http://localhost/success",
+                cancel_url="http://localhost/cancel",
+            )
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", record)
+            sa_event.remove(engine, "commit", record_commit)
+
+        assert result["status"] == "pending_payment"
+        assert len(commits) == 1
+        payment_inserts = [s for s in statements if s.lstrip().startswith("INSERT INTO payments")]
+        assert len(payment_inserts) == 1
+        assert "RETURNING payments.created_at" in payment_inserts[0]
+        assert not [s for s in statements if s.lstrip().startswith("SELECT payments.")]
+
+        payment = await registration_service.payment_service.get_payment_by_external_id(result["payment_id"])
+        assert payment.created_at is not None
+
     @pytest.mark.asyncio
     async def test_subscription_required_blocks_guest(
         self,
@@ -643,6 +688,108 @@ class TestConcurrency:
         assert after["confirmed_count"] == 1
 
 
+    @pytest.mark.asyncio
+    async def test_subscription_is_loaded_once_per_request(
+        self,
+        registration_service: RegistrationService,
+        test_member: User,
+        test_subscription_event: Event,
+        db_session,
+    ):
+        """Subscription check and member pricing share one subscription query."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.bind.sync_engine
+        sa_event.listen(engine, "before_cursor_execute", record)
+        try:
+            result = await registration_service.initiate_registration(
+                user=test_member,
+                event_id=test_subscription_event.id,
+                return_url="http://localhost/success",
+                cancel_url="http://localhost/cancel",
+            )
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", record)
+
+        assert result["amount"] == "30.00"
+        subscription_queries = [s for s in statements if s.lstrip().startswith("SELECT subscriptions.")]
+        assert len(subscription_queries) == 1
+
+        availability = await registration_service.check_availability(test_subscription_event.id)
+        assert availability["available_spots"] == 9
+
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strategy", ["row_lock", "counter"])
+    async def test_pessimistic_allocation_never_oversells(
+        self,
+        strategy: str,
+        db_engine,
+        db_session,
+        payment_gateway,
+    ):
+        """Concurrent registrants queue on the capacity row instead of failing."""
+        event = Event(
+            title="Popular",
+            event_type="mors",
+            start_date=datetime.now() + timedelta(days=4),
+            city="Poznań",
+            price_guest=Decimal("0.00"),
+            price_member=Decimal("0.00"),
+            max_participants=3,
+            version=1,
+        )
+        users = [
+            User(
+                google_id=f"alloc-{i}",
+                email=f"alloc-{i}@example.com",
+                full_name=f"Alloc {i}",
+                role=UserRole.GUEST,
+                account_status=AccountStatus.ACTIVE,
+            )
+            for i in range(8)
+        ]
+        db_session.add_all([event, *users])
+        await db_session.commit()
+        sessions = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def register(user: User) -> dict:
+            async with sessions() as session:
+                service = RegistrationService(
+                    session, PaymentService(session, payment_gateway), spot_allocation=strategy
+                )
+                return await service.initiate_registration(
+                    user=await session.get(User, user.id),
+                    event_id=event.id,
+                    return_url="http://localhost/success",
+                    cancel_url="http://localhost/cancel",
+                    max_retries=1,
+                )
+
+        results = await asyncio.gather(*(register(user) for user in users))
+        assert sorted(r["status"] for r in results) == ["confirmed"] * 3 + ["waitlist"] * 5
+
+        service = RegistrationService(
+            db_session, PaymentService(db_session, payment_gateway), spot_allocation=strategy
+        )
+        confirmed = next(r for r in results if r["status"] == "confirmed")
+        confirmed_user = next(
+            u for u, r in zip(users, results) if r["registration_id"] == confirmed["registration_id"]
+        )
+        cancelled = await service.cancel_registration(confirmed["registration_id"], confirmed_user.id)
+        assert cancelled["success"] is True
+
+        availability = await service.check_availability(event.id)
+        assert (availability["confirmed_count"], availability["waitlist_count"]) == (3, 4)
+        capacity = await db_session.scalar(
+            select(EventOccurrenceCapacity.occupied).where(EventOccurrenceCapacity.event_id == event.id)
+        )
+        assert capacity == 3
+
+
 class TestManualPaymentVerification:
     @pytest.mark.asyncio
     async def test_manual_payment_registration_happy_path(
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from models.payment import Payment, PaymentStatus
+from models.registration import Registration, RegistrationStatus
+from models.stats_summary import (
+    EventPaymentDailyStats,
+    PaymentDailyStats,
+    RegistrationDailyStats,
+    RegistrationMonthlyStats,
+    UserStats,
+)
+from services.stats_service import ensure_stats_fresh, refresh_admin_stats
+
+SUMMARY_MODELS = (
+    PaymentDailyStats,
+    EventPaymentDailyStats,
+    RegistrationDailyStats,
+    RegistrationMonthlyStats,
+    UserStats,
+)
+
+
+async def _snapshot(db) -> dict[str, list[tuple]]:
+    snapshot = {}
+    for model in SUMMARY_MODELS:
+        columns = list(model.__table__.columns)
+        result = await db.execute(select(*columns).order_by(*model.__table__.primary_key.columns))
+        snapshot[model.__tablename__] = [tuple(row) for row in result.all()]
+    return snapshot
+
+
+def _payment(user_id: str, amount: str, status: str, payment_type: str = "event", extra_data=None) -> Payment:
+    return Payment(
+        user_id=user_id,
+        external_id=f"stats-{uuid4().hex}",
+        amount=Decimal(amount),
+        currency="PLN",
+        payment_type=payment_type,
+        status=status,
+        extra_data=extra_data,
+    )
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_matches_full_rebuild(db_session, test_user, test_member, test_event):
+    day = date(2026, 3, 30)
+    paid = _payment(test_user.id, "50.00", PaymentStatus.COMPLETED.value)
+    subscription = _payment(
+        test_member.id, "120.00", PaymentStatus.PENDING.value, "subscription", '{"plan_code": "yearly"}'
+    )
+    db_session.add_all([paid, subscription])
+    await db_session.flush()
+    confirmed = Registration(
+        user_id=test_user.id, event_id=test_event.id, occurrence_date=day,
+        status=RegistrationStatus.CONFIRMED.value, payment_id=paid.external_id,
+    )
+    waitlisted = Registration(
+        user_id=test_member.id, event_id=test_event.id, occurrence_date=day,
+        status=RegistrationStatus.WAITLIST.value,
+    )
+    db_session.add_all([confirmed, waitlisted])
+    await db_session.commit()
+
+    built_at = await ensure_stats_fresh(db_session)
+    assert await ensure_stats_fresh(db_session) == built_at
+    user_stats = await db_session.get(UserStats, test_user.id)
+    assert (user_stats.total_paid, user_stats.event_count) == (Decimal("50.00"), 1)
+
+    # Complete the subscription, refund the first payment, move its registration
+    # into the next month and promote the waitlisted registration with a new payment.
+    promoted_payment = _payment(test_member.id, "30.00", PaymentStatus.COMPLETED.value)
+    db_session.add(promoted_payment)
+    await db_session.flush()
+    subscription.status = PaymentStatus.COMPLETED.value
+    paid.status = PaymentStatus.REFUNDED.value
+    confirmed.occurrence_date = confirmed.occurrence_date + timedelta(days=2)
+    waitlisted.status = RegistrationStatus.CONFIRMED.value
+    waitlisted.payment_id = promoted_payment.external_id
+    await db_session.commit()
+
+    refreshed_at = await ensure_stats_fresh(db_session)
+    assert refreshed_at > built_at
+    incremental = await _snapshot(db_session)
+
+    await refresh_admin_stats(db_session, full=True)
+    assert await _snapshot(db_session) == incremental
+    assert [row[0] for row in incremental["stats_registration_monthly"]] == ["2026-03", "2026-04"]
+    member_stats = await db_session.get(UserStats, test_member.id, populate_existing=True)
+    assert (member_stats.total_paid, member_stats.event_count) == (Decimal("150.00"), 1)
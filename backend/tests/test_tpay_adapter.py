@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from adapters.tpay_adapter import TpayAdapter
+from services.http_clients import http_clients
+
+
+class _FakeTpay(BaseHTTPRequestHandler):
+    """Token endpoint issuing token-1, token-2, ...; /transactions accepts only the newest."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:  # noqa: N802 – http.server naming
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if self.path != "/oauth/auth" or form.get("client_secret") != ["secret"]:
+            self._reply(401, {"error": "invalid_client"})
+            return
+        time.sleep(0.1)  # slow enough for concurrent callers to overlap
+        with self.server.lock:
+            self.server.issued += 1
+            token = f"token-{self.server.issued}"
+        self._reply(200, {"access_token": token, "token_type": "Bearer", "expires_in": 7200})
+
+    def do_GET(self) -> None:  # noqa: N802
+        expected = f"Bearer token-{self.server.issued}"
+        if self.headers.get("Authorization") != expected:
+            self._reply(401, {"error": "invalid_token"})
+            return
+        self._reply(200, {"result": "success"})
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_tpay():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeTpay)
+    server.lock = threading.Lock()
+    server.issued = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+async def close_pooled_clients():
+    # Pooled connections belong to this test's event loop.
+    yield
+    await http_clients.aclose()
+
+
+def _adapter(server) -> TpayAdapter:
+    return TpayAdapter(
+        client_id="client",
+        client_secret="secret",
+        merchant_id="merchant",
+        security_code="code",
+        api_url=f"http://127.0.0.1:{server.server_address[1]}",
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_token_fetch(fake_tpay):
+    adapter = _adapter(fake_tpay)
+
+    results = await asyncio.gather(*(adapter._make_request("GET", "/transactions") for _ in range(10)))
+
+    assert results == [{"result": "success"}] * 10
+    assert fake_tpay.issued == 1
+    assert adapter.token_fetches.count == 1
+    assert adapter.token_fetches.last_seconds >= 0.1
+    # Cached: further requests skip the token endpoint.
+    await adapter._make_request("GET", "/transactions")
+    assert fake_tpay.issued == 1
+
+
+@pytest.mark.asyncio
+async def test_token_is_refreshed_ahead_of_expiry_and_after_401(fake_tpay):
+    adapter = _adapter(fake_tpay)
+    assert await adapter._get_access_token() == "token-1"
+
+    # Close to expiry the current token is served while a refresh runs.
+    adapter._token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert await adapter._get_access_token() == "token-1"
+    assert await adapter._token_refresh == "token-2"
+    assert await adapter._get_access_token() == "token-2"
+
+    # Tpay revoked the token early: the request is retried with a new one.
+    fake_tpay.issued += 1
+    assert await adapter._make_request("GET", "/transactions") == {"result": "success"}
+    assert adapter._access_token == "token-4"
+    assert adapter.token_fetches.count == 3
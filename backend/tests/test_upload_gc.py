@@ -0,0 +1,79 @@
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from models.event import Event
+from adapters.local_upload_storage import LocalUploadStorage
+from models.user import AccountStatus, User, UserRole
+from services.upload_gc import collect_unreferenced_uploads
+
+_EVENT_STEM = "a" * 64
+_AVATAR_STEM = "b" * 32
+_ORPHAN_STEM = "c" * 64
+_FRESH_STEM = "d" * 64
+
+
+def _family(upload_dir, stem: str, age_seconds: float) -> list[str]:
+    names = [f"{stem}.jpg", f"{stem}-320w.webp", f"{stem}.json"]
+    stamp = time.time() - age_seconds
+    for name in names:
+        path = upload_dir / name
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (stamp, stamp))
+    return names
+
+
+@pytest.fixture
+async def referencing_rows(db_session):
+    db_session.add(Event(
+        title="Wernisaż",
+        description=f'<p>Plakat:</p><img src="/uploads/{_EVENT_STEM}-320w.webp">',
+        event_type="art",
+        start_date=datetime.now() + timedelta(days=3),
+        city="Poznań",
+        price_guest=Decimal("0"),
+        price_member=Decimal("0"),
+        version=1,
+    ))
+    db_session.add(User(
+        google_id=f"gc-{uuid4().hex}",
+        email=f"gc-{uuid4().hex}@example.com",
+        full_name="Avatar User",
+        role=UserRole.MEMBER,
+        account_status=AccountStatus.ACTIVE,
+        picture_url=f"https://cdn.kenaz.pl/media/{_AVATAR_STEM}.png",
+    ))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_gc_deletes_only_old_unreferenced_families(db_session, referencing_rows, tmp_path):
+    day = 24 * 3600
+    kept = _family(tmp_path, _EVENT_STEM, 3 * day) + _family(tmp_path, _AVATAR_STEM, 3 * day)
+    kept += _family(tmp_path, _FRESH_STEM, 60)
+    orphan = _family(tmp_path, _ORPHAN_STEM, 3 * day)
+    (tmp_path / "README.txt").write_text("not an upload")
+    (tmp_path / "incoming").mkdir()
+    abandoned = tmp_path / "incoming" / ("e" * 32)
+    abandoned.write_bytes(b"x" * 10)
+    os.utime(abandoned, (time.time() - 3 * day,) * 2)
+    orphan.append(f"incoming/{abandoned.name}")
+    (tmp_path / ".staging").mkdir()
+    storage = LocalUploadStorage(tmp_path, base_url="https://cdn.kenaz.pl/media")
+
+    dry = await collect_unreferenced_uploads(db_session, storage, grace_seconds=day, dry_run=True)
+    assert sorted(dry.deleted) == sorted(orphan)
+    assert all((tmp_path / name).exists() for name in orphan)
+
+    report = await collect_unreferenced_uploads(db_session, storage, grace_seconds=day)
+
+    assert sorted(report.deleted) == sorted(orphan)
+    assert report.bytes_freed == 40
+    assert report.kept_recent == 1
+    remaining = sorted(p.name for p in tmp_path.iterdir() if p.is_file())
+    assert remaining == sorted(kept + ["README.txt"])
+    assert list((tmp_path / "incoming").iterdir()) == []
@@ -0,0 +1,291 @@
+import base64
+import hashlib
+import io
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+from xml.sax.saxutils import escape
+
+import pytest
+from PIL import Image
+from fastapi import APIRouter, FastAPI
+from httpx import ASGITransport, AsyncClient, HTTPStatusError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+import routers.uploads as uploads_module
+from adapters.local_upload_storage import LocalUploadStorage
+from adapters.s3_upload_storage import S3UploadStorage, SigV4Signer
+from database import get_db
+from models.user import AccountStatus, User, UserRole
+from routers import uploads_router
+from routers.uploads import get_upload_storage
+from services.auth_service import AuthService
+from services.http_clients import http_clients
+
+_ENDPOINT = "http://s3.test"
+_BUCKET = "kenaz-media"
+_ACCESS_KEY = "AKIDEXAMPLE"
+_SECRET_KEY = "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY"
+_REGION = "eu-central-1"
+
+
+class FakeS3:
+    """In-process S3 stand-in that checks SigV4 signatures like a real bucket."""
+
+    def __init__(self):
+        self.objects: dict[str, tuple[bytes, dict[str, str]]] = {}
+        self.signer = SigV4Signer(_ACCESS_KEY, _SECRET_KEY, _REGION)
+        self.app = Starlette(routes=[
+            Route(f"/{_BUCKET}", self.bucket, methods=["GET", "POST"]),
+            Route(f"/{_BUCKET}/{{key:path}}", self.object, methods=["GET", "HEAD", "PUT", "DELETE"]),
+        ])
+
+    def _authorized(self, request: Request, body: bytes) -> bool:
+        authorization = request.headers.get("authorization", "")
+        signed = authorization.partition("SignedHeaders=")[2].partition(",")[0].split(";")
+        now = datetime.strptime(request.headers["x-amz-date"], "%Y%m%dT%H%M%SZ")
+        expected = self.signer.authorization(
+            request.method,
+            request.url.path,
+            dict(request.query_params),
+            {name: request.headers[name] for name in signed},
+            request.headers["x-amz-content-sha256"],
+            now,
+        )
+        payload_hash = hashlib.sha256(body).hexdigest()
+        return authorization == expected and request.headers["x-amz-content-sha256"] == payload_hash
+
+    async def object(self, request: Request) -> Response:
+        body = await request.body()
+        if not self._authorized(request, body):
+            return Response(status_code=403)
+        key = request.path_params["key"]
+        if request.method == "PUT":
+            self.objects[key] = (body, dict(request.headers))
+            return Response(status_code=200)
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return Response(status_code=204)
+        if key not in self.objects:
+            return Response(status_code=404)
+        content = self.objects[key][0] if request.method == "GET" else b""
+        return Response(content, status_code=200)
+
+    async def bucket(self, request: Request) -> Response:
+        if request.method == "POST":
+            return await self._form_upload(request)
+        if not self._authorized(request, await request.body()):
+            return Response(status_code=403)
+        prefix = request.query_params.get("prefix", "")
+        keys = sorted(k for k in self.objects if k.startswith(prefix))
+        # One key per page exercises continuation tokens.
+        start = int(request.query_params.get("continuation-token", "0"))
+        page = keys[start:start + 1]
+        truncated = start + 1 < len(keys)
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(self.objects[key][0])}</Size>"
+            f"<LastModified>2024-01-01T00:00:00.000Z</LastModified></Contents>"
+            for key in page
+        )
+        xml = (
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"{contents}<IsTruncated>{str(truncated).lower()}</IsTruncated>"
+            + (f"<NextContinuationToken>{start + 1}</NextContinuationToken>" if truncated else "")
+            + "</ListBucketResult>"
+        )
+        return Response(xml, media_type="application/xml")
+
+    async def _form_upload(self, request: Request) -> Response:
+        form = await request.form()
+        day = form["x-amz-date"][:8]
+        if form["x-amz-signature"] != self.signer.sign_string(day, form["policy"]):
+            return Response(status_code=403)
+        policy = json.loads(base64.b64decode(form["policy"]))
+        content = await form["file"].read()
+        for condition in policy["conditions"]:
+            if isinstance(condition, dict):
+                (name, value), = condition.items()
+                actual = _BUCKET if name == "bucket" else form.get(name)
+                if actual != value:
+                    return Response(status_code=403)
+            elif condition[0] == "starts-with":
+                if not form.get(condition[1].lstrip("$"), "").startswith(condition[2]):
+                    return Response(status_code=403)
+            elif condition[0] == "content-length-range":
+                if not condition[1] <= len(content) <= condition[2]:
+                    return Response(status_code=400)
+        self.objects[form["key"]] = (content, {"content-type": form["Content-Type"]})
+        return Response(status_code=204)
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture
+async def s3_storage(fake_s3):
+    storage = S3UploadStorage(
+        endpoint_url=_ENDPOINT,
+        bucket=_BUCKET,
+        access_key_id=_ACCESS_KEY,
+        secret_access_key=_SECRET_KEY,
+        region=_REGION,
+        public_base_url="https://cdn.kenaz.pl/media",
+        transport=ASGITransport(app=fake_s3.app),
+    )
+    yield storage
+    await storage.aclose()
+
+
+def _api_client(db_session, storage) -> AsyncClient:
+    app = FastAPI()
+    _api = APIRouter(prefix="/api")
+    _api.include_router(uploads_router)
+    app.include_router(_api)
+
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_upload_storage] = lambda: storage
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def _admin_headers(db_session) -> dict[str, str]:
+    user = User(
+        google_id=f"admin-storage-{uuid4().hex}",
+        email=f"admin-storage-{uuid4().hex}@example.com",
+        full_name="Storage Admin",
+        role=UserRole.ADMIN,
+        account_status=AccountStatus.ACTIVE,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+    return {"Authorization": f"Bearer {AuthService(db_session).create_access_token(user)}"}
+
+
+def _jpeg(size=(400, 20)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "navy").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_round_trip(s3_storage: S3UploadStorage, fake_s3: FakeS3, tmp_path):
+    for name in ("a.jpg", "b.webp", "c.json"):
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        await s3_storage.put_file(name, path, "image/jpeg")
+        assert not path.exists()
+
+    assert fake_s3.objects["a.jpg"][1]["cache-control"] == "public, max-age=31536000, immutable"
+    assert await s3_storage.exists("a.jpg")
+    assert not await s3_storage.exists("missing.jpg")
+    assert await s3_storage.read_bytes("b.webp") == b"b.webp"
+    assert await s3_storage.read_bytes("missing.jpg") is None
+    assert b"".join([chunk async for chunk in s3_storage.iter_bytes("c.json")]) == b"c.json"
+    with pytest.raises(FileNotFoundError):
+        [chunk async for chunk in s3_storage.iter_bytes("missing.jpg")]
+
+    listed = await s3_storage.list_objects()
+    assert [(o.key, o.size) for o in listed] == [("a.jpg", 5), ("b.webp", 6), ("c.json", 6)]
+    assert listed[0].modified_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    await s3_storage.delete("a.jpg")
+    await s3_storage.delete("a.jpg")
+    assert sorted(fake_s3.objects) == ["b.webp", "c.json"]
+    assert s3_storage.public_url("b.webp") == "https://cdn.kenaz.pl/media/b.webp"
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_rejects_bad_credentials(fake_s3: FakeS3, tmp_path):
+    storage = S3UploadStorage(
+        endpoint_url=_ENDPOINT,
+        bucket=_BUCKET,
+        access_key_id=_ACCESS_KEY,
+        secret_access_key="wrong",
+        region=_REGION,
+        transport=ASGITransport(app=fake_s3.app),
+    )
+    try:
+        with pytest.raises(HTTPStatusError):
+            await storage.read_bytes("a.jpg")
+    finally:
+        await storage.aclose()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_uses_shared_s3_client(fake_s3: FakeS3, tmp_path, monkeypatch):
+    shared = AsyncClient(transport=ASGITransport(app=fake_s3.app))
+    monkeypatch.setitem(http_clients._clients, "s3", shared)
+    storage = S3UploadStorage(
+        endpoint_url=_ENDPOINT,
+        bucket=_BUCKET,
+        access_key_id=_ACCESS_KEY,
+        secret_access_key=_SECRET_KEY,
+        region=_REGION,
+    )
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"jpeg-bytes")
+
+    await storage.put_file("a.jpg", path, "image/jpeg")
+    await storage.aclose()
+
+    assert fake_s3.objects["a.jpg"][0] == b"jpeg-bytes"
+    # The registry owns the client; closing the adapter leaves it open.
+    assert not shared.is_closed
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_is_processed_into_s3(
+    s3_storage: S3UploadStorage, fake_s3: FakeS3, db_session, tmp_path, monkeypatch,
+):
+    monkeypatch.setattr(uploads_module, "UPLOAD_DIR", tmp_path / "uploads")
+    headers = await _admin_headers(db_session)
+    bucket = AsyncClient(transport=ASGITransport(app=fake_s3.app), base_url=_ENDPOINT)
+    async with _api_client(db_session, s3_storage) as client, bucket:
+        grant = (await client.post("/api/uploads/image/direct", headers=headers)).json()
+        assert grant["key"].startswith("incoming/")
+
+        form = {**grant["fields"], "Content-Type": "text/plain"}
+        rejected = await bucket.post(grant["url"], data=form, files={"file": ("a.jpg", _jpeg())})
+        assert rejected.status_code == 403
+
+        form["Content-Type"] = "image/jpeg"
+        posted = await bucket.post(grant["url"], data=form, files={"file": ("a.jpg", _jpeg())})
+        assert posted.status_code == 204
+
+        response = await client.post(
+            "/api/uploads/image/complete", headers=headers, json={"key": grant["key"]},
+        )
+        assert response.status_code == 200
+        manifest = response.json()
+        assert manifest["url"].startswith("https://cdn.kenaz.pl/media/")
+        stem = manifest["url"].rsplit("/", 1)[1].split(".")[0]
+        assert grant["key"] not in fake_s3.objects
+        assert f"{stem}.json" in fake_s3.objects
+        for variant in manifest["variants"]:
+            assert variant["url"].rsplit("/", 1)[1] in fake_s3.objects
+
+        missing = await client.post(
+            "/api/uploads/image/complete", headers=headers, json={"key": grant["key"]},
+        )
+        assert missing.status_code == 404
+        invalid = await client.post(
+            "/api/uploads/image/complete", headers=headers, json={"key": "../etc/passwd"},
+        )
+        assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_unavailable_with_local_storage(db_session, tmp_path):
+    headers = await _admin_headers(db_session)
+    async with _api_client(db_session, LocalUploadStorage(tmp_path)) as client:
+        response = await client.post("/api/uploads/image/direct", headers=headers)
+    assert response.status_code == 501
@@ -0,0 +1,41 @@
+"""In-process latency counters for background operations and outbound calls."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class LatencyStats:
+    """
+    Count, failures and duration summary of one kind of operation.
+
+    Kept per process and cheap to update; ``as_dict`` is what admin
+    endpoints and log lines report.
+    """
+
+    count: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float | None = None
+
+    def observe(self, seconds: float, ok: bool = True) -> None:
+        """Record one operation that took ``seconds``."""
+        self.count += 1
+        if not ok:
+            self.failures += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+
+    @property
+    def mean_seconds(self) -> float | None:
+        return self.total_seconds / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "mean_seconds": self.mean_seconds,
+            "max_seconds": self.max_seconds,
+            "last_seconds": self.last_seconds,
+        }
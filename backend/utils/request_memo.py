@@ -0,0 +1,43 @@
+"""Request-scoped memo of loaded rows keyed by ``(entity, id)``."""
+
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class RequestMemo:
+    """
+    Remember lookups for one unit of work.
+
+    Services create one memo per instance, and instances live for a single
+    request, so cached rows never outlive the session that loaded them.
+    Misses are remembered too: a user without a subscription is looked up
+    once. Write paths call ``invalidate`` (or ``prime`` with the new value)
+    for the keys they change, and ``clear`` after a rollback.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[tuple[str, str], object] = {}
+
+    async def load(self, entity: str, key: object, loader: Callable[[], Awaitable[T]]) -> T:
+        """Return the memoised value, calling loader on the first lookup only."""
+        memo_key = (entity, str(key))
+        value = self._values.get(memo_key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            self._values[memo_key] = value
+        return value
+
+    def prime(self, entity: str, key: object, value: object) -> None:
+        """Store a value loaded or written elsewhere in this unit of work."""
+        self._values[(entity, str(key))] = value
+
+    def invalidate(self, entity: str, key: object) -> None:
+        """Forget one key so the next lookup reloads it."""
+        self._values.pop((entity, str(key)), None)
+
+    def clear(self) -> None:
+        """Forget everything, e.g. after the session was rolled back."""
+        self._values.clear()
@@ -0,0 +1,58 @@
+"""Accent-insensitive text matching helpers shared by search endpoints."""
+
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Diacritics folded to their base letter: Polish first, then common European.
+_FOLD_MAP = {
+    "ą": "a", "ć": "c", "ę": "e", "ł": "l", "ń": "n", "ó": "o", "ś": "s", "ź": "z", "ż": "z",
+    "á": "a", "à": "a", "â": "a", "ä": "a", "ã": "a", "å": "a", "č": "c", "ç": "c", "ď": "d",
+    "é": "e", "è": "e", "ê": "e", "ë": "e", "ě": "e", "í": "i", "ì": "i", "î": "i", "ï": "i",
+    "ň": "n", "ñ": "n", "ö": "o", "ô": "o", "õ": "o", "ř": "r", "š": "s", "ť": "t", "ú": "u",
+    "ù": "u", "û": "u", "ü": "u", "ů": "u", "ý": "y", "ÿ": "y", "ž": "z",
+}
+FOLD_FROM = "".join(_FOLD_MAP)
+FOLD_TO = "".join(_FOLD_MAP.values())
+_FOLD_TABLE = str.maketrans(FOLD_FROM, FOLD_TO)
+
+_trigram_available: bool | None = None
+
+
+def fold_text(value: str) -> str:
+    """Lower-case value and strip diacritics, matching ``folded`` in SQL."""
+    return value.lower().translate(_FOLD_TABLE)
+
+
+def folded(column):
+    """
+    Return the SQL expression ``translate(lower(column), FOLD_FROM, FOLD_TO)``.
+
+    The fold strings are rendered as literals rather than bind parameters so
+    the expression is identical to the one in the trigram expression index
+    (see the users full-name trigram migration) and the planner can use it.
+    """
+    return func.translate(
+        func.lower(column),
+        literal_column(f"'{FOLD_FROM}'"),
+        literal_column(f"'{FOLD_TO}'"),
+    )
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so value matches literally (escape character ``\\``)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def trigram_search_available(db: AsyncSession) -> bool:
+    """
+    Return whether the pg_trgm extension is installed in the database.
+
+    The result is cached per process; without pg_trgm searches still match
+    by substring but lose typo tolerance and similarity ranking.
+    """
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = bool(await db.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ))
+    return _trigram_available
@@ -197,6 +197,35 @@ export async function fetchAllUsers(authFetch) {
   return safeJson(response)
 }
 
+function userListQuery({ status, role, q, limit, cursor } = {}) {
+  const params = new URLSearchParams()
+  if (status) params.set('status', status)
+  if (role) params.set('role', role)
+  if (q) params.set('q', q)
+  if (limit) params.set('limit', String(limit))
+  if (cursor) params.set('cursor', cursor)
+  const query = params.toString()
+  return query ? `?${query}` : ''
+}
+
+export async function fetchUsersPage(authFetch, filters = {}) {
+  const response = await authFetch(`${API_URL}/admin/users/page${userListQuery(filters)}`)
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.detail || 'Failed to fetch users')
+  }
+  return safeJson(response)
+}
+
+export async function fetchUsersCount(authFetch, { status, role, q } = {}) {
+  const response = await authFetch(`${API_URL}/admin/users/count${userListQuery({ status, role, q })}`)
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.detail || 'Failed to fetch user count')
+  }
+  return safeJson(response)
+}
+
 export async function blockUser(authFetch, userId) {
   const response = await authFetch(`${API_URL}/admin/users/${userId}/block`, { method: 'POST' })
   if (!response.ok) {
@@ -141,6 +141,16 @@ export async function fetchEventAvailability(eventId, authFetch = null) {
  * @param {Function} authFetch
  * @returns {Promise<Record<string, object>>} map of eventId → availability object
  */
+// Place in the registration admission queue, or null once the token expired.
+export async function fetchAdmissionStatus(authFetch, eventId, token) {
+  const response = await authFetch(`${API_URL}/events/${eventId}/register/queue/${encodeURIComponent(token)}`)
+  if (response.status === 404) return null
+  if (!response.ok) {
+    throw new Error('Failed to fetch admission status')
+  }
+  return response.json()
+}
+
 export async function fetchBulkEventAvailability(eventIds, authFetch = null) {
   if (!eventIds || eventIds.length === 0) return {}
   const response = await requestWithAuth(authFetch, `${API_URL}/events/availability/bulk`, {
@@ -9,6 +9,18 @@ export async function fetchMyRegistrations(authFetch) {
   return response.json()
 }
 
+export async function fetchMyRegistrationsPage(authFetch, { scope = 'upcoming', limit, cursor } = {}) {
+  const params = new URLSearchParams({ scope })
+  if (limit) params.set('limit', String(limit))
+  if (cursor) params.set('cursor', cursor)
+  const response = await authFetch(`${API_URL}/users/me/registrations/page?${params}`)
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.detail || 'Failed to fetch registrations')
+  }
+  return response.json()
+}
+
 export async function fetchMyProfile(authFetch) {
   const response = await authFetch(`${API_URL}/users/me/profile`)
   if (!response.ok) {
@@ -91,6 +103,15 @@ export async function confirmManualPayment(authFetch, registrationId) {
   return data
 }
 
+export async function fetchCalendarSyncStatus(authFetch) {
+  const response = await authFetch(`${API_URL}/users/me/calendar-sync`)
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.detail || 'Failed to fetch calendar sync status')
+  }
+  return response.json()
+}
+
 export async function fetchSubscriptionPlans(authFetch) {
   const response = await authFetch(`${API_URL}/payments/subscription/plans`)
   if (!response.ok) {
@@ -4,6 +4,9 @@ import { useAuth } from '../../context/AuthContext'
 import { useLanguage } from '../../context/LanguageContext'
 import { useNotification } from '../../context/NotificationContext'
 import { API_URL } from '../../api/config'
+import { fetchAdmissionStatus } from '../../api/events'
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
 
 function RegisterButton({ eventId, price, isFull, isPast, isTooFarFuture, isRegistered, requiresSubscription, onSuccess }) {
   const { t } = useLanguage()
@@ -14,6 +17,7 @@ function RegisterButton({ eventId, price, isFull, isPast, isTooFarFuture, isRegi
   const { showError, showSuccess } = useNotification()
   const [loading, setLoading] = useState(false)
   const [locked, setLocked] = useState(false)
+  const [queuePosition, setQueuePosition] = useState(null)
 
   const mapErrorMessage = (detail) => {
     const raw = typeof detail === 'string' ? detail : ''
@@ -65,19 +69,34 @@ function RegisterButton({ eventId, price, isFull, isPast, isTooFarFuture, isRegi
     const successUrl = `${window.location.origin}${eventPath}?payment=success`
     const cancelUrl = `${window.location.origin}${eventPath}?payment=cancelled`
 
+    const postRegistration = () => authFetch(`${API_URL}/events/${eventId}/register`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        return_url: successUrl,
+        cancel_url: cancelUrl,
+      }),
+    })
+
     try {
-      const response = await authFetch(`${API_URL}/events/${eventId}/register`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          return_url: successUrl,
-          cancel_url: cancelUrl,
-        }),
-      })
-
-      const data = await response.json()
+      let response = await postRegistration()
+      let data = await response.json()
+
+      // Registration rush: wait for our turn in the admission queue, then retry.
+      while (response.status === 202 && data.queued) {
+        setQueuePosition(data.position)
+        await wait(data.retry_after * 1000)
+        const ticket = await fetchAdmissionStatus(authFetch, eventId, data.admission_token)
+        if (ticket && ticket.state !== 'ready') {
+          data = ticket
+          continue
+        }
+        response = await postRegistration()
+        data = await response.json()
+      }
+      setQueuePosition(null)
 
       if (!response.ok) {
         const rawDetail = data.detail || ''
@@ -119,6 +138,7 @@ function RegisterButton({ eventId, price, isFull, isPast, isTooFarFuture, isRegi
       console.error('Registration error:', err)
       showError(t('registration.errorGeneric'))
     } finally {
+      setQueuePosition(null)
       setLoading(false)
     }
   }
@@ -210,7 +230,9 @@ function RegisterButton({ eventId, price, isFull, isPast, isTooFarFuture, isRegi
               <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4" fill="none" />
               <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z" />
             </svg>
-            {t('registration.submitting')}
+            {queuePosition
+              ? t('registration.queuePosition', { position: queuePosition })
+              : t('registration.submitting')}
           </span>
         ) : isAuthenticated ? (
           isFull
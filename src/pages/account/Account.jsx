@@ -3,7 +3,7 @@ import { Link, Navigate, useNavigate, useSearchParams } from 'react-router-dom'
 import { useAuth } from '../../context/AuthContext'
 import { useLanguage } from '../../context/LanguageContext'
 import { useNotification } from '../../context/NotificationContext'
-import { fetchMyProfile, updateMyProfile, fetchPendingSubscriptionPurchase } from '../../api/user'
+import { fetchMyProfile, updateMyProfile, fetchPendingSubscriptionPurchase, fetchCalendarSyncStatus } from '../../api/user'
 import { usePushNotifications } from '../../hooks/usePushNotifications'
 import InterestTagsPicker from '../../components/forms/InterestTagsPicker'
 import LanguageSelector from '../../components/controls/LanguageSelector'
@@ -20,13 +20,35 @@ function Account({ darkMode, setDarkMode }) {
   const isActive = isAuthenticated && user?.account_status === 'active'
   const { supported: pushSupported, permission: pushPermission, subscribed: pushSubscribed, subscribing: pushSubscribing, subscribe: pushSubscribe, unsubscribe: pushUnsubscribe, error: pushError } = usePushNotifications({ authFetch, isActive })
 
+  const [calendarSync, setCalendarSync] = useState(null)
+
   // After calendar connect redirect (?calendar=connected) re-fetch the user
-  // so has_google_calendar flips to true, then clean the URL.
+  // so has_google_calendar flips to true, then clean the URL. Existing
+  // registrations are added in the background; poll until that finishes.
   useEffect(() => {
-    if (searchParams.get('calendar') === 'connected') {
-      fetchUser(accessToken)
-      showSuccess(t('account.calendarConnected') || 'Połączono z Google Calendar')
-      navigate('/me', { replace: true })
+    if (searchParams.get('calendar') !== 'connected') return undefined
+    fetchUser(accessToken)
+    showSuccess(t('account.calendarConnected') || 'Połączono z Google Calendar')
+    navigate('/me', { replace: true })
+
+    let cancelled = false
+    let timer = null
+    const poll = async () => {
+      try {
+        const status = await fetchCalendarSyncStatus(authFetch)
+        if (cancelled) return
+        setCalendarSync(status)
+        if (status.state === 'queued' || status.state === 'running') {
+          timer = setTimeout(poll, 1500)
+        }
+      } catch (_err) {
+        if (!cancelled) setCalendarSync(null)
+      }
+    }
+    poll()
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
     }
   }, []) // eslint-disable-line react-hooks/exhaustive-deps
   const [aboutMe, setAboutMe] = useState('')
@@ -323,6 +345,11 @@ function Account({ darkMode, setDarkMode }) {
                       </button>
                     </div>
                   )}
+                  {(calendarSync?.state === 'queued' || calendarSync?.state === 'running') && (
+                    <p className="mt-1.5 text-xs text-navy/60 dark:text-cream/60">
+                      {t('account.calendarSyncing', { processed: calendarSync.processed, total: calendarSync.total })}
+                    </p>
+                  )}
                 </div>
 
                 {pushSupported && (